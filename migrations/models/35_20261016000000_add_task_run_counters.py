@@ -0,0 +1,31 @@
+"""新增任务执行统计计数表（回填：make stats-backfill）。"""
+
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS `task_run_counters` (
+            `id` BIGINT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+            `public_id` VARCHAR(32) NOT NULL UNIQUE,
+            `scope` VARCHAR(16) NOT NULL,
+            `scope_id` BIGINT NOT NULL DEFAULT 0,
+            `day` DATE NOT NULL,
+            `total_count` INT NOT NULL DEFAULT 0,
+            `success_count` INT NOT NULL DEFAULT 0,
+            `failure_count` INT NOT NULL DEFAULT 0,
+            `cancelled_count` INT NOT NULL DEFAULT 0,
+            `duration_sum` DOUBLE NOT NULL DEFAULT 0,
+            `duration_count` INT NOT NULL DEFAULT 0,
+            `updated_at` DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+            UNIQUE KEY `uid_task_run_counters_scope_day` (`scope`, `scope_id`, `day`),
+            KEY `idx_task_run_counters_public_id` (`public_id`),
+            KEY `idx_task_run_counters_scope_day` (`scope`, `day`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS `task_run_counters`;
+    """
@@ -0,0 +1,36 @@
+"""新增 Worker 指标汇总表（回填：make metrics-backfill）。"""
+
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS `worker_metrics_rollups` (
+            `id` BIGINT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+            `public_id` VARCHAR(32) NOT NULL UNIQUE,
+            `resolution` VARCHAR(4) NOT NULL,
+            `bucket` DATETIME(6) NOT NULL,
+            `worker_id` VARCHAR(100) NOT NULL DEFAULT '',
+            `cpu_count` INT NOT NULL DEFAULT 0,
+            `cpu_sum` DOUBLE NOT NULL DEFAULT 0,
+            `cpu_min` DOUBLE,
+            `cpu_max` DOUBLE,
+            `memory_count` INT NOT NULL DEFAULT 0,
+            `memory_sum` DOUBLE NOT NULL DEFAULT 0,
+            `memory_min` DOUBLE,
+            `memory_max` DOUBLE,
+            `disk_count` INT NOT NULL DEFAULT 0,
+            `disk_sum` DOUBLE NOT NULL DEFAULT 0,
+            `disk_min` DOUBLE,
+            `disk_max` DOUBLE,
+            UNIQUE KEY `uid_worker_metrics_rollups_res_worker_bucket` (`resolution`, `worker_id`, `bucket`),
+            KEY `idx_worker_metrics_rollups_public_id` (`public_id`),
+            KEY `idx_worker_metrics_rollups_res_bucket` (`resolution`, `bucket`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS `worker_metrics_rollups`;
+    """
@@ -0,0 +1,46 @@
+"""Worker 指标汇总表新增任务数与运行时长列（单节点历史曲线改读汇总表）。"""
+
+from tortoise import BaseDBAsyncClient
+
+RUN_IN_TRANSACTION = False
+
+METRICS = ("task_count", "running_tasks", "uptime")
+
+
+async def _has_column(db: BaseDBAsyncClient, column: str) -> bool:
+    rows = await db.execute_query_dict(
+        "SELECT COUNT(*) AS cnt FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s",
+        ["worker_metrics_rollups", column],
+    )
+    return bool(rows and rows[0]["cnt"])
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    if await _has_column(db, "task_count_count"):
+        return "SELECT 1;"
+    columns = ",\n            ".join(
+        f"ADD COLUMN `{metric}_count` INT NOT NULL DEFAULT 0, "
+        f"ADD COLUMN `{metric}_sum` DOUBLE NOT NULL DEFAULT 0, "
+        f"ADD COLUMN `{metric}_min` DOUBLE, "
+        f"ADD COLUMN `{metric}_max` DOUBLE"
+        for metric in METRICS
+    )
+    return f"""
+        ALTER TABLE `worker_metrics_rollups`
+            {columns};
+    """
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    if not await _has_column(db, "task_count_count"):
+        return "SELECT 1;"
+    columns = ",\n            ".join(
+        f"DROP COLUMN `{metric}_{part}`"
+        for metric in METRICS
+        for part in ("count", "sum", "min", "max")
+    )
+    return f"""
+        ALTER TABLE `worker_metrics_rollups`
+            {columns};
+    """
@@ -25,7 +25,7 @@ from . import common_pb2 as common__pb2  # noqa: E402,F401
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rgateway.proto\x12\nantcode.v1\x1a\x0c\x63ommon.proto\"\xdc\x01\n\rWorkerMessage\x12*\n\theartbeat\x18\x01 \x01(\x0b\x32\x15.antcode.v1.HeartbeatH\x00\x12-\n\x0btask_status\x18\x03 \x01(\x0b\x32\x16.antcode.v1.TaskStatusH\x00\x12\'\n\x08task_ack\x18\x04 \x01(\x0b\x32\x13.antcode.v1.TaskAckH\x00\x12+\n\ncancel_ack\x18\x05 \x01(\x0b\x32\x15.antcode.v1.CancelAckH\x00\x42\t\n\x07payloadJ\x04\x08\x02\x10\x03R\tlog_batch\"\xd1\x01\n\rMasterMessage\x12\x31\n\rtask_dispatch\x18\x01 \x01(\x0b\x32\x18.antcode.v1.TaskDispatchH\x00\x12-\n\x0btask_cancel\x18\x02 \x01(\x0b\x32\x16.antcode.v1.TaskCancelH\x00\x12\x31\n\rconfig_update\x18\x03 \x01(\x0b\x32\x18.antcode.v1.ConfigUpdateH\x00\x12 \n\x04ping\x18\x04 \x01(\x0b\x32\x10.antcode.v1.PingH\x00\x42\t\n\x07payload\"\xa8\x02\n\tHeartbeat\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12$\n\x07metrics\x18\x03 \x01(\x0b\x32\x13.antcode.v1.Metrics\x12#\n\x07os_info\x18\x04 \x01(\x0b\x32\x12.antcode.v1.OSInfo\x12(\n\ttimestamp\x18\x05 \x01(\x0b\x32\x15.antcode.v1.Timestamp\x12=\n\x0c\x63\x61pabilities\x18\x06 \x03(\x0b\x32\'.antcode.v1.Heartbeat.CapabilitiesEntry\x12\x0f\n\x07version\x18\x07 \x01(\t\x1a\x33\n\x11\x43\x61pabilitiesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xaa\x01\n\nTaskStatus\x12\x0e\n\x06run_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x16\n\texit_code\x18\x03 \x01(\x05H\x00\x88\x01\x01\x12\x1a\n\rerror_message\x18\x04 \x01(\tH\x01\x88\x01\x01\x12(\n\ttimestamp\x18\x05 \x01(\x0b\x32\x15.antcode.v1.TimestampB\x0c\n\n_exit_codeB\x10\n\x0e_error_message\"\x93\x03\n\x0cTaskDispatch\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x12\n\nproject_id\x18\x02 \x01(\t\x12\x14\n\x0cproject_type\x18\x03 \x01(\t\x12\x10\n\x08priority\x18\x04 \x01(\x05\x12\x34\n\x06params\x18\x05 \x03(\x0b\x32$.antcode.v1.TaskDispatch.ParamsEntry\x12>\n\x0b\x65nvironment\x18\x06 \x03(\x0b\x32).antcode.v1.TaskDispatch.EnvironmentEntry\x12\x0f\n\x07timeout\x18\x07 \x01(\x05\x12\x14\n\x0c\x64ownload_url\x18\x08 \x01(\t\x12\x11\n\tfile_hash\x18\t \x01(\t\x12\x13\n\x0b\x65ntry_point\x18\n \x01(\t\x12\x0e\n\x06run_id\x18\x0b \x01(\t\x1a-\n\x0bParamsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a\x32\n\x10\x45nvironmentEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"L\n\x07TaskAck\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x02 \x01(\x08\x12\x13\n\x06reason\x18\x03 \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_reason\"-\n\nTaskCancel\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x0e\n\x06run_id\x18\x02 \x01(\t\"M\n\tCancelAck\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x13\n\x06reason\x18\x03 \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_reason\"\xe8\x01\n\x0fRegisterRequest\x12\x0f\n\x07\x61pi_key\x18\x02 \x01(\t\x12\x11\n\tworker_id\x18\x03 \x01(\t\x12#\n\x07os_info\x18\x04 \x01(\x0b\x32\x12.antcode.v1.OSInfo\x12\x43\n\x0c\x63\x61pabilities\x18\x05 \x03(\x0b\x32-.antcode.v1.RegisterRequest.CapabilitiesEntry\x1a\x33\n\x11\x43\x61pabilitiesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01J\x04\x08\x01\x10\x02R\x0cmachine_code\"p\n\x10RegisterResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x11\n\tworker_id\x18\x02 \x01(\t\x12\x12\n\x05\x65rror\x18\x03 \x01(\tH\x00\x88\x01\x01\x12\x1a\n\x12heartbeat_interval\x18\x04 \x01(\x05\x42\x08\n\x06_error\"s\n\x0c\x43onfigUpdate\x12\x34\n\x06\x63onfig\x18\x01 \x03(\x0b\x32$.antcode.v1.ConfigUpdate.ConfigEntry\x1a-\n\x0b\x43onfigEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"0\n\x04Ping\x12(\n\ttimestamp\x18\x01 \x01(\x0b\x32\x15.antcode.v1.Timestamp\"8\n\x0fPollTaskRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x12\n\ntimeout_ms\x18\x02 \x01(\x05\"`\n\x10PollTaskResponse\x12\x10\n\x08has_task\x18\x01 \x01(\x08\x12&\n\x04task\x18\x02 \x01(\x0b\x32\x18.antcode.v1.TaskDispatch\x12\x12\n\nreceipt_id\x18\x03 \x01(\t\"j\n\x0e\x41\x63kTaskRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x12\n\nreceipt_id\x18\x02 \x01(\t\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x03 \x01(\x08\x12\x0e\n\x06reason\x18\x04 \x01(\t\x12\x0f\n\x07task_id\x18\x05 \x01(\t\"1\n\x0f\x41\x63kTaskResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"\xd4\x01\n\x13ReportResultRequest\x12\x0e\n\x06run_id\x18\x01 \x01(\t\x12\x0f\n\x07task_id\x18\x02 \x01(\t\x12\x11\n\tworker_id\x18\x03 \x01(\t\x12\x0e\n\x06status\x18\x04 \x01(\t\x12\x11\n\texit_code\x18\x05 \x01(\x05\x12\x15\n\rerror_message\x18\x06 \x01(\t\x12\x12\n\nstarted_at\x18\x07 \x01(\t\x12\x13\n\x0b\x66inished_at\x18\x08 \x01(\t\x12\x13\n\x0b\x64uration_ms\x18\t \x01(\x03\x12\x11\n\tdata_json\x18\n \x01(\t\"6\n\x14ReportResultResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"h\n\x0eSendLogRequest\x12\x0e\n\x06run_id\x18\x01 \x01(\t\x12\x10\n\x08log_type\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\x11\n\ttimestamp\x18\x04 \x01(\t\x12\x10\n\x08sequence\x18\x05 \x01(\x03\"b\n\x08LogEntry\x12\x0e\n\x06run_id\x18\x01 \x01(\t\x12\x10\n\x08log_type\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\x11\n\ttimestamp\x18\x04 \x01(\t\x12\x10\n\x08sequence\x18\x05 \x01(\x03\"9\n\x13SendLogBatchRequest\x12\"\n\x04logs\x18\x01 \x03(\x0b\x32\x14.antcode.v1.LogEntry\"1\n\x0fSendLogResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"6\n\x14SendLogBatchResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"\x8d\x01\n\x13SendLogChunkRequest\x12\x0e\n\x06run_id\x18\x01 \x01(\t\x12\x10\n\x08log_type\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\x12\x0e\n\x06offset\x18\x04 \x01(\x03\x12\x10\n\x08is_final\x18\x05 \x01(\x08\x12\x10\n\x08\x63hecksum\x18\x06 \x01(\t\x12\x12\n\ntotal_size\x18\x07 \x01(\x03\"J\n\x14SendLogChunkResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x12\n\nack_offset\x18\x02 \x01(\x03\x12\r\n\x05\x65rror\x18\x03 \x01(\t\"\xd5\x01\n\x14SendHeartbeatRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x13\n\x0b\x63pu_percent\x18\x03 \x01(\x02\x12\x16\n\x0ememory_percent\x18\x04 \x01(\x02\x12\x14\n\x0c\x64isk_percent\x18\x05 \x01(\x02\x12\x15\n\rrunning_tasks\x18\x06 \x01(\x05\x12\x1c\n\x14max_concurrent_tasks\x18\x07 \x01(\x05\x12\x11\n\ttimestamp\x18\x08 \x01(\t\x12\x0f\n\x07version\x18\t \x01(\t\"7\n\x15SendHeartbeatResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"\xb4\x01\n\x0e\x43ontrolMessage\x12-\n\x0btask_cancel\x18\x01 \x01(\x0b\x32\x16.antcode.v1.TaskCancelH\x00\x12\x31\n\rconfig_update\x18\x02 \x01(\x0b\x32\x18.antcode.v1.ConfigUpdateH\x00\x12\x35\n\x0fruntime_control\x18\x03 \x01(\x0b\x32\x1a.antcode.v1.RuntimeControlH\x00\x42\t\n\x07payload\"`\n\x0eRuntimeControl\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0e\n\x06\x61\x63tion\x18\x02 \x01(\t\x12\x14\n\x0creply_stream\x18\x03 \x01(\t\x12\x14\n\x0cpayload_json\x18\x04 \x01(\t\";\n\x12PollControlRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x12\n\ntimeout_ms\x18\x02 \x01(\x05\"k\n\x13PollControlResponse\x12\x13\n\x0bhas_control\x18\x01 \x01(\x08\x12+\n\x07\x63ontrol\x18\x02 \x01(\x0b\x32\x1a.antcode.v1.ControlMessage\x12\x12\n\nreceipt_id\x18\x03 \x01(\t\":\n\x11\x41\x63kControlRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x12\n\nreceipt_id\x18\x02 \x01(\t\"4\n\x12\x41\x63kControlResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"\x89\x01\n\x14\x43ontrolResultRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x12\n\nrequest_id\x18\x02 \x01(\t\x12\x0f\n\x07success\x18\x03 \x01(\x08\x12\x14\n\x0cpayload_json\x18\x04 \x01(\t\x12\r\n\x05\x65rror\x18\x05 \x01(\t\x12\x14\n\x0creply_stream\x18\x06 \x01(\t\"7\n\x15\x43ontrolResultResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t2\xb8\x07\n\x0eGatewayService\x12H\n\x0cWorkerStream\x12\x19.antcode.v1.WorkerMessage\x1a\x19.antcode.v1.MasterMessage(\x01\x30\x01\x12\x45\n\x08Register\x12\x1b.antcode.v1.RegisterRequest\x1a\x1c.antcode.v1.RegisterResponse\x12\x45\n\x08PollTask\x12\x1b.antcode.v1.PollTaskRequest\x1a\x1c.antcode.v1.PollTaskResponse\x12\x42\n\x07\x41\x63kTask\x12\x1a.antcode.v1.AckTaskRequest\x1a\x1b.antcode.v1.AckTaskResponse\x12Q\n\x0cReportResult\x12\x1f.antcode.v1.ReportResultRequest\x1a .antcode.v1.ReportResultResponse\x12\x42\n\x07SendLog\x12\x1a.antcode.v1.SendLogRequest\x1a\x1b.antcode.v1.SendLogResponse\x12Q\n\x0cSendLogBatch\x12\x1f.antcode.v1.SendLogBatchRequest\x1a .antcode.v1.SendLogBatchResponse\x12Q\n\x0cSendLogChunk\x12\x1f.antcode.v1.SendLogChunkRequest\x1a .antcode.v1.SendLogChunkResponse\x12T\n\rSendHeartbeat\x12 .antcode.v1.SendHeartbeatRequest\x1a!.antcode.v1.SendHeartbeatResponse\x12N\n\x0bPollControl\x12\x1e.antcode.v1.PollControlRequest\x1a\x1f.antcode.v1.PollControlResponse\x12K\n\nAckControl\x12\x1d.antcode.v1.AckControlRequest\x1a\x1e.antcode.v1.AckControlResponse\x12Z\n\x13ReportControlResult\x12 .antcode.v1.ControlResultRequest\x1a!.antcode.v1.ControlResultResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rgateway.proto\x12\nantcode.v1\x1a\x0c\x63ommon.proto\"\xdc\x01\n\rWorkerMessage\x12*\n\theartbeat\x18\x01 \x01(\x0b\x32\x15.antcode.v1.HeartbeatH\x00\x12-\n\x0btask_status\x18\x03 \x01(\x0b\x32\x16.antcode.v1.TaskStatusH\x00\x12\'\n\x08task_ack\x18\x04 \x01(\x0b\x32\x13.antcode.v1.TaskAckH\x00\x12+\n\ncancel_ack\x18\x05 \x01(\x0b\x32\x15.antcode.v1.CancelAckH\x00\x42\t\n\x07payloadJ\x04\x08\x02\x10\x03R\tlog_batch\"\xd1\x01\n\rMasterMessage\x12\x31\n\rtask_dispatch\x18\x01 \x01(\x0b\x32\x18.antcode.v1.TaskDispatchH\x00\x12-\n\x0btask_cancel\x18\x02 \x01(\x0b\x32\x16.antcode.v1.TaskCancelH\x00\x12\x31\n\rconfig_update\x18\x03 \x01(\x0b\x32\x18.antcode.v1.ConfigUpdateH\x00\x12 \n\x04ping\x18\x04 \x01(\x0b\x32\x10.antcode.v1.PingH\x00\x42\t\n\x07payload\"\xa8\x02\n\tHeartbeat\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12$\n\x07metrics\x18\x03 \x01(\x0b\x32\x13.antcode.v1.Metrics\x12#\n\x07os_info\x18\x04 \x01(\x0b\x32\x12.antcode.v1.OSInfo\x12(\n\ttimestamp\x18\x05 \x01(\x0b\x32\x15.antcode.v1.Timestamp\x12=\n\x0c\x63\x61pabilities\x18\x06 \x03(\x0b\x32\'.antcode.v1.Heartbeat.CapabilitiesEntry\x12\x0f\n\x07version\x18\x07 \x01(\t\x1a\x33\n\x11\x43\x61pabilitiesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xaa\x01\n\nTaskStatus\x12\x0e\n\x06run_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x16\n\texit_code\x18\x03 \x01(\x05H\x00\x88\x01\x01\x12\x1a\n\rerror_message\x18\x04 \x01(\tH\x01\x88\x01\x01\x12(\n\ttimestamp\x18\x05 \x01(\x0b\x32\x15.antcode.v1.TimestampB\x0c\n\n_exit_codeB\x10\n\x0e_error_message\"\x93\x03\n\x0cTaskDispatch\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x12\n\nproject_id\x18\x02 \x01(\t\x12\x14\n\x0cproject_type\x18\x03 \x01(\t\x12\x10\n\x08priority\x18\x04 \x01(\x05\x12\x34\n\x06params\x18\x05 \x03(\x0b\x32$.antcode.v1.TaskDispatch.ParamsEntry\x12>\n\x0b\x65nvironment\x18\x06 \x03(\x0b\x32).antcode.v1.TaskDispatch.EnvironmentEntry\x12\x0f\n\x07timeout\x18\x07 \x01(\x05\x12\x14\n\x0c\x64ownload_url\x18\x08 \x01(\t\x12\x11\n\tfile_hash\x18\t \x01(\t\x12\x13\n\x0b\x65ntry_point\x18\n \x01(\t\x12\x0e\n\x06run_id\x18\x0b \x01(\t\x1a-\n\x0bParamsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a\x32\n\x10\x45nvironmentEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"L\n\x07TaskAck\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x02 \x01(\x08\x12\x13\n\x06reason\x18\x03 \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_reason\"-\n\nTaskCancel\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x0e\n\x06run_id\x18\x02 \x01(\t\"M\n\tCancelAck\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x13\n\x06reason\x18\x03 \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_reason\"\xe8\x01\n\x0fRegisterRequest\x12\x0f\n\x07\x61pi_key\x18\x02 \x01(\t\x12\x11\n\tworker_id\x18\x03 \x01(\t\x12#\n\x07os_info\x18\x04 \x01(\x0b\x32\x12.antcode.v1.OSInfo\x12\x43\n\x0c\x63\x61pabilities\x18\x05 \x03(\x0b\x32-.antcode.v1.RegisterRequest.CapabilitiesEntry\x1a\x33\n\x11\x43\x61pabilitiesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01J\x04\x08\x01\x10\x02R\x0cmachine_code\"p\n\x10RegisterResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x11\n\tworker_id\x18\x02 \x01(\t\x12\x12\n\x05\x65rror\x18\x03 \x01(\tH\x00\x88\x01\x01\x12\x1a\n\x12heartbeat_interval\x18\x04 \x01(\x05\x42\x08\n\x06_error\"s\n\x0c\x43onfigUpdate\x12\x34\n\x06\x63onfig\x18\x01 \x03(\x0b\x32$.antcode.v1.ConfigUpdate.ConfigEntry\x1a-\n\x0b\x43onfigEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"0\n\x04Ping\x12(\n\ttimestamp\x18\x01 \x01(\x0b\x32\x15.antcode.v1.Timestamp\"K\n\x0fPollTaskRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x12\n\ntimeout_ms\x18\x02 \x01(\x05\x12\x11\n\tmax_tasks\x18\x03 \x01(\x05\"H\n\nPolledTask\x12&\n\x04task\x18\x01 \x01(\x0b\x32\x18.antcode.v1.TaskDispatch\x12\x12\n\nreceipt_id\x18\x02 \x01(\t\"\x87\x01\n\x10PollTaskResponse\x12\x10\n\x08has_task\x18\x01 \x01(\x08\x12&\n\x04task\x18\x02 \x01(\x0b\x32\x18.antcode.v1.TaskDispatch\x12\x12\n\nreceipt_id\x18\x03 \x01(\t\x12%\n\x05tasks\x18\x04 \x03(\x0b\x32\x16.antcode.v1.PolledTask\"j\n\x0e\x41\x63kTaskRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x12\n\nreceipt_id\x18\x02 \x01(\t\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x03 \x01(\x08\x12\x0e\n\x06reason\x18\x04 \x01(\t\x12\x0f\n\x07task_id\x18\x05 \x01(\t\"1\n\x0f\x41\x63kTaskResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"\xd4\x01\n\x13ReportResultRequest\x12\x0e\n\x06run_id\x18\x01 \x01(\t\x12\x0f\n\x07task_id\x18\x02 \x01(\t\x12\x11\n\tworker_id\x18\x03 \x01(\t\x12\x0e\n\x06status\x18\x04 \x01(\t\x12\x11\n\texit_code\x18\x05 \x01(\x05\x12\x15\n\rerror_message\x18\x06 \x01(\t\x12\x12\n\nstarted_at\x18\x07 \x01(\t\x12\x13\n\x0b\x66inished_at\x18\x08 \x01(\t\x12\x13\n\x0b\x64uration_ms\x18\t \x01(\x03\x12\x11\n\tdata_json\x18\n \x01(\t\"6\n\x14ReportResultResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"h\n\x0eSendLogRequest\x12\x0e\n\x06run_id\x18\x01 \x01(\t\x12\x10\n\x08log_type\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\x11\n\ttimestamp\x18\x04 \x01(\t\x12\x10\n\x08sequence\x18\x05 \x01(\x03\"b\n\x08LogEntry\x12\x0e\n\x06run_id\x18\x01 \x01(\t\x12\x10\n\x08log_type\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\x11\n\ttimestamp\x18\x04 \x01(\t\x12\x10\n\x08sequence\x18\x05 \x01(\x03\"9\n\x13SendLogBatchRequest\x12\"\n\x04logs\x18\x01 \x03(\x0b\x32\x14.antcode.v1.LogEntry\"1\n\x0fSendLogResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"6\n\x14SendLogBatchResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"\x8d\x01\n\x13SendLogChunkRequest\x12\x0e\n\x06run_id\x18\x01 \x01(\t\x12\x10\n\x08log_type\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\x12\x0e\n\x06offset\x18\x04 \x01(\x03\x12\x10\n\x08is_final\x18\x05 \x01(\x08\x12\x10\n\x08\x63hecksum\x18\x06 \x01(\t\x12\x12\n\ntotal_size\x18\x07 \x01(\x03\"J\n\x14SendLogChunkResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x12\n\nack_offset\x18\x02 \x01(\x03\x12\r\n\x05\x65rror\x18\x03 \x01(\t\"\xd5\x01\n\x14SendHeartbeatRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x13\n\x0b\x63pu_percent\x18\x03 \x01(\x02\x12\x16\n\x0ememory_percent\x18\x04 \x01(\x02\x12\x14\n\x0c\x64isk_percent\x18\x05 \x01(\x02\x12\x15\n\rrunning_tasks\x18\x06 \x01(\x05\x12\x1c\n\x14max_concurrent_tasks\x18\x07 \x01(\x05\x12\x11\n\ttimestamp\x18\x08 \x01(\t\x12\x0f\n\x07version\x18\t \x01(\t\"7\n\x15SendHeartbeatResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"\xb4\x01\n\x0e\x43ontrolMessage\x12-\n\x0btask_cancel\x18\x01 \x01(\x0b\x32\x16.antcode.v1.TaskCancelH\x00\x12\x31\n\rconfig_update\x18\x02 \x01(\x0b\x32\x18.antcode.v1.ConfigUpdateH\x00\x12\x35\n\x0fruntime_control\x18\x03 \x01(\x0b\x32\x1a.antcode.v1.RuntimeControlH\x00\x42\t\n\x07payload\"`\n\x0eRuntimeControl\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0e\n\x06\x61\x63tion\x18\x02 \x01(\t\x12\x14\n\x0creply_stream\x18\x03 \x01(\t\x12\x14\n\x0cpayload_json\x18\x04 \x01(\t\";\n\x12PollControlRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x12\n\ntimeout_ms\x18\x02 \x01(\x05\"k\n\x13PollControlResponse\x12\x13\n\x0bhas_control\x18\x01 \x01(\x08\x12+\n\x07\x63ontrol\x18\x02 \x01(\x0b\x32\x1a.antcode.v1.ControlMessage\x12\x12\n\nreceipt_id\x18\x03 \x01(\t\":\n\x11\x41\x63kControlRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x12\n\nreceipt_id\x18\x02 \x01(\t\"4\n\x12\x41\x63kControlResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"\x89\x01\n\x14\x43ontrolResultRequest\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x12\n\nrequest_id\x18\x02 \x01(\t\x12\x0f\n\x07success\x18\x03 \x01(\x08\x12\x14\n\x0cpayload_json\x18\x04 \x01(\t\x12\r\n\x05\x65rror\x18\x05 \x01(\t\x12\x14\n\x0creply_stream\x18\x06 \x01(\t\"7\n\x15\x43ontrolResultResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t2\xb8\x07\n\x0eGatewayService\x12H\n\x0cWorkerStream\x12\x19.antcode.v1.WorkerMessage\x1a\x19.antcode.v1.MasterMessage(\x01\x30\x01\x12\x45\n\x08Register\x12\x1b.antcode.v1.RegisterRequest\x1a\x1c.antcode.v1.RegisterResponse\x12\x45\n\x08PollTask\x12\x1b.antcode.v1.PollTaskRequest\x1a\x1c.antcode.v1.PollTaskResponse\x12\x42\n\x07\x41\x63kTask\x12\x1a.antcode.v1.AckTaskRequest\x1a\x1b.antcode.v1.AckTaskResponse\x12Q\n\x0cReportResult\x12\x1f.antcode.v1.ReportResultRequest\x1a .antcode.v1.ReportResultResponse\x12\x42\n\x07SendLog\x12\x1a.antcode.v1.SendLogRequest\x1a\x1b.antcode.v1.SendLogResponse\x12Q\n\x0cSendLogBatch\x12\x1f.antcode.v1.SendLogBatchRequest\x1a .antcode.v1.SendLogBatchResponse\x12Q\n\x0cSendLogChunk\x12\x1f.antcode.v1.SendLogChunkRequest\x1a .antcode.v1.SendLogChunkResponse\x12T\n\rSendHeartbeat\x12 .antcode.v1.SendHeartbeatRequest\x1a!.antcode.v1.SendHeartbeatResponse\x12N\n\x0bPollControl\x12\x1e.antcode.v1.PollControlRequest\x1a\x1f.antcode.v1.PollControlResponse\x12K\n\nAckControl\x12\x1d.antcode.v1.AckControlRequest\x1a\x1e.antcode.v1.AckControlResponse\x12Z\n\x13ReportControlResult\x12 .antcode.v1.ControlResultRequest\x1a!.antcode.v1.ControlResultResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -77,51 +77,53 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_PING']._serialized_start=2026
   _globals['_PING']._serialized_end=2074
   _globals['_POLLTASKREQUEST']._serialized_start=2076
-  _globals['_POLLTASKREQUEST']._serialized_end=2132
-  _globals['_POLLTASKRESPONSE']._serialized_start=2134
-  _globals['_POLLTASKRESPONSE']._serialized_end=2230
-  _globals['_ACKTASKREQUEST']._serialized_start=2232
-  _globals['_ACKTASKREQUEST']._serialized_end=2338
-  _globals['_ACKTASKRESPONSE']._serialized_start=2340
-  _globals['_ACKTASKRESPONSE']._serialized_end=2389
-  _globals['_REPORTRESULTREQUEST']._serialized_start=2392
-  _globals['_REPORTRESULTREQUEST']._serialized_end=2604
-  _globals['_REPORTRESULTRESPONSE']._serialized_start=2606
-  _globals['_REPORTRESULTRESPONSE']._serialized_end=2660
-  _globals['_SENDLOGREQUEST']._serialized_start=2662
-  _globals['_SENDLOGREQUEST']._serialized_end=2766
-  _globals['_LOGENTRY']._serialized_start=2768
-  _globals['_LOGENTRY']._serialized_end=2866
-  _globals['_SENDLOGBATCHREQUEST']._serialized_start=2868
-  _globals['_SENDLOGBATCHREQUEST']._serialized_end=2925
-  _globals['_SENDLOGRESPONSE']._serialized_start=2927
-  _globals['_SENDLOGRESPONSE']._serialized_end=2976
-  _globals['_SENDLOGBATCHRESPONSE']._serialized_start=2978
-  _globals['_SENDLOGBATCHRESPONSE']._serialized_end=3032
-  _globals['_SENDLOGCHUNKREQUEST']._serialized_start=3035
-  _globals['_SENDLOGCHUNKREQUEST']._serialized_end=3176
-  _globals['_SENDLOGCHUNKRESPONSE']._serialized_start=3178
-  _globals['_SENDLOGCHUNKRESPONSE']._serialized_end=3252
-  _globals['_SENDHEARTBEATREQUEST']._serialized_start=3255
-  _globals['_SENDHEARTBEATREQUEST']._serialized_end=3468
-  _globals['_SENDHEARTBEATRESPONSE']._serialized_start=3470
-  _globals['_SENDHEARTBEATRESPONSE']._serialized_end=3525
-  _globals['_CONTROLMESSAGE']._serialized_start=3528
-  _globals['_CONTROLMESSAGE']._serialized_end=3708
-  _globals['_RUNTIMECONTROL']._serialized_start=3710
-  _globals['_RUNTIMECONTROL']._serialized_end=3806
-  _globals['_POLLCONTROLREQUEST']._serialized_start=3808
-  _globals['_POLLCONTROLREQUEST']._serialized_end=3867
-  _globals['_POLLCONTROLRESPONSE']._serialized_start=3869
-  _globals['_POLLCONTROLRESPONSE']._serialized_end=3976
-  _globals['_ACKCONTROLREQUEST']._serialized_start=3978
-  _globals['_ACKCONTROLREQUEST']._serialized_end=4036
-  _globals['_ACKCONTROLRESPONSE']._serialized_start=4038
-  _globals['_ACKCONTROLRESPONSE']._serialized_end=4090
-  _globals['_CONTROLRESULTREQUEST']._serialized_start=4093
-  _globals['_CONTROLRESULTREQUEST']._serialized_end=4230
-  _globals['_CONTROLRESULTRESPONSE']._serialized_start=4232
-  _globals['_CONTROLRESULTRESPONSE']._serialized_end=4287
-  _globals['_GATEWAYSERVICE']._serialized_start=4290
-  _globals['_GATEWAYSERVICE']._serialized_end=5242
+  _globals['_POLLTASKREQUEST']._serialized_end=2151
+  _globals['_POLLEDTASK']._serialized_start=2153
+  _globals['_POLLEDTASK']._serialized_end=2225
+  _globals['_POLLTASKRESPONSE']._serialized_start=2228
+  _globals['_POLLTASKRESPONSE']._serialized_end=2363
+  _globals['_ACKTASKREQUEST']._serialized_start=2365
+  _globals['_ACKTASKREQUEST']._serialized_end=2471
+  _globals['_ACKTASKRESPONSE']._serialized_start=2473
+  _globals['_ACKTASKRESPONSE']._serialized_end=2522
+  _globals['_REPORTRESULTREQUEST']._serialized_start=2525
+  _globals['_REPORTRESULTREQUEST']._serialized_end=2737
+  _globals['_REPORTRESULTRESPONSE']._serialized_start=2739
+  _globals['_REPORTRESULTRESPONSE']._serialized_end=2793
+  _globals['_SENDLOGREQUEST']._serialized_start=2795
+  _globals['_SENDLOGREQUEST']._serialized_end=2899
+  _globals['_LOGENTRY']._serialized_start=2901
+  _globals['_LOGENTRY']._serialized_end=2999
+  _globals['_SENDLOGBATCHREQUEST']._serialized_start=3001
+  _globals['_SENDLOGBATCHREQUEST']._serialized_end=3058
+  _globals['_SENDLOGRESPONSE']._serialized_start=3060
+  _globals['_SENDLOGRESPONSE']._serialized_end=3109
+  _globals['_SENDLOGBATCHRESPONSE']._serialized_start=3111
+  _globals['_SENDLOGBATCHRESPONSE']._serialized_end=3165
+  _globals['_SENDLOGCHUNKREQUEST']._serialized_start=3168
+  _globals['_SENDLOGCHUNKREQUEST']._serialized_end=3309
+  _globals['_SENDLOGCHUNKRESPONSE']._serialized_start=3311
+  _globals['_SENDLOGCHUNKRESPONSE']._serialized_end=3385
+  _globals['_SENDHEARTBEATREQUEST']._serialized_start=3388
+  _globals['_SENDHEARTBEATREQUEST']._serialized_end=3601
+  _globals['_SENDHEARTBEATRESPONSE']._serialized_start=3603
+  _globals['_SENDHEARTBEATRESPONSE']._serialized_end=3658
+  _globals['_CONTROLMESSAGE']._serialized_start=3661
+  _globals['_CONTROLMESSAGE']._serialized_end=3841
+  _globals['_RUNTIMECONTROL']._serialized_start=3843
+  _globals['_RUNTIMECONTROL']._serialized_end=3939
+  _globals['_POLLCONTROLREQUEST']._serialized_start=3941
+  _globals['_POLLCONTROLREQUEST']._serialized_end=4000
+  _globals['_POLLCONTROLRESPONSE']._serialized_start=4002
+  _globals['_POLLCONTROLRESPONSE']._serialized_end=4109
+  _globals['_ACKCONTROLREQUEST']._serialized_start=4111
+  _globals['_ACKCONTROLREQUEST']._serialized_end=4169
+  _globals['_ACKCONTROLRESPONSE']._serialized_start=4171
+  _globals['_ACKCONTROLRESPONSE']._serialized_end=4223
+  _globals['_CONTROLRESULTREQUEST']._serialized_start=4226
+  _globals['_CONTROLRESULTREQUEST']._serialized_end=4363
+  _globals['_CONTROLRESULTRESPONSE']._serialized_start=4365
+  _globals['_CONTROLRESULTRESPONSE']._serialized_end=4420
+  _globals['_GATEWAYSERVICE']._serialized_start=4423
+  _globals['_GATEWAYSERVICE']._serialized_end=5375
 # @@protoc_insertion_point(module_scope)
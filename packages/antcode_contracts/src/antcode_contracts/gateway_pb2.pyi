@@ -189,22 +189,34 @@ class Ping(_message.Message):
     def __init__(self, timestamp: _Optional[_Union[_common_pb2.Timestamp, _Mapping]] = ...) -> None: ...
 
 class PollTaskRequest(_message.Message):
-    __slots__ = ("worker_id", "timeout_ms")
+    __slots__ = ("worker_id", "timeout_ms", "max_tasks")
     WORKER_ID_FIELD_NUMBER: _ClassVar[int]
     TIMEOUT_MS_FIELD_NUMBER: _ClassVar[int]
+    MAX_TASKS_FIELD_NUMBER: _ClassVar[int]
     worker_id: str
     timeout_ms: int
-    def __init__(self, worker_id: _Optional[str] = ..., timeout_ms: _Optional[int] = ...) -> None: ...
+    max_tasks: int
+    def __init__(self, worker_id: _Optional[str] = ..., timeout_ms: _Optional[int] = ..., max_tasks: _Optional[int] = ...) -> None: ...
+
+class PolledTask(_message.Message):
+    __slots__ = ("task", "receipt_id")
+    TASK_FIELD_NUMBER: _ClassVar[int]
+    RECEIPT_ID_FIELD_NUMBER: _ClassVar[int]
+    task: TaskDispatch
+    receipt_id: str
+    def __init__(self, task: _Optional[_Union[TaskDispatch, _Mapping]] = ..., receipt_id: _Optional[str] = ...) -> None: ...
 
 class PollTaskResponse(_message.Message):
-    __slots__ = ("has_task", "task", "receipt_id")
+    __slots__ = ("has_task", "task", "receipt_id", "tasks")
     HAS_TASK_FIELD_NUMBER: _ClassVar[int]
     TASK_FIELD_NUMBER: _ClassVar[int]
     RECEIPT_ID_FIELD_NUMBER: _ClassVar[int]
+    TASKS_FIELD_NUMBER: _ClassVar[int]
     has_task: bool
     task: TaskDispatch
     receipt_id: str
-    def __init__(self, has_task: bool = ..., task: _Optional[_Union[TaskDispatch, _Mapping]] = ..., receipt_id: _Optional[str] = ...) -> None: ...
+    tasks: _containers.RepeatedCompositeFieldContainer[PolledTask]
+    def __init__(self, has_task: bool = ..., task: _Optional[_Union[TaskDispatch, _Mapping]] = ..., receipt_id: _Optional[str] = ..., tasks: _Optional[_Iterable[_Union[PolledTask, _Mapping]]] = ...) -> None: ...
 
 class AckTaskRequest(_message.Message):
     __slots__ = ("worker_id", "receipt_id", "accepted", "reason", "task_id")
@@ -4,15 +4,22 @@ Application Services 模块
 应用层编排服务（可依赖基础设施，但不涉及 HTTP/gRPC/WS 适配）：
 - id_service: ID 生成服务
 - quota_service: 配额服务
+- task_stats_service: 任务执行统计服务
 """
 
 from antcode_core.application.services.id_service import IdService
 from antcode_core.application.services.quota_service import QuotaService
 from antcode_core.application.services.task_run_service import TaskRunService, task_run_service
+from antcode_core.application.services.task_stats_service import (
+    TaskStatsService,
+    task_stats_service,
+)
 
 __all__ = [
     "IdService",
     "QuotaService",
     "TaskRunService",
     "task_run_service",
+    "TaskStatsService",
+    "task_stats_service",
 ]
@@ -12,6 +12,10 @@ from antcode_core.application.services.crawl.backends.base import (
     get_queue_backend,
     reset_queue_backend,
 )
+from antcode_core.application.services.crawl.backends.bloom_dedup import (
+    BloomDedupStore,
+    ScalableBloomFilter,
+)
 from antcode_core.application.services.crawl.backends.dedup_backend import (
     DedupStore,
     get_dedup_store,
@@ -61,6 +65,8 @@ __all__ = [
     "RedisCrawlQueueBackend",
     # 去重具体实现
     "InMemoryDedupStore",
+    "BloomDedupStore",
+    "ScalableBloomFilter",
     "RedisDedupStore",
     # 进度具体实现
     "InMemoryProgressStore",
@@ -315,6 +315,7 @@ def get_queue_backend() -> CrawlQueueBackend:
     通过环境变量 CRAWL_BACKEND 配置后端类型：
     - "memory": 内存队列实现（默认）
     - "redis": Redis Streams 实现
+    - "bloom": 同 "memory"（仅去重存储使用 Bloom Filter）
 
     Returns:
         CrawlQueueBackend 实例
@@ -334,7 +335,7 @@ def get_queue_backend() -> CrawlQueueBackend:
     if backend_type == "redis":
         from antcode_core.application.services.crawl.backends.redis_queue import RedisCrawlQueueBackend
         _queue_backend_instance = RedisCrawlQueueBackend()
-    elif backend_type == "memory":
+    elif backend_type in ("memory", "bloom"):
         from antcode_core.application.services.crawl.backends.memory_queue import InMemoryCrawlQueueBackend
         _queue_backend_instance = InMemoryCrawlQueueBackend()
     else:
@@ -0,0 +1,423 @@
+"""紧凑型内存去重存储实现
+
+基于可扩展 Bloom Filter 的进程内去重存储：位数组使用 bytearray，
+按 128 位原始指纹做双重哈希，不保存指纹字符串本身。
+1000 万 URL、误判率 0.1% 时约占 18MB，而 OrderedDict 实现需数 GB。
+
+支持通过 mmap 快照持久化，重启后按需分页加载。
+"""
+
+import asyncio
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+from pathlib import Path
+
+from loguru import logger
+
+from antcode_core.application.services.crawl.backends.dedup_backend import DedupStore
+
+_MASK64 = (1 << 64) - 1
+
+# 快照文件格式：文件头 + 每层元数据 + 各层位数组
+_SNAPSHOT_MAGIC = b"ABF1"
+_SNAPSHOT_HEADER = struct.Struct("<4sdQI")  # magic, error_rate, initial_capacity, layer_count
+_SNAPSHOT_LAYER = struct.Struct("<QQIQ")  # capacity, num_bits, num_hashes, count
+
+
+def fingerprint_hashes(fingerprint: str) -> tuple[int, int]:
+    """将指纹转换为两个 64 位哈希值
+
+    32 位十六进制（MD5）指纹直接解析为 128 位整数，其他格式先做 blake2b。
+    """
+    value = None
+    if len(fingerprint) == 32:
+        try:
+            value = int(fingerprint, 16)
+        except ValueError:
+            value = None
+    if value is None:
+        digest = hashlib.blake2b(fingerprint.encode("utf-8"), digest_size=16).digest()
+        value = int.from_bytes(digest, "big")
+    # h2 取奇数，保证与位数组长度互素的概率更高
+    return value >> 64, (value & _MASK64) | 1
+
+
+class _BloomLayer:
+    """单层定长 Bloom Filter"""
+
+    __slots__ = ("capacity", "num_bits", "num_hashes", "count", "bits")
+
+    def __init__(
+        self,
+        capacity: int,
+        num_bits: int,
+        num_hashes: int,
+        count: int = 0,
+        bits: bytearray | memoryview | None = None,
+    ):
+        self.capacity = capacity
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.count = count
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+
+    @classmethod
+    def create(cls, capacity: int, error_rate: float) -> "_BloomLayer":
+        num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(capacity, num_bits, num_hashes)
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+    def contains(self, h1: int, h2: int) -> bool:
+        bits = self.bits
+        m = self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % m
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def add(self, h1: int, h2: int) -> None:
+        bits = self.bits
+        m = self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % m
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+
+class ScalableBloomFilter:
+    """可扩展 Bloom Filter
+
+    当前层写满后追加新层：容量按 GROWTH 倍增长，误判率按 TIGHTENING 收紧，
+    总误判率上界为 error_rate。
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, initial_capacity: int = 1000000, error_rate: float = 0.001):
+        if not 0 < error_rate < 1:
+            raise ValueError(f"error_rate 必须在 (0, 1) 区间: {error_rate}")
+        self.initial_capacity = max(1, initial_capacity)
+        self.error_rate = error_rate
+        self._layers: list[_BloomLayer] = []
+
+    def __len__(self) -> int:
+        return sum(layer.count for layer in self._layers)
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(len(layer.bits) for layer in self._layers)
+
+    @property
+    def layer_count(self) -> int:
+        return len(self._layers)
+
+    def _new_layer(self) -> _BloomLayer:
+        index = len(self._layers)
+        capacity = self.initial_capacity * (self.GROWTH**index)
+        error_rate = self.error_rate * (1 - self.TIGHTENING) * (self.TIGHTENING**index)
+        layer = _BloomLayer.create(capacity, error_rate)
+        self._layers.append(layer)
+        return layer
+
+    def contains(self, h1: int, h2: int) -> bool:
+        # 新层元素更多，倒序检查命中更快
+        return any(layer.contains(h1, h2) for layer in reversed(self._layers))
+
+    def add(self, h1: int, h2: int) -> bool:
+        """添加元素，返回是否为新元素（可能误判为已存在）"""
+        if self.contains(h1, h2):
+            return False
+        layer = self._layers[-1] if self._layers else self._new_layer()
+        if layer.is_full:
+            layer = self._new_layer()
+        layer.add(h1, h2)
+        return True
+
+    def to_bytes(self) -> bytes:
+        """序列化为快照格式"""
+        parts = [
+            _SNAPSHOT_HEADER.pack(
+                _SNAPSHOT_MAGIC, self.error_rate, self.initial_capacity, len(self._layers)
+            )
+        ]
+        for layer in self._layers:
+            parts.append(
+                _SNAPSHOT_LAYER.pack(layer.capacity, layer.num_bits, layer.num_hashes, layer.count)
+            )
+        parts.extend(bytes(layer.bits) for layer in self._layers)
+        return b"".join(parts)
+
+    @classmethod
+    def from_buffer(cls, buffer) -> "ScalableBloomFilter":
+        """从快照缓冲区恢复，位数组直接引用缓冲区（不复制）"""
+        view = memoryview(buffer)
+        magic, error_rate, initial_capacity, layer_count = _SNAPSHOT_HEADER.unpack_from(view, 0)
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError("无效的 Bloom Filter 快照")
+
+        bloom = cls(initial_capacity=initial_capacity, error_rate=error_rate)
+        offset = _SNAPSHOT_HEADER.size
+        metas = []
+        for _ in range(layer_count):
+            metas.append(_SNAPSHOT_LAYER.unpack_from(view, offset))
+            offset += _SNAPSHOT_LAYER.size
+
+        for capacity, num_bits, num_hashes, count in metas:
+            size = (num_bits + 7) // 8
+            if offset + size > len(view):
+                raise ValueError("Bloom Filter 快照不完整")
+            bits = view[offset : offset + size]
+            bloom._layers.append(_BloomLayer(capacity, num_bits, num_hashes, count, bits))
+            offset += size
+        return bloom
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ScalableBloomFilter":
+        """通过 mmap 加载快照
+
+        使用 ACCESS_COPY 私有映射：页面按需加载，写入不会回写到快照文件。
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        return cls.from_buffer(mapped)
+
+
+class BloomDedupStore(DedupStore):
+    """紧凑型内存去重存储
+
+    与 InMemoryDedupStore 接口一致，区别：
+    - 不做 LRU 淘汰，容量满后自动扩层
+    - exists 可能误判为存在（概率不超过 error_rate），不会漏判
+    - 配置 snapshot_dir 后支持快照持久化
+
+    通过 CRAWL_BACKEND=bloom 或 DEDUP_BACKEND=bloom 启用。
+    """
+
+    DEFAULT_CAPACITY = 1000000
+    DEFAULT_ERROR_RATE = 0.001
+    SNAPSHOT_SUFFIX = ".bloom"
+
+    def __init__(
+        self,
+        snapshot_dir: str | Path | None = None,
+        initial_capacity: int = None,
+        error_rate: float = None,
+        snapshot_every: int = 100000,
+    ):
+        """初始化紧凑型去重存储
+
+        Args:
+            snapshot_dir: 快照目录，为 None 时不持久化
+            initial_capacity: 首层容量
+            error_rate: 总误判率上界
+            snapshot_every: 累计新增多少条后自动写快照，0 表示仅手动
+        """
+        self._initial_capacity = initial_capacity or self.DEFAULT_CAPACITY
+        self._error_rate = error_rate or self.DEFAULT_ERROR_RATE
+        self._snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self._snapshot_every = max(0, snapshot_every)
+        self._filters: dict[str, ScalableBloomFilter] = {}
+        # 自上次快照以来的新增数
+        self._dirty: dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+        if self._snapshot_dir:
+            self._snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    def _snapshot_path(self, project_id: str) -> Path | None:
+        if not self._snapshot_dir:
+            return None
+        safe_name = re.sub(r"[^a-zA-Z0-9._-]", "_", project_id)
+        return self._snapshot_dir / f"{safe_name}{self.SNAPSHOT_SUFFIX}"
+
+    def _get_filter(self, project_id: str) -> ScalableBloomFilter:
+        """获取项目的 Bloom Filter，首次访问时尝试加载快照"""
+        bloom = self._filters.get(project_id)
+        if bloom is not None:
+            return bloom
+
+        path = self._snapshot_path(project_id)
+        if path is not None and path.exists():
+            try:
+                bloom = ScalableBloomFilter.load(path)
+                logger.info(
+                    f"已加载去重快照: project={project_id}, size={len(bloom)}, "
+                    f"layers={bloom.layer_count}"
+                )
+            except Exception as e:
+                logger.warning(f"去重快照加载失败，重新创建: project={project_id}, error={e}")
+                bloom = None
+
+        if bloom is None:
+            bloom = ScalableBloomFilter(self._initial_capacity, self._error_rate)
+        self._filters[project_id] = bloom
+        return bloom
+
+    def _mark_dirty(self, project_id: str, added: int) -> bytes | None:
+        """记录新增数，达到阈值时返回待写入的快照数据"""
+        if not added or not self._snapshot_dir:
+            return None
+        dirty = self._dirty.get(project_id, 0) + added
+        if self._snapshot_every and dirty >= self._snapshot_every:
+            self._dirty[project_id] = 0
+            return self._filters[project_id].to_bytes()
+        self._dirty[project_id] = dirty
+        return None
+
+    async def _write_snapshot(self, project_id: str, data: bytes | None) -> None:
+        path = self._snapshot_path(project_id)
+        if data is None or path is None:
+            return
+        try:
+            await asyncio.to_thread(self._write_file, path, data)
+        except Exception as e:
+            logger.warning(f"写入去重快照失败: project={project_id}, error={e}")
+
+    @staticmethod
+    def _write_file(path: Path, data: bytes) -> None:
+        """原子写入：先写临时文件再 rename，已映射旧快照的读者不受影响"""
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    async def exists(self, project_id: str, fingerprint: str) -> bool:
+        """检查指纹是否存在（可能误判为存在）"""
+        h1, h2 = fingerprint_hashes(fingerprint)
+        async with self._lock:
+            return self._get_filter(project_id).contains(h1, h2)
+
+    async def add(self, project_id: str, fingerprint: str) -> bool:
+        """添加指纹
+
+        Returns:
+            True 表示新添加成功，False 表示（可能）已存在
+        """
+        h1, h2 = fingerprint_hashes(fingerprint)
+        async with self._lock:
+            added = self._get_filter(project_id).add(h1, h2)
+            snapshot = self._mark_dirty(project_id, int(added))
+        await self._write_snapshot(project_id, snapshot)
+        return added
+
+    async def add_many(self, project_id: str, fingerprints: list[str]) -> list[bool]:
+        """批量添加指纹"""
+        if not fingerprints:
+            return []
+
+        hashes = [fingerprint_hashes(fp) for fp in fingerprints]
+        async with self._lock:
+            bloom = self._get_filter(project_id)
+            results = [bloom.add(h1, h2) for h1, h2 in hashes]
+            snapshot = self._mark_dirty(project_id, sum(results))
+        await self._write_snapshot(project_id, snapshot)
+        return results
+
+    async def exists_many(self, project_id: str, fingerprints: list[str]) -> list[bool]:
+        """批量检查指纹是否存在"""
+        if not fingerprints:
+            return []
+
+        hashes = [fingerprint_hashes(fp) for fp in fingerprints]
+        async with self._lock:
+            bloom = self._get_filter(project_id)
+            return [bloom.contains(h1, h2) for h1, h2 in hashes]
+
+    async def size(self, project_id: str) -> int:
+        """获取去重集合大小（已添加的不同指纹数，近似值）"""
+        async with self._lock:
+            return len(self._get_filter(project_id))
+
+    async def clear(self, project_id: str) -> bool:
+        """清空去重集合，同时删除快照"""
+        async with self._lock:
+            bloom = self._filters.get(project_id)
+            if bloom is not None:
+                self._filters[project_id] = ScalableBloomFilter(
+                    bloom.initial_capacity, bloom.error_rate
+                )
+            self._dirty.pop(project_id, None)
+            self._remove_snapshot(project_id)
+            return True
+
+    async def ensure_store(
+        self,
+        project_id: str,
+        capacity: int = 1000000,
+        error_rate: float = 0.001,
+    ) -> bool:
+        """确保去重存储存在
+
+        仅在集合为空时应用 capacity / error_rate，已有数据的集合保持原参数。
+        """
+        async with self._lock:
+            bloom = self._get_filter(project_id)
+            if len(bloom) == 0:
+                self._filters[project_id] = ScalableBloomFilter(capacity, error_rate)
+            return True
+
+    async def snapshot(self, project_id: str | None = None) -> int:
+        """写入快照
+
+        Args:
+            project_id: 项目 ID，为 None 时写入所有项目
+
+        Returns:
+            写入的快照数量
+        """
+        if not self._snapshot_dir:
+            return 0
+
+        async with self._lock:
+            project_ids = [project_id] if project_id else list(self._filters.keys())
+            pending = []
+            for pid in project_ids:
+                if pid in self._filters:
+                    pending.append((pid, self._filters[pid].to_bytes()))
+                    self._dirty[pid] = 0
+
+        for pid, data in pending:
+            await self._write_snapshot(pid, data)
+        return len(pending)
+
+    async def get_stats(self, project_id: str) -> dict:
+        """获取项目的内存占用与分层信息"""
+        async with self._lock:
+            bloom = self._get_filter(project_id)
+            return {
+                "size": len(bloom),
+                "layers": bloom.layer_count,
+                "memory_bytes": bloom.memory_bytes,
+                "error_rate": bloom.error_rate,
+                "initial_capacity": bloom.initial_capacity,
+            }
+
+    def _remove_snapshot(self, project_id: str) -> None:
+        path = self._snapshot_path(project_id)
+        if path is not None and path.exists():
+            path.unlink(missing_ok=True)
+
+    async def get_all_projects(self) -> list[str]:
+        """获取所有项目 ID（用于测试）"""
+        async with self._lock:
+            return list(self._filters.keys())
+
+    async def delete_store(self, project_id: str) -> bool:
+        """删除项目的去重存储（用于测试）"""
+        async with self._lock:
+            self._filters.pop(project_id, None)
+            self._dirty.pop(project_id, None)
+            self._remove_snapshot(project_id)
+            return True
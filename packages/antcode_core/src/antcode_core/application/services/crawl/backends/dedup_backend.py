@@ -1,6 +1,6 @@
 """去重存储后端抽象基类
 
-定义去重存储的抽象接口，支持 Redis Bloom Filter 和内存 Set 两种实现。
+定义去重存储的抽象接口，支持 Redis Bloom Filter、内存 Set 和内存 Bloom Filter 三种实现。
 
 Requirements: 2.1, 2.2, 2.3
 """
@@ -135,6 +135,8 @@ def get_dedup_store() -> DedupStore:
     通过环境变量 CRAWL_BACKEND 或 DEDUP_BACKEND 配置后端类型：
     - "memory": 内存 Set 实现（默认）
     - "redis": Redis Bloom Filter 实现
+    - "bloom": 进程内可扩展 Bloom Filter（队列与进度仍使用内存实现）
+      DEDUP_SNAPSHOT_DIR 配置快照目录，DEDUP_ERROR_RATE 配置误判率
 
     Returns:
         DedupStore 实例
@@ -159,6 +161,12 @@ def get_dedup_store() -> DedupStore:
     elif backend_type == "memory":
         from antcode_core.application.services.crawl.backends.memory_dedup import InMemoryDedupStore
         _dedup_store_instance = InMemoryDedupStore()
+    elif backend_type == "bloom":
+        from antcode_core.application.services.crawl.backends.bloom_dedup import BloomDedupStore
+        _dedup_store_instance = BloomDedupStore(
+            snapshot_dir=os.getenv("DEDUP_SNAPSHOT_DIR") or None,
+            error_rate=float(os.getenv("DEDUP_ERROR_RATE", "0") or 0) or None,
+        )
     else:
         raise ValueError(f"Unknown dedup backend: {backend_type}")
 
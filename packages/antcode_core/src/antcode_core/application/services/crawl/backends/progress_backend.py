@@ -247,6 +247,7 @@ def get_progress_store() -> ProgressStore:
     通过环境变量 CRAWL_BACKEND 或 PROGRESS_BACKEND 配置后端类型：
     - "memory": 内存实现（默认）
     - "redis": Redis Hash 实现
+    - "bloom": 同 "memory"（仅去重存储使用 Bloom Filter）
 
     Returns:
         ProgressStore 实例
@@ -268,7 +269,7 @@ def get_progress_store() -> ProgressStore:
     if backend_type == "redis":
         from antcode_core.application.services.crawl.backends.redis_progress import RedisProgressStore
         _progress_store_instance = RedisProgressStore()
-    elif backend_type == "memory":
+    elif backend_type in ("memory", "bloom"):
         from antcode_core.application.services.crawl.backends.memory_progress import InMemoryProgressStore
         _progress_store_instance = InMemoryProgressStore()
     else:
@@ -37,7 +37,7 @@ class RedisDedupStore(DedupStore):
 
     注意：
     - 需要 Redis 安装 RedisBloom 模块
-    - 如果模块不可用，会降级使用 Set 实现
+    - 如果模块不可用，会降级为客户端 Bloom Filter（Redis String 位数组 + HyperLogLog 计数）
 
     Requirements: 2.2, 2.4, 2.5, 2.6, 2.7
     """
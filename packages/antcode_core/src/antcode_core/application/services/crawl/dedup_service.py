@@ -41,6 +41,7 @@ class CrawlDedupService(BaseService):
     通过环境变量 CRAWL_BACKEND 配置后端类型：
     - "memory": 内存 Set 实现（默认）
     - "redis": Redis Bloom Filter 实现
+    - "bloom": 进程内可扩展 Bloom Filter（大规模单机抓取）
 
     Requirements: 2.1, 2.2, 2.3, 2.4, 2.5, 2.6, 2.7, 2.8
     """
@@ -17,6 +17,10 @@ import aiofiles
 from loguru import logger
 
 from antcode_core.common.config import settings
+from antcode_core.application.services.logs.log_index import (
+    release_line_index,
+    update_line_index,
+)
 
 
 @dataclass
@@ -162,6 +166,9 @@ class LogChunkReceiver:
             # 获取更新后的状态
             state = await self._get_state(state_key)
             
+            # 增量更新行索引（只索引已连续写入的部分）
+            await self._update_line_index(run_id, log_type, state.contiguous_offset)
+            
             # 如果是最终分片，验证完整性
             if is_final and total_size >= 0:
                 verify_result = await self._verify_final(
@@ -175,6 +182,7 @@ class LogChunkReceiver:
                 
                 # 标记完成
                 await self._mark_completed(state_key)
+                release_line_index(self.get_log_file_path(run_id, log_type))
                 
                 logger.info(
                     f"[{run_id}/{log_type}] 传输完成: total_size={total_size}"
@@ -283,12 +291,29 @@ class LogChunkReceiver:
             state_key = f"{run_id}:{log_type}"
             if state_key in self._states:
                 del self._states[state_key]
+            release_line_index(self.get_log_file_path(run_id, log_type))
         
         if run_id in self._write_locks:
             del self._write_locks[run_id]
     
     # ==================== 内部方法 ====================
     
+    async def _update_line_index(self, run_id: str, log_type: str, limit: int) -> None:
+        """
+        更新日志文件的稀疏行索引，失败不影响 ACK
+        
+        Args:
+            run_id: 任务执行 ID
+            log_type: 日志类型 (stdout/stderr)
+            limit: 已连续写入的最大 offset
+        """
+        try:
+            await asyncio.to_thread(
+                update_line_index, self.get_log_file_path(run_id, log_type), limit
+            )
+        except Exception as e:
+            logger.debug(f"[{run_id}/{log_type}] 更新行索引失败: {e}")
+    
     def _get_write_lock(self, run_id: str) -> asyncio.Lock:
         """
         获取写锁
@@ -0,0 +1,286 @@
+"""
+日志稀疏行索引
+
+为日志文件维护一个旁路索引文件（<日志>.lidx），大约每 INDEX_INTERVAL 字节
+记录一个 (行号, 行起始偏移) 检查点，按行分页时定位到最近的检查点再向后读取，
+不需要从头扫描整个文件。
+
+- 写入方在日志落盘后调用 update() 增量扩展索引，只读取新增部分
+- 读取方打开索引时会补齐尚未索引的尾部，因此没有索引的历史文件首次读取时建立
+- 分片乱序写入时文件中间会留下未补齐的空洞（NUL 字节），接收方登记已连续写入的
+  上限，索引只扩展到该上限；上限以内及其他日志中的 NUL 字节按普通内容索引
+"""
+
+import os
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+LINE_INDEX_SUFFIX = ".lidx"
+INDEX_INTERVAL = 64 * 1024
+
+_MAGIC = 0x31584449494C  # "LIIDX1"
+_HEADER_FIELDS = 5  # magic, interval, indexed_bytes, line_count, tail_start
+_READ_BLOCK = 1024 * 1024
+_CACHE_SIZE = 128
+
+
+class LineIndex:
+    """单个日志文件的稀疏行索引"""
+
+    def __init__(self, path, interval=INDEX_INTERVAL):
+        self.path = str(path)
+        self.index_path = self.path + LINE_INDEX_SUFFIX
+        self.interval = interval
+        # 已索引的字节数
+        self.indexed_bytes = 0
+        # 已索引范围内的换行符数量
+        self.line_count = 0
+        # 最后一个换行符之后的偏移（未结束行的起始位置）
+        self.tail_start = 0
+        # 检查点（行 0 的偏移 0 为隐含检查点）
+        self.lines = array("Q")
+        self.offsets = array("Q")
+        self._lock = threading.Lock()
+
+    @property
+    def total_lines(self):
+        """已索引的行数（未以换行结尾的最后一行也计入）"""
+        return self.line_count + (1 if self.indexed_bytes > self.tail_start else 0)
+
+    def load(self):
+        """读取索引文件，损坏或与日志不匹配时从头开始"""
+        self._reset()
+        try:
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+
+        header = array("Q")
+        header_size = _HEADER_FIELDS * header.itemsize
+        if len(data) < header_size:
+            return
+        header.frombytes(data[:header_size])
+        magic, interval, indexed_bytes, line_count, tail_start = header
+
+        try:
+            log_size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if magic != _MAGIC or interval != self.interval or log_size < indexed_bytes:
+            # 格式不符或日志被截断，丢弃旧索引
+            self._remove_index_file()
+            return
+
+        pairs = array("Q")
+        body = data[header_size:]
+        pairs.frombytes(body[: len(body) - len(body) % (2 * pairs.itemsize)])
+
+        # 并发写入可能追加重复检查点，只保留严格递增且在已索引范围内的部分
+        last_offset = 0
+        for i in range(0, len(pairs), 2):
+            line, offset = pairs[i], pairs[i + 1]
+            if offset <= last_offset or offset > indexed_bytes:
+                continue
+            self.lines.append(line)
+            self.offsets.append(offset)
+            last_offset = offset
+
+        self.indexed_bytes = indexed_bytes
+        self.line_count = line_count
+        self.tail_start = tail_start
+
+    def update(self, limit=None):
+        """索引新增内容（最多到 limit 字节），返回是否有变化"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return False
+
+            if size < self.indexed_bytes or (limit is not None and limit < self.indexed_bytes):
+                # 日志被截断，或此前在不知道连续上限时索引进了空洞
+                self._reset()
+                self._remove_index_file()
+
+            end = size if limit is None else min(size, limit)
+            if end <= self.indexed_bytes:
+                return False
+
+            start_checkpoints = len(self.offsets)
+            start_bytes = self.indexed_bytes
+            with open(self.path, "rb") as f:
+                f.seek(self.indexed_bytes)
+                while self.indexed_bytes < end:
+                    block = f.read(min(_READ_BLOCK, end - self.indexed_bytes))
+                    if not block:
+                        break
+                    self._scan(block)
+
+            if self.indexed_bytes == start_bytes:
+                return False
+            self._persist(start_checkpoints, rewrite=start_bytes == 0)
+            return True
+
+    def locate(self, line):
+        """返回不晚于 line 的最近检查点 (行号, 偏移)"""
+        i = bisect_right(self.lines, line)
+        if i == 0:
+            return 0, 0
+        return self.lines[i - 1], self.offsets[i - 1]
+
+    def read_lines(self, start, count):
+        """读取 [start, start + count) 行（不含换行符）"""
+        end_line = min(start + count, self.total_lines)
+        if start >= end_line:
+            return []
+
+        line, offset = self.locate(start)
+        result = []
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while line < start:
+                f.readline()
+                line += 1
+            while line < end_line:
+                position = f.tell()
+                raw = f.readline()
+                if not raw:
+                    break
+                if position + len(raw) > self.indexed_bytes:
+                    raw = raw[: max(0, self.indexed_bytes - position)]
+                result.append(raw.rstrip(b"\r\n").decode("utf-8", errors="replace"))
+                line += 1
+        return result
+
+    def _scan(self, block):
+        """扫描一段新数据，按间隔记录检查点"""
+        base = self.indexed_bytes
+        size = len(block)
+        pos = 0
+        next_mark = (self.offsets[-1] if self.offsets else 0) + self.interval
+
+        while True:
+            search_from = max(pos, next_mark - 1 - base)
+            newline = block.find(b"\n", search_from) if search_from < size else -1
+            if newline < 0:
+                self.line_count += block.count(b"\n", pos)
+                last = block.rfind(b"\n", pos)
+                if last >= 0:
+                    self.tail_start = base + last + 1
+                break
+
+            self.line_count += block.count(b"\n", pos, newline + 1)
+            line_start = base + newline + 1
+            self.tail_start = line_start
+            self.lines.append(self.line_count)
+            self.offsets.append(line_start)
+            next_mark = line_start + self.interval
+            pos = newline + 1
+
+        self.indexed_bytes = base + size
+
+    def _persist(self, start_checkpoints, rewrite=False):
+        """先追加新检查点再写头部，中途崩溃时多出的检查点在加载时被丢弃"""
+        header = array(
+            "Q",
+            [_MAGIC, self.interval, self.indexed_bytes, self.line_count, self.tail_start],
+        )
+        pairs = array("Q")
+        for i in range(start_checkpoints, len(self.offsets)):
+            pairs.append(self.lines[i])
+            pairs.append(self.offsets[i])
+
+        try:
+            if rewrite or not os.path.exists(self.index_path):
+                with open(self.index_path, "wb") as f:
+                    f.write(header.tobytes())
+                    f.write(pairs.tobytes())
+                return
+
+            with open(self.index_path, "r+b") as f:
+                f.seek(0, os.SEEK_END)
+                f.write(pairs.tobytes())
+                f.seek(0)
+                f.write(header.tobytes())
+        except OSError:
+            pass
+
+    def _remove_index_file(self):
+        try:
+            os.remove(self.index_path)
+        except OSError:
+            pass
+
+    def _reset(self):
+        self.indexed_bytes = 0
+        self.line_count = 0
+        self.tail_start = 0
+        self.lines = array("Q")
+        self.offsets = array("Q")
+
+
+_cache: OrderedDict[str, LineIndex] = OrderedDict()
+_cache_lock = threading.Lock()
+# 仍在乱序写入的日志 -> 已连续写入的字节数（之后可能有空洞，不纳入索引）
+_contiguous_limits: dict[str, int] = {}
+
+
+def get_line_index(path):
+    """获取（并补齐）日志文件的行索引，最近使用的索引缓存在内存中"""
+    key = str(path)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+
+    if index is None:
+        index = LineIndex(key)
+        index.load()
+        with _cache_lock:
+            _cache[key] = index
+            while len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    index.update(_contiguous_limits.get(key))
+    return index
+
+
+def update_line_index(path, limit=None):
+    """日志写入后增量更新索引（写入方调用）
+
+    limit 为已连续写入的字节数，登记后读取方也不会索引到其后的空洞，
+    写入完成后调用 release_line_index() 解除。
+    """
+    key = str(path)
+    with _cache_lock:
+        if limit is not None:
+            _contiguous_limits[key] = limit
+        index = _cache.get(key)
+    if index is None:
+        index = LineIndex(key)
+        index.load()
+        with _cache_lock:
+            _cache.setdefault(key, index)
+            index = _cache[key]
+    index.update(limit)
+
+
+def release_line_index(path):
+    """日志已完整写入，解除连续上限"""
+    with _cache_lock:
+        _contiguous_limits.pop(str(path), None)
+
+
+def forget_line_index(path):
+    """删除日志前移除索引文件和缓存"""
+    key = str(path)
+    with _cache_lock:
+        _cache.pop(key, None)
+        _contiguous_limits.pop(key, None)
+    try:
+        os.remove(key + LINE_INDEX_SUFFIX)
+    except OSError:
+        pass
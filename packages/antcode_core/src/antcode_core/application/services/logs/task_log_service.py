@@ -1,18 +1,35 @@
 """任务日志管理服务"""
 import asyncio
+import codecs
+import json
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
 
-
+import aiofiles
 from loguru import logger
 
 from antcode_core.common.config import settings
 from antcode_core.application.services.files.async_file_stream_service import file_stream_service
+from antcode_core.application.services.logs.log_index import (
+    forget_line_index,
+    get_line_index,
+    update_line_index,
+)
 
 # 大文件阈值
 LARGE_FILE_THRESHOLD = 10 * 1024 * 1024  # 10MB
 
+# 本地日志目录指针文件（写在 {log_dir}/{run_id}/ 下，内容为相对 log_dir 的目录）
+LOCAL_LOG_REF = "local.ref"
+# 下载时的读取块大小
+STREAM_CHUNK_SIZE = 1024 * 1024
+# 执行日志目录定位缓存
+_LOCATE_CACHE_SIZE = 4096
+_LOCATE_MISS_TTL = 10.0
+
 
 class TaskLogService:
     """任务日志管理服务"""
@@ -21,12 +38,24 @@ class TaskLogService:
         self.log_dir = Path(settings.TASK_LOG_DIR)
         self.max_log_size = settings.TASK_LOG_MAX_SIZE
         self.log_dir.mkdir(parents=True, exist_ok=True)
+        # run_id -> (本地日志目录或 None, 缓存时间)
+        self._locate_cache: OrderedDict[str, tuple[Path | None, float]] = OrderedDict()
 
     def generate_log_paths(self, run_id, task_name):
         """生成日志文件路径"""
-        task_log_dir = self.log_dir / datetime.now().strftime("%Y-%m-%d") / run_id
+        date_dir = datetime.now().strftime("%Y-%m-%d")
+        task_log_dir = self.log_dir / date_dir / run_id
         task_log_dir.mkdir(parents=True, exist_ok=True)
 
+        # 写入目录指针，查询日志时直接定位，不再遍历日期目录
+        try:
+            ref_dir = self.log_dir / run_id
+            ref_dir.mkdir(parents=True, exist_ok=True)
+            (ref_dir / LOCAL_LOG_REF).write_text(f"{date_dir}/{run_id}", encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"写入日志目录指针失败 {run_id}: {e}")
+        self._remember_location(run_id, task_log_dir)
+
         return {
             "log_file_path": str(task_log_dir / "output.log"),
             "error_log_path": str(task_log_dir / "error.log"),
@@ -47,12 +76,15 @@ class TaskLogService:
                 return
 
             def write_sync():
+                if not append:
+                    forget_line_index(log_file_path)
                 with open(log_file_path, "a" if append else "w", encoding='utf-8') as f:
                     if add_timestamp:
                         ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
                         f.write(f"[{ts}] {content}\n")
                     else:
                         f.write(f"{content}\n")
+                update_line_index(log_file_path)
 
             await asyncio.get_event_loop().run_in_executor(None, write_sync)
         except Exception as e:
@@ -196,14 +228,11 @@ class TaskLogService:
         # 1. 获取本地日志（任务分发阶段的日志）
         local_output = ""
         local_error = ""
-        
-        for date_dir in self.log_dir.iterdir():
-            if date_dir.is_dir():
-                execution_dir = date_dir / run_id
-                if execution_dir.exists():
-                    local_output = await self.read_log(str(execution_dir / "output.log"))
-                    local_error = await self.read_log(str(execution_dir / "error.log"))
-                    break
+
+        execution_dir = await self.locate_local_log_dir(run_id)
+        if execution_dir:
+            local_output = await self.read_log(str(execution_dir / "output.log"))
+            local_error = await self.read_log(str(execution_dir / "error.log"))
         
         # 2. 获取 Worker 日志（日志双通道持久化）
         distributed_output = ""
@@ -239,6 +268,197 @@ class TaskLogService:
             "error": all_error
         }
 
+    async def locate_local_log_dir(self, run_id):
+        """定位执行的本地日志目录（{log_dir}/{date}/{run_id}），不存在返回 None"""
+        cached = self._locate_cache.get(run_id)
+        if cached is not None:
+            path, cached_at = cached
+            if path is not None and path.is_dir():
+                self._locate_cache.move_to_end(run_id)
+                return path
+            if path is None and time.monotonic() - cached_at < _LOCATE_MISS_TTL:
+                return None
+
+        path = await asyncio.get_event_loop().run_in_executor(
+            None, self._locate_local_log_dir_sync, run_id
+        )
+        self._remember_location(run_id, path)
+        return path
+
+    def _locate_local_log_dir_sync(self, run_id):
+        ref_file = self.log_dir / run_id / LOCAL_LOG_REF
+        try:
+            execution_dir = self.log_dir / ref_file.read_text(encoding="utf-8").strip()
+            if execution_dir.is_dir():
+                return execution_dir
+        except OSError:
+            pass
+
+        # 兼容没有指针的历史执行：遍历日期目录
+        try:
+            for entry in os.scandir(self.log_dir):
+                if not entry.is_dir():
+                    continue
+                try:
+                    datetime.strptime(entry.name, "%Y-%m-%d")
+                except ValueError:
+                    continue
+                execution_dir = Path(entry.path) / run_id
+                if execution_dir.is_dir():
+                    return execution_dir
+        except OSError:
+            pass
+        return None
+
+    def _remember_location(self, run_id, path):
+        self._locate_cache[run_id] = (path, time.monotonic())
+        self._locate_cache.move_to_end(run_id)
+        while len(self._locate_cache) > _LOCATE_CACHE_SIZE:
+            self._locate_cache.popitem(last=False)
+
+    async def _get_log_segments(self, run_id, include_distributed=True):
+        """
+        收集执行日志的各个来源（顺序与 get_execution_logs 一致）
+
+        Returns:
+            [(log_type, 文件路径或行列表)]，stdout 在前、stderr 在后
+        """
+        local_dir = await self.locate_local_log_dir(run_id)
+        sources = {"stdout": [], "stderr": []}
+        if local_dir:
+            for log_type, filename in (("stdout", "output.log"), ("stderr", "error.log")):
+                path = local_dir / filename
+                if path.is_file():
+                    sources[log_type].append(path)
+
+        if include_distributed:
+            missing = []
+            try:
+                from antcode_core.application.services.logs.log_chunk_receiver import log_chunk_receiver
+
+                for log_type in ("stdout", "stderr"):
+                    path = log_chunk_receiver.get_log_file_path(run_id, log_type)
+                    if path.is_file():
+                        sources[log_type].append(path)
+                    else:
+                        missing.append(log_type)
+            except Exception as e:
+                logger.debug(f"获取 Worker 日志失败: {e}")
+                missing = ["stdout", "stderr"]
+
+            if missing:
+                redis_output, redis_error = await self._get_redis_stream_logs(run_id)
+                redis_logs = {"stdout": redis_output, "stderr": redis_error}
+                for log_type in missing:
+                    if redis_logs[log_type]:
+                        sources[log_type].append(redis_logs[log_type].splitlines())
+
+        return [
+            (log_type, source)
+            for log_type in ("stdout", "stderr")
+            for source in sources[log_type]
+        ]
+
+    async def read_execution_log_page(self, run_id, offset, limit, include_distributed=True):
+        """
+        按行分页读取执行日志（stdout 在前，stderr 在后）
+
+        文件来源通过稀疏行索引定位到页首，只读取当前页附近的内容。
+
+        Returns:
+            (items, total)，items 为 {"type", "message"} 列表
+        """
+        segments = await self._get_log_segments(run_id, include_distributed)
+
+        def read_sync():
+            items = []
+            total = 0
+            end = offset + limit
+            for log_type, source in segments:
+                index = None
+                if isinstance(source, list):
+                    count = len(source)
+                else:
+                    index = get_line_index(source)
+                    count = index.total_lines
+
+                start, stop = max(offset, total), min(end, total + count)
+                if start < stop:
+                    if index is None:
+                        lines = source[start - total:stop - total]
+                    else:
+                        lines = index.read_lines(start - total, stop - start)
+                    items.extend({"type": log_type, "message": line} for line in lines)
+                total += count
+            return items, total
+
+        return await asyncio.get_event_loop().run_in_executor(None, read_sync)
+
+    async def stream_execution_logs(self, run_id, format="txt", include_distributed=True):
+        """
+        流式输出执行日志（用于下载），按块读取文件，不把整份日志载入内存
+
+        Args:
+            run_id: 执行ID
+            format: txt 或 json（json 结构与 get_execution_logs 返回值一致）
+
+        Yields:
+            bytes: 日志内容块
+        """
+        segments = await self._get_log_segments(run_id, include_distributed)
+        as_json = format == "json"
+
+        if as_json:
+            sections = (("stdout", '{\n  "output": "'), ("stderr", '",\n  "error": "'))
+            footer = '"\n}'
+        else:
+            sections = (("stdout", "=== STDOUT ===\n"), ("stderr", "\n\n=== STDERR ===\n"))
+            footer = ""
+
+        for log_type, header in sections:
+            yield header.encode("utf-8")
+            # 与 get_execution_logs 一致：各来源去掉末尾换行后以换行连接
+            emitted = False
+            for segment_type, source in segments:
+                if segment_type != log_type:
+                    continue
+                pending = "\n" if emitted else ""
+                async for chunk in self._iter_source_text(source):
+                    body = chunk.rstrip("\n")
+                    if body:
+                        yield self._encode_stream_text(pending + body, as_json)
+                        pending = chunk[len(body):]
+                        emitted = True
+                    else:
+                        pending += chunk
+
+        if footer:
+            yield footer.encode("utf-8")
+
+    async def _iter_source_text(self, source):
+        if isinstance(source, list):
+            if source:
+                yield "\n".join(source)
+            return
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            async with aiofiles.open(source, "rb") as f:
+                while True:
+                    block = await f.read(STREAM_CHUNK_SIZE)
+                    if not block:
+                        break
+                    yield decoder.decode(block)
+        except OSError as e:
+            logger.warning(f"读取日志失败 {source}: {e}")
+        yield decoder.decode(b"", final=True)
+
+    @staticmethod
+    def _encode_stream_text(text, as_json):
+        if as_json:
+            text = json.dumps(text, ensure_ascii=False)[1:-1]
+        return text.encode("utf-8")
+
     async def _get_redis_stream_logs(self, run_id: str) -> tuple[str, str]:
         if not settings.REDIS_URL:
             return "", ""
@@ -246,6 +466,7 @@ class TaskLogService:
         try:
             from antcode_core.infrastructure.redis.client import get_redis_client
             from antcode_core.infrastructure.redis.keys import RedisKeys
+            from antcode_core.infrastructure.redis.log_codec import unpack_log_entry
         except Exception as e:
             logger.debug(f"Redis 客户端不可用: {e}")
             return "", ""
@@ -268,32 +489,20 @@ class TaskLogService:
 
                 for msg_id, fields in messages:
                     last_id = self._decode_redis_value(msg_id)
-                    log_entry = self._decode_redis_log(fields)
-                    log_type = log_entry.get("log_type") or "stdout"
-                    content = log_entry.get("content") or ""
-                    if not content:
-                        continue
-                    if log_type == "stderr":
-                        stderr_lines.append(content)
-                    else:
-                        stdout_lines.append(content)
+                    for log_entry in unpack_log_entry(fields):
+                        content = log_entry["content"]
+                        if not content:
+                            continue
+                        if log_entry["log_type"] == "stderr":
+                            stderr_lines.append(content)
+                        else:
+                            stdout_lines.append(content)
 
             return "\n".join(stdout_lines), "\n".join(stderr_lines)
         except Exception as e:
             logger.debug(f"读取 Redis 日志流失败: {e}")
             return "", ""
 
-    def _decode_redis_log(self, fields: dict) -> dict[str, str]:
-        def get_field(name: str):
-            return fields.get(name) or fields.get(name.encode("utf-8"))
-
-        return {
-            "log_type": self._decode_redis_value(get_field("log_type")),
-            "content": self._decode_redis_value(get_field("content")),
-            "timestamp": self._decode_redis_value(get_field("timestamp")),
-            "sequence": self._decode_redis_value(get_field("sequence")),
-        }
-
     def _decode_redis_value(self, value) -> str:
         if isinstance(value, bytes):
             return value.decode("utf-8")
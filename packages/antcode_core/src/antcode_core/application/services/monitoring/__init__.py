@@ -1,3 +1,7 @@
+from antcode_core.application.services.monitoring.metrics_rollup_service import (
+    MetricsRollupService,
+    metrics_rollup_service,
+)
 from antcode_core.application.services.monitoring.monitoring_service import (
     MonitoringService,
     monitoring_service,
@@ -10,6 +14,8 @@ from antcode_core.application.services.monitoring.system_metrics_service import
 )
 
 __all__ = [
+    "MetricsRollupService",
+    "metrics_rollup_service",
     "MonitoringService",
     "monitoring_service",
     "SystemMetrics",
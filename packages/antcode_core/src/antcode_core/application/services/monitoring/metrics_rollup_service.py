@@ -0,0 +1,384 @@
+"""
+Worker 指标汇总服务
+
+- 写入：心跳写入时把 cpu/memory/disk、任务数与运行时长样本累加到内存，由后台任务按间隔合并写入
+  worker_metrics_rollups（1m/1h/1d × 每个 Worker 与集群），停止时写出剩余样本
+- 读取：历史曲线按时间范围读取对应分辨率的汇总行，不再加载原始心跳
+- 保留：每个分辨率单独配置保留天数，随监控数据清理任务删除
+- 回填：已有心跳通过命令一次性回填
+
+    python -m antcode_core.application.services.monitoring.metrics_rollup_service backfill --days 30
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from loguru import logger
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import Case, F, Q, When
+
+from antcode_core.common.config import settings
+from antcode_core.domain.models.monitoring import WorkerMetricsRollup
+from antcode_core.domain.models.worker import WorkerHeartbeat
+
+# 汇总列前缀 -> 心跳 metrics 中的字段名
+METRIC_KEYS = {
+    "cpu": "cpu",
+    "memory": "memory",
+    "disk": "disk",
+    "task_count": "taskCount",
+    "running_tasks": "runningTasks",
+    "uptime": "uptime",
+}
+METRICS = tuple(METRIC_KEYS)
+
+# 分辨率 -> (桶长度秒数, 保留天数配置项)
+RESOLUTIONS = {
+    WorkerMetricsRollup.RESOLUTION_MINUTE: (60, "MONITOR_ROLLUP_MINUTE_KEEP_DAYS"),
+    WorkerMetricsRollup.RESOLUTION_HOUR: (3600, "MONITOR_ROLLUP_HOUR_KEEP_DAYS"),
+    WorkerMetricsRollup.RESOLUTION_DAY: (86400, "MONITOR_ROLLUP_DAY_KEEP_DAYS"),
+}
+
+RollupKey = tuple[str, str, datetime]
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    """时间桶起始时间（保持原时间的时区属性）"""
+    if resolution == WorkerMetricsRollup.RESOLUTION_MINUTE:
+        return timestamp.replace(second=0, microsecond=0)
+    if resolution == WorkerMetricsRollup.RESOLUTION_HOUR:
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _to_float(value) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _entry_values(entry: dict[str, list[float]]) -> dict[str, Any]:
+    """累加值 -> 汇总行字段"""
+    values: dict[str, Any] = {}
+    for metric, (count, total, low, high) in entry.items():
+        values[f"{metric}_count"] = count
+        values[f"{metric}_sum"] = total
+        values[f"{metric}_min"] = low
+        values[f"{metric}_max"] = high
+    return values
+
+
+class MetricsRollupService:
+    """Worker 指标汇总服务"""
+
+    BACKFILL_BATCH_SIZE = 5000
+    BACKFILL_SLACK = timedelta(hours=1)
+
+    def __init__(self):
+        # (resolution, worker_id, bucket) -> {metric: [count, sum, min, max]}
+        self._pending: dict[RollupKey, dict[str, list[float]]] = {}
+        self._last_flush = time.monotonic()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._stats = {"samples": 0, "flushes": 0, "rows_written": 0, "flush_errors": 0}
+
+    def add(
+        self,
+        worker_id: Any,
+        timestamp: datetime,
+        values: dict[str, Any],
+        resolutions: tuple[str, ...] | None = None,
+    ) -> None:
+        """累加一个样本（values 为心跳 metrics，缺失的指标不计入）"""
+        samples = {
+            metric: value
+            for metric in METRICS
+            if (value := _to_float(values.get(METRIC_KEYS[metric]))) is not None
+        }
+        if not samples:
+            return
+
+        self._stats["samples"] += 1
+        entry = {metric: [1, value, value, value] for metric, value in samples.items()}
+        for resolution in resolutions or RESOLUTIONS:
+            bucket = bucket_start(timestamp, resolution)
+            for owner in (str(worker_id), WorkerMetricsRollup.CLUSTER):
+                self._merge_pending((resolution, owner, bucket), entry)
+
+    async def start(self) -> None:
+        """启动后台定时写入（心跳停止后最后一个间隔的样本也会落库）"""
+        if self._flush_task and not self._flush_task.done():
+            return
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"指标汇总定时写入已启动 (间隔: {settings.MONITOR_ROLLUP_FLUSH_INTERVAL}s)")
+
+    async def stop(self) -> None:
+        """停止后台定时写入，并写出内存中剩余的样本"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flush_task
+        self._flush_task = None
+        await self._safe_flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.MONITOR_ROLLUP_FLUSH_INTERVAL)
+            await self._safe_flush()
+
+    async def _safe_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"写入指标汇总失败: {e}")
+
+    async def record(self, worker_id: Any, timestamp: datetime, values: dict[str, Any]) -> None:
+        """累加样本；未启动后台写入时，距上次写入超过间隔即在此合并写入（失败只记日志）"""
+        self.add(worker_id, timestamp, values)
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        if time.monotonic() - self._last_flush >= settings.MONITOR_ROLLUP_FLUSH_INTERVAL:
+            await self._safe_flush()
+
+    async def flush(self) -> int:
+        """把内存中的累加值写入汇总表，返回写入行数"""
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            if not pending:
+                return 0
+
+            # 按键排序，避免并发事务交叉加锁
+            items = sorted(pending.items(), key=lambda item: item[0])
+            written = 0
+            try:
+                for (resolution, worker_id, bucket), entry in items:
+                    await self._apply(resolution, worker_id, bucket, entry)
+                    written += 1
+            except Exception:
+                self._stats["flush_errors"] += 1
+                # 未写入的部分放回，下次重试
+                for key, entry in items[written:]:
+                    self._merge_pending(key, entry)
+                raise
+
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += written
+            return written
+
+    async def _apply(
+        self, resolution: str, worker_id: str, bucket: datetime, entry: dict[str, list[float]]
+    ) -> None:
+        updates: dict[str, Any] = {}
+        for metric, (count, total, low, high) in entry.items():
+            min_field, max_field = f"{metric}_min", f"{metric}_max"
+            updates[f"{metric}_count"] = F(f"{metric}_count") + count
+            updates[f"{metric}_sum"] = F(f"{metric}_sum") + total
+            updates[min_field] = Case(
+                When(Q(**{f"{min_field}__isnull": True}) | Q(**{f"{min_field}__gt": low}), then=low),
+                default=F(min_field),
+            )
+            updates[max_field] = Case(
+                When(Q(**{f"{max_field}__isnull": True}) | Q(**{f"{max_field}__lt": high}), then=high),
+                default=F(max_field),
+            )
+
+        query = WorkerMetricsRollup.filter(resolution=resolution, worker_id=worker_id, bucket=bucket)
+        if await query.update(**updates):
+            return
+
+        try:
+            await WorkerMetricsRollup.create(
+                resolution=resolution, worker_id=worker_id, bucket=bucket, **_entry_values(entry)
+            )
+        except IntegrityError:
+            # 并发创建：改为累加
+            await query.update(**updates)
+
+    def _merge_pending(self, key: RollupKey, entry: dict[str, list[float]]) -> None:
+        target = self._pending.setdefault(key, {})
+        for metric, (count, total, low, high) in entry.items():
+            acc = target.get(metric)
+            if acc is None:
+                target[metric] = [count, total, low, high]
+            else:
+                acc[0] += count
+                acc[1] += total
+                acc[2] = min(acc[2], low)
+                acc[3] = max(acc[3], high)
+
+    async def get_series(
+        self,
+        resolution: str,
+        start: datetime,
+        worker_id: Any = WorkerMetricsRollup.CLUSTER,
+        end: datetime | None = None,
+    ) -> dict[str, list]:
+        """
+        读取汇总序列（按列返回）
+
+        Returns:
+            {"bucket": [...], "cpu_count": [...], "cpu_sum": [...], ...}
+        """
+        columns = ["bucket"] + [
+            f"{metric}_{part}" for metric in METRICS for part in ("count", "sum", "min", "max")
+        ]
+        query = WorkerMetricsRollup.filter(
+            resolution=resolution,
+            worker_id=str(worker_id),
+            bucket__gte=bucket_start(start, resolution),
+        )
+        if end is not None:
+            query = query.filter(bucket__lte=end)
+        rows = await query.order_by("bucket").values_list(*columns)
+        if not rows:
+            return {name: [] for name in columns}
+        return {name: list(values) for name, values in zip(columns, zip(*rows), strict=True)}
+
+    def coarsen(self, series: dict[str, list], bucket_of) -> dict[str, list]:
+        """把序列合并到更粗的时间桶（bucket_of 把原桶映射到新桶）"""
+        merged: dict[str, list] = {name: [] for name in series}
+        for i, bucket in enumerate(series["bucket"]):
+            target = bucket_of(bucket)
+            if merged["bucket"] and merged["bucket"][-1] == target:
+                for metric in METRICS:
+                    merged[f"{metric}_count"][-1] += series[f"{metric}_count"][i]
+                    merged[f"{metric}_sum"][-1] += series[f"{metric}_sum"][i]
+                    for part, pick in (("min", min), ("max", max)):
+                        name = f"{metric}_{part}"
+                        values = [v for v in (merged[name][-1], series[name][i]) if v is not None]
+                        merged[name][-1] = pick(values) if values else None
+                continue
+            merged["bucket"].append(target)
+            for name in series:
+                if name != "bucket":
+                    merged[name].append(series[name][i])
+        return merged
+
+    async def cleanup(self) -> dict[str, int]:
+        """按分辨率删除超过保留天数的汇总行"""
+        deleted = {}
+        now = datetime.now()
+        for resolution, (_, keep_setting) in RESOLUTIONS.items():
+            cutoff = now - timedelta(days=getattr(settings, keep_setting))
+            deleted[resolution] = await WorkerMetricsRollup.filter(
+                resolution=resolution, bucket__lt=cutoff
+            ).delete()
+        if any(deleted.values()):
+            logger.info(f"已清理指标汇总: {deleted}")
+        return deleted
+
+    async def backfill(self, days: int = 30, batch_size: int | None = None) -> dict[str, int]:
+        """
+        从 worker_heartbeats 重建汇总表中指定天数内的数据
+
+        按主键分批扫描心跳记录并累加，已结束的时间桶批量插入（覆盖范围内的旧汇总行）；
+        分钟汇总只回填保留期内的部分。
+        """
+        batch_size = batch_size or self.BACKFILL_BATCH_SIZE
+        now = datetime.now()
+        start = bucket_start(now - timedelta(days=days), WorkerMetricsRollup.RESOLUTION_DAY)
+        minute_start = now - timedelta(days=settings.MONITOR_ROLLUP_MINUTE_KEEP_DAYS)
+        coarse = (WorkerMetricsRollup.RESOLUTION_HOUR, WorkerMetricsRollup.RESOLUTION_DAY)
+
+        await self.flush()
+        await WorkerMetricsRollup.filter(bucket__gte=start).delete()
+
+        written_keys: set[RollupKey] = set()
+        last_id = 0
+        scanned = 0
+        while True:
+            rows = (
+                await WorkerHeartbeat.filter(id__gt=last_id, timestamp__gte=start)
+                .order_by("id")
+                .limit(batch_size)
+                .values_list("id", "worker_id", "timestamp", "metrics")
+            )
+            if not rows:
+                break
+            for _, worker_id, timestamp, metrics in rows:
+                if metrics:
+                    self.add(
+                        worker_id, timestamp, metrics, None if timestamp >= minute_start else coarse
+                    )
+            scanned += len(rows)
+            last_id = rows[-1][0]
+
+            # 心跳大致按时间写入，留出余量后早于本批最早时间的桶视为已结束
+            watermark = min(row[2] for row in rows) - self.BACKFILL_SLACK
+            await self._write_backfill(watermark, written_keys)
+            logger.info(f"指标汇总回填: 已扫描 {scanned} 条心跳")
+
+        await self._write_backfill(None, written_keys)
+        logger.info(f"指标汇总回填完成: 扫描 {scanned} 条心跳，写入 {len(written_keys)} 行")
+        return {"scanned": scanned, "rows": len(written_keys)}
+
+    async def _write_backfill(self, watermark: datetime | None, written_keys: set[RollupKey]) -> None:
+        """写出已结束的时间桶：未写过的批量插入，已写过的（迟到样本）累加更新"""
+        closed = [
+            key
+            for key in self._pending
+            if watermark is None or key[2] + timedelta(seconds=RESOLUTIONS[key[0]][0]) <= watermark
+        ]
+        if not closed:
+            return
+
+        objects = []
+        for key in closed:
+            entry = self._pending.pop(key)
+            resolution, worker_id, bucket = key
+            if key in written_keys:
+                await self._apply(resolution, worker_id, bucket, entry)
+                continue
+            objects.append(
+                WorkerMetricsRollup(
+                    resolution=resolution, worker_id=worker_id, bucket=bucket, **_entry_values(entry)
+                )
+            )
+            written_keys.add(key)
+
+        if objects:
+            await WorkerMetricsRollup.bulk_create(objects, batch_size=1000)
+        self._stats["rows_written"] += len(closed)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {**self._stats, "pending_rows": len(self._pending)}
+
+
+metrics_rollup_service = MetricsRollupService()
+
+__all__ = [
+    "MetricsRollupService",
+    "metrics_rollup_service",
+    "bucket_start",
+]
+
+
+async def _main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    from antcode_core.infrastructure.db.tortoise import close_db, init_db
+
+    parser = argparse.ArgumentParser(description="Worker 指标汇总")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=MetricsRollupService.BACKFILL_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    await init_db()
+    try:
+        await metrics_rollup_service.backfill(days=args.days, batch_size=args.batch_size)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
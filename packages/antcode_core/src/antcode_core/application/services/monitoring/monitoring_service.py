@@ -14,6 +14,9 @@ from decimal import Decimal, InvalidOperation
 from loguru import logger
 from tortoise.expressions import Q
 
+from antcode_core.application.services.monitoring.metrics_rollup_service import (
+    metrics_rollup_service,
+)
 from antcode_core.common.config import settings
 from antcode_core.common.serialization import from_json
 from antcode_core.domain.models.monitoring import (
@@ -162,6 +165,9 @@ class MonitoringService:
                 f"事件{event_deleted}条, 共{total_deleted}条 (>= {keep_days}天前)"
             )
 
+        # 指标汇总按各分辨率的保留天数清理
+        await metrics_rollup_service.cleanup()
+
     async def get_online_workers(self):
         """获取当前在线 Worker 及其实时指标。"""
         redis_client = await self._get_redis()
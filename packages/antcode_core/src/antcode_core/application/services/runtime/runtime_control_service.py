@@ -199,6 +199,15 @@ class RuntimeControlService:
     async def get_platform_info(self, worker_id: str) -> dict[str, Any]:
         return await self.send_command(worker_id, "get_platform_info", {})
 
+    async def prewarm_runtimes(
+        self, worker_id: str, specs: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """下发热点运行时规格，Worker 在后台低优先级预构建（立即返回排队结果）"""
+        return await self.send_command(worker_id, "prewarm", {"specs": specs})
+
+    async def list_warm_runtimes(self, worker_id: str) -> dict[str, Any]:
+        return await self.send_command(worker_id, "list_warm", {})
+
 
 runtime_control_service = RuntimeControlService()
 
@@ -7,6 +7,7 @@ from loguru import logger
 from antcode_core.domain.models.enums import DispatchStatus, RuntimeStatus, TaskStatus
 from antcode_core.domain.models.task import Task
 from antcode_core.domain.models.task_run import TaskRun
+from antcode_core.application.services.task_stats_service import task_stats_service
 
 
 class ExecutionStatusService:
@@ -100,25 +101,21 @@ class ExecutionStatusService:
             return False
         return not (new_order == current_order and current_at and new_at <= current_at)
 
-    async def update_dispatch_status(
+    def apply_dispatch_status(
         self,
-        run_id,
+        execution,
         status,
         status_at=None,
         worker_id=None,
         error_message=None,
     ):
+        """在内存中应用分发状态（不落库），返回是否发生变更"""
         new_status = self._normalize_dispatch(status)
         if not new_status:
             logger.warning(f"无效分发状态: {status}")
             return False
 
         status_at = self._ensure_dt(status_at)
-        execution = await TaskRun.get_or_none(run_id=run_id)
-        if not execution:
-            logger.warning(f"执行记录不存在: {run_id}")
-            return False
-
         if not self._should_update(
             execution.dispatch_status,
             execution.dispatch_updated_at,
@@ -138,30 +135,23 @@ class ExecutionStatusService:
         if new_status in self._dispatch_terminal and not execution.runtime_status and not execution.end_time:
             execution.end_time = status_at
         execution.status = self._derive_overall(execution.dispatch_status, execution.runtime_status)
-
-        await execution.save()
-        await self._sync_task_status(execution, status_at)
         return True
 
-    async def update_runtime_status(
+    def apply_runtime_status(
         self,
-        run_id,
+        execution,
         status,
         status_at=None,
         exit_code=None,
         error_message=None,
     ):
+        """在内存中应用运行状态（不落库），返回是否发生变更"""
         new_status = self._normalize_runtime(status)
         if not new_status:
             logger.warning(f"无效运行状态: {status}")
             return False
 
         status_at = self._ensure_dt(status_at)
-        execution = await TaskRun.get_or_none(run_id=run_id)
-        if not execution:
-            logger.warning(f"执行记录不存在: {run_id}")
-            return False
-
         if not self._should_update(
             execution.runtime_status,
             execution.runtime_updated_at,
@@ -188,16 +178,10 @@ class ExecutionStatusService:
                 execution.duration_seconds = (execution.end_time - execution.start_time).total_seconds()
 
         execution.status = self._derive_overall(execution.dispatch_status, execution.runtime_status)
-
-        await execution.save()
-        await self._sync_task_status(execution, status_at)
         return True
 
-    async def _sync_task_status(self, execution, status_at):
-        task = await Task.get_or_none(id=execution.task_id)
-        if not task:
-            return
-
+    def apply_task_status(self, task, execution, status_at):
+        """在内存中同步 Task 状态与计数（不落库）"""
         previous_status = task.status
         task.status = execution.status
         if execution.runtime_status == RuntimeStatus.RUNNING:
@@ -209,7 +193,83 @@ class ExecutionStatusService:
             if previous_status not in (TaskStatus.FAILED, TaskStatus.TIMEOUT, TaskStatus.REJECTED):
                 task.failure_count = (task.failure_count or 0) + 1
 
+    async def update_dispatch_status(
+        self,
+        run_id,
+        status,
+        status_at=None,
+        worker_id=None,
+        error_message=None,
+        record_stats=True,
+    ):
+        if not self._normalize_dispatch(status):
+            logger.warning(f"无效分发状态: {status}")
+            return False
+
+        status_at = self._ensure_dt(status_at)
+        execution = await TaskRun.get_or_none(run_id=run_id)
+        if not execution:
+            logger.warning(f"执行记录不存在: {run_id}")
+            return False
+
+        previous_status = execution.status
+        if not self.apply_dispatch_status(execution, status, status_at, worker_id, error_message):
+            return False
+
+        await execution.save()
+        task = await self._sync_task_status(execution, status_at)
+        if record_stats:
+            await self._record_stats(execution, previous_status, task)
+        return True
+
+    async def update_runtime_status(
+        self,
+        run_id,
+        status,
+        status_at=None,
+        exit_code=None,
+        error_message=None,
+        record_stats=True,
+    ):
+        """
+        更新运行状态
+
+        record_stats=False 时不更新执行统计，由调用方在补齐结果字段（如时长）后自行记录
+        """
+        if not self._normalize_runtime(status):
+            logger.warning(f"无效运行状态: {status}")
+            return False
+
+        status_at = self._ensure_dt(status_at)
+        execution = await TaskRun.get_or_none(run_id=run_id)
+        if not execution:
+            logger.warning(f"执行记录不存在: {run_id}")
+            return False
+
+        previous_status = execution.status
+        if not self.apply_runtime_status(execution, status, status_at, exit_code, error_message):
+            return False
+
+        await execution.save()
+        task = await self._sync_task_status(execution, status_at)
+        if record_stats:
+            await self._record_stats(execution, previous_status, task)
+        return True
+
+    async def _sync_task_status(self, execution, status_at):
+        task = await Task.get_or_none(id=execution.task_id)
+        if not task:
+            return None
+
+        self.apply_task_status(task, execution, status_at)
         await task.save()
+        return task
+
+    async def _record_stats(self, execution, previous_status, task):
+        if not task_stats_service.is_terminal_transition(previous_status, execution.status):
+            return
+        tasks = {task.id: task} if task else {}
+        await task_stats_service.safe_record([(execution, previous_status)], tasks)
 
 
 execution_status_service = ExecutionStatusService()
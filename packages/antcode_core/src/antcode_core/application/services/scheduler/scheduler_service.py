@@ -424,9 +424,9 @@ class SchedulerService:
     async def get_task_stats(self, task_id, user_id):
         """获取任务统计信息（支持 public_id）
 
-        使用数据库聚合查询优化性能。
+        终态计数读取 task_run_counters 累计行，进行中的执行用单条 GROUP BY 统计。
         """
-        import asyncio
+        from antcode_core.application.services.task_stats_service import task_stats_service
 
         # 使用 QueryHelper 获取任务（自动处理 ID/public_id 和权限检查）
         task = await QueryHelper.get_by_id_or_public_id(
@@ -436,58 +436,27 @@ class SchedulerService:
         if not task:
             return None
 
-        base_query = TaskRun.filter(task_id=task.id)
+        stats = await task_stats_service.get_task_stats(task)
+        counters = stats["counters"]
+        last_execution = stats["last_execution"]
 
-        # 并行执行统计查询
-        total, success_count, failed_count, running_count, last_execution = await asyncio.gather(
-            base_query.count(),
-            base_query.filter(status=TaskStatus.SUCCESS).count(),
-            base_query.filter(status=TaskStatus.FAILED).count(),
-            base_query.filter(status=TaskStatus.RUNNING).count(),
-            base_query.order_by("-start_time").first(),
-        )
-
-        if total == 0:
-            return {
-                "task_id": task_id,
-                "total_executions": 0,
-                "success_count": 0,
-                "failed_count": 0,
-                "running_count": 0,
-                "success_rate": 0.0,
-                "avg_duration": 0.0,
-                "last_execution": None,
-            }
-
-        # 计算平均执行时长（只查询有完成时间的记录）
-        avg_duration = 0.0
-        completed = await base_query.filter(
-            end_time__isnull=False, start_time__isnull=False
-        ).only("start_time", "end_time").limit(1000)
-
-        if completed:
-                durations = [
-                    (e.end_time - e.start_time).total_seconds() for e in completed
-                ]
-                avg_duration = sum(durations) / len(durations)
-
-            return {
-                "task_id": task_id,
-                "total_executions": total,
-                "success_count": success_count,
-                "failed_count": failed_count,
-                "running_count": running_count,
-                "success_rate": success_count / total * 100,
-                "avg_duration": avg_duration,
-                "last_execution": {
-                    "run_id": last_execution.run_id,
-                    "status": last_execution.status,
-                    "start_time": last_execution.start_time,
-                    "end_time": last_execution.end_time,
-                }
-                if last_execution
-                else None,
+        return {
+            "task_id": task_id,
+            "total_executions": counters["total_count"] + stats["active_count"],
+            "success_count": counters["success_count"],
+            "failed_count": counters["failure_count"],
+            "running_count": stats["running_count"],
+            "success_rate": counters["success_rate"] * 100,
+            "avg_duration": counters["avg_duration"],
+            "last_execution": {
+                "run_id": last_execution.run_id,
+                "status": last_execution.status,
+                "start_time": last_execution.start_time,
+                "end_time": last_execution.end_time,
             }
+            if last_execution
+            else None,
+        }
 
     async def verify_admin_permission(self, user_id):
         """验证管理员权限"""
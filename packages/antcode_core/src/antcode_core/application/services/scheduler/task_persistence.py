@@ -154,6 +154,7 @@ class TaskPersistenceService:
         """获取所有被中断的任务"""
         from tortoise.expressions import Q
 
+        from antcode_core.application.services.task_stats_service import task_stats_service
         from antcode_core.domain.models import Task, TaskRun
         from antcode_core.domain.models.enums import TaskStatus
 
@@ -179,7 +180,8 @@ class TaskPersistenceService:
             orphan_executions = [e for e in interrupted_executions if e.task_id not in task_map]
             if orphan_executions:
                 orphan_ids = [e.run_id for e in orphan_executions]
-                await TaskRun.filter(run_id__in=orphan_ids).update(
+                await task_stats_service.update_status(
+                    TaskRun.filter(run_id__in=orphan_ids),
                     status=TaskStatus.FAILED,
                     error_message="任务已被删除",
                     end_time=datetime.now(),
@@ -287,6 +289,7 @@ class TaskRecoveryService:
     async def _recover_task(self, checkpoint):
         """恢复单个任务"""
         try:
+            from antcode_core.application.services.task_stats_service import task_stats_service
             from antcode_core.domain.models import Task, TaskRun
             from antcode_core.domain.models.enums import TaskStatus
 
@@ -299,7 +302,8 @@ class TaskRecoveryService:
             checkpoint.retry_count += 1
             await self.persistence.save_checkpoint(checkpoint)
 
-            await TaskRun.filter(run_id=checkpoint.run_id).update(
+            await task_stats_service.update_status(
+                TaskRun.filter(run_id=checkpoint.run_id),
                 status=TaskStatus.FAILED,
                 error_message="任务中断，已重新调度",
                 end_time=datetime.now(),
@@ -341,10 +345,12 @@ class TaskRecoveryService:
     async def _mark_task_failed(self, checkpoint, error_message):
         """标记任务为失败"""
         try:
+            from antcode_core.application.services.task_stats_service import task_stats_service
             from antcode_core.domain.models import TaskRun
             from antcode_core.domain.models.enums import TaskStatus
 
-            await TaskRun.filter(run_id=checkpoint.run_id).update(
+            await task_stats_service.update_status(
+                TaskRun.filter(run_id=checkpoint.run_id),
                 status=TaskStatus.FAILED,
                 error_message=error_message,
                 end_time=datetime.now(),
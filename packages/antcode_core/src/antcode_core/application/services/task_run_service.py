@@ -10,12 +10,15 @@ from datetime import UTC, datetime
 from typing import Any
 
 from loguru import logger
+from tortoise.transactions import in_transaction
 
 from antcode_core.domain.models.enums import DispatchStatus, RuntimeStatus
+from antcode_core.domain.models.task import Task
 from antcode_core.domain.models.task_run import TaskRun
 from antcode_core.application.services.scheduler.execution_status_service import (
     execution_status_service,
 )
+from antcode_core.application.services.task_stats_service import task_stats_service
 
 
 class TaskRunService:
@@ -35,6 +38,23 @@ class TaskRunService:
         "killed": RuntimeStatus.FAILED,
     }
 
+    # 批量写回时更新的字段
+    BATCH_RUN_FIELDS = [
+        "dispatch_status",
+        "dispatch_updated_at",
+        "runtime_status",
+        "runtime_updated_at",
+        "status",
+        "last_heartbeat",
+        "start_time",
+        "end_time",
+        "duration_seconds",
+        "exit_code",
+        "error_message",
+        "result_data",
+    ]
+    BATCH_TASK_FIELDS = ["status", "last_run_time", "success_count", "failure_count"]
+
     async def update_result(
         self,
         run_id: str,
@@ -61,6 +81,7 @@ class TaskRunService:
         start_dt = self._parse_dt(started_at)
         finish_dt = self._parse_dt(finished_at)
         status_at = finish_dt or start_dt or datetime.now(UTC)
+        previous_status = execution.status
 
         await execution_status_service.update_dispatch_status(
             run_id=execution.run_id,
@@ -74,6 +95,7 @@ class TaskRunService:
             status_at=status_at,
             exit_code=exit_code,
             error_message=error_message,
+            record_stats=False,
         )
 
         # 重新加载，避免覆盖状态字段
@@ -81,7 +103,141 @@ class TaskRunService:
         if not execution:
             return True
 
-        # 同步额外字段
+        self._apply_result_fields(
+            execution,
+            start_dt=start_dt,
+            finish_dt=finish_dt,
+            duration_ms=duration_ms,
+            exit_code=exit_code,
+            error_message=error_message,
+            output=output,
+            data=data,
+        )
+
+        await execution.save()
+        # 结果字段（时长）补齐后再计入统计
+        await task_stats_service.safe_record([(execution, previous_status)])
+        return True
+
+    async def update_results_batch(self, results: list[dict[str, Any]]) -> list[bool]:
+        """
+        批量更新执行结果
+
+        一次查询加载所有涉及的 TaskRun/Task，在内存中按顺序应用状态迁移，
+        然后在单个事务内批量写回。批量写入失败时回退到逐条 update_result。
+
+        Args:
+            results: update_result 的关键字参数列表
+
+        Returns:
+            与 results 一一对应的处理结果（True 表示可以确认消息）
+        """
+        if not results:
+            return []
+
+        handled = [False] * len(results)
+        executions = await self._get_executions([str(r.get("run_id") or "") for r in results])
+
+        tasks: dict[int, Task] = {}
+        task_ids = {e.task_id for e in executions.values()}
+        if task_ids:
+            tasks = {t.id: t for t in await Task.filter(id__in=task_ids)}
+
+        changed_runs: dict[str, TaskRun] = {}
+        changed_tasks: dict[int, Task] = {}
+        # run_id -> 本批次处理前的状态，用于计算统计增量
+        previous_statuses: dict[str, Any] = {}
+        for index, result in enumerate(results):
+            run_id = str(result.get("run_id") or "")
+            execution = executions.get(run_id)
+            if not execution:
+                logger.warning(f"执行记录不存在: {run_id}")
+                handled[index] = True
+                continue
+
+            runtime_status = self._normalize_status(result.get("status") or "")
+            if not runtime_status:
+                logger.warning(f"无法识别的运行状态: {result.get('status')}")
+                continue
+
+            start_dt = self._parse_dt(result.get("started_at"))
+            finish_dt = self._parse_dt(result.get("finished_at"))
+            status_at = finish_dt or start_dt or datetime.now(UTC)
+
+            previous_statuses.setdefault(execution.run_id, execution.status)
+            dispatch_changed = execution_status_service.apply_dispatch_status(
+                execution, DispatchStatus.ACKED, status_at
+            )
+            runtime_changed = execution_status_service.apply_runtime_status(
+                execution,
+                runtime_status,
+                status_at,
+                exit_code=result.get("exit_code"),
+                error_message=result.get("error_message"),
+            )
+            task = tasks.get(execution.task_id)
+            if task and (dispatch_changed or runtime_changed):
+                execution_status_service.apply_task_status(task, execution, status_at)
+                changed_tasks[task.id] = task
+
+            self._apply_result_fields(
+                execution,
+                start_dt=start_dt,
+                finish_dt=finish_dt,
+                duration_ms=result.get("duration_ms"),
+                exit_code=result.get("exit_code"),
+                error_message=result.get("error_message"),
+                output=result.get("output"),
+                data=result.get("data"),
+            )
+            changed_runs[execution.run_id] = execution
+            handled[index] = True
+
+        if not changed_runs:
+            return handled
+
+        try:
+            async with in_transaction():
+                await TaskRun.bulk_update(
+                    list(changed_runs.values()), fields=self.BATCH_RUN_FIELDS
+                )
+                if changed_tasks:
+                    await Task.bulk_update(
+                        list(changed_tasks.values()), fields=self.BATCH_TASK_FIELDS
+                    )
+                # 统计计数与结果写回在同一事务内
+                await task_stats_service.record(
+                    [(e, previous_statuses.get(e.run_id)) for e in changed_runs.values()],
+                    tasks,
+                )
+        except Exception as e:
+            logger.error(f"批量更新执行结果失败，回退逐条更新: {e}")
+            return await self._update_results_one_by_one(results)
+
+        return handled
+
+    async def _update_results_one_by_one(self, results: list[dict[str, Any]]) -> list[bool]:
+        handled = []
+        for result in results:
+            try:
+                handled.append(await self.update_result(**result))
+            except Exception as e:
+                logger.error(f"更新执行结果失败: {result.get('run_id')}, {e}")
+                handled.append(False)
+        return handled
+
+    def _apply_result_fields(
+        self,
+        execution: TaskRun,
+        start_dt: datetime | None,
+        finish_dt: datetime | None,
+        duration_ms: float | str | None,
+        exit_code: int | None,
+        error_message: str | None,
+        output: str | None,
+        data: dict[str, Any] | None,
+    ) -> None:
+        """同步额外字段"""
         if start_dt and not execution.start_time:
             execution.start_time = start_dt
         if finish_dt:
@@ -102,9 +258,6 @@ class TaskRunService:
         if result_data:
             execution.result_data = result_data
 
-        await execution.save()
-        return True
-
     async def update_status(
         self,
         run_id: str,
@@ -145,6 +298,23 @@ class TaskRunService:
 
         return await TaskRun.get_or_none(public_id=run_id_str)
 
+    async def _get_executions(self, run_ids: list[str]) -> dict[str, TaskRun]:
+        """按 run_id 批量加载，未命中的短 ID 回退按 public_id 查询"""
+        wanted = {run_id for run_id in run_ids if run_id}
+        if not wanted:
+            return {}
+
+        found: dict[str, TaskRun] = {}
+        for execution in await TaskRun.filter(run_id__in=wanted):
+            found[execution.run_id] = execution
+
+        # public_id 固定为 32 字符；超长 run_id 不应回退到 public_id 查询
+        fallback = {run_id for run_id in wanted - found.keys() if len(run_id) <= 32}
+        if fallback:
+            for execution in await TaskRun.filter(public_id__in=fallback):
+                found[execution.public_id] = found.get(execution.run_id, execution)
+        return found
+
     def _normalize_status(self, status: str | RuntimeStatus) -> RuntimeStatus | None:
         if isinstance(status, RuntimeStatus):
             return status
@@ -0,0 +1,432 @@
+"""
+任务执行统计服务
+
+- 计数：执行进入终态时增量更新 task_run_counters（任务/项目/用户/全局 × 按日/累计）
+- 读取：统计面板读取累计行（每个维度 1 行），趋势读取日行；任务当前状态用单条 GROUP BY 查询
+- 回填：已有执行记录通过命令一次性回填
+
+    python -m antcode_core.application.services.task_stats_service backfill
+
+回填会重建整张计数表，建议在低峰期执行。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from datetime import UTC, date, datetime
+from typing import Any
+
+from loguru import logger
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F
+from tortoise.functions import Count
+from tortoise.queryset import QuerySet
+from tortoise.transactions import in_transaction
+
+from antcode_core.domain.models.enums import ScheduleType, TaskStatus
+from antcode_core.domain.models.task import Task
+from antcode_core.domain.models.task_run import TaskRun
+from antcode_core.domain.models.task_stats import ALL_TIME, TaskRunCounter
+
+# 计数字段顺序与 delta 列表一一对应
+COUNTER_FIELDS = (
+    "total_count",
+    "success_count",
+    "failure_count",
+    "cancelled_count",
+    "duration_sum",
+    "duration_count",
+)
+
+TERMINAL_STATUSES = frozenset(
+    {
+        TaskStatus.SUCCESS,
+        TaskStatus.FAILED,
+        TaskStatus.TIMEOUT,
+        TaskStatus.REJECTED,
+        TaskStatus.CANCELLED,
+        TaskStatus.SKIPPED,
+    }
+)
+FAILURE_STATUSES = frozenset({TaskStatus.FAILED, TaskStatus.TIMEOUT, TaskStatus.REJECTED})
+ACTIVE_STATUSES = frozenset(
+    {TaskStatus.PENDING, TaskStatus.DISPATCHING, TaskStatus.QUEUED, TaskStatus.RUNNING}
+)
+SCHEDULED_TYPES = frozenset({ScheduleType.CRON, ScheduleType.INTERVAL, ScheduleType.DATE})
+
+CounterKey = tuple[str, int, date]
+
+
+def _normalize_status(status) -> TaskStatus | None:
+    if status is None or isinstance(status, TaskStatus):
+        return status
+    try:
+        return TaskStatus(status)
+    except ValueError:
+        return None
+
+
+def _outcome(status: TaskStatus | None) -> tuple[int, int, int, int]:
+    """终态对应的 (total, success, failure, cancelled) 计数"""
+    if status not in TERMINAL_STATUSES:
+        return (0, 0, 0, 0)
+    return (
+        1,
+        int(status == TaskStatus.SUCCESS),
+        int(status in FAILURE_STATUSES),
+        int(status == TaskStatus.CANCELLED),
+    )
+
+
+def _to_day(value: datetime | None) -> date:
+    if value is None:
+        return datetime.now(UTC).date()
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC)
+    return value.date()
+
+
+class TaskStatsService:
+    """任务执行统计服务"""
+
+    BACKFILL_BATCH_SIZE = 5000
+
+    def is_terminal_transition(self, previous_status, status) -> bool:
+        """状态变化是否影响计数（进入终态，或终态之间改判）"""
+        previous = _normalize_status(previous_status)
+        current = _normalize_status(status)
+        return current in TERMINAL_STATUSES and previous != current
+
+    def build_deltas(
+        self,
+        changes: list[tuple[TaskRun, Any]],
+        tasks: dict[int, Task],
+    ) -> dict[CounterKey, list[float]]:
+        """
+        计算计数增量
+
+        Args:
+            changes: (执行记录, 变更前状态) 列表
+            tasks: task_id -> Task，用于确定项目与用户维度
+        """
+        deltas: dict[CounterKey, list[float]] = defaultdict(lambda: [0] * len(COUNTER_FIELDS))
+        for execution, previous_status in changes:
+            previous = _normalize_status(previous_status)
+            current = _normalize_status(execution.status)
+            if not self.is_terminal_transition(previous, current):
+                continue
+
+            before = _outcome(previous)
+            after = _outcome(current)
+            delta = [a - b for a, b in zip(after, before)]
+            # 时长只在首次进入终态时计入
+            if not before[0] and execution.duration_seconds is not None:
+                delta += [execution.duration_seconds, 1]
+            else:
+                delta += [0, 0]
+
+            task = tasks.get(execution.task_id)
+            self._accumulate(
+                deltas,
+                delta,
+                execution.task_id,
+                task.project_id if task else None,
+                task.user_id if task else None,
+                _to_day(execution.end_time),
+            )
+        return deltas
+
+    def _accumulate(
+        self,
+        deltas: dict[CounterKey, list[float]],
+        delta: list[float],
+        task_id: int,
+        project_id: int | None,
+        user_id: int | None,
+        day: date,
+    ) -> None:
+        """把一次执行的增量累加到各维度的日行与累计行（任务已删除时只计任务与全局维度）"""
+        scopes = [(TaskRunCounter.SCOPE_TASK, task_id), (TaskRunCounter.SCOPE_GLOBAL, 0)]
+        if project_id is not None:
+            scopes.append((TaskRunCounter.SCOPE_PROJECT, project_id))
+        if user_id is not None:
+            scopes.append((TaskRunCounter.SCOPE_USER, user_id))
+
+        for scope, scope_id in scopes:
+            for key in ((scope, scope_id, day), (scope, scope_id, ALL_TIME)):
+                row = deltas[key]
+                for i, value in enumerate(delta):
+                    row[i] += value
+
+    async def record(
+        self,
+        changes: list[tuple[TaskRun, Any]],
+        tasks: dict[int, Task] | None = None,
+    ) -> None:
+        """按执行状态变化增量更新计数"""
+        changes = [c for c in changes if self.is_terminal_transition(c[1], c[0].status)]
+        if not changes:
+            return
+
+        if tasks is None:
+            task_ids = {execution.task_id for execution, _ in changes}
+            tasks = {t.id: t for t in await Task.filter(id__in=task_ids)}
+
+        await self.apply_deltas(self.build_deltas(changes, tasks))
+
+    async def apply_deltas(self, deltas: dict[CounterKey, list[float]]) -> None:
+        """写入计数增量（按键排序，避免并发事务交叉加锁）"""
+        for (scope, scope_id, day), delta in sorted(deltas.items()):
+            updates = {
+                name: F(name) + value for name, value in zip(COUNTER_FIELDS, delta) if value
+            }
+            if not updates:
+                continue
+
+            query = TaskRunCounter.filter(scope=scope, scope_id=scope_id, day=day)
+            if await query.update(**updates):
+                continue
+            try:
+                await TaskRunCounter.create(
+                    scope=scope, scope_id=scope_id, day=day, **dict(zip(COUNTER_FIELDS, delta))
+                )
+            except IntegrityError:
+                # 并发创建：改为累加
+                await query.update(**updates)
+
+    async def safe_record(
+        self,
+        changes: list[tuple[TaskRun, Any]],
+        tasks: dict[int, Task] | None = None,
+    ) -> None:
+        """记录计数，失败只记日志（统计不影响结果处理）"""
+        try:
+            await self.record(changes, tasks)
+        except Exception as e:
+            logger.warning(f"更新任务执行统计失败: {e}")
+
+    async def record_transitions(self, transitions: list[tuple[int, Any, Any]]) -> None:
+        """
+        按 (执行 ID, 变更前状态, 变更后状态) 更新计数
+
+        用于不经过模型实例的集合式 UPDATE：写入后按 ID 重新读取执行记录，
+        以写入时的目标状态计算增量（期间被其他路径再次改写的，由该路径自行计数）。
+        """
+        transitions = [t for t in transitions if self.is_terminal_transition(t[1], t[2])]
+        if not transitions:
+            return
+
+        targets = {run_id: (previous, current) for run_id, previous, current in transitions}
+        changes = []
+        for execution in await TaskRun.filter(id__in=list(targets)):
+            previous, execution.status = targets[execution.id]
+            changes.append((execution, previous))
+        await self.record(changes)
+
+    async def safe_record_transitions(self, transitions: list[tuple[int, Any, Any]]) -> None:
+        """记录集合式 UPDATE 的计数，失败只记日志"""
+        try:
+            await self.record_transitions(transitions)
+        except Exception as e:
+            logger.warning(f"更新任务执行统计失败: {e}")
+
+    async def update_status(self, query: QuerySet, **values: Any) -> int:
+        """
+        对执行记录执行集合式状态 UPDATE 并更新计数
+
+        先取出命中行的 (id, status)，再以 ``query AND id IN (...)`` 更新，
+        只有确实被本次写入改为目标状态的行才计数。
+
+        Returns:
+            实际更新的行数
+        """
+        rows = await query.values_list("id", "status")
+        if not rows:
+            return 0
+
+        ids = [run_id for run_id, _ in rows]
+        updated = await query.filter(id__in=ids).update(**values)
+        if updated and "status" in values:
+            current = values["status"]
+            if updated < len(rows):
+                # 部分行已被并发改写，只计入当前确为目标状态的行
+                written = set(
+                    await TaskRun.filter(id__in=ids, status=current).values_list("id", flat=True)
+                )
+                rows = [row for row in rows if row[0] in written]
+            await self.safe_record_transitions(
+                [(run_id, previous, current) for run_id, previous in rows]
+            )
+        return updated
+
+    async def get_counters(self, scope: str, scope_id: int = 0) -> dict[str, Any]:
+        """读取维度累计计数（单行）"""
+        row = await TaskRunCounter.get_or_none(scope=scope, scope_id=scope_id, day=ALL_TIME)
+        return self._to_dict(row)
+
+    async def get_daily(
+        self, scope: str, scope_id: int, start: date, end: date
+    ) -> list[dict[str, Any]]:
+        """读取维度按日计数（含起止日期）"""
+        rows = await TaskRunCounter.filter(
+            scope=scope, scope_id=scope_id, day__gt=ALL_TIME, day__gte=start, day__lte=end
+        ).order_by("day")
+        return [{"day": row.day.isoformat(), **self._to_dict(row)} for row in rows]
+
+    def _to_dict(self, row: TaskRunCounter | None) -> dict[str, Any]:
+        values = {name: getattr(row, name) if row else 0 for name in COUNTER_FIELDS}
+        total = values["total_count"]
+        values["success_rate"] = values["success_count"] / total if total else 0.0
+        values["avg_duration"] = (
+            values["duration_sum"] / values["duration_count"] if values["duration_count"] else 0.0
+        )
+        return values
+
+    async def count_by_status(self, query: QuerySet, *fields: str) -> dict[Any, int]:
+        """
+        单条 GROUP BY 查询统计记录数
+
+        默认按 status 分组，键为 TaskStatus；指定多个字段时键为对应取值的元组。
+        """
+        fields = fields or ("status",)
+        rows = await query.annotate(count=Count("id")).group_by(*fields).values(*fields, "count")
+
+        result: dict[Any, int] = {}
+        for row in rows:
+            key = tuple(
+                _normalize_status(row[name]) if name == "status" else row[name] for name in fields
+            )
+            result[key if len(fields) > 1 else key[0]] = row["count"]
+        return result
+
+    async def summarize_tasks(self, task_query: QuerySet) -> dict[str, int]:
+        """按状态与调度类型汇总任务数（单条 GROUP BY 查询）"""
+        grouped = await self.count_by_status(task_query, "status", "schedule_type")
+
+        summary = {
+            "total": 0,
+            "pending": 0,
+            "running": 0,
+            "success": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "scheduled": 0,
+        }
+        for (status, schedule_type), count in grouped.items():
+            summary["total"] += count
+            if status in (TaskStatus.PENDING, TaskStatus.DISPATCHING, TaskStatus.QUEUED):
+                summary["pending"] += count
+            elif status == TaskStatus.RUNNING:
+                summary["running"] += count
+            elif status == TaskStatus.SUCCESS:
+                summary["success"] += count
+            elif status in (TaskStatus.FAILED, TaskStatus.TIMEOUT):
+                summary["failed"] += count
+            elif status == TaskStatus.CANCELLED:
+                summary["cancelled"] += count
+            if schedule_type in SCHEDULED_TYPES:
+                summary["scheduled"] += count
+        return summary
+
+    async def get_task_stats(self, task: Task) -> dict[str, Any]:
+        """单个任务的执行统计：累计计数 1 行 + 进行中执行的 GROUP BY"""
+        base_query = TaskRun.filter(task_id=task.id)
+        counters, active, last_execution = await asyncio.gather(
+            self.get_counters(TaskRunCounter.SCOPE_TASK, task.id),
+            self.count_by_status(base_query.filter(status__in=list(ACTIVE_STATUSES))),
+            base_query.order_by("-start_time").first(),
+        )
+        return {
+            "counters": counters,
+            "active_count": sum(active.values()),
+            "running_count": active.get(TaskStatus.RUNNING, 0),
+            "last_execution": last_execution,
+        }
+
+    async def backfill(self, batch_size: int | None = None) -> dict[str, int]:
+        """
+        从 task_executions 重建计数表
+
+        按主键分批扫描终态执行记录，在内存中聚合后整体替换计数表。
+        """
+        batch_size = batch_size or self.BACKFILL_BATCH_SIZE
+        tasks = {
+            row["id"]: row for row in await Task.all().values("id", "project_id", "user_id")
+        }
+
+        deltas: dict[CounterKey, list[float]] = defaultdict(lambda: [0] * len(COUNTER_FIELDS))
+        last_id = 0
+        scanned = 0
+        while True:
+            rows = (
+                await TaskRun.filter(id__gt=last_id, status__in=list(TERMINAL_STATUSES))
+                .order_by("id")
+                .limit(batch_size)
+                .values("id", "task_id", "status", "end_time", "duration_seconds")
+            )
+            if not rows:
+                break
+
+            for row in rows:
+                task = tasks.get(row["task_id"])
+                delta = list(_outcome(_normalize_status(row["status"])))
+                duration = row["duration_seconds"]
+                delta += [duration, 1] if duration is not None else [0, 0]
+                self._accumulate(
+                    deltas,
+                    delta,
+                    row["task_id"],
+                    task["project_id"] if task else None,
+                    task["user_id"] if task else None,
+                    _to_day(row["end_time"]),
+                )
+
+            scanned += len(rows)
+            last_id = rows[-1]["id"]
+            logger.info(f"任务执行统计回填: 已扫描 {scanned} 条")
+
+        counters = [
+            TaskRunCounter(
+                scope=scope, scope_id=scope_id, day=day, **dict(zip(COUNTER_FIELDS, delta))
+            )
+            for (scope, scope_id, day), delta in deltas.items()
+        ]
+        async with in_transaction():
+            await TaskRunCounter.all().delete()
+            if counters:
+                await TaskRunCounter.bulk_create(counters, batch_size=1000)
+
+        logger.info(f"任务执行统计回填完成: 扫描 {scanned} 条执行记录，写入 {len(counters)} 行")
+        return {"scanned": scanned, "rows": len(counters)}
+
+
+task_stats_service = TaskStatsService()
+
+__all__ = [
+    "TaskStatsService",
+    "task_stats_service",
+    "TERMINAL_STATUSES",
+    "ACTIVE_STATUSES",
+]
+
+
+async def _main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    from antcode_core.infrastructure.db.tortoise import close_db, init_db
+
+    parser = argparse.ArgumentParser(description="任务执行统计")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--batch-size", type=int, default=TaskStatsService.BACKFILL_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    await init_db()
+    try:
+        await task_stats_service.backfill(batch_size=args.batch_size)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
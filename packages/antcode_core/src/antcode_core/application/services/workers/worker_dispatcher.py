@@ -59,6 +59,9 @@ class WorkerLoadBalancer:
     MAX_MEMORY_THRESHOLD = 90
     MAX_TASKS_RATIO = 0.8
 
+    # 节点已就绪任务所需运行时时的评分减免（免去冷启动构建）
+    WARM_RUNTIME_BONUS = 15
+
     def __init__(self):
         self._worker_latencies = {}
         self._latency_update_interval = 60
@@ -269,6 +272,7 @@ class WorkerLoadBalancer:
         region=None,
         tags=None,
         require_render=False,
+        runtime_hash=None,
     ):
         """
         选择最佳节点
@@ -279,6 +283,7 @@ class WorkerLoadBalancer:
         - region: 区域过滤
         - tags: 标签过滤
         - require_render: 是否需要渲染能力（DrissionPage）
+        - runtime_hash: 任务所需运行时哈希，已就绪的节点优先
         """
         if workers is None:
             query = Worker.filter(status=WorkerStatus.ONLINE.value)
@@ -346,6 +351,8 @@ class WorkerLoadBalancer:
         scored_workers = []
         for worker, metrics in candidates:
             score = self.calculate_load_score(worker, metrics)
+            if runtime_hash and self._has_warm_runtime(worker, runtime_hash):
+                score = round(score - self.WARM_RUNTIME_BONUS, 2)
             scored_workers.append((worker, score))
             logger.debug(f"负载评分 [{worker.name}] {score}")
 
@@ -364,6 +371,13 @@ class WorkerLoadBalancer:
         cap = caps.get("drissionpage")
         return bool(cap and cap.get("enabled"))
 
+    def _has_warm_runtime(self, worker, runtime_hash):
+        """检查节点心跳上报的已就绪运行时中是否包含指定哈希"""
+        if not worker.capabilities:
+            return False
+        cap = worker.capabilities.get("runtime_warm")
+        return bool(cap and runtime_hash in (cap.get("hashes") or []))
+
     async def get_workers_ranking(self, region=None, top_n=10):
         """获取节点排名"""
         query = Worker.filter(status=WorkerStatus.ONLINE.value)
@@ -620,12 +634,14 @@ class WorkerTaskDispatcher:
         priority=None,
         project_type="code",
         require_render=False,
+        runtime_hash=None,
     ):
         """
         分发单个任务到节点（使用批量接口）
 
         参数:
         - require_render: 是否需要渲染能力（用于需要浏览器渲染的爬虫任务）
+        - runtime_hash: 任务所需运行时哈希（可选，用于优先选择已预热的节点）
         """
         # 构建单任务批量请求
         task_item = {
@@ -645,6 +661,7 @@ class WorkerTaskDispatcher:
             region=region,
             tags=tags,
             require_render=require_render,
+            runtime_hash=runtime_hash,
         )
 
         # 转换批量结果为单任务结果格式
@@ -681,12 +698,14 @@ class WorkerTaskDispatcher:
         tags=None,
         batch_id=None,
         require_render=False,
+        runtime_hash=None,
     ):
         """
         批量分发任务到节点（使用优先级队列接口）
 
         参数:
         - require_render: 是否需要渲染能力
+        - runtime_hash: 任务所需运行时哈希（缺省取任务项中的 runtime_hash）
         """
         import uuid
 
@@ -700,8 +719,13 @@ class WorkerTaskDispatcher:
                     require_render = True
                     break
 
+        if not runtime_hash:
+            runtime_hash = next((t.get("runtime_hash") for t in tasks if t.get("runtime_hash")), None)
+
         # 选择目标 Worker
-        worker = await self._select_worker(worker_id, region, tags, require_render=require_render)
+        worker = await self._select_worker(
+            worker_id, region, tags, require_render=require_render, runtime_hash=runtime_hash
+        )
         if not worker:
             return BatchDispatchResult(success=False, error="无可用 Worker")
 
@@ -790,12 +814,14 @@ class WorkerTaskDispatcher:
         region=None,
         tags=None,
         require_render=False,
+        runtime_hash=None,
     ):
         """
         选择目标节点
 
         参数:
         - require_render: 是否需要渲染能力
+        - runtime_hash: 任务所需运行时哈希
         """
         if worker_id:
             worker = await Worker.filter(public_id=worker_id).first()
@@ -819,7 +845,7 @@ class WorkerTaskDispatcher:
             return worker
         else:
             return await self.load_balancer.select_best_worker(
-                region=region, tags=tags, require_render=require_render
+                region=region, tags=tags, require_render=require_render, runtime_hash=runtime_hash
             )
 
     async def _sync_projects_to_worker(self, worker, project_ids):
@@ -11,6 +11,9 @@ from datetime import datetime, timedelta
 
 from loguru import logger
 
+from antcode_core.application.services.monitoring.metrics_rollup_service import (
+    metrics_rollup_service,
+)
 from antcode_core.common.config import settings
 from antcode_core.common.serialization import from_json
 from antcode_core.domain.models import Worker, WorkerHeartbeat, WorkerStatus
@@ -619,11 +622,13 @@ class WorkerHeartbeatService:
         if spider_stats and "spider_stats" not in heartbeat_metrics:
             heartbeat_metrics["spider_stats"] = spider_stats
 
-        await WorkerHeartbeat.create(
+        heartbeat = await WorkerHeartbeat.create(
             worker_id=worker.id,
             status=status_value,
             metrics=heartbeat_metrics if heartbeat_metrics else None,
         )
+        if heartbeat_metrics:
+            await metrics_rollup_service.record(worker.id, heartbeat.timestamp, heartbeat_metrics)
 
         return True
 
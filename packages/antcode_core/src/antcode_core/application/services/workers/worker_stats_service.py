@@ -5,10 +5,18 @@
 
 from datetime import UTC, datetime, timedelta
 
-from antcode_core.domain.models import Worker, WorkerHeartbeat, WorkerStatus
+from antcode_core.application.services.monitoring.metrics_rollup_service import (
+    metrics_rollup_service,
+)
+from antcode_core.domain.models import Worker, WorkerHeartbeat, WorkerMetricsRollup, WorkerStatus
 from antcode_core.domain.schemas.worker import WorkerAggregateStats
 
 
+def _four_hour_bucket(bucket: datetime) -> datetime:
+    """小时桶归并到所在的 4 小时桶"""
+    return bucket.replace(hour=bucket.hour // 4 * 4)
+
+
 class WorkerStatsService:
     """节点统计服务"""
 
@@ -91,132 +99,78 @@ class WorkerStatsService:
     async def get_metrics_history(self, worker_id: int, hours: int = 24) -> list[dict]:
         """
         获取节点的历史指标数据
-        返回指定时间范围内的心跳记录
+        读取节点指标汇总：24 小时内按分钟，7 天内按小时，更长按天，返回各时间桶的平均值
+        （运行时长取桶内最大值）
         """
         cutoff_time = datetime.now(UTC) - timedelta(hours=hours)
 
-        heartbeats = (
-            await WorkerHeartbeat.filter(worker_id=worker_id, timestamp__gte=cutoff_time)
-            .order_by("timestamp")
-            .all()
-        )
-
-        result = []
-        for hb in heartbeats:
-            metrics = hb.metrics or {}
-            result.append(
-                {
-                    "timestamp": hb.timestamp.isoformat(),
-                    "cpu": metrics.get("cpu", 0),
-                    "memory": metrics.get("memory", 0),
-                    "disk": metrics.get("disk", 0),
-                    "taskCount": metrics.get("taskCount", 0),
-                    "runningTasks": metrics.get("runningTasks", 0),
-                    "uptime": metrics.get("uptime", 0),
-                }
-            )
-
-        return result
+        if hours <= 24:
+            resolution = WorkerMetricsRollup.RESOLUTION_MINUTE
+        elif hours <= 168:  # 7天
+            resolution = WorkerMetricsRollup.RESOLUTION_HOUR
+        else:
+            resolution = WorkerMetricsRollup.RESOLUTION_DAY
+
+        series = await metrics_rollup_service.get_series(resolution, cutoff_time, worker_id)
+
+        def average(metric: str, i: int) -> float:
+            count = series[f"{metric}_count"][i]
+            return round(series[f"{metric}_sum"][i] / count, 1) if count else 0
+
+        return [
+            {
+                "timestamp": bucket.isoformat(),
+                "cpu": average("cpu", i),
+                "memory": average("memory", i),
+                "disk": average("disk", i),
+                "taskCount": average("task_count", i),
+                "runningTasks": average("running_tasks", i),
+                "uptime": series["uptime_max"][i] or 0,
+            }
+            for i, bucket in enumerate(series["bucket"])
+        ]
 
     async def get_cluster_metrics_history(self, hours: int = 24) -> dict:
         """
         获取集群的历史聚合指标
-        按时间点聚合所有节点的指标，返回平均值、最大值、最小值
+        读取集群指标汇总：24 小时内按小时，7 天内按 4 小时，更长按天，返回平均值、最大值、最小值
         """
         cutoff_time = datetime.now(UTC) - timedelta(hours=hours)
 
-        # 获取所有节点
-        workers = await Worker.all()
-        worker_ids = [n.id for n in workers]
-
-        if not worker_ids:
+        if not await Worker.exists():
             return {
                 "timestamps": [],
                 "cpu": {"avg": [], "max": [], "min": []},
                 "memory": {"avg": [], "max": [], "min": []},
             }
 
-        # 获取所有心跳记录
-        heartbeats = (
-            await WorkerHeartbeat.filter(worker_id__in=worker_ids, timestamp__gte=cutoff_time)
-            .order_by("timestamp")
-            .all()
-        )
-
-        # 根据时间范围决定聚合粒度
-        interval_hours = 1
+        bucket_of = None
         if hours <= 24:
-            # 24小时内：按小时聚合
+            resolution = WorkerMetricsRollup.RESOLUTION_HOUR
             time_format = "%Y-%m-%d %H:00"
         elif hours <= 168:  # 7天
-            # 7天内：按4小时聚合
-            time_format = None  # 使用自定义逻辑
-            interval_hours = 4
+            # 小时汇总合并为 4 小时
+            resolution = WorkerMetricsRollup.RESOLUTION_HOUR
+            time_format = "%Y-%m-%d %H:00"
+            bucket_of = _four_hour_bucket
         else:  # 30天或更长
-            # 30天内：按天聚合
+            resolution = WorkerMetricsRollup.RESOLUTION_DAY
             time_format = "%Y-%m-%d"
 
-        # 按时间聚合
-        time_data: dict[str, dict[str, list[float]]] = {}
-
-        for hb in heartbeats:
-            # 生成时间key
-            if time_format:
-                time_key = hb.timestamp.strftime(time_format)
-            else:
-                # 7天数据：按4小时聚合
-                hour_bucket = (hb.timestamp.hour // interval_hours) * interval_hours
-                time_key = hb.timestamp.strftime(f"%Y-%m-%d {hour_bucket:02d}:00")
-
-            if time_key not in time_data:
-                time_data[time_key] = {"cpu": [], "memory": [], "disk": []}
-
-            metrics = hb.metrics or {}
-            if metrics.get("cpu") is not None:
-                time_data[time_key]["cpu"].append(metrics.get("cpu", 0))
-            if metrics.get("memory") is not None:
-                time_data[time_key]["memory"].append(metrics.get("memory", 0))
-            if metrics.get("disk") is not None:
-                time_data[time_key]["disk"].append(metrics.get("disk", 0))
-
-        # 计算每个时间点的平均、最大、最小值
-        timestamps = []
-        cpu_avg = []
-        cpu_max = []
-        cpu_min = []
-        memory_avg = []
-        memory_max = []
-        memory_min = []
-
-        for time_key in sorted(time_data.keys()):
-            data = time_data[time_key]
-            timestamps.append(time_key)
-
-            # CPU 指标
-            if data["cpu"]:
-                cpu_avg.append(round(sum(data["cpu"]) / len(data["cpu"]), 1))
-                cpu_max.append(round(max(data["cpu"]), 1))
-                cpu_min.append(round(min(data["cpu"]), 1))
-            else:
-                cpu_avg.append(0)
-                cpu_max.append(0)
-                cpu_min.append(0)
-
-            # 内存
-            if data["memory"]:
-                memory_avg.append(round(sum(data["memory"]) / len(data["memory"]), 1))
-                memory_max.append(round(max(data["memory"]), 1))
-                memory_min.append(round(min(data["memory"]), 1))
-            else:
-                memory_avg.append(0)
-                memory_max.append(0)
-                memory_min.append(0)
-
-        return {
-            "timestamps": timestamps,
-            "cpu": {"avg": cpu_avg, "max": cpu_max, "min": cpu_min},
-            "memory": {"avg": memory_avg, "max": memory_max, "min": memory_min},
-        }
+        series = await metrics_rollup_service.get_series(resolution, cutoff_time)
+        if bucket_of:
+            series = metrics_rollup_service.coarsen(series, bucket_of)
+
+        result = {"timestamps": [bucket.strftime(time_format) for bucket in series["bucket"]]}
+        for metric in ("cpu", "memory"):
+            counts = series[f"{metric}_count"]
+            sums = series[f"{metric}_sum"]
+            result[metric] = {
+                "avg": [round(s / c, 1) if c else 0 for s, c in zip(sums, counts, strict=True)],
+                "max": [round(v, 1) if c else 0 for v, c in zip(series[f"{metric}_max"], counts, strict=True)],
+                "min": [round(v, 1) if c else 0 for v, c in zip(series[f"{metric}_min"], counts, strict=True)],
+            }
+        return result
 
     async def get_spider_metrics_history(
         self, worker_id: int, hours: int = 24
@@ -236,17 +190,17 @@ class WorkerStatsService:
         heartbeats = (
             await WorkerHeartbeat.filter(worker_id=worker_id, timestamp__gte=cutoff_time)
             .order_by("timestamp")
-            .all()
+            .values_list("timestamp", "metrics")
         )
 
         result = []
-        for hb in heartbeats:
-            metrics = hb.metrics or {}
+        for timestamp, metrics in heartbeats:
+            metrics = metrics or {}
             spider_stats = metrics.get("spider_stats")
 
             if spider_stats:
                 result.append({
-                    "timestamp": hb.timestamp.isoformat(),
+                    "timestamp": timestamp.isoformat(),
                     "requestCount": spider_stats.get("request_count", 0),
                     "responseCount": spider_stats.get("response_count", 0),
                     "itemScrapedCount": spider_stats.get("item_scraped_count", 0),
@@ -257,6 +257,11 @@ class Settings(BaseSettings):
     MONITOR_SPIDER_KEY_TPL: str = "monitor:worker:{worker_id}:spider"
     MONITOR_HISTORY_KEY_TPL: str = "monitor:worker:{worker_id}:history"
     MONITOR_CLUSTER_SET_KEY: str = "monitor:cluster:workers"
+    # 指标汇总（1m/1h/1d）保留天数与写入间隔
+    MONITOR_ROLLUP_MINUTE_KEEP_DAYS: int = 2
+    MONITOR_ROLLUP_HOUR_KEEP_DAYS: int = 90
+    MONITOR_ROLLUP_DAY_KEEP_DAYS: int = 730
+    MONITOR_ROLLUP_FLUSH_INTERVAL: int = 30
 
     # === 限流配置 ===
     RATE_LIMIT_CALLS: int = 1000
@@ -265,6 +270,10 @@ class Settings(BaseSettings):
     # === WebSocket 配置 ===
     WEBSOCKET_MAX_CONN_PER_EXECUTION: int = 200
     WEBSOCKET_MAX_TOTAL_CONN: int = 20000
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 2000  # 单连接发送队列上限（消息数）
+    WEBSOCKET_SEND_TIMEOUT: float = 5.0
+    WEBSOCKET_BATCH_MAX_MESSAGES: int = 500  # 合并帧最多包含的消息数
+    WEBSOCKET_SLOW_CONSUMER_POLICY: str = "drop"  # drop / disconnect
 
     model_config = SettingsConfigDict(
         env_file=str(_find_project_root() / ".env"),
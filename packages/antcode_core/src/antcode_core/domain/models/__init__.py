@@ -8,6 +8,7 @@ Domain Models 模块
 - project: 项目模型
 - task: 任务定义模型
 - task_run: 任务执行实例模型
+- task_stats: 任务执行统计模型
 - runtime: 运行时环境模型
 - worker: Worker 节点模型
 - worker_project: Worker 项目绑定模型
@@ -65,6 +66,7 @@ from antcode_core.domain.models.enums import (
 from antcode_core.domain.models.monitoring import (
     SpiderMetricsHistory,
     WorkerEvent,
+    WorkerMetricsRollup,
     WorkerPerformanceHistory,
 )
 
@@ -90,6 +92,7 @@ from antcode_core.domain.models.system_config import SystemConfig
 # 任务模型
 from antcode_core.domain.models.task import Task
 from antcode_core.domain.models.task_run import TaskRun
+from antcode_core.domain.models.task_stats import ALL_TIME, TaskRunCounter
 
 # 用户模型
 from antcode_core.domain.models.user import User, UserRole, pwd_context
@@ -150,6 +153,8 @@ __all__ = [
     # 任务模型
     "Task",
     "TaskRun",
+    "TaskRunCounter",
+    "ALL_TIME",
     # 运行时环境模型
     "Interpreter",
     "Runtime",
@@ -168,6 +173,7 @@ __all__ = [
     "CrawlTaskStatus",
     # 监控模型
     "WorkerPerformanceHistory",
+    "WorkerMetricsRollup",
     "SpiderMetricsHistory",
     "WorkerEvent",
     # 审计日志模型
@@ -98,8 +98,56 @@ class WorkerEvent(BaseModel):
         ]
 
 
+class WorkerMetricsRollup(BaseModel):
+    """Worker 指标时间序列汇总
+
+    按分辨率（1m/1h/1d）的时间桶记录每个 Worker 与集群（worker_id 为空）的
+    count/sum/min/max，写入时增量累加，历史查询直接读取对应分辨率。
+    """
+
+    RESOLUTION_MINUTE = "1m"
+    RESOLUTION_HOUR = "1h"
+    RESOLUTION_DAY = "1d"
+    CLUSTER = ""
+
+    resolution = fields.CharField(max_length=4, description="分辨率")
+    bucket = fields.DatetimeField(description="时间桶起始")
+    worker_id = fields.CharField(max_length=100, default="", description="Worker 标识，集群为空")
+
+    cpu_count = fields.IntField(default=0)
+    cpu_sum = fields.FloatField(default=0)
+    cpu_min = fields.FloatField(null=True)
+    cpu_max = fields.FloatField(null=True)
+    memory_count = fields.IntField(default=0)
+    memory_sum = fields.FloatField(default=0)
+    memory_min = fields.FloatField(null=True)
+    memory_max = fields.FloatField(null=True)
+    disk_count = fields.IntField(default=0)
+    disk_sum = fields.FloatField(default=0)
+    disk_min = fields.FloatField(null=True)
+    disk_max = fields.FloatField(null=True)
+    task_count_count = fields.IntField(default=0)
+    task_count_sum = fields.FloatField(default=0)
+    task_count_min = fields.FloatField(null=True)
+    task_count_max = fields.FloatField(null=True)
+    running_tasks_count = fields.IntField(default=0)
+    running_tasks_sum = fields.FloatField(default=0)
+    running_tasks_min = fields.FloatField(null=True)
+    running_tasks_max = fields.FloatField(null=True)
+    uptime_count = fields.IntField(default=0)
+    uptime_sum = fields.FloatField(default=0)
+    uptime_min = fields.FloatField(null=True)
+    uptime_max = fields.FloatField(null=True)
+
+    class Meta:
+        table = "worker_metrics_rollups"
+        unique_together = (("resolution", "worker_id", "bucket"),)
+        indexes = [("resolution", "bucket")]
+
+
 __all__ = [
     "WorkerPerformanceHistory",
     "SpiderMetricsHistory",
     "WorkerEvent",
+    "WorkerMetricsRollup",
 ]
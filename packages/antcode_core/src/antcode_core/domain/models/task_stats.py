@@ -0,0 +1,54 @@
+"""
+任务执行统计模型
+
+按维度（任务/项目/用户/全局）与日期物化的执行计数，供统计面板直接读取。
+"""
+
+from datetime import date
+
+from tortoise import fields
+
+from antcode_core.domain.models.base import BaseModel, generate_public_id
+
+# 累计行使用的日期（与按日行共用同一张表）
+ALL_TIME = date(1970, 1, 1)
+
+
+class TaskRunCounter(BaseModel):
+    """任务执行计数
+
+    每个维度两类行：day=ALL_TIME 的累计行，以及按执行结束日期（UTC）的日行。
+    执行进入终态时由结果处理路径增量更新。
+    """
+
+    SCOPE_TASK = "task"
+    SCOPE_PROJECT = "project"
+    SCOPE_USER = "user"
+    SCOPE_GLOBAL = "global"
+
+    public_id = fields.CharField(
+        max_length=32, unique=True, default=generate_public_id, db_index=True
+    )
+    scope = fields.CharField(max_length=16, description="统计维度")
+    scope_id = fields.BigIntField(default=0, description="维度 ID（全局为 0）")
+    day = fields.DateField(description="统计日期，ALL_TIME 表示累计")
+
+    total_count = fields.IntField(default=0)
+    success_count = fields.IntField(default=0)
+    failure_count = fields.IntField(default=0)
+    cancelled_count = fields.IntField(default=0)
+    duration_sum = fields.FloatField(default=0)
+    duration_count = fields.IntField(default=0)
+
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "task_run_counters"
+        unique_together = (("scope", "scope_id", "day"),)
+        indexes = [("scope", "day")]
+
+
+__all__ = [
+    "ALL_TIME",
+    "TaskRunCounter",
+]
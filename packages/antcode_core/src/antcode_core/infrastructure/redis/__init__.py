@@ -6,6 +6,8 @@ Redis 客户端与工具：
 - keys: Key 命名规范
 - streams: Redis Streams 封装（XADD/XREADGROUP/XACK/XAUTOCLAIM）
 - locks: 分布式锁（compare-and-renew + fencing token）
+- log_codec: 日志 Stream 消息打包格式
+- delay_queue: 基于 Sorted Set 的延迟队列（原子认领 + 租约）
 """
 
 from antcode_core.infrastructure.redis.client import (
@@ -13,7 +15,13 @@ from antcode_core.infrastructure.redis.client import (
     close_redis_pool,
     get_redis_client,
 )
+from antcode_core.infrastructure.redis.delay_queue import RedisDelayQueue
 from antcode_core.infrastructure.redis.keys import RedisKeys
+from antcode_core.infrastructure.redis.log_codec import (
+    PACKED_LOG_FORMAT,
+    pack_log_lines,
+    unpack_log_entry,
+)
 from antcode_core.infrastructure.redis.locks import (
     DistributedLock,
     FencingTokenManager,
@@ -60,6 +68,7 @@ __all__ = [
     "acquire_leader_lock",
     "RedisRateLimiter",
     "redis_rate_limiter",
+    "RedisDelayQueue",
     "redis_namespace",
     "task_ready_stream",
     "task_result_stream",
@@ -67,6 +76,9 @@ __all__ = [
     "log_chunk_stream_key",
     "log_stream_pattern",
     "log_chunk_stream_pattern",
+    "PACKED_LOG_FORMAT",
+    "pack_log_lines",
+    "unpack_log_entry",
     "control_stream",
     "control_global_stream",
     "control_reply_stream",
@@ -6,9 +6,14 @@
 - 元素检查 (BF.EXISTS/BF.MEXISTS)
 - 过滤器信息查询 (BF.INFO)
 
-注意：需要 Redis 安装 RedisBloom 模块
+RedisBloom 模块不可用时降级为客户端 Bloom Filter：
+位数组存放在普通 Redis String 中，通过 BITFIELD 批量读写，
+元素计数使用 HyperLogLog，批量操作仍为单次往返。
+旧版降级实现写入的 Set（直接位于 key）继续参与判重，升级后已见过的元素不会被当作新元素。
 """
 
+import hashlib
+import math
 from dataclasses import dataclass
 
 from loguru import logger
@@ -27,6 +32,37 @@ class BloomFilterInfo:
     expansion_rate: int = 0
 
 
+@dataclass
+class _FallbackFilterMeta:
+    """客户端 Bloom Filter 元数据（存放在 Redis Hash 中）"""
+
+    capacity: int
+    error_rate: float
+    expansion: int = 2
+    nonscaling: bool = False
+    layers: int = 1
+    item_count: int = 0  # 最近一次观测到的 PFCOUNT
+
+    def layer_capacity(self, index: int) -> int:
+        return self.capacity * (self.expansion**index)
+
+    def layer_params(self, index: int) -> tuple[int, int]:
+        """第 index 层的 (位数, 哈希函数个数)
+
+        每层误判率逐层减半，总误判率上界为 error_rate。
+        """
+        capacity = self.layer_capacity(index)
+        error_rate = self.error_rate * (0.5 ** (index + 1))
+        num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        # Redis String 上限 512MB，即 2^32 位
+        num_bits = max(8, min(num_bits, BloomFilterClient.MAX_FALLBACK_BITS))
+        num_hashes = max(1, round(-math.log2(error_rate)))
+        return num_bits, num_hashes
+
+    def total_capacity(self) -> int:
+        return sum(self.layer_capacity(i) for i in range(self.layers))
+
+
 class BloomFilterClient:
     """Redis Bloom Filter 客户端
 
@@ -36,14 +72,32 @@ class BloomFilterClient:
     - 批量操作支持
 
     注意：
-    - 需要 Redis 安装 RedisBloom 模块
-    - 如果模块不可用，会降级使用 Set 实现（精确去重但内存占用更高）
+    - 优先使用 RedisBloom 模块
+    - 如果模块不可用，降级为客户端 Bloom Filter（SETBIT/BITFIELD + HyperLogLog），
+      键布局：{key}:bf:meta（元数据）、{key}:bf:{n}（第 n 层位数组）、{key}:bf:hll（计数）
+    - 旧版降级实现的 Set 仍位于 key，降级模式下一并查询（SMISMEMBER）
+    - BF.* 命令执行失败时记录错误并降级到客户端 Bloom Filter
     """
 
     # 默认配置
     DEFAULT_CAPACITY = 1000000  # 默认容量 100 万
     DEFAULT_ERROR_RATE = 0.001  # 默认误判率 0.1%
 
+    # 降级实现配置
+    MAX_FALLBACK_BITS = 2**32
+    BITFIELD_BATCH = 512  # 单条 BITFIELD 命令包含的元素数
+
+    # 按需扩层：只增不减，避免并发客户端互相覆盖
+    _GROW_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'layers') or '1')
+local wanted = tonumber(ARGV[1])
+if wanted > current then
+    redis.call('HSET', KEYS[1], 'layers', wanted)
+    return wanted
+end
+return current
+"""
+
     def __init__(self, redis_client=None):
         """初始化 Bloom Filter 客户端
 
@@ -52,6 +106,8 @@ class BloomFilterClient:
         """
         self._redis = redis_client
         self._bloom_available = None  # 是否支持 Bloom Filter
+        self._fallback_meta: dict[str, _FallbackFilterMeta] = {}
+        self._legacy_sets: dict[str, bool] = {}  # key 是否为旧版降级实现的 Set
 
     async def _get_client(self):
         """获取 Redis 客户端"""
@@ -73,7 +129,7 @@ class BloomFilterClient:
         except Exception as e:
             error_str = str(e).lower()
             if "unknown command" in error_str or "err unknown" in error_str:
-                logger.warning("RedisBloom 模块不可用，将使用 Set 降级实现")
+                logger.warning("RedisBloom 模块不可用，将使用客户端 Bloom Filter 降级实现")
                 self._bloom_available = False
             elif "not found" in error_str or "does not exist" in error_str:
                 # 命令存在但 key 不存在，说明模块可用
@@ -84,6 +140,242 @@ class BloomFilterClient:
 
         return self._bloom_available
 
+    # =========================================================================
+    # 降级实现：客户端 Bloom Filter
+    # =========================================================================
+
+    @staticmethod
+    def _meta_key(key: str) -> str:
+        return f"{key}:bf:meta"
+
+    @staticmethod
+    def _layer_key(key: str, index: int) -> str:
+        return f"{key}:bf:{index}"
+
+    @staticmethod
+    def _hll_key(key: str) -> str:
+        return f"{key}:bf:hll"
+
+    @staticmethod
+    def _item_hashes(item) -> tuple[int, int]:
+        if not isinstance(item, bytes):
+            item = str(item).encode("utf-8")
+        value = int.from_bytes(hashlib.blake2b(item, digest_size=16).digest(), "big")
+        return value >> 64, (value & ((1 << 64) - 1)) | 1
+
+    @staticmethod
+    def _bit_offsets(hashes: tuple[int, int], num_bits: int, num_hashes: int) -> list[int]:
+        h1, h2 = hashes
+        return [(h1 + i * h2) % num_bits for i in range(num_hashes)]
+
+    @staticmethod
+    def _decode(value) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+    async def _is_legacy_set(self, key: str) -> bool:
+        """key 是否为旧版降级实现写入的 Set（结果按 key 缓存）"""
+        if key not in self._legacy_sets:
+            client = await self._get_client()
+            self._legacy_sets[key] = self._decode(await client.type(key)) == "set"
+        return self._legacy_sets[key]
+
+    async def _fallback_reserve(self, key: str, capacity: int, error_rate: float,
+                                expansion: int = 2, nonscaling: bool = False) -> bool:
+        """创建客户端 Bloom Filter 元数据（已存在时保持原参数）"""
+        client = await self._get_client()
+        meta_key = self._meta_key(key)
+        pipe = client.pipeline(transaction=False)
+        for field, value in (
+            ("capacity", capacity),
+            ("error_rate", error_rate),
+            ("expansion", max(1, expansion)),
+            ("nonscaling", int(nonscaling)),
+            ("layers", 1),
+        ):
+            pipe.hsetnx(meta_key, field, value)
+        results = await pipe.execute()
+        self._fallback_meta.pop(key, None)
+        if results[0]:
+            logger.debug(f"创建客户端 Bloom Filter: {key}, 容量={capacity}, 误判率={error_rate}")
+        return True
+
+    async def _fallback_load_meta(self, key: str, refresh: bool = False) -> _FallbackFilterMeta:
+        """获取元数据，不存在时按默认参数创建（与 BF.ADD 自动创建语义一致）"""
+        if not refresh and key in self._fallback_meta:
+            return self._fallback_meta[key]
+
+        client = await self._get_client()
+        raw = await client.hgetall(self._meta_key(key))
+        if not raw:
+            await self._fallback_reserve(key, self.DEFAULT_CAPACITY, self.DEFAULT_ERROR_RATE)
+            raw = await client.hgetall(self._meta_key(key))
+
+        data = {self._decode(k): self._decode(v) for k, v in raw.items()}
+        meta = _FallbackFilterMeta(
+            capacity=int(data.get("capacity", self.DEFAULT_CAPACITY)),
+            error_rate=float(data.get("error_rate", self.DEFAULT_ERROR_RATE)),
+            expansion=int(data.get("expansion", 2)),
+            nonscaling=data.get("nonscaling", "0") == "1",
+            layers=int(data.get("layers", 1)),
+            item_count=await client.pfcount(self._hll_key(key)),
+        )
+        self._fallback_meta[key] = meta
+        return meta
+
+    def _queue_bitfield(self, pipe, key: str, index: int, meta: _FallbackFilterMeta,
+                        hashes: list[tuple[int, int]], op: str) -> int:
+        """将一层的 BITFIELD 读写加入 pipeline，返回加入的命令数"""
+        num_bits, num_hashes = meta.layer_params(index)
+        layer_key = self._layer_key(key, index)
+        commands = 0
+        for start in range(0, len(hashes), self.BITFIELD_BATCH):
+            args = []
+            for item_hashes in hashes[start:start + self.BITFIELD_BATCH]:
+                for offset in self._bit_offsets(item_hashes, num_bits, num_hashes):
+                    if op == "SET":
+                        args.extend(("SET", "u1", offset, 1))
+                    else:
+                        args.extend(("GET", "u1", offset))
+            pipe.execute_command("BITFIELD", layer_key, *args)
+            commands += 1
+        return commands
+
+    @staticmethod
+    def _any_zero_per_item(results: list, count: int, num_hashes: int) -> list[bool]:
+        """按元素拆分 BITFIELD 结果，返回每个元素是否存在为 0 的位"""
+        bits = [bit for chunk in results for bit in chunk]
+        return [
+            0 in bits[i * num_hashes:(i + 1) * num_hashes]
+            for i in range(count)
+        ]
+
+    async def _fallback_madd(self, key: str, items: list) -> list[bool]:
+        """客户端 Bloom Filter 批量添加
+
+        单次 pipeline：旧层 BITFIELD GET + 当前层 BITFIELD SET + PFADD + PFCOUNT。
+        元素在旧层全部命中，或当前层所有位原本已置 1，即视为已存在。
+        """
+        client = await self._get_client()
+        hashes = [self._item_hashes(item) for item in items]
+        legacy = await self._is_legacy_set(key)
+
+        while True:
+            meta = await self._fallback_load_meta(key)
+            # 预计写满当前层时先扩层，避免整批写入超载的旧层
+            if not meta.nonscaling and not self._fits(meta, meta.layers, len(items)):
+                await self._fallback_grow(key, meta, len(items))
+            pipe = client.pipeline(transaction=False)
+            pipe.hget(self._meta_key(key), "layers")
+            layout = []
+            for index in range(meta.layers):
+                op = "SET" if index == meta.layers - 1 else "GET"
+                layout.append((index, self._queue_bitfield(pipe, key, index, meta, hashes, op)))
+            pipe.pfadd(self._hll_key(key), *items)
+            pipe.pfcount(self._hll_key(key))
+            if legacy:
+                pipe.smismember(key, items)
+            results = await pipe.execute()
+            if legacy:
+                known_legacy = results.pop()
+
+            # 其他客户端已扩层，按新布局重做（SET 幂等）
+            remote_layers = int(results[0] or 1)
+            if remote_layers != meta.layers:
+                self._fallback_meta.pop(key, None)
+                continue
+            break
+
+        added = [False] * len(items)
+        known = [True] * len(items)
+        position = 1
+        for index, commands in layout:
+            _, num_hashes = meta.layer_params(index)
+            chunk_results = results[position:position + commands]
+            position += commands
+            missing = self._any_zero_per_item(chunk_results, len(items), num_hashes)
+            if index < meta.layers - 1:
+                known = [k and m for k, m in zip(known, missing, strict=True)]
+            else:
+                added = [k and m for k, m in zip(known, missing, strict=True)]
+
+        meta.item_count = int(results[-1] or 0)
+        if legacy:
+            added = [a and not seen for a, seen in zip(added, known_legacy, strict=True)]
+        return added
+
+    @staticmethod
+    def _fits(meta: _FallbackFilterMeta, layers: int, incoming: int) -> bool:
+        """layers 层能否容纳已有元素加上本批新元素（且本批能放进最后一层）"""
+        total = sum(meta.layer_capacity(i) for i in range(layers))
+        return (
+            meta.item_count + incoming <= total
+            and incoming <= meta.layer_capacity(layers - 1)
+        )
+
+    async def _fallback_grow(self, key: str, meta: _FallbackFilterMeta, incoming: int) -> None:
+        """追加新层，直到能容纳本批元素"""
+        layers = meta.layers
+        while not self._fits(meta, layers, incoming):
+            layers += 1
+        client = await self._get_client()
+        result = await client.eval(self._GROW_SCRIPT, 1, self._meta_key(key), layers)
+        meta.layers = int(result)
+        logger.debug(f"客户端 Bloom Filter 扩层: {key}, layers={meta.layers}")
+
+    async def _fallback_mexists(self, key: str, items: list) -> list[bool]:
+        """客户端 Bloom Filter 批量检查，单次 pipeline 读取所有层"""
+        client = await self._get_client()
+        hashes = [self._item_hashes(item) for item in items]
+        legacy = await self._is_legacy_set(key)
+
+        while True:
+            meta = await self._fallback_load_meta(key)
+            pipe = client.pipeline(transaction=False)
+            pipe.hget(self._meta_key(key), "layers")
+            layout = [
+                (index, self._queue_bitfield(pipe, key, index, meta, hashes, "GET"))
+                for index in range(meta.layers)
+            ]
+            if legacy:
+                pipe.smismember(key, items)
+            results = await pipe.execute()
+            if int(results[0] or 1) != meta.layers:
+                self._fallback_meta.pop(key, None)
+                continue
+            break
+
+        exists = [bool(seen) for seen in results[-1]] if legacy else [False] * len(items)
+        position = 1
+        for index, commands in layout:
+            _, num_hashes = meta.layer_params(index)
+            missing = self._any_zero_per_item(
+                results[position:position + commands], len(items), num_hashes
+            )
+            position += commands
+            exists = [e or not m for e, m in zip(exists, missing, strict=True)]
+        return exists
+
+    async def _fallback_info(self, key: str) -> BloomFilterInfo:
+        client = await self._get_client()
+        if not await client.exists(self._meta_key(key)):
+            return BloomFilterInfo()
+        meta = await self._fallback_load_meta(key, refresh=True)
+        count = await client.pfcount(self._hll_key(key))
+        return BloomFilterInfo(
+            capacity=meta.total_capacity(),
+            size=sum((meta.layer_params(i)[0] + 7) // 8 for i in range(meta.layers)),
+            num_filters=meta.layers,
+            num_items_inserted=count,
+            expansion_rate=meta.expansion,
+        )
+
+    async def _fallback_keys(self, key: str) -> list[str]:
+        client = await self._get_client()
+        layers = await client.hget(self._meta_key(key), "layers")
+        keys = [self._meta_key(key), self._hll_key(key)]
+        keys.extend(self._layer_key(key, i) for i in range(int(layers or 1)))
+        return keys
+
     # =========================================================================
     # 过滤器管理
     # =========================================================================
@@ -108,9 +400,7 @@ class BloomFilterClient:
         error_rate = error_rate or self.DEFAULT_ERROR_RATE
 
         if not await self._check_bloom_available():
-            # 降级模式：使用 Set，不需要预创建
-            logger.debug(f"降级模式: 跳过 BF.RESERVE for {key}")
-            return True
+            return await self._fallback_reserve(key, capacity, error_rate, expansion, nonscaling)
 
         try:
             args = [key, error_rate, capacity]
@@ -146,7 +436,8 @@ class BloomFilterClient:
         client = await self._get_client()
 
         # 检查是否已存在
-        exists = await client.exists(key)
+        check_key = key if await self._check_bloom_available() else self._meta_key(key)
+        exists = await client.exists(check_key)
         if exists:
             return True
 
@@ -166,21 +457,17 @@ class BloomFilterClient:
         Returns:
             True 表示新添加，False 表示可能已存在
         """
-        client = await self._get_client()
-
         if not await self._check_bloom_available():
-            # 降级模式：使用 SADD
-            result = await client.sadd(key, item)
-            return bool(result)
+            return (await self._fallback_madd(key, [item]))[0]
 
+        client = await self._get_client()
         try:
             result = await client.execute_command("BF.ADD", key, item)
             return bool(result)
         except Exception as e:
             logger.error(f"BF.ADD 失败: {key}, 错误: {e}")
-            # 降级到 Set
-            result = await client.sadd(key, item)
-            return bool(result)
+            # 降级到客户端 Bloom Filter
+            return (await self._fallback_madd(key, [item]))[0]
 
     async def bf_madd(self, key: str, items: list) -> list:
         """批量添加元素到 Bloom Filter
@@ -195,27 +482,17 @@ class BloomFilterClient:
         if not items:
             return []
 
-        client = await self._get_client()
-
         if not await self._check_bloom_available():
-            # 降级模式：使用 pipeline SADD
-            pipe = client.pipeline()
-            for item in items:
-                pipe.sadd(key, item)
-            results = await pipe.execute()
-            return [bool(r) for r in results]
+            return await self._fallback_madd(key, items)
 
+        client = await self._get_client()
         try:
             result = await client.execute_command("BF.MADD", key, *items)
             return [bool(r) for r in result]
         except Exception as e:
             logger.error(f"BF.MADD 失败: {key}, 错误: {e}")
-            # 降级到 Set
-            pipe = client.pipeline()
-            for item in items:
-                pipe.sadd(key, item)
-            results = await pipe.execute()
-            return [bool(r) for r in results]
+            # 降级到客户端 Bloom Filter
+            return await self._fallback_madd(key, items)
 
     # =========================================================================
     # 元素检查
@@ -231,21 +508,17 @@ class BloomFilterClient:
         Returns:
             True 表示可能存在，False 表示一定不存在
         """
-        client = await self._get_client()
-
         if not await self._check_bloom_available():
-            # 降级模式：使用 SISMEMBER
-            result = await client.sismember(key, item)
-            return bool(result)
+            return (await self._fallback_mexists(key, [item]))[0]
 
+        client = await self._get_client()
         try:
             result = await client.execute_command("BF.EXISTS", key, item)
             return bool(result)
         except Exception as e:
             logger.error(f"BF.EXISTS 失败: {key}, 错误: {e}")
-            # 降级到 Set
-            result = await client.sismember(key, item)
-            return bool(result)
+            # 降级到客户端 Bloom Filter
+            return (await self._fallback_mexists(key, [item]))[0]
 
     async def bf_mexists(self, key: str, items: list) -> list:
         """批量检查元素是否存在于 Bloom Filter
@@ -260,27 +533,17 @@ class BloomFilterClient:
         if not items:
             return []
 
-        client = await self._get_client()
-
         if not await self._check_bloom_available():
-            # 降级模式：使用 pipeline SISMEMBER
-            pipe = client.pipeline()
-            for item in items:
-                pipe.sismember(key, item)
-            results = await pipe.execute()
-            return [bool(r) for r in results]
+            return await self._fallback_mexists(key, items)
 
+        client = await self._get_client()
         try:
             result = await client.execute_command("BF.MEXISTS", key, *items)
             return [bool(r) for r in result]
         except Exception as e:
             logger.error(f"BF.MEXISTS 失败: {key}, 错误: {e}")
-            # 降级到 Set
-            pipe = client.pipeline()
-            for item in items:
-                pipe.sismember(key, item)
-            results = await pipe.execute()
-            return [bool(r) for r in results]
+            # 降级到客户端 Bloom Filter
+            return await self._fallback_mexists(key, items)
 
     # =========================================================================
     # 组合操作
@@ -354,19 +617,10 @@ class BloomFilterClient:
         Returns:
             BloomFilterInfo 对象
         """
-        client = await self._get_client()
-
         if not await self._check_bloom_available():
-            # 降级模式：返回 Set 的信息
-            card = await client.scard(key)
-            return BloomFilterInfo(
-                capacity=0,
-                size=0,
-                num_filters=1,
-                num_items_inserted=card,
-                expansion_rate=0
-            )
+            return await self._fallback_info(key)
 
+        client = await self._get_client()
         try:
             result = await client.execute_command("BF.INFO", key)
 
@@ -400,8 +654,12 @@ class BloomFilterClient:
             key: 过滤器键名
 
         Returns:
-            元素数量
+            元素数量（降级模式下为 HyperLogLog 估算值）
         """
+        if not await self._check_bloom_available():
+            client = await self._get_client()
+            return await client.pfcount(self._hll_key(key))
+
         info = await self.bf_info(key)
         return info.num_items_inserted
 
@@ -419,7 +677,12 @@ class BloomFilterClient:
             是否删除成功
         """
         client = await self._get_client()
-        result = await client.delete(key)
+        keys = [key]
+        if not await self._check_bloom_available():
+            keys.extend(await self._fallback_keys(key))
+            self._fallback_meta.pop(key, None)
+            self._legacy_sets.pop(key, None)
+        result = await client.delete(*keys)
         return bool(result)
 
     async def clear_filter(self, key: str, capacity: int = None,
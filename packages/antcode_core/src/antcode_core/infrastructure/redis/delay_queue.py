@@ -0,0 +1,163 @@
+"""Redis 延迟队列
+
+使用 Sorted Set 按到期时间排序（score 为到期时间戳，秒），载荷存放在 Hash 中。
+到期条目通过 Lua 脚本原子认领：移入处理中集合并附带租约，确认后删除；
+租约过期未确认的条目在下次认领时重新投递，进程重启不会丢失。
+"""
+
+import time
+
+import ujson
+from redis.exceptions import NoScriptError
+
+from antcode_core.infrastructure.redis.client import get_redis_client
+from antcode_core.infrastructure.redis.control_plane import redis_namespace
+
+# Lua 脚本：批量认领到期条目
+# KEYS[1] = 待处理 ZSET, KEYS[2] = 处理中 ZSET, KEYS[3] = 载荷 Hash
+# ARGV[1] = 当前时间戳（秒）, ARGV[2] = 认领上限, ARGV[3] = 租约时长（秒）
+# 返回: [member, due, payload, member, due, payload, ...]
+_CLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local lease = tonumber(ARGV[3])
+
+-- 租约过期的条目放回待处理集合，保持原到期时间
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now, 'LIMIT', 0, limit)
+for _, member in ipairs(expired) do
+    local due = redis.call('HGET', KEYS[3], member .. ':due')
+    redis.call('ZADD', KEYS[1], due or now, member)
+    redis.call('ZREM', KEYS[2], member)
+end
+
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'WITHSCORES', 'LIMIT', 0, limit)
+local result = {}
+for i = 1, #items, 2 do
+    local member = items[i]
+    redis.call('ZREM', KEYS[1], member)
+    redis.call('ZADD', KEYS[2], now + lease, member)
+    result[#result + 1] = member
+    result[#result + 1] = items[i + 1]
+    result[#result + 1] = redis.call('HGET', KEYS[3], member) or ''
+end
+return result
+"""
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class RedisDelayQueue:
+    """Redis 延迟队列"""
+
+    def __init__(self, name: str, lease_seconds: int = 60, namespace: str | None = None):
+        """
+        Args:
+            name: 队列名称
+            lease_seconds: 认领后的租约时长，超时未确认则重新投递
+            namespace: Redis 命名空间
+        """
+        base = f"{redis_namespace(namespace)}:delay:{name}"
+        self.pending_key = f"{base}:pending"
+        self.inflight_key = f"{base}:inflight"
+        self.payload_key = f"{base}:payload"
+        self.lease_seconds = lease_seconds
+        self._script_sha: str | None = None
+
+    async def _ensure_script(self, redis_client) -> str:
+        """加载 Lua 脚本并缓存 SHA"""
+        if self._script_sha is None:
+            self._script_sha = await redis_client.script_load(_CLAIM_SCRIPT)
+        return self._script_sha
+
+    async def add(self, member: str, payload: dict, due_at: float) -> None:
+        """加入条目（member 已存在时覆盖到期时间和载荷）"""
+        redis_client = await get_redis_client()
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.hset(
+            self.payload_key,
+            mapping={member: ujson.dumps(payload), f"{member}:due": due_at},
+        )
+        pipe.zadd(self.pending_key, {member: due_at})
+        await pipe.execute()
+
+    async def claim(
+        self, limit: int = 100, now: float | None = None
+    ) -> list[tuple[str, float, dict]]:
+        """原子认领到期条目，返回 (member, due_at, payload) 列表（按到期时间升序）"""
+        redis_client = await get_redis_client()
+        args = (
+            3,
+            self.pending_key,
+            self.inflight_key,
+            self.payload_key,
+            now if now is not None else time.time(),
+            limit,
+            self.lease_seconds,
+        )
+
+        sha = await self._ensure_script(redis_client)
+        try:
+            raw = await redis_client.evalsha(sha, *args)
+        except NoScriptError:
+            # SHA 可能因 Redis 重启或 SCRIPT FLUSH 失效，重新加载；其他错误直接抛出
+            self._script_sha = None
+            sha = await self._ensure_script(redis_client)
+            raw = await redis_client.evalsha(sha, *args)
+
+        items = []
+        for i in range(0, len(raw), 3):
+            payload = _decode(raw[i + 2])
+            items.append(
+                (_decode(raw[i]), float(_decode(raw[i + 1])), ujson.loads(payload) if payload else {})
+            )
+        return items
+
+    async def ack(self, *members: str) -> None:
+        """确认处理完成，删除条目"""
+        if not members:
+            return
+        redis_client = await get_redis_client()
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.zrem(self.inflight_key, *members)
+        pipe.hdel(self.payload_key, *members, *(f"{m}:due" for m in members))
+        await pipe.execute()
+
+    async def remove(self, member: str) -> None:
+        """取消条目"""
+        redis_client = await get_redis_client()
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.zrem(self.pending_key, member)
+        pipe.zrem(self.inflight_key, member)
+        pipe.hdel(self.payload_key, member, f"{member}:due")
+        await pipe.execute()
+
+    async def next_due(self) -> float | None:
+        """最近的到期时间（含处理中条目的租约到期时间），为空返回 None"""
+        redis_client = await get_redis_client()
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zrange(self.pending_key, 0, 0, withscores=True)
+        pipe.zrange(self.inflight_key, 0, 0, withscores=True)
+        heads = await pipe.execute()
+        scores = [float(items[0][1]) for items in heads if items]
+        return min(scores) if scores else None
+
+    async def size(self) -> int:
+        """待处理条目数（不含处理中）"""
+        redis_client = await get_redis_client()
+        return int(await redis_client.zcard(self.pending_key))
+
+    async def peek(self, limit: int = 100) -> list[tuple[str, float, dict]]:
+        """按到期时间升序查看待处理条目，不认领"""
+        redis_client = await get_redis_client()
+        entries = await redis_client.zrange(self.pending_key, 0, limit - 1, withscores=True)
+        if not entries:
+            return []
+
+        members = [_decode(member) for member, _ in entries]
+        payloads = await redis_client.hmget(self.payload_key, members)
+        return [
+            (member, float(score), ujson.loads(payload) if payload else {})
+            for member, (_, score), payload in zip(members, entries, payloads, strict=True)
+        ]
@@ -0,0 +1,98 @@
+"""
+日志 Stream 消息编解码
+
+Worker 批量发送日志时，同一 run 中连续的同类型日志行打包为一条 Stream 消息：
+
+    format    = "packed"
+    log_type  = stdout / stderr
+    timestamp = 首行时间（ISO 格式，兼容只读单行字段的旧读取方）
+    sequence  = 首行序号
+    ts        = 首行时间戳（毫秒）
+    lines     = JSON 数组 [[seq, 相对首行的毫秒偏移, content], ...]
+
+每行一条消息的旧格式仍然有效，读取方统一通过 unpack_log_entry 展开。
+"""
+
+import json
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any
+
+from antcode_core.infrastructure.redis.control_plane import decode_stream_payload
+
+PACKED_LOG_FORMAT = "packed"
+
+
+def pack_log_lines(log_type: str, lines: list[tuple[int, int, str]]) -> dict[str, str]:
+    """
+    打包多行日志为一条 Stream 消息
+
+    Args:
+        log_type: 日志类型
+        lines: [(seq, 时间戳毫秒, content), ...]，不能为空
+
+    Returns:
+        XADD 字段
+    """
+    base_seq, base_ms, _ = lines[0]
+    payload = [[seq, ts_ms - base_ms, content] for seq, ts_ms, content in lines]
+    return {
+        "format": PACKED_LOG_FORMAT,
+        "log_type": log_type,
+        "timestamp": datetime.fromtimestamp(base_ms / 1000).isoformat(),
+        "sequence": str(base_seq),
+        "ts": str(base_ms),
+        "lines": json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+    }
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value) if value is not None else ""
+
+
+def unpack_log_entry(fields: Mapping[Any, Any]) -> list[dict[str, str]]:
+    """
+    展开一条日志 Stream 消息（兼容单行与打包格式）
+
+    Returns:
+        [{"log_type", "content", "timestamp", "sequence"}, ...]
+    """
+    decoded = decode_stream_payload(fields)
+    log_type = _text(decoded.get("log_type")) or "stdout"
+
+    if decoded.get("format") != PACKED_LOG_FORMAT:
+        return [
+            {
+                "log_type": log_type,
+                "content": _text(decoded.get("content")),
+                "timestamp": _text(decoded.get("timestamp")),
+                "sequence": _text(decoded.get("sequence")),
+            }
+        ]
+
+    try:
+        base_ms = int(decoded.get("ts") or 0)
+        lines = json.loads(decoded.get("lines") or "[]")
+    except (TypeError, ValueError):
+        return []
+
+    entries = []
+    for seq, offset_ms, content in lines:
+        entries.append(
+            {
+                "log_type": log_type,
+                "content": content,
+                "timestamp": datetime.fromtimestamp((base_ms + offset_ms) / 1000).isoformat(),
+                "sequence": str(seq),
+            }
+        )
+    return entries
+
+
+__all__ = [
+    "PACKED_LOG_FORMAT",
+    "pack_log_lines",
+    "unpack_log_entry",
+]
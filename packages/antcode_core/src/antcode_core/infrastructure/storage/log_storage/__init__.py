@@ -19,6 +19,7 @@ from antcode_core.infrastructure.storage.log_storage.base import (
     LogEntry,
     LogChunk,
     WriteResult,
+    close_log_storage,
     get_log_storage,
     reset_log_storage,
 )
@@ -30,4 +31,5 @@ __all__ = [
     "WriteResult",
     "get_log_storage",
     "reset_log_storage",
+    "close_log_storage",
 ]
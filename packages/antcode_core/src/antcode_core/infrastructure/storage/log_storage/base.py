@@ -243,6 +243,11 @@ class LogStorageBackend(ABC):
         return True
 
 
+    async def close(self) -> None:
+        """关闭后端，写出尚未持久化的缓冲（默认无操作）"""
+        return None
+
+
 # 全局日志存储实例
 _log_storage_instance: LogStorageBackend | None = None
 
@@ -282,3 +287,12 @@ def reset_log_storage() -> None:
     """重置日志存储实例"""
     global _log_storage_instance
     _log_storage_instance = None
+
+
+async def close_log_storage() -> None:
+    """关闭并重置日志存储实例"""
+    global _log_storage_instance
+    storage = _log_storage_instance
+    _log_storage_instance = None
+    if storage is not None:
+        await storage.close()
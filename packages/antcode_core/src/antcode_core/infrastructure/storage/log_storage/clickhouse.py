@@ -4,7 +4,7 @@ ClickHouse 日志存储后端
 用于大规模日志存储和分析。
 
 特点：
-- 高性能批量写入
+- 高性能批量写入（后台异步写出）
 - 时间序列查询优化
 - 自动分区和 TTL
 - 支持全文搜索
@@ -29,9 +29,13 @@ ClickHouse 日志存储后端
     TTL timestamp + INTERVAL 30 DAY;
 """
 
+import asyncio
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from typing import Any, AsyncIterator
 
 from loguru import logger
@@ -55,7 +59,7 @@ CREATE TABLE IF NOT EXISTS {database}.logs (
     level String DEFAULT 'INFO',
     content String,
     source Nullable(String),
-    metadata String DEFAULT '{}',
+    metadata String DEFAULT '{{}}',
     INDEX idx_run_id run_id TYPE bloom_filter GRANULARITY 1,
     INDEX idx_content content TYPE tokenbf_v1(10240, 3, 0) GRANULARITY 4
 ) ENGINE = MergeTree()
@@ -83,11 +87,20 @@ TTL created_at + INTERVAL 1 DAY;
 """
 
 
+# 日志表写入列（写入缓冲按列存放）
+LOG_COLUMNS = (
+    "run_id", "log_type", "sequence", "timestamp",
+    "level", "content", "source", "metadata",
+)
+
+
 class ClickHouseLogStorage(LogStorageBackend):
     """ClickHouse 日志存储后端
     
     特点：
-    - 高性能批量写入（使用 INSERT ... VALUES 批量插入）
+    - 异步批量写入：write_log / write_logs_batch 进入有界内存缓冲，
+      后台任务按行数或时间阈值以列式 INSERT 写出，避免逐行插入产生大量 part
+    - clickhouse-connect 的阻塞调用在专用线程池中执行，不阻塞事件循环
     - 时间序列查询优化
     - 支持全文搜索（tokenbf_v1 索引）
     - 自动分区和 TTL
@@ -99,10 +112,18 @@ class ClickHouseLogStorage(LogStorageBackend):
         CLICKHOUSE_USER: 用户名（默认 default）
         CLICKHOUSE_PASSWORD: 密码
         CLICKHOUSE_RETENTION_DAYS: 日志保留天数（默认 30）
+        CLICKHOUSE_FLUSH_ROWS: 触发写出的缓冲行数（默认 10000）
+        CLICKHOUSE_FLUSH_INTERVAL: 缓冲最长停留时间，秒（默认 1）
+        CLICKHOUSE_BUFFER_MAX_ROWS: 缓冲上限，超出时写入方等待（默认 200000）
+        CLICKHOUSE_EXECUTOR_WORKERS: 专用线程池大小（默认 4）
     """
 
     # 批量写入阈值
-    BATCH_SIZE = 1000
+    BATCH_SIZE = 10000
+    # 缓冲已满时写入方的最长等待时间（秒）
+    ENQUEUE_TIMEOUT = 5.0
+    # 写出失败后的最大重试间隔（秒）
+    MAX_RETRY_DELAY = 30.0
     
     def __init__(
         self,
@@ -112,6 +133,10 @@ class ClickHouseLogStorage(LogStorageBackend):
         user: str | None = None,
         password: str | None = None,
         retention_days: int | None = None,
+        flush_rows: int | None = None,
+        flush_interval: float | None = None,
+        max_buffer_rows: int | None = None,
+        executor_workers: int | None = None,
     ):
         """初始化 ClickHouse 日志存储
         
@@ -122,6 +147,10 @@ class ClickHouseLogStorage(LogStorageBackend):
             user: 用户名
             password: 密码
             retention_days: 日志保留天数
+            flush_rows: 触发写出的缓冲行数
+            flush_interval: 缓冲最长停留时间（秒）
+            max_buffer_rows: 缓冲上限（行）
+            executor_workers: 专用线程池大小
         """
         self.host = host or os.getenv("CLICKHOUSE_HOST", "localhost")
         self.port = port or int(os.getenv("CLICKHOUSE_PORT", "8123"))
@@ -129,33 +158,80 @@ class ClickHouseLogStorage(LogStorageBackend):
         self.user = user or os.getenv("CLICKHOUSE_USER", "default")
         self.password = password or os.getenv("CLICKHOUSE_PASSWORD", "")
         self.retention_days = retention_days or int(os.getenv("CLICKHOUSE_RETENTION_DAYS", "30"))
+        self.flush_rows = flush_rows or int(os.getenv("CLICKHOUSE_FLUSH_ROWS", str(self.BATCH_SIZE)))
+        self.flush_interval = flush_interval or float(os.getenv("CLICKHOUSE_FLUSH_INTERVAL", "1"))
+        self.max_buffer_rows = max(
+            self.flush_rows,
+            max_buffer_rows or int(os.getenv("CLICKHOUSE_BUFFER_MAX_ROWS", "200000")),
+        )
         
         self._client = None
         self._initialized = False
+        self._client_lock = asyncio.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=executor_workers or int(os.getenv("CLICKHOUSE_EXECUTOR_WORKERS", "4")),
+            thread_name_prefix="clickhouse",
+        )
         
-        # 写入缓冲
-        self._buffer: list[LogEntry] = []
+        # 写入缓冲（列式）
+        self._columns: list[list[Any]] = [[] for _ in LOG_COLUMNS]
+        self._buffer_since: float | None = None
+        self._inflight_rows = 0
+        self._flush_task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_wakeup = asyncio.Event()
+        self._space_available = asyncio.Event()
+
+        # 写入指标
+        self._stats: dict[str, Any] = {
+            "enqueued_rows": 0,
+            "flushed_rows": 0,
+            "rejected_rows": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "backpressure_waits": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+            "last_error": None,
+        }
+
+    async def _run(self, func, *args, **kwargs):
+        """在专用线程池中执行阻塞调用"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
 
     async def _get_client(self):
         """获取 ClickHouse 客户端"""
-        if self._client is None:
-            try:
-                import clickhouse_connect
-            except ImportError:
-                raise ImportError("请安装 clickhouse-connect: pip install clickhouse-connect")
-            
-            self._client = clickhouse_connect.get_client(
-                host=self.host,
-                port=self.port,
-                database=self.database,
-                username=self.user,
-                password=self.password,
-            )
-            
-            # 初始化表结构
-            if not self._initialized:
-                await self._init_tables()
-                self._initialized = True
+        if self._client is not None:
+            return self._client
+
+        async with self._client_lock:
+            if self._client is None:
+                try:
+                    import clickhouse_connect
+                except ImportError:
+                    raise ImportError("请安装 clickhouse-connect: pip install clickhouse-connect")
+                
+                # 客户端在线程池中并发使用，关闭自动会话以避免 "Session is locked"
+                self._client = await self._run(
+                    clickhouse_connect.get_client,
+                    host=self.host,
+                    port=self.port,
+                    database=self.database,
+                    username=self.user,
+                    password=self.password,
+                    autogenerate_session_id=False,
+                )
+                
+                # 初始化表结构（失败时丢弃客户端，下次重新初始化）
+                if not self._initialized:
+                    try:
+                        await self._init_tables()
+                    except Exception:
+                        self._client = None
+                        raise
+                    self._initialized = True
         
         return self._client
 
@@ -163,18 +239,18 @@ class ClickHouseLogStorage(LogStorageBackend):
         """初始化表结构"""
         try:
             # 创建数据库
-            self._client.command(f"CREATE DATABASE IF NOT EXISTS {self.database}")
+            await self._run(self._client.command, f"CREATE DATABASE IF NOT EXISTS {self.database}")
             
             # 创建日志表
             create_logs_sql = CREATE_TABLE_SQL.format(
                 database=self.database,
                 retention_days=self.retention_days,
             )
-            self._client.command(create_logs_sql)
+            await self._run(self._client.command, create_logs_sql)
             
             # 创建分片临时表
             create_chunks_sql = CREATE_CHUNKS_TABLE_SQL.format(database=self.database)
-            self._client.command(create_chunks_sql)
+            await self._run(self._client.command, create_chunks_sql)
             
             logger.info(f"ClickHouse 日志表已初始化: {self.database}.logs")
             
@@ -187,80 +263,183 @@ class ClickHouseLogStorage(LogStorageBackend):
         mapping = {"stdout": "stdout", "stderr": "stderr", "system": "system"}
         return mapping.get(log_type, "stdout")
 
+    @property
+    def buffered_rows(self) -> int:
+        """缓冲中待写出的行数"""
+        return len(self._columns[0])
+
     async def write_log(self, entry: LogEntry) -> WriteResult:
-        """写入单条日志"""
-        try:
-            client = await self._get_client()
-            
-            # 准备数据
-            data = [[
+        """写入单条日志（进入写入缓冲）"""
+        return await self.write_logs_batch([entry])
+
+    async def write_logs_batch(self, entries: list[LogEntry]) -> WriteResult:
+        """批量写入日志
+
+        日志进入写入缓冲即返回成功，由后台任务批量写出；
+        缓冲已满且在 ENQUEUE_TIMEOUT 内未腾出空间时返回失败（背压）。
+        """
+        if not entries:
+            return WriteResult(success=True)
+        
+        if not await self._wait_for_space(len(entries)):
+            self._stats["rejected_rows"] += len(entries)
+            logger.warning(f"ClickHouse 写入缓冲已满，拒绝 {len(entries)} 条日志")
+            return WriteResult(success=False, error="ClickHouse 写入缓冲已满")
+
+        now = datetime.now()
+        columns = self._columns
+        max_seq = 0
+        for entry in entries:
+            row = (
                 entry.run_id,
                 self._log_type_to_enum(entry.log_type),
                 entry.sequence,
-                entry.timestamp or datetime.now(),
+                entry.timestamp or now,
                 entry.level,
                 entry.content,
                 entry.source,
                 json.dumps(entry.metadata, ensure_ascii=False) if entry.metadata else "{}",
-            ]]
-            
-            # 插入数据
-            client.insert(
-                f"{self.database}.logs",
-                data,
-                column_names=[
-                    "run_id", "log_type", "sequence", "timestamp",
-                    "level", "content", "source", "metadata"
-                ],
             )
-            
-            return WriteResult(success=True, ack_offset=entry.sequence)
-            
-        except Exception as e:
-            logger.error(f"写入日志到 ClickHouse 失败: {e}")
-            return WriteResult(success=False, error=str(e))
+            for column, value in zip(columns, row):
+                column.append(value)
+            max_seq = max(max_seq, entry.sequence)
 
-    async def write_logs_batch(self, entries: list[LogEntry]) -> WriteResult:
-        """批量写入日志"""
-        if not entries:
-            return WriteResult(success=True)
+        if self._buffer_since is None:
+            self._buffer_since = time.monotonic()
+        self._stats["enqueued_rows"] += len(entries)
+
+        self._ensure_flush_task()
+        if self.buffered_rows >= self.flush_rows:
+            self._flush_wakeup.set()
         
-        try:
-            client = await self._get_client()
-            
-            # 准备批量数据
-            data = []
-            max_seq = 0
-            
-            for entry in entries:
-                data.append([
-                    entry.run_id,
-                    self._log_type_to_enum(entry.log_type),
-                    entry.sequence,
-                    entry.timestamp or datetime.now(),
-                    entry.level,
-                    entry.content,
-                    entry.source,
-                    json.dumps(entry.metadata, ensure_ascii=False) if entry.metadata else "{}",
-                ])
-                max_seq = max(max_seq, entry.sequence)
-            
-            # 批量插入
-            client.insert(
-                f"{self.database}.logs",
-                data,
-                column_names=[
-                    "run_id", "log_type", "sequence", "timestamp",
-                    "level", "content", "source", "metadata"
-                ],
-            )
-            
-            logger.debug(f"批量写入 {len(entries)} 条日志到 ClickHouse")
-            return WriteResult(success=True, ack_offset=max_seq)
-            
-        except Exception as e:
-            logger.error(f"批量写入日志到 ClickHouse 失败: {e}")
-            return WriteResult(success=False, error=str(e))
+        return WriteResult(success=True, ack_offset=max_seq)
+
+    async def _wait_for_space(self, count: int) -> bool:
+        """等待缓冲腾出空间（缓冲为空时总是允许，避免超大批次永远无法写入）"""
+        if self.buffered_rows + self._inflight_rows + count <= self.max_buffer_rows:
+            return True
+
+        self._stats["backpressure_waits"] += 1
+        self._ensure_flush_task()
+        self._flush_wakeup.set()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.ENQUEUE_TIMEOUT
+        while (
+            self.buffered_rows + self._inflight_rows > 0
+            and self.buffered_rows + self._inflight_rows + count > self.max_buffer_rows
+        ):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            self._space_available.clear()
+            try:
+                await asyncio.wait_for(self._space_available.wait(), remaining)
+            except TimeoutError:
+                return False
+        return True
+
+    def _ensure_flush_task(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """后台写出：行数达到阈值时被唤醒，否则每 flush_interval 写出一次；缓冲为空时退出"""
+        retry_delay = 0.0
+        while self.buffered_rows:
+            if retry_delay:
+                await asyncio.sleep(retry_delay)
+            else:
+                try:
+                    await asyncio.wait_for(self._flush_wakeup.wait(), self.flush_interval)
+                except TimeoutError:
+                    pass
+            self._flush_wakeup.clear()
+
+            if await self.flush():
+                retry_delay = 0.0
+            else:
+                retry_delay = min(self.MAX_RETRY_DELAY, max(1.0, retry_delay * 2))
+
+    async def flush(self) -> bool:
+        """立即以单次列式 INSERT 写出缓冲，失败时放回缓冲"""
+        async with self._flush_lock:
+            if not self.buffered_rows:
+                return True
+
+            columns, self._columns = self._columns, [[] for _ in LOG_COLUMNS]
+            buffer_since, self._buffer_since = self._buffer_since, None
+            rows = len(columns[0])
+            self._inflight_rows = rows
+            started = time.perf_counter()
+            try:
+                client = await self._get_client()
+                await self._run(
+                    client.insert,
+                    f"{self.database}.logs",
+                    columns,
+                    column_names=list(LOG_COLUMNS),
+                    column_oriented=True,
+                )
+            except Exception as e:
+                # 放回缓冲头部，保持原有顺序
+                for column, pending in zip(columns, self._columns):
+                    column.extend(pending)
+                self._columns = columns
+                self._buffer_since = buffer_since
+                self._stats["failed_flushes"] += 1
+                self._stats["last_error"] = str(e)
+                logger.error(f"批量写入日志到 ClickHouse 失败: rows={rows}, error={e}")
+                return False
+            finally:
+                self._inflight_rows = 0
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._stats["flushes"] += 1
+            self._stats["flushed_rows"] += rows
+            self._stats["last_flush_ms"] = round(elapsed_ms, 2)
+            self._stats["max_flush_ms"] = round(max(self._stats["max_flush_ms"], elapsed_ms), 2)
+            self._stats["total_flush_ms"] += elapsed_ms
+            self._space_available.set()
+            logger.debug(f"批量写入 {rows} 条日志到 ClickHouse, 耗时 {elapsed_ms:.1f}ms")
+            return True
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取写入缓冲与写出延迟指标"""
+        stats = dict(self._stats)
+        flushes = stats["flushes"]
+        pending = self.buffered_rows + self._inflight_rows
+        stats.update({
+            "buffered_rows": self.buffered_rows,
+            "inflight_rows": self._inflight_rows,
+            "max_buffer_rows": self.max_buffer_rows,
+            "buffer_usage": round(pending / self.max_buffer_rows, 4),
+            "oldest_buffered_age_s": (
+                round(time.monotonic() - self._buffer_since, 3) if self._buffer_since else 0.0
+            ),
+            "avg_flush_ms": round(stats["total_flush_ms"] / flushes, 2) if flushes else 0.0,
+            "total_flush_ms": round(stats["total_flush_ms"], 2),
+        })
+        return stats
+
+    async def close(self) -> None:
+        """停止后台写出，写出剩余缓冲并释放线程池"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        await self.flush()
+        if self._client is not None:
+            try:
+                await self._run(self._client.close)
+            except Exception:
+                pass
+            self._client = None
+        self._executor.shutdown(wait=False)
 
     async def write_chunk(self, chunk: LogChunk) -> WriteResult:
         """写入日志分片"""
@@ -273,7 +452,8 @@ class ClickHouseLogStorage(LogStorageBackend):
             data_b64 = base64.b64encode(chunk.data).decode("utf-8")
             
             # 插入分片
-            client.insert(
+            await self._run(
+                client.insert,
                 f"{self.database}.log_chunks",
                 [[
                     chunk.run_id,
@@ -313,7 +493,8 @@ class ClickHouseLogStorage(LogStorageBackend):
             import hashlib
             
             # 查询所有分片
-            result = client.query(
+            result = await self._run(
+                client.query,
                 f"""
                 SELECT offset, data FROM {self.database}.log_chunks
                 WHERE run_id = %(run_id)s AND log_type = %(log_type)s
@@ -364,10 +545,13 @@ class ClickHouseLogStorage(LogStorageBackend):
                     ))
             
             if entries:
-                await self.write_logs_batch(entries)
+                result = await self.write_logs_batch(entries)
+                if not result.success or not await self.flush():
+                    return WriteResult(success=False, error=result.error or "写入日志表失败")
             
             # 删除分片
-            client.command(
+            await self._run(
+                client.command,
                 f"""
                 ALTER TABLE {self.database}.log_chunks
                 DELETE WHERE run_id = %(run_id)s AND log_type = %(log_type)s
@@ -416,7 +600,7 @@ class ClickHouseLogStorage(LogStorageBackend):
                 LIMIT %(limit)s
             """
             
-            result = client.query(query, parameters=params)
+            result = await self._run(client.query, query, parameters=params)
             
             entries = []
             for row in result.result_rows[:limit]:
@@ -440,7 +624,7 @@ class ClickHouseLogStorage(LogStorageBackend):
                 SELECT count() FROM {self.database}.logs
                 WHERE run_id = %(run_id)s
             """
-            count_result = client.query(count_query, parameters={"run_id": run_id})
+            count_result = await self._run(client.query, count_query, parameters={"run_id": run_id})
             total = count_result.result_rows[0][0] if count_result.result_rows else 0
             
             return LogQueryResult(
@@ -468,7 +652,8 @@ class ClickHouseLogStorage(LogStorageBackend):
             batch_size = 10000
             
             while True:
-                result = client.query(
+                result = await self._run(
+                    client.query,
                     f"""
                     SELECT sequence, timestamp, level, content, source
                     FROM {self.database}.logs
@@ -516,13 +701,15 @@ class ClickHouseLogStorage(LogStorageBackend):
             client = await self._get_client()
             
             # 删除日志
-            client.command(
+            await self._run(
+                client.command,
                 f"ALTER TABLE {self.database}.logs DELETE WHERE run_id = %(run_id)s",
                 parameters={"run_id": run_id},
             )
             
             # 删除分片
-            client.command(
+            await self._run(
+                client.command,
                 f"ALTER TABLE {self.database}.log_chunks DELETE WHERE run_id = %(run_id)s",
                 parameters={"run_id": run_id},
             )
@@ -565,7 +752,7 @@ class ClickHouseLogStorage(LogStorageBackend):
         """健康检查"""
         try:
             client = await self._get_client()
-            result = client.query("SELECT 1")
+            result = await self._run(client.query, "SELECT 1")
             return result.result_rows[0][0] == 1
         except Exception as e:
             logger.error(f"ClickHouse 健康检查失败: {e}")
@@ -599,7 +786,8 @@ class ClickHouseLogStorage(LogStorageBackend):
                 conditions.append("log_type = %(log_type)s")
                 params["log_type"] = log_type
             
-            result = client.query(
+            result = await self._run(
+                client.query,
                 f"""
                 SELECT run_id, log_type, sequence, timestamp, level, content, source, metadata
                 FROM {self.database}.logs
@@ -646,7 +834,8 @@ class ClickHouseLogStorage(LogStorageBackend):
         try:
             client = await self._get_client()
             
-            result = client.query(
+            result = await self._run(
+                client.query,
                 f"""
                 SELECT
                     log_type,
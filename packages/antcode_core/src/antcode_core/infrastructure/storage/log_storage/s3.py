@@ -9,13 +9,25 @@ S3/MinIO 日志存储后端
     logs/{run_id}/stderr.log.gz
     logs/{run_id}/system.log.gz
     logs/{run_id}/chunks/{log_type}/{offset}.chunk  # 临时分片
+    logs/{run_id}/segments/{log_type}/manifest.json  # 段清单（每段的 seq 范围与行数）
+    logs/{run_id}/segments/{log_type}/{first_seq}-{last_seq}-{token}.jsonl.gz  # 不可变日志段
+
+逐行日志（write_log / write_logs_batch）先在内存中按 (run_id, log_type) 缓冲，
+达到大小/行数/时间阈值后压缩为一个新的日志段对象并追加到清单，
+查询时只读取与 start_seq 起的请求范围重叠的段。清单读取时与段对象列表取并集，
+多个副本并发更新清单时被覆盖掉的段仍然可见。
+旧版 {log_type}.jsonl 对象仍可读取。
 """
 
+import asyncio
 import gzip
 import hashlib
 import io
 import json
 import os
+import time
+import uuid
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, AsyncIterator
 
@@ -31,6 +43,15 @@ from antcode_core.infrastructure.storage.log_storage.base import (
 from antcode_core.infrastructure.storage.s3_client import get_s3_client_manager
 
 
+@dataclass
+class _SegmentBuffer:
+    """单个 (run_id, log_type) 的待写入日志行"""
+
+    lines: list[tuple[int, bytes]] = field(default_factory=list)
+    size: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+
+
 class S3LogStorage(LogStorageBackend):
     """S3/MinIO 日志存储后端
     
@@ -41,28 +62,56 @@ class S3LogStorage(LogStorageBackend):
     - 支持分片上传（大文件）
     - 自动 gzip 压缩
     - 支持流式读取
+    - 逐行日志分段写入，写入与查询开销不随日志总量增长
+
+    配置环境变量：
+        S3_LOG_SEGMENT_MAX_BYTES: 单段最大未压缩字节数（默认 4MB）
+        S3_LOG_SEGMENT_MAX_LINES: 单段最大行数（默认 50000）
+        S3_LOG_FLUSH_INTERVAL: 缓冲最长停留时间，秒（默认 5）
     """
 
     CHUNK_SIZE = 8 * 1024 * 1024  # 8MB
+    MANIFEST_NAME = "manifest.json"
+    SEGMENT_SUFFIX = ".jsonl.gz"
+    # 清单更新锁分片数
+    MANIFEST_LOCK_STRIPES = 64
 
     def __init__(
         self,
         bucket: str | None = None,
         prefix: str = "logs",
+        segment_max_bytes: int | None = None,
+        segment_max_lines: int | None = None,
+        flush_interval: float | None = None,
     ):
         """初始化 S3 日志存储
         
         Args:
             bucket: S3 桶名（默认从环境变量读取）
             prefix: 存储前缀
+            segment_max_bytes: 单段最大未压缩字节数
+            segment_max_lines: 单段最大行数
+            flush_interval: 缓冲最长停留时间（秒）
         """
         self.bucket = bucket or os.getenv("S3_BUCKET") or os.getenv("MINIO_BUCKET", "antcode-logs")
         self.prefix = prefix
+        self.segment_max_bytes = segment_max_bytes or int(
+            os.getenv("S3_LOG_SEGMENT_MAX_BYTES", str(4 * 1024 * 1024))
+        )
+        self.segment_max_lines = segment_max_lines or int(
+            os.getenv("S3_LOG_SEGMENT_MAX_LINES", "50000")
+        )
+        self.flush_interval = flush_interval or float(os.getenv("S3_LOG_FLUSH_INTERVAL", "5"))
         
         # 使用公共客户端管理器
         self._client_manager = get_s3_client_manager()
         self._bucket_ensured = False
 
+        # 分段写入缓冲
+        self._buffers: dict[tuple[str, str], _SegmentBuffer] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._manifest_locks = [asyncio.Lock() for _ in range(self.MANIFEST_LOCK_STRIPES)]
+
     async def _get_client(self):
         """获取 S3 客户端（通过公共管理器）"""
         client = await self._client_manager.get_client()
@@ -97,13 +146,23 @@ class S3LogStorage(LogStorageBackend):
         """构建分片存储路径"""
         return f"{self.prefix}/{run_id}/chunks/{log_type}/{offset:012d}.chunk"
 
-    async def write_log(self, entry: LogEntry) -> WriteResult:
-        """写入单条日志（追加模式）"""
-        try:
-            client = await self._get_client()
-            
-            # 构建日志行
-            log_line = json.dumps({
+    def _build_segment_dir(self, run_id: str, log_type: str) -> str:
+        """构建日志段目录"""
+        return f"{self.prefix}/{run_id}/segments/{log_type}/"
+
+    def _build_segment_path(self, run_id: str, log_type: str, first_seq: int, last_seq: int) -> str:
+        """构建日志段路径（token 保证多个写入方不会覆盖同名段）"""
+        token = uuid.uuid4().hex[:8]
+        return (
+            f"{self._build_segment_dir(run_id, log_type)}"
+            f"{first_seq:012d}-{last_seq:012d}-{token}{self.SEGMENT_SUFFIX}"
+        )
+
+    @staticmethod
+    def _encode_line(entry: LogEntry) -> bytes:
+        """编码为 JSONL 行"""
+        return (
+            json.dumps({
                 "seq": entry.sequence,
                 "ts": entry.timestamp.isoformat() if entry.timestamp else datetime.now().isoformat(),
                 "level": entry.level,
@@ -111,83 +170,59 @@ class S3LogStorage(LogStorageBackend):
                 "source": entry.source,
                 "metadata": entry.metadata,
             }, ensure_ascii=False) + "\n"
-            
-            # 追加到日志文件（使用 JSONL 格式）
-            path = f"{self.prefix}/{entry.run_id}/{entry.log_type}.jsonl"
-            
-            # 尝试读取现有内容
-            existing_content = b""
-            try:
-                response = await client.get_object(Bucket=self.bucket, Key=path)
-                async with response["Body"] as stream:
-                    existing_content = await stream.read()
-            except Exception:
-                pass  # 文件不存在
-            
-            # 追加新内容
-            new_content = existing_content + log_line.encode("utf-8")
-            await client.put_object(
-                Bucket=self.bucket,
-                Key=path,
-                Body=new_content,
-                ContentType="application/x-ndjson",
-            )
-            
-            return WriteResult(success=True, ack_offset=entry.sequence)
-            
-        except Exception as e:
-            logger.error(f"写入日志失败: {e}")
-            return WriteResult(success=False, error=str(e))
+        ).encode("utf-8")
+
+    @staticmethod
+    def _decode_line(run_id: str, log_type: str, line: bytes | str) -> LogEntry | None:
+        """解码 JSONL 行"""
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        return LogEntry(
+            run_id=run_id,
+            log_type=log_type,
+            content=data.get("content", ""),
+            sequence=data.get("seq", 0),
+            timestamp=datetime.fromisoformat(data["ts"]) if data.get("ts") else None,
+            level=data.get("level", "INFO"),
+            source=data.get("source"),
+        )
+
+    async def write_log(self, entry: LogEntry) -> WriteResult:
+        """写入单条日志（进入分段缓冲）"""
+        return await self.write_logs_batch([entry])
 
     async def write_logs_batch(self, entries: list[LogEntry]) -> WriteResult:
-        """批量写入日志"""
+        """批量写入日志
+
+        日志先进入内存缓冲，达到段大小/行数阈值时立即落为新段，
+        否则由后台任务在 flush_interval 后写出。
+        """
         if not entries:
             return WriteResult(success=True)
         
         try:
-            client = await self._get_client()
-            
-            # 按 run_id 和 log_type 分组
-            groups: dict[tuple[str, str], list[LogEntry]] = {}
+            full: list[tuple[str, str]] = []
+            max_seq = 0
             for entry in entries:
                 key = (entry.run_id, entry.log_type)
-                if key not in groups:
-                    groups[key] = []
-                groups[key].append(entry)
-            
-            max_seq = 0
-            for (run_id, log_type), group_entries in groups.items():
-                # 构建日志内容
-                lines = []
-                for entry in sorted(group_entries, key=lambda e: e.sequence):
-                    lines.append(json.dumps({
-                        "seq": entry.sequence,
-                        "ts": entry.timestamp.isoformat() if entry.timestamp else datetime.now().isoformat(),
-                        "level": entry.level,
-                        "content": entry.content,
-                        "source": entry.source,
-                    }, ensure_ascii=False))
-                    max_seq = max(max_seq, entry.sequence)
-                
-                content = "\n".join(lines) + "\n"
-                path = f"{self.prefix}/{run_id}/{log_type}.jsonl"
-                
-                # 追加到现有文件
-                existing_content = b""
-                try:
-                    response = await client.get_object(Bucket=self.bucket, Key=path)
-                    async with response["Body"] as stream:
-                        existing_content = await stream.read()
-                except Exception:
-                    pass
-                
-                new_content = existing_content + content.encode("utf-8")
-                await client.put_object(
-                    Bucket=self.bucket,
-                    Key=path,
-                    Body=new_content,
-                    ContentType="application/x-ndjson",
-                )
+                buffer = self._buffers.get(key)
+                if buffer is None:
+                    buffer = self._buffers[key] = _SegmentBuffer()
+                line = self._encode_line(entry)
+                buffer.lines.append((entry.sequence, line))
+                buffer.size += len(line)
+                max_seq = max(max_seq, entry.sequence)
+                if (
+                    buffer.size >= self.segment_max_bytes
+                    or len(buffer.lines) >= self.segment_max_lines
+                ) and key not in full:
+                    full.append(key)
+
+            for run_id, log_type in full:
+                await self._flush_key(run_id, log_type)
+            self._ensure_flush_task()
             
             return WriteResult(success=True, ack_offset=max_seq)
             
@@ -195,6 +230,153 @@ class S3LogStorage(LogStorageBackend):
             logger.error(f"批量写入日志失败: {e}")
             return WriteResult(success=False, error=str(e))
 
+    def _ensure_flush_task(self) -> None:
+        if self._buffers and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """按时间阈值写出缓冲，缓冲为空时退出（下次写入时重新启动）"""
+        while self._buffers:
+            await asyncio.sleep(min(1.0, self.flush_interval))
+            now = time.monotonic()
+            expired = [
+                key for key, buffer in self._buffers.items()
+                if now - buffer.created_at >= self.flush_interval
+            ]
+            for run_id, log_type in expired:
+                await self._flush_key(run_id, log_type)
+
+    async def _flush_key(self, run_id: str, log_type: str) -> bool:
+        """写出单个 (run_id, log_type) 的缓冲，失败时放回缓冲等待重试"""
+        key = (run_id, log_type)
+        buffer = self._buffers.pop(key, None)
+        if buffer is None or not buffer.lines:
+            return True
+
+        try:
+            await self._write_segment(run_id, log_type, buffer)
+            return True
+        except Exception as e:
+            logger.error(f"写入日志段失败: run_id={run_id}, log_type={log_type}, error={e}")
+            pending = self._buffers.get(key)
+            if pending is not None:
+                buffer.lines.extend(pending.lines)
+                buffer.size += pending.size
+            self._buffers[key] = buffer
+            return False
+
+    async def _write_segment(self, run_id: str, log_type: str, buffer: _SegmentBuffer) -> None:
+        """压缩缓冲为新段对象，并追加到段清单"""
+        lines = sorted(buffer.lines, key=lambda item: item[0])
+        raw = b"".join(line for _, line in lines)
+        body = await asyncio.to_thread(gzip.compress, raw, 6)
+        first_seq, last_seq = lines[0][0], lines[-1][0]
+        path = self._build_segment_path(run_id, log_type, first_seq, last_seq)
+
+        client = await self._get_client()
+        await client.put_object(
+            Bucket=self.bucket,
+            Key=path,
+            Body=body,
+            ContentType="application/gzip",
+        )
+
+        segment = {
+            "key": path,
+            "first_seq": first_seq,
+            "last_seq": last_seq,
+            "count": len(lines),
+            "bytes": len(raw),
+        }
+        async with self._manifest_lock(run_id, log_type):
+            segments = await self._load_manifest(run_id, log_type)
+            # 对象列表中已包含刚写入的段（按对象名估算），以实际行数为准
+            segments = [item for item in segments if item["key"] != path]
+            segments.append(segment)
+            await client.put_object(
+                Bucket=self.bucket,
+                Key=self._build_segment_dir(run_id, log_type) + self.MANIFEST_NAME,
+                Body=json.dumps({"segments": segments}).encode("utf-8"),
+                ContentType="application/json",
+            )
+
+    def _manifest_lock(self, run_id: str, log_type: str) -> asyncio.Lock:
+        return self._manifest_locks[hash((run_id, log_type)) % self.MANIFEST_LOCK_STRIPES]
+
+    async def _load_manifest(self, run_id: str, log_type: str) -> list[dict[str, Any]]:
+        """读取段清单，并与段对象列表取并集（无段时返回空列表）
+
+        清单的读-改-写只在单进程内串行，多个副本同时写同一 run 时可能互相覆盖、
+        丢失段条目；段对象名已包含 seq 范围，列表中有而清单中缺失的段按对象名补齐，
+        下次写清单时一并写回。
+        """
+        client = await self._get_client()
+        segment_dir = self._build_segment_dir(run_id, log_type)
+        segments: list[dict[str, Any]] = []
+        try:
+            response = await client.get_object(Bucket=self.bucket, Key=segment_dir + self.MANIFEST_NAME)
+            async with response["Body"] as stream:
+                segments = json.loads(await stream.read()).get("segments", [])
+        except Exception:
+            pass
+
+        known = {segment["key"] for segment in segments}
+        segments.extend(
+            segment for segment in await self._list_segments(segment_dir)
+            if segment["key"] not in known
+        )
+        return segments
+
+    async def _list_segments(self, segment_dir: str) -> list[dict[str, Any]]:
+        """按段对象名列出日志段（count 按 seq 范围估算）"""
+        client = await self._get_client()
+        segments = []
+        paginator = client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(Bucket=self.bucket, Prefix=segment_dir):
+            for obj in page.get("Contents", []):
+                name = obj["Key"][len(segment_dir):]
+                if not name.endswith(self.SEGMENT_SUFFIX):
+                    continue
+                try:
+                    first_seq, last_seq, _ = name[: -len(self.SEGMENT_SUFFIX)].split("-", 2)
+                    first, last = int(first_seq), int(last_seq)
+                except ValueError:
+                    continue
+                segments.append({
+                    "key": obj["Key"],
+                    "first_seq": first,
+                    "last_seq": last,
+                    "count": last - first + 1,
+                    "bytes": obj.get("Size", 0),
+                })
+        return segments
+
+    async def _read_segment(self, key: str) -> bytes:
+        """读取并解压单个日志段"""
+        client = await self._get_client()
+        response = await client.get_object(Bucket=self.bucket, Key=key)
+        async with response["Body"] as stream:
+            data = await stream.read()
+        return await asyncio.to_thread(gzip.decompress, data)
+
+    async def flush(self) -> bool:
+        """立即写出所有缓冲的日志"""
+        ok = True
+        for run_id, log_type in list(self._buffers):
+            ok = await self._flush_key(run_id, log_type) and ok
+        return ok
+
+    async def close(self) -> None:
+        """停止后台写出任务并写出剩余缓冲"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
     async def write_chunk(self, chunk: LogChunk) -> WriteResult:
         """写入日志分片"""
         try:
@@ -324,46 +506,28 @@ class S3LogStorage(LogStorageBackend):
         limit: int = 100,
         cursor: str | None = None,
     ) -> LogQueryResult:
-        """查询日志"""
+        """查询日志（只读取与请求范围重叠的日志段）"""
         try:
-            client = await self._get_client()
-            
+            if cursor:
+                try:
+                    start_seq = max(start_seq, int(cursor))
+                except ValueError:
+                    pass
+
             # 确定要查询的日志类型
             log_types = [log_type] if log_type else ["stdout", "stderr", "system"]
             
             entries = []
+            total = 0
             for lt in log_types:
-                path = f"{self.prefix}/{run_id}/{lt}.jsonl"
-                
-                try:
-                    response = await client.get_object(Bucket=self.bucket, Key=path)
-                    async with response["Body"] as stream:
-                        content = await stream.read()
-                    
-                    for line in content.decode("utf-8").strip().split("\n"):
-                        if not line:
-                            continue
-                        try:
-                            data = json.loads(line)
-                            if data.get("seq", 0) >= start_seq:
-                                entries.append(LogEntry(
-                                    run_id=run_id,
-                                    log_type=lt,
-                                    content=data.get("content", ""),
-                                    sequence=data.get("seq", 0),
-                                    timestamp=datetime.fromisoformat(data["ts"]) if data.get("ts") else None,
-                                    level=data.get("level", "INFO"),
-                                    source=data.get("source"),
-                                ))
-                        except json.JSONDecodeError:
-                            continue
-                            
-                except Exception:
-                    pass  # 文件不存在
+                type_entries, type_total = await self._query_log_type(
+                    run_id, lt, start_seq, limit + 1
+                )
+                entries.extend(type_entries)
+                total += type_total
             
             # 排序并分页
             entries.sort(key=lambda e: e.sequence)
-            total = len(entries)
             entries = entries[:limit]
             
             return LogQueryResult(
@@ -377,6 +541,77 @@ class S3LogStorage(LogStorageBackend):
             logger.error(f"查询日志失败: {e}")
             return LogQueryResult(entries=[], total=0, has_more=False)
 
+    async def _query_log_type(
+        self,
+        run_id: str,
+        log_type: str,
+        start_seq: int,
+        want: int,
+    ) -> tuple[list[LogEntry], int]:
+        """查询单个日志类型，返回 seq 最小的至多 want 条及匹配总数（未读取的段按清单计数）"""
+        entries: list[LogEntry] = []
+        total = 0
+
+        # 尚未写出的缓冲
+        buffer = self._buffers.get((run_id, log_type))
+        if buffer is not None:
+            for seq, line in buffer.lines:
+                if seq >= start_seq:
+                    entry = self._decode_line(run_id, log_type, line)
+                    if entry is not None:
+                        entries.append(entry)
+                        total += 1
+
+        manifest = await self._load_manifest(run_id, log_type)
+        if not manifest and buffer is None:
+            return await self._query_legacy(run_id, log_type, start_seq)
+
+        segments = [segment for segment in manifest if segment["last_seq"] >= start_seq]
+
+        segments.sort(key=lambda segment: segment["first_seq"])
+        total += sum(segment["count"] for segment in segments)
+        for segment in segments:
+            # 已凑够 want 条且后续段的 seq 都更大时停止读取
+            if len(entries) >= want:
+                entries.sort(key=lambda e: e.sequence)
+                del entries[want:]
+                if segment["first_seq"] > entries[-1].sequence:
+                    break
+
+            data = await self._read_segment(segment["key"])
+            for line in data.splitlines():
+                entry = self._decode_line(run_id, log_type, line) if line else None
+                if entry is None or entry.sequence < start_seq:
+                    total -= 1
+                    continue
+                entries.append(entry)
+
+        entries.sort(key=lambda e: e.sequence)
+        return entries[:want], max(total, len(entries))
+
+    async def _query_legacy(
+        self,
+        run_id: str,
+        log_type: str,
+        start_seq: int,
+    ) -> tuple[list[LogEntry], int]:
+        """读取旧版整文件 JSONL 日志"""
+        client = await self._get_client()
+        path = f"{self.prefix}/{run_id}/{log_type}.jsonl"
+        try:
+            response = await client.get_object(Bucket=self.bucket, Key=path)
+            async with response["Body"] as stream:
+                content = await stream.read()
+        except Exception:
+            return [], 0  # 文件不存在
+
+        entries = []
+        for line in content.splitlines():
+            entry = self._decode_line(run_id, log_type, line) if line else None
+            if entry is not None and entry.sequence >= start_seq:
+                entries.append(entry)
+        return entries, len(entries)
+
     async def get_log_stream(
         self,
         run_id: str,
@@ -392,6 +627,14 @@ class S3LogStorage(LogStorageBackend):
             try:
                 response = await client.get_object(Bucket=self.bucket, Key=path)
             except Exception:
+                # 逐行写入的日志段，按 seq 顺序输出
+                await self._flush_key(run_id, log_type)
+                segments = await self._load_manifest(run_id, log_type)
+                if segments:
+                    for segment in sorted(segments, key=lambda item: item["first_seq"]):
+                        yield await self._read_segment(segment["key"])
+                    return
+
                 # 尝试未压缩的 JSONL 文件
                 path = f"{self.prefix}/{run_id}/{log_type}.jsonl"
                 response = await client.get_object(Bucket=self.bucket, Key=path)
@@ -406,6 +649,9 @@ class S3LogStorage(LogStorageBackend):
 
     async def delete_logs(self, run_id: str) -> bool:
         """删除日志"""
+        for key in [key for key in self._buffers if key[0] == run_id]:
+            self._buffers.pop(key, None)
+
         try:
             client = await self._get_client()
             
@@ -419,11 +665,12 @@ class S3LogStorage(LogStorageBackend):
                     objects_to_delete.append({"Key": obj["Key"]})
             
             if objects_to_delete:
-                # 批量删除
-                await client.delete_objects(
-                    Bucket=self.bucket,
-                    Delete={"Objects": objects_to_delete},
-                )
+                # 批量删除（单次请求最多 1000 个对象）
+                for start in range(0, len(objects_to_delete), 1000):
+                    await client.delete_objects(
+                        Bucket=self.bucket,
+                        Delete={"Objects": objects_to_delete[start : start + 1000]},
+                    )
                 logger.info(f"已删除日志: {run_id}, 共 {len(objects_to_delete)} 个对象")
             
             return True
@@ -0,0 +1,39 @@
+"""日志稀疏行索引测试"""
+
+from antcode_core.application.services.logs.log_index import (
+    get_line_index,
+    release_line_index,
+    update_line_index,
+)
+
+
+def test_nul_bytes_indexed_as_content(tmp_path):
+    path = tmp_path / "output.log"
+    path.write_bytes(b"line1\nbinary \x00 here\nline3\nline4\n")
+
+    index = get_line_index(path)
+
+    assert index.total_lines == 4
+    assert index.read_lines(0, 10) == ["line1", "binary \x00 here", "line3", "line4"]
+
+
+def test_hole_beyond_contiguous_limit_not_indexed(tmp_path):
+    path = tmp_path / "stdout.log"
+    # 第二个分片（offset=4）尚未到达，第三个分片已写入
+    path.write_bytes(b"a\nb\n" + b"\x00" * 4 + b"d\n")
+    update_line_index(path, limit=4)
+
+    index = get_line_index(path)
+    assert index.total_lines == 2
+    assert index.read_lines(0, 10) == ["a", "b"]
+
+    # 补齐空洞，分片内容本身带 NUL 字节
+    with open(path, "r+b") as f:
+        f.seek(4)
+        f.write(b"c\x00c\n")
+    update_line_index(path, limit=10)
+    release_line_index(path)
+
+    index = get_line_index(path)
+    assert index.total_lines == 4
+    assert index.read_lines(0, 10) == ["a", "b", "c\x00c", "d"]
@@ -5,6 +5,7 @@ Gateway 服务配置模块
 """
 
 import os
+import socket
 from dataclasses import dataclass, field
 
 
@@ -21,6 +22,12 @@ class GatewayConfig:
     # 服务器端口
     port: int = field(default_factory=lambda: int(os.getenv("GRPC_PORT", "50051")))
 
+    # 实例标识（控制 stream 消费者名，重启后保持不变才能读回本实例的 PEL）
+    instance_id: str = field(
+        default_factory=lambda: os.getenv("GATEWAY_INSTANCE_ID")
+        or f"{socket.gethostname()}-{os.getenv('GRPC_PORT', '50051')}"
+    )
+
     # 最大工作线程数
     max_workers: int = field(
         default_factory=lambda: int(os.getenv("GRPC_MAX_WORKERS", "10"))
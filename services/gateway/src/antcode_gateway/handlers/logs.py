@@ -17,7 +17,7 @@ from datetime import datetime
 from loguru import logger
 
 from antcode_core.common.config import settings
-from antcode_core.infrastructure.redis import decode_stream_payload, log_stream_key
+from antcode_core.infrastructure.redis import log_stream_key, unpack_log_entry
 
 
 @dataclass
@@ -101,18 +101,20 @@ class LogHandler:
         try:
             from antcode_core.infrastructure.storage.log_storage import LogEntry as StorageLogEntry
 
-            for entry in entries:
-                storage_entry = StorageLogEntry(
+            storage_entries = [
+                StorageLogEntry(
                     run_id=entry.run_id,
                     log_type=entry.log_type,
                     content=entry.content,
                     sequence=entry.sequence,
                     timestamp=datetime.fromtimestamp(entry.timestamp) if entry.timestamp else None,
                 )
-                result = await log_storage.write_log(storage_entry)
+                for entry in entries
+            ]
+            result = await log_storage.write_logs_batch(storage_entries)
 
-                if not result.success:
-                    logger.warning(f"持久化日志失败: {result.error}")
+            if not result.success:
+                logger.warning(f"持久化日志失败: {result.error}")
 
         except Exception as e:
             logger.error(f"持久化日志失败: {e}")
@@ -280,15 +282,16 @@ class LogHandler:
 
             logs = []
             for message_id, data in messages:
-                decoded = decode_stream_payload(data)
                 mid = message_id.decode() if isinstance(message_id, bytes) else str(message_id)
-                logs.append({
-                    "id": mid,
-                    "log_type": decoded.get("log_type", "stdout"),
-                    "content": decoded.get("content", ""),
-                    "timestamp": float(decoded.get("timestamp", 0) or 0),
-                    "sequence": int(decoded.get("sequence", 0) or 0),
-                })
+                # 打包消息展开为多行，共用同一个消息 ID
+                for entry in unpack_log_entry(data):
+                    logs.append({
+                        "id": mid,
+                        "log_type": entry["log_type"],
+                        "content": entry["content"],
+                        "timestamp": self._parse_timestamp(entry["timestamp"]),
+                        "sequence": int(entry["sequence"] or 0),
+                    })
 
             return logs
 
@@ -296,6 +299,20 @@ class LogHandler:
             logger.error(f"读取日志失败: {e}")
             return []
 
+    @staticmethod
+    def _parse_timestamp(value: str) -> float:
+        """解析时间戳（Gateway 写入为浮点秒，Worker 直连写入为 ISO 格式）"""
+        if not value:
+            return 0.0
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return 0.0
+
     async def cleanup_logs(self, run_id: str) -> bool:
         """清理日志 Stream
 
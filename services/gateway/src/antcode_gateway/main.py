@@ -13,6 +13,7 @@ from loguru import logger
 
 from antcode_contracts.gateway_pb2_grpc import add_GatewayServiceServicer_to_server
 from antcode_core.infrastructure.db.tortoise import close_db, init_db
+from antcode_core.infrastructure.storage.log_storage import close_log_storage
 from antcode_gateway.auth import AuthInterceptor
 from antcode_gateway.config import gateway_config
 from antcode_gateway.rate_limit import RateLimitInterceptor
@@ -50,7 +51,8 @@ async def main():
 
     # 注册服务实现
     logger.info("注册 gRPC 服务")
-    server.add_servicer(GatewayServiceImpl(), add_GatewayServiceServicer_to_server)
+    gateway_service = GatewayServiceImpl()
+    server.add_servicer(gateway_service, add_GatewayServiceServicer_to_server)
     logger.info("GatewayService 已注册")
 
     # 启动服务器
@@ -83,6 +85,16 @@ async def main():
         except TimeoutError:
             logger.warning("gRPC 服务器关闭超时，继续关闭流程")
 
+        await gateway_service.control_router.stop()
+
+        # 写出日志存储中尚未持久化的缓冲
+        try:
+            await asyncio.wait_for(close_log_storage(), timeout=10)
+        except TimeoutError:
+            logger.warning("日志存储关闭超时，继续关闭流程")
+        except Exception as e:
+            logger.error(f"关闭日志存储失败: {e}")
+
         try:
             await asyncio.wait_for(close_db(), timeout=10)
         except TimeoutError:
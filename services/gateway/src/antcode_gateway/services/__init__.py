@@ -4,6 +4,7 @@ gRPC 服务实现
 提供 GatewayService 的实现。
 """
 
+from antcode_gateway.services.control_router import ControlStreamRouter
 from antcode_gateway.services.gateway_service import GatewayServiceImpl
 
-__all__ = ["GatewayServiceImpl"]
+__all__ = ["ControlStreamRouter", "GatewayServiceImpl"]
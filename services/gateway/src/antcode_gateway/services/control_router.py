@@ -0,0 +1,343 @@
+"""
+控制消息路由
+
+每个 Gateway 进程一个共享读取任务：一次 XREADGROUP 覆盖所有已连接 Worker 的控制 stream
+与全局控制 stream，读到的消息立即投递到对应 WorkerStream 的发送队列，不再依赖
+Worker 的下一次上行消息触发发送。
+
+Worker 连接/断开时通过唤醒 stream 打断阻塞中的 XREADGROUP，使新 stream 立即生效。
+消费者名取自 Gateway 实例标识，重启后沿用同一消费者。Worker 断开期间已读取但未
+投递的消息留在消费者的 PEL 中；Worker 连接、读取任务启动或 Redis 异常恢复后，先以
+XAUTOCLAIM 把其他消费者名下的空闲消息转移到本消费者，再从 ID 0 起逐批读回，直到 PEL
+读尽才切换为读取新消息。
+"""
+
+import asyncio
+import contextlib
+import json
+import time
+from itertools import cycle
+from typing import Any
+
+from loguru import logger
+
+from antcode_core.infrastructure.redis import (
+    build_cancel_control_payload,
+    control_global_stream,
+    control_group,
+    control_stream,
+    decode_stream_payload,
+    redis_namespace,
+)
+
+
+class ControlStreamRouter:
+    """控制 stream 共享读取与分发"""
+
+    # 单次 XREADGROUP 每个 stream 最多读取的消息数
+    READ_COUNT = 10
+    # 唤醒 stream 过期时间（秒）
+    WAKEUP_TTL = 3600
+    # 单次 XAUTOCLAIM 转移的最大消息数
+    CLAIM_COUNT = 100
+    # 全局 stream 转移的最小空闲时间（毫秒），避开其他 Gateway 正在投递的消息
+    GLOBAL_CLAIM_IDLE_MS = 30000
+    # 全局 stream 定期转移间隔（秒），接管已下线 Gateway 遗留的消息
+    GLOBAL_CLAIM_INTERVAL = 60
+
+    def __init__(self, block_ms: int = 5000, consumer: str | None = None):
+        self._block_ms = block_ms
+        self._group = control_group()
+        self._global_stream = control_global_stream()
+        if consumer is None:
+            from antcode_gateway.config import gateway_config
+
+            consumer = gateway_config.instance_id
+        self._consumer = f"gateway-{consumer}"
+        self._wakeup_key = f"{redis_namespace()}:control:gateway:wakeup:{self._consumer}"
+
+        self._queues: dict[str, asyncio.Queue] = {}  # worker_id -> 发送队列
+        self._stream_workers: dict[str, str] = {}  # control stream -> worker_id
+        # 正在读回 PEL 的 stream -> 下一批的起始 ID（"0" 表示尚未开始，需先转移）
+        self._recover_streams: dict[str, str] = {}
+        self._global_targets = cycle(())
+        self._last_global_claim = 0.0
+        self._initialized_groups: set[str] = set()
+        self._group_lock = asyncio.Lock()
+
+        self._task: asyncio.Task | None = None
+        self._has_workers = asyncio.Event()
+        self._blocking = False
+
+        self._stats = {
+            "messages_routed": 0,
+            "messages_unroutable": 0,
+            "messages_claimed": 0,
+            "reads": 0,
+            "errors": 0,
+            "last_route_ms": 0.0,
+        }
+
+    @property
+    def connected_workers(self) -> int:
+        return len(self._queues)
+
+    async def register(self, worker_id: str, queue: asyncio.Queue) -> None:
+        """注册 Worker 的发送队列（同一 Worker 重连时以最新连接为准）"""
+        stream_key = control_stream(worker_id)
+        self._queues[worker_id] = queue
+        self._stream_workers[stream_key] = worker_id
+        self._recover_streams[stream_key] = "0"
+        self._global_targets = cycle(list(self._queues))
+        self._has_workers.set()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._read_loop())
+        elif self._blocking:
+            await self._wakeup()
+
+    def unregister(self, worker_id: str, queue: asyncio.Queue) -> None:
+        """注销 Worker；队列不匹配说明已被新连接替换，忽略"""
+        if self._queues.get(worker_id) is not queue:
+            return
+        self._queues.pop(worker_id, None)
+        self._stream_workers.pop(control_stream(worker_id), None)
+        self._recover_streams.pop(control_stream(worker_id), None)
+        self._global_targets = cycle(list(self._queues))
+
+    async def stop(self) -> None:
+        """停止读取任务"""
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "connected_workers": len(self._queues),
+            "running": self._task is not None and not self._task.done(),
+        }
+
+    async def _get_redis_client(self):
+        try:
+            from antcode_core.infrastructure.redis import get_redis_client
+
+            return await get_redis_client()
+        except ImportError:
+            logger.warning("antcode_core.infrastructure.redis 不可用")
+            return None
+
+    async def _ensure_group(self, redis, stream_key: str) -> None:
+        if stream_key in self._initialized_groups:
+            return
+
+        async with self._group_lock:
+            if stream_key in self._initialized_groups:
+                return
+            try:
+                await redis.xgroup_create(stream_key, self._group, id="0", mkstream=True)
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    logger.warning(f"创建消费者组失败: {e}")
+                    return
+            self._initialized_groups.add(stream_key)
+
+    async def _wakeup(self) -> None:
+        """写入唤醒 stream，使阻塞中的 XREADGROUP 立即返回"""
+        redis = await self._get_redis_client()
+        if redis is None:
+            return
+        try:
+            pipe = redis.pipeline(transaction=False)
+            pipe.xadd(self._wakeup_key, {"w": "1"}, maxlen=1, approximate=False)
+            pipe.expire(self._wakeup_key, self.WAKEUP_TTL)
+            await pipe.execute()
+        except Exception as e:
+            logger.debug(f"唤醒控制读取任务失败: {e}")
+
+    async def _read_loop(self) -> None:
+        logger.info(f"控制消息读取任务已启动: consumer={self._consumer}")
+        try:
+            while True:
+                if not self._queues:
+                    self._has_workers.clear()
+                    await self._has_workers.wait()
+                    continue
+
+                try:
+                    redis = await self._get_redis_client()
+                    if redis is None:
+                        logger.warning("控制消息读取任务：Redis 不可用")
+                        await asyncio.sleep(1.0)
+                        continue
+
+                    streams = [*self._stream_workers, self._global_stream, self._wakeup_key]
+                    for stream_key in streams:
+                        await self._ensure_group(redis, stream_key)
+
+                    if time.monotonic() - self._last_global_claim >= self.GLOBAL_CLAIM_INTERVAL:
+                        self._recover_streams.setdefault(self._global_stream, "0")
+
+                    # 非 ">" 的 stream 会使本次读取立即返回
+                    recover = {
+                        key: self._recover_streams[key]
+                        for key in streams
+                        if key in self._recover_streams
+                    }
+                    for stream_key, start_id in recover.items():
+                        if start_id == "0":
+                            await self._claim_pending(redis, stream_key)
+                    stream_ids = {key: recover.get(key, ">") for key in streams}
+
+                    self._blocking = True
+                    try:
+                        result = await redis.xreadgroup(
+                            groupname=self._group,
+                            consumername=self._consumer,
+                            streams=stream_ids,
+                            count=self.READ_COUNT,
+                            block=self._block_ms,
+                        )
+                    finally:
+                        self._blocking = False
+                    self._advance_recovery(recover, result)
+
+                    self._stats["reads"] += 1
+                    if result:
+                        await self._route(redis, result)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    logger.error(f"控制消息读取异常: {e}")
+                    # Redis 恢复后重新转移并读回所有 stream 的 PEL
+                    self._recover_streams.update(dict.fromkeys(self._stream_workers, "0"))
+                    self._last_global_claim = 0.0
+                    await asyncio.sleep(1.0)
+        finally:
+            logger.info("控制消息读取任务已停止")
+
+    def _advance_recovery(self, recover: dict[str, str], result) -> None:
+        """PEL 读回的 stream 从本批最后一条之后继续，读空后切换为读取新消息"""
+        last_ids = {}
+        for stream_name, messages in result or ():
+            stream_key = stream_name.decode() if isinstance(stream_name, bytes) else stream_name
+            if stream_key in recover and messages:
+                msg_id = messages[-1][0]
+                last_ids[stream_key] = msg_id.decode() if isinstance(msg_id, bytes) else msg_id
+
+        for stream_key, start_id in recover.items():
+            if self._recover_streams.get(stream_key) != start_id:
+                # 读取期间 Worker 重新注册，已重新从头开始
+                continue
+            if stream_key in last_ids:
+                self._recover_streams[stream_key] = last_ids[stream_key]
+            else:
+                self._recover_streams.pop(stream_key, None)
+
+    async def _claim_pending(self, redis, stream_key: str) -> None:
+        """把其他消费者名下的空闲消息转移到本消费者
+
+        Worker 同一时刻只连接一个 Gateway，其控制 stream 在别处的 PEL 均属于已断开的
+        旧连接，可立即转移；全局 stream 只转移空闲超过阈值的消息。
+        """
+        min_idle = 0
+        if stream_key == self._global_stream:
+            min_idle = self.GLOBAL_CLAIM_IDLE_MS
+            self._last_global_claim = time.monotonic()
+        start_id = "0-0"
+        claimed = 0
+        while True:
+            result = await redis.xautoclaim(
+                stream_key,
+                self._group,
+                self._consumer,
+                min_idle,
+                start_id,
+                count=self.CLAIM_COUNT,
+            )
+            if not result:
+                break
+            next_id, messages = result[0], result[1]
+            claimed += len(messages)
+            start_id = next_id.decode() if isinstance(next_id, bytes) else next_id
+            if start_id == "0-0":
+                break
+
+        if claimed:
+            self._stats["messages_claimed"] += claimed
+            logger.info(f"转移控制消息: stream={stream_key}, count={claimed}")
+
+    async def _route(self, redis, result) -> None:
+        """分发一次读取结果，已投递的消息按 stream 批量 ACK"""
+        started = time.perf_counter()
+        acks: dict[str, list] = {}
+
+        for stream_name, messages in result:
+            stream_key = stream_name.decode() if isinstance(stream_name, bytes) else stream_name
+            if stream_key == self._wakeup_key:
+                acks.setdefault(stream_key, []).extend(msg_id for msg_id, _ in messages)
+                continue
+
+            for msg_id, data in messages:
+                if stream_key == self._global_stream:
+                    # 全局消息沿用消费者组语义：只投递给一个 Worker（本进程内轮询）
+                    worker_id = next(self._global_targets, None)
+                else:
+                    worker_id = self._stream_workers.get(stream_key)
+
+                queue = self._queues.get(worker_id) if worker_id else None
+                if queue is None:
+                    # Worker 已断开，消息留在 PEL，不 ACK
+                    self._stats["messages_unroutable"] += 1
+                    continue
+
+                master_msg = self.build_master_message(decode_stream_payload(data), worker_id)
+                if master_msg is None:
+                    continue
+
+                queue.put_nowait(master_msg)
+                acks.setdefault(stream_key, []).append(msg_id)
+                self._stats["messages_routed"] += 1
+
+        for stream_key, msg_ids in acks.items():
+            if msg_ids:
+                await redis.xack(stream_key, self._group, *msg_ids)
+
+        self._stats["last_route_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    @staticmethod
+    def build_master_message(decoded: dict, worker_id: str):
+        """将控制 stream 消息转换为 MasterMessage，不支持的类型返回 None"""
+        from antcode_contracts import gateway_pb2
+
+        control_type = decoded.get("control_type", "")
+
+        if control_type in ("cancel", "kill"):
+            cancel_payload = build_cancel_control_payload(
+                run_id=decoded.get("run_id", ""),
+                task_id=decoded.get("task_id", ""),
+            )
+            logger.info(f"推送任务取消到 Worker {worker_id}: {decoded.get('task_id')}")
+            return gateway_pb2.MasterMessage(
+                task_cancel=gateway_pb2.TaskCancel(
+                    task_id=cancel_payload["task_id"],
+                    run_id=cancel_payload["run_id"],
+                )
+            )
+
+        if control_type == "config_update":
+            config = decoded.get("config", {})
+            if isinstance(config, str):
+                try:
+                    config = json.loads(config)
+                except Exception:
+                    config = {}
+            logger.info(f"推送配置更新到 Worker {worker_id}")
+            return gateway_pb2.MasterMessage(
+                config_update=gateway_pb2.ConfigUpdate(config=config)
+            )
+
+        return None
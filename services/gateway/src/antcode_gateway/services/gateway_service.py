@@ -15,6 +15,7 @@ from loguru import logger
 
 from antcode_gateway.handlers import HeartbeatHandler, LogHandler, ResultHandler, TaskPollHandler
 from antcode_gateway.handlers.heartbeat import HeartbeatData
+from antcode_gateway.services.control_router import ControlStreamRouter
 from antcode_core.infrastructure.redis import (
     build_cancel_control_payload,
     control_global_stream,
@@ -34,8 +35,8 @@ class GatewayServiceImpl:
     处理 Worker 的心跳、状态报告等请求。
     """
 
-    # 控制消息轮询间隔（秒）
-    CONTROL_POLL_INTERVAL = 1.0
+    # WorkerStream 发送队列结束标记
+    _STREAM_END = object()
 
     def __init__(self):
         """初始化服务"""
@@ -43,8 +44,8 @@ class GatewayServiceImpl:
         self.result_handler = ResultHandler()
         self.log_handler = LogHandler()
         self.poll_handler = TaskPollHandler()
+        self.control_router = ControlStreamRouter()
         self._active_streams: dict[str, asyncio.Queue] = {}
-        self._stream_tasks: dict[str, asyncio.Task] = {}
         self._control_group_lock = asyncio.Lock()
         self._initialized_control_groups: set[tuple[str, str]] = set()
         logger.info("GatewayService 已初始化")
@@ -67,100 +68,6 @@ class GatewayServiceImpl:
 
             self._initialized_control_groups.add(key)
 
-    async def _control_poller(
-        self,
-        worker_id: str,
-        response_queue: asyncio.Queue,
-        stop_event: asyncio.Event,
-    ) -> None:
-        """后台协程：主动轮询控制消息并推送到响应队列
-
-        Args:
-            worker_id: Worker ID
-            response_queue: 响应队列
-            stop_event: 停止信号
-        """
-        from antcode_contracts import gateway_pb2
-
-        redis = await self._get_redis_client()
-        if redis is None:
-            logger.warning(f"Worker {worker_id} 控制轮询器：Redis 不可用")
-            return
-
-        control_group_name = control_group()
-        consumer = worker_id
-
-        # 确保消费者组存在（每个 stream 只初始化一次）
-        streams = [control_stream(worker_id), control_global_stream()]
-        for stream_key in streams:
-            await self._ensure_control_group(redis, stream_key, control_group_name)
-
-        logger.debug(f"Worker {worker_id} 控制轮询器已启动")
-
-        while not stop_event.is_set():
-            try:
-                # 非阻塞轮询控制消息
-                result = await redis.xreadgroup(
-                    groupname=control_group_name,
-                    consumername=consumer,
-                    streams=dict.fromkeys(streams, ">"),
-                    count=1,
-                    block=int(self.CONTROL_POLL_INTERVAL * 1000),
-                )
-
-                if not result:
-                    continue
-
-                stream_key, messages = result[0]
-                if not messages:
-                    continue
-
-                msg_id, data = messages[0]
-                decoded = decode_stream_payload(data)
-                control_type = decoded.get("control_type", "")
-
-                # 构建控制消息
-                master_msg = None
-
-                if control_type in ("cancel", "kill"):
-                    cancel_payload = build_cancel_control_payload(
-                        run_id=decoded.get("run_id", ""),
-                        task_id=decoded.get("task_id", ""),
-                    )
-                    master_msg = gateway_pb2.MasterMessage(
-                        task_cancel=gateway_pb2.TaskCancel(
-                            task_id=cancel_payload["task_id"],
-                            run_id=cancel_payload["run_id"],
-                        )
-                    )
-                    logger.info(f"推送任务取消到 Worker {worker_id}: {decoded.get('task_id')}")
-
-                elif control_type == "config_update":
-                    config = decoded.get("config", {})
-                    if isinstance(config, str):
-                        import json
-                        try:
-                            config = json.loads(config)
-                        except Exception:
-                            config = {}
-                    master_msg = gateway_pb2.MasterMessage(
-                        config_update=gateway_pb2.ConfigUpdate(config=config)
-                    )
-                    logger.info(f"推送配置更新到 Worker {worker_id}")
-
-                if master_msg:
-                    await response_queue.put(master_msg)
-                    # ACK 消息
-                    await redis.xack(stream_key, control_group_name, msg_id)
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Worker {worker_id} 控制轮询异常: {e}")
-                await asyncio.sleep(self.CONTROL_POLL_INTERVAL)
-
-        logger.debug(f"Worker {worker_id} 控制轮询器已停止")
-
     async def WorkerStream(
         self,
         request_iterator: AsyncIterator,
@@ -168,8 +75,9 @@ class GatewayServiceImpl:
     ) -> AsyncIterator:
         """双向流式通信
 
-        处理 Worker 发送的消息（心跳、任务状态等），
-        并向 Worker 发送消息（任务分发、取消等）。
+        读写分离：后台任务消费 Worker 发送的消息（心跳、任务状态等），
+        本协程只负责把发送队列中的消息（任务取消、配置更新等）推送给 Worker，
+        控制消息到达即发送，不等待 Worker 的下一条消息。
 
         Args:
             request_iterator: Worker 发送的消息流
@@ -179,13 +87,44 @@ class GatewayServiceImpl:
             MasterMessage: 发送给 Worker 的消息
         """
 
-        worker_id = None
         response_queue: asyncio.Queue = asyncio.Queue()
-        stop_event = asyncio.Event()
-        poller_task: asyncio.Task | None = None
+        state: dict[str, str | None] = {"worker_id": None}
+        reader_task = asyncio.create_task(
+            self._read_worker_stream(request_iterator, response_queue, state)
+        )
 
         try:
-            # 处理来自 Worker 的消息
+            while True:
+                response = await response_queue.get()
+                if response is self._STREAM_END:
+                    break
+                yield response
+        except asyncio.CancelledError:
+            logger.info(f"Worker {state['worker_id']} 流被取消")
+        except Exception as e:
+            logger.error(f"WorkerStream 异常: {e}")
+        finally:
+            if not reader_task.done():
+                reader_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await reader_task
+
+            # 清理活跃流
+            worker_id = state["worker_id"]
+            if worker_id:
+                self.control_router.unregister(worker_id, response_queue)
+                if self._active_streams.get(worker_id) is response_queue:
+                    self._active_streams.pop(worker_id, None)
+                logger.info(f"Worker {worker_id} 已断开")
+
+    async def _read_worker_stream(
+        self,
+        request_iterator: AsyncIterator,
+        response_queue: asyncio.Queue,
+        state: dict[str, str | None],
+    ) -> None:
+        """WorkerStream 读路径：处理 Worker 上行消息，结束时通知写路径"""
+        try:
             async for message in request_iterator:
                 try:
                     # 根据消息类型处理
@@ -195,42 +134,14 @@ class GatewayServiceImpl:
                         heartbeat = message.heartbeat
                         worker_id = heartbeat.worker_id
 
-                        # 注册活跃流并启动控制轮询器
-                        if worker_id and worker_id not in self._active_streams:
+                        # 注册活跃流，由共享读取任务推送控制消息
+                        if worker_id and self._active_streams.get(worker_id) is not response_queue:
+                            state["worker_id"] = worker_id
                             self._active_streams[worker_id] = response_queue
-                            # 启动后台控制轮询协程
-                            poller_task = asyncio.create_task(
-                                self._control_poller(worker_id, response_queue, stop_event)
-                            )
-                            self._stream_tasks[worker_id] = poller_task
-                            logger.info(f"Worker {worker_id} 已连接，控制轮询器已启动")
-
-                        # 处理心跳
-                        heartbeat_data = HeartbeatData(
-                            worker_id=heartbeat.worker_id,
-                            status=heartbeat.status or "online",
-                            version=heartbeat.version if heartbeat.version else "",
-                        )
+                            await self.control_router.register(worker_id, response_queue)
+                            logger.info(f"Worker {worker_id} 已连接，控制消息推送已启用")
 
-                        if heartbeat.HasField("metrics"):
-                            m = heartbeat.metrics
-                            heartbeat_data.cpu = m.cpu
-                            heartbeat_data.memory = m.memory
-                            heartbeat_data.disk = m.disk
-                            heartbeat_data.running_tasks = m.running_tasks
-                            heartbeat_data.max_concurrent_tasks = m.max_concurrent_tasks
-
-                        if heartbeat.HasField("os_info"):
-                            os = heartbeat.os_info
-                            heartbeat_data.os_type = os.os_type
-                            heartbeat_data.os_version = os.os_version
-                            heartbeat_data.python_version = os.python_version
-                            heartbeat_data.machine_arch = os.machine_arch
-
-                        if heartbeat.capabilities:
-                            heartbeat_data.capabilities = dict(heartbeat.capabilities)
-
-                        await self.heartbeat_handler.handle(heartbeat_data)
+                        await self._handle_stream_heartbeat(heartbeat)
 
                     elif payload_type == "task_status":
                         task_status = message.task_status
@@ -250,31 +161,43 @@ class GatewayServiceImpl:
                             f"success={cancel_ack.success}"
                         )
 
-                    # 检查是否有待发送的消息（非阻塞）
-                    while not response_queue.empty():
-                        response = await response_queue.get()
-                        yield response
-
                 except Exception as e:
                     logger.error(f"处理 WorkerStream 消息失败: {e}")
 
         except asyncio.CancelledError:
-            logger.info(f"Worker {worker_id} 流被取消")
+            raise
         except Exception as e:
-            logger.error(f"WorkerStream 异常: {e}")
+            logger.error(f"WorkerStream 读取异常: {e}")
         finally:
-            # 停止控制轮询器
-            stop_event.set()
-            if poller_task and not poller_task.done():
-                poller_task.cancel()
-                with contextlib.suppress(asyncio.CancelledError):
-                    await poller_task
+            response_queue.put_nowait(self._STREAM_END)
+
+    async def _handle_stream_heartbeat(self, heartbeat) -> None:
+        """处理 WorkerStream 中的心跳"""
+        heartbeat_data = HeartbeatData(
+            worker_id=heartbeat.worker_id,
+            status=heartbeat.status or "online",
+            version=heartbeat.version if heartbeat.version else "",
+        )
 
-            # 清理活跃流
-            if worker_id:
-                self._active_streams.pop(worker_id, None)
-                self._stream_tasks.pop(worker_id, None)
-                logger.info(f"Worker {worker_id} 已断开")
+        if heartbeat.HasField("metrics"):
+            m = heartbeat.metrics
+            heartbeat_data.cpu = m.cpu
+            heartbeat_data.memory = m.memory
+            heartbeat_data.disk = m.disk
+            heartbeat_data.running_tasks = m.running_tasks
+            heartbeat_data.max_concurrent_tasks = m.max_concurrent_tasks
+
+        if heartbeat.HasField("os_info"):
+            os = heartbeat.os_info
+            heartbeat_data.os_type = os.os_type
+            heartbeat_data.os_version = os.os_version
+            heartbeat_data.python_version = os.python_version
+            heartbeat_data.machine_arch = os.machine_arch
+
+        if heartbeat.capabilities:
+            heartbeat_data.capabilities = dict(heartbeat.capabilities)
+
+        await self.heartbeat_handler.handle(heartbeat_data)
 
     async def _handle_task_status(self, task_status) -> None:
         """处理任务状态更新"""
@@ -397,22 +320,38 @@ class GatewayServiceImpl:
             return False, f"验证失败: {e}", None
 
     async def PollTask(self, request, context):
-        """Worker 拉取任务"""
+        """Worker 拉取任务（max_tasks > 1 时批量返回）"""
         from antcode_contracts import gateway_pb2
 
         worker_id = request.worker_id
         timeout_ms = request.timeout_ms or 5000
+        max_tasks = max(1, min(int(getattr(request, "max_tasks", 0) or 1), 100))
 
         tasks = await self.poll_handler.handle(
             worker_id=worker_id,
-            max_tasks=1,
+            max_tasks=max_tasks,
             block_ms=timeout_ms,
         )
 
         if not tasks:
             return gateway_pb2.PollTaskResponse(has_task=False)
 
-        task = tasks[0]
+        dispatches = [self._build_task_dispatch(task) for task in tasks]
+        response = gateway_pb2.PollTaskResponse(
+            has_task=True,
+            task=dispatches[0],
+            receipt_id=tasks[0].receipt_id,
+        )
+        if max_tasks > 1:
+            for task, dispatch in zip(tasks, dispatches, strict=True):
+                response.tasks.add(task=dispatch, receipt_id=task.receipt_id)
+        return response
+
+    @staticmethod
+    def _build_task_dispatch(task):
+        """构建 TaskDispatch 消息"""
+        from antcode_contracts import gateway_pb2
+
         task_dispatch = gateway_pb2.TaskDispatch(
             task_id=task.task_id,
             project_id=task.project_id,
@@ -433,11 +372,7 @@ class GatewayServiceImpl:
             for key, value in task.environment.items():
                 task_dispatch.environment[key] = str(value)
 
-        return gateway_pb2.PollTaskResponse(
-            has_task=True,
-            task=task_dispatch,
-            receipt_id=task.receipt_id,
-        )
+        return task_dispatch
 
     async def AckTask(self, request, context):
         """Worker 确认任务"""
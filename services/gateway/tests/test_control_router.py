@@ -0,0 +1,123 @@
+"""控制消息路由测试"""
+
+import asyncio
+
+import pytest
+
+from antcode_core.infrastructure.redis import control_stream
+from antcode_gateway.services.control_router import ControlStreamRouter
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self._redis = redis
+
+    def xadd(self, key, fields, **kwargs):
+        entries = self._redis.streams.setdefault(key, [])
+        entries.append((f"{len(entries) + 1}-0", fields))
+
+    def expire(self, key, ttl):
+        pass
+
+    async def execute(self):
+        return []
+
+
+class _StreamRedis:
+    """只实现路由用到的消费者组命令：消息与 PEL 均在内存中"""
+
+    def __init__(self):
+        self.streams: dict[str, list] = {}
+        self.delivered: dict[str, int] = {}  # ">" 读取的位置
+        self.pending: dict[str, dict[str, str]] = {}  # stream -> {msg_id: consumer}
+        self.acked: dict[str, list] = {}
+
+    def add_pending(self, key, consumer, count):
+        for i in range(count):
+            msg_id = f"{i + 1}-0"
+            self.streams.setdefault(key, []).append(
+                (msg_id, {"control_type": "cancel", "task_id": f"task-{i}", "run_id": f"run-{i}"})
+            )
+            self.pending.setdefault(key, {})[msg_id] = consumer
+        self.delivered[key] = count
+
+    async def xgroup_create(self, key, group, id="0", mkstream=False):
+        self.streams.setdefault(key, [])
+
+    async def xautoclaim(self, key, group, consumer, min_idle, start_id, count=None):
+        pending = self.pending.get(key, {})
+        claimed = []
+        for msg_id, owner in pending.items():
+            if owner != consumer:
+                pending[msg_id] = consumer
+                claimed.append((msg_id, {}))
+        return ["0-0", claimed, []]
+
+    async def xreadgroup(self, groupname, consumername, streams, count, block):
+        result = []
+        for key, start in streams.items():
+            entries = self.streams.get(key, [])
+            if start == ">":
+                position = self.delivered.get(key, 0)
+                batch = entries[position:position + count]
+                self.delivered[key] = position + len(batch)
+                for msg_id, _ in batch:
+                    self.pending.setdefault(key, {})[msg_id] = consumername
+            else:
+                owned = self.pending.get(key, {})
+                batch = [
+                    (msg_id, data)
+                    for msg_id, data in entries
+                    if owned.get(msg_id) == consumername and _id_key(msg_id) > _id_key(start)
+                ][:count]
+            if batch or start != ">":
+                result.append((key, batch))
+        if not any(batch for _, batch in result) and all(s == ">" for s in streams.values()):
+            await asyncio.sleep(0.01)
+            return []
+        return result
+
+    async def xack(self, key, group, *msg_ids):
+        for msg_id in msg_ids:
+            self.pending.get(key, {}).pop(msg_id, None)
+        self.acked.setdefault(key, []).extend(msg_ids)
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+
+def _id_key(msg_id):
+    ms, _, seq = msg_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+@pytest.mark.asyncio
+async def test_recovers_more_pending_than_read_count():
+    redis = _StreamRedis()
+    worker_id = "worker-1"
+    stream_key = control_stream(worker_id)
+    pending = ControlStreamRouter.READ_COUNT * 2 + 5
+    redis.add_pending(stream_key, "gateway-old", pending)
+
+    router = ControlStreamRouter(block_ms=10, consumer="test")
+
+    async def get_redis_client():
+        return redis
+
+    router._get_redis_client = get_redis_client
+
+    queue: asyncio.Queue = asyncio.Queue()
+    await router.register(worker_id, queue)
+    try:
+        for _ in range(200):
+            if queue.qsize() >= pending:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await router.stop()
+
+    assert queue.qsize() == pending
+    task_ids = [queue.get_nowait().task_cancel.task_id for _ in range(pending)]
+    assert task_ids == [f"task-{i}" for i in range(pending)]
+    assert redis.pending[stream_key] == {}
+    assert stream_key not in router._recover_streams
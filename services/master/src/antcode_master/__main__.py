@@ -85,6 +85,14 @@ async def start_master():
     except Exception as e:
         logger.error(f"结果消费循环启动失败: {e}")
 
+    # 启动指标汇总定时写入
+    try:
+        from antcode_core.application.services.monitoring import metrics_rollup_service
+
+        await metrics_rollup_service.start()
+    except Exception as e:
+        logger.error(f"指标汇总定时写入启动失败: {e}")
+
     logger.info("Master 服务已启动")
 
 
@@ -132,6 +140,15 @@ async def stop_master():
     except Exception as e:
         logger.error(f"停止结果消费循环失败: {e}")
 
+    # 写出剩余的指标汇总样本
+    try:
+        from antcode_core.application.services.monitoring import metrics_rollup_service
+
+        await metrics_rollup_service.stop()
+        logger.info("指标汇总已写出")
+    except Exception as e:
+        logger.error(f"停止指标汇总写入失败: {e}")
+
     # 放弃 Leader 身份
     try:
         await leader_election.step_down()
@@ -10,31 +10,50 @@
 
 import asyncio
 import contextlib
+import time
 from datetime import datetime, timedelta
+from typing import Any
 
 from loguru import logger
+from tortoise.expressions import Q
 
-from antcode_master.leader import ensure_leader, get_fencing_token
+from antcode_master.leader import ensure_leader, get_fencing_token, leader_election
+
+
+class _FencingTokenLost(Exception):
+    """本轮协调期间 fencing token 已失效"""
 
 
 class ReconcileLoop:
-    """协调循环"""
+    """协调循环
+
+    所有检查均为分片的集合式 UPDATE，不再逐行加载模型后 save()。
+    """
 
     def __init__(
         self,
         check_interval: int = 60,
         timeout_threshold: int = 300,
+        chunk_size: int = 500,
+        max_rows_per_cycle: int = 5000,
     ):
         """初始化协调循环
 
         Args:
             check_interval: 检查间隔（秒）
             timeout_threshold: 超时阈值（秒）
+            chunk_size: 单条 UPDATE 涉及的最大行数
+            max_rows_per_cycle: 每轮协调最多改写的行数
         """
         self.check_interval = check_interval
         self.timeout_threshold = timeout_threshold
+        self.chunk_size = max(1, chunk_size)
+        self.max_rows_per_cycle = max(1, max_rows_per_cycle)
         self._running = False
         self._task: asyncio.Task | None = None
+        self._budget = self.max_rows_per_cycle
+        self._cycles = 0
+        self._last_stats: dict[str, Any] = {}
 
     async def start(self):
         """启动协调循环"""
@@ -46,7 +65,8 @@ class ReconcileLoop:
         self._task = asyncio.create_task(self._run_loop())
         logger.info(
             f"协调循环已启动: check_interval={self.check_interval}s, "
-      f"timeout_threshold={self.timeout_threshold}s"
+            f"timeout_threshold={self.timeout_threshold}s, "
+            f"chunk_size={self.chunk_size}, max_rows_per_cycle={self.max_rows_per_cycle}"
         )
 
     async def stop(self):
@@ -91,177 +111,295 @@ class ReconcileLoop:
     async def _reconcile(self, fencing_token: int):
         """执行协调
 
+        各检查按固定顺序共享一个本轮行数预算，每个分片写入前校验 fencing token，
+        token 失效时立即中止本轮。
+
         Args:
             fencing_token: Fencing Token
         """
         logger.debug(f"开始协调检查 (token={fencing_token})")
 
-        # 1. 检测超时任务
-        await self._check_timeout_tasks(fencing_token)
-
-        # 2. 检测失联 Worker
-        await self._check_disconnected_workers(fencing_token)
-
-        # 3. 检测状态不一致
-        await self._check_inconsistent_states(fencing_token)
+        self._budget = self.max_rows_per_cycle
+        started = time.perf_counter()
+        checks: dict[str, dict[str, Any]] = {}
+        aborted = False
+
+        for name, check in (
+            # 1. 检测超时任务
+            ("timeout_tasks", self._check_timeout_tasks),
+            # 2. 检测失联 Worker
+            ("disconnected_workers", self._check_disconnected_workers),
+            # 3. 检测状态不一致
+            ("inconsistent_states", self._check_inconsistent_states),
+            # 4. 清理僵尸任务
+            ("zombie_tasks", self._cleanup_zombie_tasks),
+        ):
+            check_started = time.perf_counter()
+            try:
+                rows = await check(fencing_token)
+            except _FencingTokenLost:
+                logger.warning(f"Fencing token 已失效，中止本轮协调 (token={fencing_token})")
+                aborted = True
+                rows = 0
+            except Exception as e:
+                logger.error(f"协调检查失败 [{name}]: {e}")
+                rows = 0
+            checks[name] = {
+                "rows": rows,
+                "duration_ms": round((time.perf_counter() - check_started) * 1000, 2),
+            }
+            if aborted:
+                break
 
-        # 4. 清理僵尸任务
-        await self._cleanup_zombie_tasks(fencing_token)
+        self._last_stats = {
+            "fencing_token": fencing_token,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "rows": sum(c["rows"] for c in checks.values()),
+            "budget_exhausted": self._budget <= 0,
+            "aborted": aborted,
+            "checks": checks,
+        }
+        self._cycles += 1
+
+        summary = ", ".join(
+            f"{name}={c['rows']}/{c['duration_ms']}ms" for name, c in checks.items()
+        )
+        if self._last_stats["rows"]:
+            logger.info(f"协调完成: {summary}")
+        else:
+            logger.debug(f"协调完成: {summary}")
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取最近一轮协调的耗时与行数统计"""
+        return {
+            "check_interval": self.check_interval,
+            "chunk_size": self.chunk_size,
+            "max_rows_per_cycle": self.max_rows_per_cycle,
+            "cycles": self._cycles,
+            "last": dict(self._last_stats),
+        }
+
+    async def _ensure_fencing(self, fencing_token: int) -> None:
+        """写入前校验 fencing token，防止旧 Leader 的写入覆盖新 Leader"""
+        if get_fencing_token() != fencing_token or not await leader_election.validate_token(
+            fencing_token
+        ):
+            raise _FencingTokenLost()
+
+    async def _update_in_chunks(
+        self,
+        model,
+        condition: Q,
+        values: dict[str, Any],
+        fencing_token: int,
+        capped: bool = True,
+    ) -> list[tuple[int, Any, Any]]:
+        """按主键分片执行集合式 UPDATE
 
-    async def _check_timeout_tasks(self, fencing_token: int):
-        """检测超时任务
+        每片先只取主键与原状态，再以 ``id IN (...) AND condition`` 更新，
+        条件重复出现在 UPDATE 中，期间已被其他路径改写的行不会被覆盖。
 
         Args:
+            model: Tortoise 模型
+            condition: 过滤条件
+            values: 更新字段
             fencing_token: Fencing Token
-        """
-        try:
-            from antcode_core.domain.models import TaskRun
-            from antcode_core.domain.models.enums import TaskStatus
+            capped: 是否计入本轮行数预算
 
-            # 查找运行中但超时的任务
-            timeout_threshold = datetime.now() - timedelta(seconds=self.timeout_threshold)
-
-            timeout_tasks = await TaskRun.filter(
-                status=TaskStatus.RUNNING,
-                start_time__lt=timeout_threshold,
-            ).all()
+        Returns:
+            实际更新行的 (id, 原状态, 新状态) 列表，供终态计数使用
+        """
+        changed: list[tuple[int, Any, Any]] = []
+        new_status = values.get("status")
+        while True:
+            limit = self.chunk_size
+            if capped:
+                limit = min(limit, self._budget)
+                if limit <= 0:
+                    break
+
+            rows = await (
+                model.filter(condition).order_by("id").limit(limit).values_list("id", "status")
+            )
+            if not rows:
+                break
 
-            if timeout_tasks:
-                logger.warning(f"发现 {len(timeout_tasks)} 个超时任务")
+            ids = [row_id for row_id, _ in rows]
+            await self._ensure_fencing(fencing_token)
+            updated = await model.filter(condition, id__in=ids).update(**values)
+            if updated < len(rows):
+                # 部分行已被并发改写，只保留当前确为新状态的行
+                written = set(
+                    await model.filter(id__in=ids, status=new_status).values_list("id", flat=True)
+                )
+                rows = [row for row in rows if row[0] in written]
+            changed.extend((row_id, status, new_status) for row_id, status in rows)
+            if capped:
+                self._budget -= len(ids)
+
+            if len(ids) < limit:
+                break
+        return changed
 
-                for task in timeout_tasks:
-                    logger.info(f"标记任务超时: run_id={task.id}")
-                    task.status = TaskStatus.TIMEOUT
-                    task.end_time = datetime.now()
-                    task.error_message = f"任务执行超时（超过 {self.timeout_threshold}秒）"
-                    await task.save()
+    async def _record_stats(self, changed: list[tuple[int, Any, Any]]) -> None:
+        """把本次写入的终态变化计入任务执行统计"""
+        from antcode_core.application.services.task_stats_service import task_stats_service
 
-        except Exception as e:
-            logger.error(f"检测超时任务失败: {e}")
+        await task_stats_service.safe_record_transitions(changed)
 
-    async def _check_disconnected_workers(self, fencing_token: int):
-        """检测失联 Worker
+    async def _check_timeout_tasks(self, fencing_token: int) -> int:
+        """检测超时任务
 
         Args:
             fencing_token: Fencing Token
-        """
-        try:
-            from antcode_core.domain.models import Worker
-            from antcode_core.domain.models.enums import WorkerStatus
 
-            # 查找失联的 Worker
-            offline_threshold = datetime.now() - timedelta(seconds=60)
+        Returns:
+            标记超时的行数
+        """
+        from antcode_core.domain.models import TaskRun
+        from antcode_core.domain.models.enums import TaskStatus
+
+        # 运行中但超时的任务
+        now = datetime.now()
+        timeout_threshold = now - timedelta(seconds=self.timeout_threshold)
+
+        changed = await self._update_in_chunks(
+            TaskRun,
+            Q(status=TaskStatus.RUNNING, start_time__lt=timeout_threshold),
+            {
+                "status": TaskStatus.TIMEOUT,
+                "end_time": now,
+                "error_message": f"任务执行超时（超过 {self.timeout_threshold}秒）",
+            },
+            fencing_token,
+        )
+        await self._record_stats(changed)
+        count = len(changed)
+        if count:
+            logger.warning(f"标记 {count} 个超时任务")
+        return count
 
-            disconnected_workers = await Worker.filter(
-                status=WorkerStatus.ONLINE.value,
-                last_heartbeat__lt=offline_threshold,
-            ).all()
+    async def _check_disconnected_workers(self, fencing_token: int) -> int:
+        """检测失联 Worker
 
-            if disconnected_workers:
-                logger.warning(f"发现 {len(disconnected_workers)} 个失联 Worker")
+        Worker 标记离线后，其上运行中的任务随即标记失败；
+        后者不受行数预算限制，避免 Worker 已离线而任务残留 RUNNING。
 
-                for worker in disconnected_workers:
-                    logger.info(f"标记 Worker 离线: worker_id={worker.id}")
-                    worker.status = WorkerStatus.OFFLINE.value
-                    await worker.save()
+        Args:
+            fencing_token: Fencing Token
 
-                    # 处理该 Worker 上的运行中任务
-                    await self._handle_worker_tasks(worker.id, fencing_token)
+        Returns:
+            更新的行数（Worker + 任务）
+        """
+        from antcode_core.domain.models import TaskRun, Worker
+        from antcode_core.domain.models.enums import TaskStatus, WorkerStatus
+
+        now = datetime.now()
+        offline_threshold = now - timedelta(seconds=60)
+        condition = Q(status=WorkerStatus.ONLINE.value, last_heartbeat__lt=offline_threshold)
+
+        worker_count = 0
+        task_count = 0
+        while self._budget > 0:
+            limit = min(self.chunk_size, self._budget)
+            worker_ids = await (
+                Worker.filter(condition).order_by("id").limit(limit).values_list("id", flat=True)
+            )
+            if not worker_ids:
+                break
 
-        except Exception as e:
-            logger.error(f"检测失联 Worker 失败: {e}")
+            await self._ensure_fencing(fencing_token)
+            worker_count += await Worker.filter(condition, id__in=worker_ids).update(
+                status=WorkerStatus.OFFLINE.value
+            )
+            self._budget -= len(worker_ids)
+            logger.info(f"标记 Worker 离线: worker_ids={list(worker_ids)}")
+
+            # 处理这些 Worker 上的运行中任务
+            changed = await self._update_in_chunks(
+                TaskRun,
+                Q(worker_id__in=list(worker_ids), status=TaskStatus.RUNNING),
+                {"status": TaskStatus.FAILED, "end_time": now, "error_message": "Worker 失联"},
+                fencing_token,
+                capped=False,
+            )
+            await self._record_stats(changed)
+            task_count += len(changed)
+
+            if len(worker_ids) < limit:
+                break
 
-    async def _handle_worker_tasks(self, worker_id: int, fencing_token: int):
-        """处理 Worker 上的任务
+        if worker_count:
+            logger.warning(f"发现 {worker_count} 个失联 Worker，标记 {task_count} 个任务失败")
+        return worker_count + task_count
 
-        Args:
-            worker_id: Worker ID
-            fencing_token: Fencing Token
-        """
-        try:
-            from antcode_core.domain.models import TaskRun
-            from antcode_core.domain.models.enums import TaskStatus
-
-            # 查找该 Worker 上运行中的任务
-            running_tasks = await TaskRun.filter(
-                worker_id=worker_id,
-                status=TaskStatus.RUNNING,
-            ).all()
-
-            if running_tasks:
-                logger.info(f"Worker {worker_id} 上有 {len(running_tasks)} 个运行中任务")
-
-                for task in running_tasks:
-                    logger.info(f"标记任务失败: run_id={task.id}")
-                    task.status = TaskStatus.FAILED
-                    task.end_time = datetime.now()
-                    task.error_message = "Worker 失联"
-                    await task.save()
-
-        except Exception as e:
-            logger.error(f"处理 Worker 任务失败: {e}")
-
-    async def _check_inconsistent_states(self, fencing_token: int):
+    async def _check_inconsistent_states(self, fencing_token: int) -> int:
         """检测状态不一致
 
+        有 end_time 但状态仍为 RUNNING 的任务：有错误信息的判为失败，否则判为成功。
+
         Args:
             fencing_token: Fencing Token
+
+        Returns:
+            修复的行数
         """
-        try:
-            from antcode_core.domain.models import TaskRun
-            from antcode_core.domain.models.enums import TaskStatus
-
-            # 查找状态不一致的任务（例如：有 end_time 但状态仍为 RUNNING）
-            inconsistent_tasks = await TaskRun.filter(
-                status=TaskStatus.RUNNING,
-                end_time__isnull=False,
-            ).all()
-
-            if inconsistent_tasks:
-                logger.warning(f"发现 {len(inconsistent_tasks)} 个状态不一致任务")
-
-                for task in inconsistent_tasks:
-                    logger.info(f"修复任务状态: run_id={task.id}")
-                    # 根据 end_time 和其他信息推断正确状态
-                    if task.error_message:
-                        task.status = TaskStatus.FAILED
-                    else:
-                        task.status = TaskStatus.SUCCESS
-                    await task.save()
-
-        except Exception as e:
-            logger.error(f"检测状态不一致失败: {e}")
-
-    async def _cleanup_zombie_tasks(self, fencing_token: int):
+        from antcode_core.domain.models import TaskRun
+        from antcode_core.domain.models.enums import TaskStatus
+
+        base = Q(status=TaskStatus.RUNNING, end_time__isnull=False)
+        no_error = Q(error_message__isnull=True) | Q(error_message="")
+
+        failed = await self._update_in_chunks(
+            TaskRun,
+            base & ~no_error,
+            {"status": TaskStatus.FAILED},
+            fencing_token,
+        )
+        succeeded = await self._update_in_chunks(
+            TaskRun,
+            base & no_error,
+            {"status": TaskStatus.SUCCESS},
+            fencing_token,
+        )
+        await self._record_stats(failed + succeeded)
+        failed, succeeded = len(failed), len(succeeded)
+        count = failed + succeeded
+        if count:
+            logger.warning(f"修复 {count} 个状态不一致任务 (failed={failed}, success={succeeded})")
+        return count
+
+    async def _cleanup_zombie_tasks(self, fencing_token: int) -> int:
         """清理僵尸任务
 
         Args:
             fencing_token: Fencing Token
+
+        Returns:
+            清理的行数
         """
-        try:
-            from antcode_core.domain.models import TaskRun
-            from antcode_core.domain.models.enums import TaskStatus
-
-            # 查找长时间处于 PENDING 状态的任务
-            zombie_threshold = datetime.now() - timedelta(hours=24)
-
-            zombie_tasks = await TaskRun.filter(
-                status=TaskStatus.PENDING,
-                created_at__lt=zombie_threshold,
-            ).all()
-
-            if zombie_tasks:
-                logger.warning(f"发现 {len(zombie_tasks)} 个僵尸任务")
-
-                for task in zombie_tasks:
-                    logger.info(f"清理僵尸任务: run_id={task.id}")
-                    task.status = TaskStatus.FAILED
-                    task.error_message = "任务长时间未调度，已清理"
-                    task.end_time = datetime.now()
-                    await task.save()
-
-        except Exception as e:
-            logger.error(f"清理僵尸任务失败: {e}")
+        from antcode_core.domain.models import TaskRun
+        from antcode_core.domain.models.enums import TaskStatus
+
+        # 长时间处于 PENDING 状态的任务
+        now = datetime.now()
+        zombie_threshold = now - timedelta(hours=24)
+
+        changed = await self._update_in_chunks(
+            TaskRun,
+            Q(status=TaskStatus.PENDING, created_at__lt=zombie_threshold),
+            {
+                "status": TaskStatus.FAILED,
+                "error_message": "任务长时间未调度，已清理",
+                "end_time": now,
+            },
+            fencing_token,
+        )
+        await self._record_stats(changed)
+        count = len(changed)
+        if count:
+            logger.warning(f"清理 {count} 个僵尸任务")
+        return count
 
 
 # 全局协调循环实例
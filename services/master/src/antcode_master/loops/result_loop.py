@@ -46,6 +46,15 @@ class ResultLoop:
         self._stream = StreamClient()
         self._running = False
         self._task: asyncio.Task | None = None
+        self._stats: dict[str, Any] = {
+            "batches": 0,
+            "messages": 0,
+            "acked": 0,
+            "failed": 0,
+            "busy_seconds": 0.0,
+            "last_batch_size": 0,
+            "last_batch_ms": 0.0,
+        }
 
     async def start(self) -> None:
         """启动结果循环"""
@@ -103,17 +112,7 @@ class ResultLoop:
                         await asyncio.sleep(self._poll_interval)
                         continue
 
-                ack_ids: list[str] = []
-                for message in messages:
-                    try:
-                        handled = await self._handle_message(message.data)
-                        if handled:
-                            ack_ids.append(message.msg_id)
-                    except Exception as exc:
-                        logger.error(f"处理结果消息失败: {exc}")
-
-                if ack_ids:
-                    await self._stream.xack(self._stream_key, ack_ids, self._group)
+                await self._handle_batch(messages)
 
             except asyncio.CancelledError:
                 break
@@ -121,31 +120,76 @@ class ResultLoop:
                 logger.error(f"结果消费循环异常: {e}")
                 await asyncio.sleep(self._poll_interval)
 
-    async def _handle_message(self, data: dict[str, Any]) -> bool:
-        """处理单条结果消息"""
+    async def _handle_batch(self, messages: list[Any]) -> None:
+        """批量处理结果消息：一次加载、一次事务写回、一次 XACK"""
+        started = time.perf_counter()
+        ack_ids: list[str] = []
+        results: list[dict[str, Any]] = []
+        result_msg_ids: list[str] = []
+
+        for message in messages:
+            try:
+                result = self._build_result(message.data)
+            except Exception as exc:
+                logger.error(f"解析结果消息失败: {exc}")
+                continue
+            if result is None:
+                # 无 run_id 的消息无法处理，直接确认
+                ack_ids.append(message.msg_id)
+                continue
+            results.append(result)
+            result_msg_ids.append(message.msg_id)
+
+        if results:
+            try:
+                handled = await task_run_service.update_results_batch(results)
+            except Exception as exc:
+                logger.error(f"批量处理结果消息失败: {exc}")
+                handled = [False] * len(results)
+            ack_ids.extend(
+                msg_id for msg_id, ok in zip(result_msg_ids, handled, strict=True) if ok
+            )
+
+        if ack_ids:
+            await self._stream.xack(self._stream_key, ack_ids, self._group)
+
+        elapsed = time.perf_counter() - started
+        failed = len(messages) - len(ack_ids)
+        self._stats["batches"] += 1
+        self._stats["messages"] += len(messages)
+        self._stats["acked"] += len(ack_ids)
+        self._stats["failed"] += failed
+        self._stats["busy_seconds"] += elapsed
+        self._stats["last_batch_size"] = len(messages)
+        self._stats["last_batch_ms"] = round(elapsed * 1000, 2)
+        if failed:
+            logger.warning(f"结果批次中 {failed}/{len(messages)} 条未确认，将在 pending 检查中重试")
+
+    def _build_result(self, data: dict[str, Any]) -> dict[str, Any] | None:
+        """解析结果消息为 update_result 参数，无 run_id 时返回 None"""
         payload = self._normalize_payload(data)
         run_id = payload.get("run_id") or ""
         if not run_id:
-            return True
-
-        status = (payload.get("status") or "").lower()
-        exit_code = self._to_int(payload.get("exit_code"))
-        error_message = payload.get("error_message") or ""
-        started_at = self._parse_dt(payload.get("started_at"))
-        finished_at = self._parse_dt(payload.get("finished_at"))
-        duration_ms = payload.get("duration_ms")
-        result_data = payload.get("data") or {}
+            return None
 
-        return await task_run_service.update_result(
-            run_id=run_id,
-            status=status,
-            exit_code=exit_code,
-            error_message=error_message,
-            started_at=started_at,
-            finished_at=finished_at,
-            duration_ms=duration_ms,
-            data=result_data if isinstance(result_data, dict) else {},
-        )
+        result_data = payload.get("data") or {}
+        return {
+            "run_id": run_id,
+            "status": (payload.get("status") or "").lower(),
+            "exit_code": self._to_int(payload.get("exit_code")),
+            "error_message": payload.get("error_message") or "",
+            "started_at": self._parse_dt(payload.get("started_at")),
+            "finished_at": self._parse_dt(payload.get("finished_at")),
+            "duration_ms": payload.get("duration_ms"),
+            "data": result_data if isinstance(result_data, dict) else {},
+        }
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取结果消费吞吐统计"""
+        stats = dict(self._stats)
+        busy = stats["busy_seconds"]
+        stats["messages_per_second"] = round(stats["messages"] / busy, 2) if busy else 0.0
+        return stats
 
     def _normalize_payload(self, data: dict[str, Any]) -> dict[str, Any]:
         normalized: dict[str, Any] = {}
@@ -1,14 +1,21 @@
 """任务重试与补偿服务"""
 
 import asyncio
-from datetime import datetime, timedelta
+import contextlib
+import heapq
+import itertools
+import time
+from datetime import datetime
 from enum import Enum
 
 from loguru import logger
 
+from antcode_core.application.services.task_stats_service import task_stats_service
 from antcode_core.domain.models.enums import TaskStatus
 from antcode_core.domain.models.task import Task
 from antcode_core.domain.models.task_run import TaskRun
+from antcode_core.infrastructure.redis.delay_queue import RedisDelayQueue
+from antcode_master.leader import leader_election
 
 
 class RetryStrategy(str, Enum):
@@ -59,23 +66,58 @@ class RetryConfig:
 
 
 class RetryService:
-    """任务重试服务"""
+    """任务重试服务
+
+    待重试条目持久化在 Redis 延迟队列（按到期时间排序），进程内维护一个
+    到期时间最小堆，单个定时器睡到最近的到期时间，到期后批量认领并触发。
+    Redis 不可用时条目只保存在内存堆中。
+    """
+
+    # 单次认领的最大条目数（需在租约时长内逐个触发完）
+    CLAIM_BATCH = 50
+    # 轮询 Redis 的最长间隔（其他实例写入或重启前遗留的条目）
+    POLL_INTERVAL = 5.0
+    # 内存条目触发失败后的重试间隔（秒）
+    LOCAL_RETRY_DELAY = 60
 
     def __init__(self):
         self.default_config = RetryConfig()
         self.compensation_handlers = {}
-        self._retry_queue = asyncio.Queue()
+        # (到期时间戳, 序号, 条目)；条目为 None 表示在 Redis 中，只用于唤醒定时器
+        self._heap: list[tuple[float, int, dict | None]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._delay_queue = RedisDelayQueue("retry")
+        self._task: asyncio.Task | None = None
         self._running = False
 
+        self._stats = {
+            "scheduled": 0,
+            "triggered": 0,
+            "trigger_failures": 0,
+            "claim_batches": 0,
+            "redis_fallbacks": 0,
+            "lag_sum": 0.0,
+            "lag_max": 0.0,
+            "lag_last": 0.0,
+        }
+
     async def start(self):
         """启动重试服务"""
+        if self._running:
+            return
         self._running = True
-        asyncio.create_task(self._process_retry_queue())
+        self._task = asyncio.create_task(self._process_retry_queue())
         logger.info("任务重试服务已启动")
 
     async def stop(self):
         """停止重试服务"""
         self._running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        self._task = None
         logger.info("任务重试服务已停止")
 
     def calculate_delay(self, retry_count, config=None):
@@ -128,7 +170,8 @@ class RetryService:
             return None
 
         delay = self.calculate_delay(current_retry, config)
-        next_retry_time = datetime.now() + timedelta(seconds=delay)
+        due_at = time.time() + delay
+        next_retry_time = datetime.fromtimestamp(due_at)
 
         execution.retry_count = current_retry + 1
         execution.status = TaskStatus.PENDING
@@ -138,13 +181,14 @@ class RetryService:
         task.failure_count += 1
         await task.save()
 
-        await self._retry_queue.put(
+        await self._enqueue(
             {
                 "task_id": task.id,
                 "run_id": execution.run_id,
-                "retry_time": next_retry_time,
+                "retry_time": next_retry_time.isoformat(),
                 "retry_count": execution.retry_count,
-            }
+            },
+            due_at,
         )
 
         logger.info(
@@ -198,10 +242,12 @@ class RetryService:
             task.failure_count += 1
             await task.save()
 
+            previous_status = execution.status
             execution.status = TaskStatus.FAILED
             execution.end_time = datetime.now()
             execution.error_message = f"重试耗尽: {error}"
             await execution.save()
+            await task_stats_service.safe_record([(execution, previous_status)], {task.id: task})
 
             task_type = str(task.task_type.value) if task.task_type else "default"
             handler = self.compensation_handlers.get(task_type)
@@ -236,32 +282,112 @@ class RetryService:
         except Exception as e:
             logger.error(f"发送任务失败告警失败: {e}")
 
+    async def _enqueue(self, item, due_at):
+        """写入延迟队列并登记到期时间"""
+        self._stats["scheduled"] += 1
+        member = f"{item['run_id']}:{item['retry_count']}"
+        try:
+            await self._delay_queue.add(member, item, due_at)
+            self._push(due_at, None)
+        except Exception as e:
+            self._stats["redis_fallbacks"] += 1
+            logger.warning(f"重试条目写入 Redis 失败，仅保存在内存: {e}")
+            self._push(due_at, item)
+
+    def _push(self, due_at, item):
+        """加入到期堆，成为最早条目时唤醒定时器"""
+        heapq.heappush(self._heap, (due_at, next(self._seq), item))
+        if self._heap[0][0] == due_at:
+            self._wakeup.set()
+
+    def _can_claim(self):
+        """是否由本实例认领 Redis 中的条目"""
+        return leader_election.is_leader
+
     async def _process_retry_queue(self):
-        """处理重试队列"""
+        """处理重试队列：睡到最近的到期时间，批量触发到期条目"""
         while self._running:
             try:
-                try:
-                    retry_item = await asyncio.wait_for(self._retry_queue.get(), timeout=1.0)
-                except TimeoutError:
-                    continue
+                self._wakeup.clear()
+                timeout = self.POLL_INTERVAL
+                if self._heap:
+                    timeout = min(timeout, self._heap[0][0] - time.time())
+                if timeout > 0:
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
 
-                retry_time = retry_item["retry_time"]
-                now = datetime.now()
+                await self._dispatch_due()
 
-                if retry_time > now:
-                    wait_seconds = (retry_time - now).total_seconds()
-                    await asyncio.sleep(wait_seconds)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"处理重试队列失败: {e}")
+                await asyncio.sleep(1)
 
-                task_id = retry_item["task_id"]
-                from antcode_master.loops.scheduler_loop import scheduler_service
+    async def _dispatch_due(self):
+        """触发所有到期条目"""
+        now = time.time()
+        local_items = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, _, item = heapq.heappop(self._heap)
+            if item is not None:
+                local_items.append((due_at, item))
 
-                await scheduler_service.trigger_task(task_id)
+        for due_at, item in local_items:
+            if not await self._trigger(item, due_at):
+                self._push(time.time() + self.LOCAL_RETRY_DELAY, item)
 
-                logger.info(f"任务 {task_id} 重试已触发")
+        if self._can_claim():
+            await self._claim_from_redis()
 
-            except Exception as e:
-                logger.error(f"处理重试队列失败: {e}")
-                await asyncio.sleep(1)
+    async def _claim_from_redis(self):
+        """批量认领 Redis 中的到期条目；未确认的条目在租约到期后重新投递"""
+        try:
+            while True:
+                claimed = await self._delay_queue.claim(self.CLAIM_BATCH)
+                if not claimed:
+                    break
+                self._stats["claim_batches"] += 1
+
+                # 逐个触发后立即确认；租约到期的剩余条目可能已被重新认领，不再触发
+                lease_deadline = time.monotonic() + self._delay_queue.lease_seconds
+                for member, due_at, item in claimed:
+                    if time.monotonic() >= lease_deadline:
+                        break
+                    if await self._trigger(item, due_at):
+                        await self._delay_queue.ack(member)
+
+                if len(claimed) < self.CLAIM_BATCH:
+                    break
+
+            next_due = await self._delay_queue.next_due()
+        except Exception as e:
+            logger.warning(f"认领 Redis 重试条目失败: {e}")
+            return
+
+        if next_due is not None and (not self._heap or next_due < self._heap[0][0]):
+            self._push(next_due, None)
+
+    async def _trigger(self, item, due_at):
+        """触发单个重试条目，返回是否成功"""
+        task_id = item.get("task_id")
+        try:
+            from antcode_master.loops.scheduler_loop import scheduler_service
+
+            await scheduler_service.trigger_task(task_id)
+        except Exception as e:
+            self._stats["trigger_failures"] += 1
+            logger.error(f"任务 {task_id} 重试触发失败: {e}")
+            return False
+
+        lag = max(0.0, time.time() - due_at)
+        self._stats["triggered"] += 1
+        self._stats["lag_sum"] += lag
+        self._stats["lag_last"] = lag
+        self._stats["lag_max"] = max(self._stats["lag_max"], lag)
+
+        logger.info(f"任务 {task_id} 重试已触发")
+        return True
 
     def _get_task_retry_config(self, task):
         """获取任务的重试配置"""
@@ -298,31 +424,39 @@ class RetryService:
             ),
         }
 
-    async def get_pending_retries(self):
-        """获取待重试的任务列表"""
-        pending = []
-        queue_size = self._retry_queue.qsize()
-        items = []
+    async def get_pending_retries(self, limit=1000):
+        """获取待重试的任务列表（按到期时间升序，不消费队列）"""
+        pending = [item for _, _, item in heapq.nsmallest(limit, self._heap) if item is not None]
 
-        for _ in range(queue_size):
-            try:
-                item = self._retry_queue.get_nowait()
-                items.append(item)
-                pending.append(
-                    {
-                        "task_id": item["task_id"],
-                        "run_id": item["run_id"],
-                        "retry_time": item["retry_time"].isoformat(),
-                        "retry_count": item["retry_count"],
-                    }
-                )
-            except asyncio.QueueEmpty:
-                break
-
-        for item in items:
-            await self._retry_queue.put(item)
+        try:
+            pending.extend(item for _, _, item in await self._delay_queue.peek(limit))
+        except Exception as e:
+            logger.warning(f"读取 Redis 待重试条目失败: {e}")
 
-        return pending
+        pending.sort(key=lambda item: item["retry_time"])
+        return [
+            {
+                "task_id": item["task_id"],
+                "run_id": item["run_id"],
+                "retry_time": item["retry_time"],
+                "retry_count": item["retry_count"],
+            }
+            for item in pending[:limit]
+        ]
 
+    def get_stats(self):
+        """重试队列统计（含触发延迟：实际触发时间与到期时间之差，秒）"""
+        triggered = self._stats["triggered"]
+        return {
+            "scheduled": self._stats["scheduled"],
+            "triggered": triggered,
+            "trigger_failures": self._stats["trigger_failures"],
+            "claim_batches": self._stats["claim_batches"],
+            "redis_fallbacks": self._stats["redis_fallbacks"],
+            "local_pending": sum(1 for _, _, item in self._heap if item is not None),
+            "lag_last_seconds": round(self._stats["lag_last"], 3),
+            "lag_max_seconds": round(self._stats["lag_max"], 3),
+            "lag_avg_seconds": round(self._stats["lag_sum"] / triggered, 3) if triggered else 0.0,
+        }
 
 retry_service = RetryService()
@@ -357,6 +357,8 @@ class SchedulerService:
 
     async def get_task_stats(self, task_id, user_id):
         """获取任务统计信息（支持 public_id）"""
+        from antcode_core.application.services.task_stats_service import task_stats_service
+
         try:
             # 使用 QueryHelper 获取任务（自动处理 ID/public_id 和权限检查）
             task = await QueryHelper.get_by_id_or_public_id(
@@ -366,46 +368,19 @@ class SchedulerService:
             if not task:
                 return None
 
-            # 获取执行统计（使用内部 ID）
-            executions = await TaskRun.filter(task_id=task.id).all()
-
-            total = len(executions)
-            if total == 0:
-                return {
-                    "task_id": task_id,
-                    "total_executions": 0,
-                    "success_count": 0,
-                    "failed_count": 0,
-                    "running_count": 0,
-                    "success_rate": 0.0,
-                    "avg_duration": 0.0,
-                    "last_execution": None,
-                }
-
-            success_count = sum(1 for e in executions if e.status == TaskStatus.SUCCESS)
-            failed_count = sum(1 for e in executions if e.status == TaskStatus.FAILED)
-            running_count = sum(1 for e in executions if e.status == TaskStatus.RUNNING)
-
-            # 计算平均执行时长
-            completed_executions = [e for e in executions if e.end_time and e.start_time]
-            avg_duration = 0.0
-            if completed_executions:
-                durations = [
-                    (e.end_time - e.start_time).total_seconds() for e in completed_executions
-                ]
-                avg_duration = sum(durations) / len(durations)
-
-            # 获取最后执行
-            last_execution = max(executions, key=lambda e: e.start_time) if executions else None
+            # 终态计数读取物化计数表，进行中的执行单独统计
+            stats = await task_stats_service.get_task_stats(task)
+            counters = stats["counters"]
+            last_execution = stats["last_execution"]
 
             return {
                 "task_id": task_id,
-                "total_executions": total,
-                "success_count": success_count,
-                "failed_count": failed_count,
-                "running_count": running_count,
-                "success_rate": success_count / total * 100,
-                "avg_duration": avg_duration,
+                "total_executions": counters["total_count"] + stats["active_count"],
+                "success_count": counters["success_count"],
+                "failed_count": counters["failure_count"],
+                "running_count": stats["running_count"],
+                "success_rate": counters["success_rate"] * 100,
+                "avg_duration": counters["avg_duration"],
                 "last_execution": {
                     "run_id": last_execution.run_id,
                     "status": last_execution.status,
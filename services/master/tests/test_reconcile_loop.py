@@ -0,0 +1,82 @@
+"""协调循环测试"""
+
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from tortoise import Tortoise
+
+from antcode_core.application.services.task_stats_service import task_stats_service
+from antcode_core.domain.models import Task, TaskRun, TaskRunCounter
+from antcode_core.domain.models.enums import ScheduleType, TaskStatus, TaskType
+from antcode_master.loops.reconcile_loop import ReconcileLoop
+
+# antcode_master.loops 以同名实例覆盖了子模块属性，直接取模块对象
+reconcile_module = sys.modules[ReconcileLoop.__module__]
+
+FENCING_TOKEN = 7
+
+
+@pytest_asyncio.fixture
+async def db():
+    await Tortoise.init(
+        db_url="sqlite://:memory:",
+        modules={"models": ["antcode_core.domain.models"]},
+        use_tz=False,
+    )
+    await Tortoise.generate_schemas()
+    yield
+    await Tortoise.close_connections()
+
+
+@pytest.fixture
+def leader(monkeypatch):
+    async def validate_token(token):
+        return token == FENCING_TOKEN
+
+    monkeypatch.setattr(reconcile_module, "get_fencing_token", lambda: FENCING_TOKEN)
+    monkeypatch.setattr(reconcile_module.leader_election, "validate_token", validate_token)
+
+
+async def _create_run(task: Task, run_id: str, status: TaskStatus, started_ago: int) -> TaskRun:
+    return await TaskRun.create(
+        task_id=task.id,
+        run_id=run_id,
+        status=status,
+        start_time=datetime.now() - timedelta(seconds=started_ago),
+    )
+
+
+@pytest.mark.asyncio
+async def test_timeout_updates_counters(db, leader):
+    task = await Task.create(
+        name="reconcile-timeout",
+        project_id=11,
+        user_id=22,
+        task_type=TaskType.CODE,
+        schedule_type=ScheduleType.ONCE,
+    )
+    await _create_run(task, "run-stale-1", TaskStatus.RUNNING, 600)
+    await _create_run(task, "run-stale-2", TaskStatus.RUNNING, 900)
+    await _create_run(task, "run-fresh", TaskStatus.RUNNING, 10)
+
+    loop = ReconcileLoop(timeout_threshold=300, chunk_size=1)
+    assert await loop._check_timeout_tasks(FENCING_TOKEN) == 2
+
+    assert await TaskRun.filter(status=TaskStatus.TIMEOUT).count() == 2
+    for scope, scope_id in (
+        (TaskRunCounter.SCOPE_TASK, task.id),
+        (TaskRunCounter.SCOPE_PROJECT, 11),
+        (TaskRunCounter.SCOPE_USER, 22),
+        (TaskRunCounter.SCOPE_GLOBAL, 0),
+    ):
+        counters = await task_stats_service.get_counters(scope, scope_id)
+        assert counters["total_count"] == 2
+        assert counters["failure_count"] == 2
+        assert counters["success_count"] == 0
+
+    # 再次协调不会重复计数
+    assert await loop._check_timeout_tasks(FENCING_TOKEN) == 0
+    counters = await task_stats_service.get_counters(TaskRunCounter.SCOPE_GLOBAL)
+    assert counters["total_count"] == 2
@@ -74,6 +74,7 @@ async def init_services() -> None:
 
     logger.info("[8/12] 初始化指标缓存")
     await _init_metrics_cache()
+    await _init_metrics_rollup()
 
     logger.info("[9/12] 启动文件清理")
     await _init_temp_cleanup()
@@ -106,6 +107,9 @@ async def shutdown_services() -> None:
     except Exception as e:
         logger.error(f"停止指标缓存失败: {e}")
 
+    # 写出剩余的指标汇总样本（需在关闭数据库前）
+    await _shutdown_metrics_rollup()
+
     # 关闭 HTTP 客户端
     await http_client.stop()
 
@@ -113,6 +117,7 @@ async def shutdown_services() -> None:
     await _shutdown_distributed_log()
     await _shutdown_log_cleanup()
     await _shutdown_temp_cleanup()
+    await _shutdown_log_stream_follow()
     await _shutdown_redis()
 
     # 关闭数据库连接
@@ -482,6 +487,27 @@ async def _init_metrics_cache() -> None:
         raise
 
 
+async def _init_metrics_rollup() -> None:
+    """启动 Worker 指标汇总定时写入"""
+    try:
+        from antcode_core.application.services.monitoring import metrics_rollup_service
+
+        await metrics_rollup_service.start()
+    except Exception as e:
+        logger.warning(f"指标汇总定时写入启动失败: {e}")
+
+
+async def _shutdown_metrics_rollup() -> None:
+    """停止 Worker 指标汇总定时写入并写出剩余样本"""
+    try:
+        from antcode_core.application.services.monitoring import metrics_rollup_service
+
+        await metrics_rollup_service.stop()
+        logger.info("指标汇总已写出")
+    except Exception as e:
+        logger.error(f"停止指标汇总写入失败: {e}")
+
+
 # ============================================================================
 # 清理服务
 # ============================================================================
@@ -529,6 +555,16 @@ async def _shutdown_log_cleanup() -> None:
         logger.error(f"日志清理服务关闭失败: {e}")
 
 
+async def _shutdown_log_stream_follow() -> None:
+    """停止 Redis 日志流读取任务"""
+    try:
+        from antcode_web_api.websockets.redis_log_stream_service import redis_log_stream_service
+
+        await redis_log_stream_service.stop()
+    except Exception as e:
+        logger.error(f"日志流读取任务关闭失败: {e}")
+
+
 async def _init_distributed_log() -> None:
     """初始化分布式日志服务"""
     try:
@@ -150,6 +150,7 @@ async def cancel_pending_retry(
     run_id: str, current_user: TokenData = Depends(get_current_user)
 ):
     """取消待重试任务"""
+    from antcode_core.application.services.task_stats_service import task_stats_service
     from antcode_core.domain.models.enums import TaskStatus
     from antcode_core.domain.models.task import Task
     from antcode_core.domain.models.task_run import TaskRun
@@ -168,9 +169,11 @@ async def cancel_pending_retry(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权操作此任务")
 
     # 更新状态为已取消
+    previous_status = execution.status
     execution.status = TaskStatus.CANCELLED
     execution.error_message = f"重试已取消 by user {current_user.user_id}"
     await execution.save()
+    await task_stats_service.safe_record([(execution, previous_status)], {task.id: task})
 
     logger.info(f"任务 {task.name} 的重试已取消 by user {current_user.user_id}")
 
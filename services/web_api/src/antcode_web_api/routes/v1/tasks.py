@@ -21,7 +21,7 @@ from antcode_web_api.response import (
     success as success_response,
 )
 from antcode_core.common.security.auth import get_current_user
-from antcode_core.domain.models.enums import ProjectType, ScheduleType, TaskStatus
+from antcode_core.domain.models.enums import ProjectType, TaskStatus
 from antcode_core.domain.schemas.common import BaseResponse, PaginationResponse
 from antcode_core.domain.schemas.task import (
     TaskCreateRequest as TaskCreate,
@@ -281,18 +281,28 @@ async def get_tasks_stats(
     project_id: str | None = Query(None),
     current_user=Depends(get_current_user),
 ):
-    """获取任务统计信息（全局/按项目）"""
+    """获取任务统计信息（全局/按项目）
+
+    任务状态用单条 GROUP BY 查询汇总，执行统计读取物化计数表的累计行。
+    """
     import asyncio
 
-    from tortoise.functions import Avg
+    from tortoise.expressions import Subquery
 
     from antcode_core.application.services.base import QueryHelper
+    from antcode_core.application.services.task_stats_service import task_stats_service
     from antcode_core.application.services.users.user_service import user_service
+    from antcode_core.domain.models import TaskRunCounter
 
     user = await user_service.get_user_by_id(current_user.user_id)
     is_admin = bool(user and user.is_admin)
 
     task_query = Task.all() if is_admin else Task.filter(user_id=current_user.user_id)
+    scope = (
+        (TaskRunCounter.SCOPE_GLOBAL, 0)
+        if is_admin
+        else (TaskRunCounter.SCOPE_USER, current_user.user_id)
+    )
 
     if project_id:
         project = await QueryHelper.get_by_id_or_public_id(
@@ -304,41 +314,23 @@ async def get_tasks_stats(
         if not project:
             raise HTTPException(status_code=404, detail="项目不存在或无权限访问")
         task_query = task_query.filter(project_id=project.id)
+        scope = (TaskRunCounter.SCOPE_PROJECT, project.id)
 
-    (
-        total_tasks,
-        pending_tasks,
-        running_tasks,
-        success_tasks,
-        failed_tasks,
-        cancelled_tasks,
-    ) = await asyncio.gather(
-        task_query.count(),
-        task_query.filter(
-            status__in=[TaskStatus.PENDING, TaskStatus.DISPATCHING, TaskStatus.QUEUED]
-        ).count(),
-        task_query.filter(status=TaskStatus.RUNNING).count(),
-        task_query.filter(status=TaskStatus.SUCCESS).count(),
-        task_query.filter(status__in=[TaskStatus.FAILED, TaskStatus.TIMEOUT]).count(),
-        task_query.filter(status=TaskStatus.CANCELLED).count(),
+    run_query = (
+        TaskRun.all()
+        if is_admin and not project_id
+        else TaskRun.filter(task_id__in=Subquery(task_query.values("id")))
     )
 
-    scheduled_tasks = await task_query.filter(
-        schedule_type__in=[ScheduleType.CRON, ScheduleType.INTERVAL, ScheduleType.DATE]
-    ).count()
+    summary, counters, recent_runs = await asyncio.gather(
+        task_stats_service.summarize_tasks(task_query),
+        task_stats_service.get_counters(*scope),
+        run_query.order_by("-created_at").limit(10),
+    )
+    total_tasks = summary["total"]
+    scheduled_tasks = summary["scheduled"]
     manual_tasks = max(0, total_tasks - scheduled_tasks)
 
-    task_ids = await task_query.values_list("id", flat=True)
-    run_query = TaskRun.filter(task_id__in=list(task_ids)) if task_ids else TaskRun.filter(id__in=[])
-
-    runs_total = await run_query.count()
-    runs_success = await run_query.filter(status=TaskStatus.SUCCESS).count()
-    avg_duration_raw = await run_query.filter(duration_seconds__not_isnull=True).annotate(
-        avg=Avg("duration_seconds")
-    ).values("avg")
-    avg_duration = avg_duration_raw[0]["avg"] if avg_duration_raw else 0
-
-    recent_runs = await run_query.order_by("-created_at").limit(10)
     if recent_runs:
         recent_task_ids = list({run.task_id for run in recent_runs})
         task_map = {
@@ -349,11 +341,11 @@ async def get_tasks_stats(
 
     data = {
         "total_tasks": total_tasks,
-        "pending_tasks": pending_tasks,
-        "running_tasks": running_tasks,
-        "completed_tasks": success_tasks,
-        "failed_tasks": failed_tasks,
-        "cancelled_tasks": cancelled_tasks,
+        "pending_tasks": summary["pending"],
+        "running_tasks": summary["running"],
+        "completed_tasks": summary["success"],
+        "failed_tasks": summary["failed"],
+        "cancelled_tasks": summary["cancelled"],
         "tasks_by_priority": {
             "low": 0,
             "normal": total_tasks,
@@ -367,8 +359,8 @@ async def get_tasks_stats(
             "api": 0,
         },
         "recent_executions": ExecutionResponseBuilder.build_list(recent_runs),
-        "success_rate": (runs_success / runs_total) if runs_total else 0,
-        "average_duration": avg_duration or 0,
+        "success_rate": counters["success_rate"],
+        "average_duration": counters["avg_duration"],
     }
 
     return success_response(data, message=Messages.QUERY_SUCCESS)
@@ -1088,20 +1080,11 @@ async def get_task_execution_logs(
     if not execution:
         raise HTTPException(status_code=404, detail="执行记录不存在或无权访问")
 
-    logs = await task_log_service.get_execution_logs(execution.run_id)
-    items = []
-    for line in (logs.get("output") or "").splitlines():
-        if line.strip():
-            items.append({"type": "stdout", "message": line})
-    for line in (logs.get("error") or "").splitlines():
-        if line.strip():
-            items.append({"type": "stderr", "message": line})
-
-    total = len(items)
-    start = (page - 1) * size
-    end = start + size
+    items, total = await task_log_service.read_execution_log_page(
+        execution.run_id, offset=(page - 1) * size, limit=size
+    )
     return page_response(
-        items=items[start:end],
+        items=items,
         total=total,
         page=page,
         size=size,
@@ -1124,27 +1107,19 @@ async def download_task_execution_logs(
     if not execution:
         raise HTTPException(status_code=404, detail="执行记录不存在或无权访问")
 
-    logs = await task_log_service.get_execution_logs(execution.run_id)
     if format == "json":
-        content = json.dumps(logs, ensure_ascii=False, indent=2)
         media_type = "application/json"
         filename = f"run_{run_id}.json"
     else:
-        content = "\n".join(
-            [
-                "=== STDOUT ===",
-                logs.get("output", ""),
-                "",
-                "=== STDERR ===",
-                logs.get("error", ""),
-            ]
-        )
         media_type = "text/plain"
         filename = f"run_{run_id}.txt"
 
-    buffer = io.BytesIO(content.encode("utf-8"))
     headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
-    return StreamingResponse(buffer, media_type=media_type, headers=headers)
+    return StreamingResponse(
+        task_log_service.stream_execution_logs(execution.run_id, format=format),
+        media_type=media_type,
+        headers=headers,
+    )
 
 
 # 标准导出
@@ -27,11 +27,15 @@ async def websocket_logs_endpoint(
     websocket: WebSocket,
     run_id: str,
     token: str = Query(...),
+    batch: bool = Query(False, description="合并帧模式：多条消息打包为一帧 log_batch"),
+    compression: str | None = Query(None, description="合并帧压缩方式，仅支持 gzip"),
 ):
     logger.info(f"WebSocket 连接请求: run_id={run_id}")
 
     try:
-        await websocket_log_service.connect(websocket, run_id, token)
+        await websocket_log_service.connect(
+            websocket, run_id, token, batch_mode=batch, compression=compression
+        )
     except WebSocketDisconnect:
         logger.info(f"WebSocket 客户端断开连接: {run_id}")
     except Exception:
@@ -44,11 +48,15 @@ async def websocket_logs_endpoint(
 async def get_websocket_stats(current_user: TokenData = Depends(get_current_user)):
     await _ensure_authenticated_user(current_user)
     try:
+        from antcode_web_api.websockets.redis_log_stream_service import (
+            redis_log_stream_service,
+        )
         from antcode_web_api.websockets.websocket_connection_manager import (
             websocket_manager,
         )
 
         stats = websocket_manager.get_stats()
+        stats["log_stream_follow"] = redis_log_stream_service.get_stats()
         return success(stats, message="查询成功")
     except Exception as e:
         logger.error(f"获取 WebSocket 统计信息失败: {e}")
@@ -1197,6 +1197,7 @@ async def dispatch_task_to_worker(
     import uuid
     from datetime import datetime
 
+    from antcode_core.application.services.task_stats_service import task_stats_service
     from antcode_core.domain.models import Project, TaskRun
     from antcode_core.application.services.workers import worker_task_dispatcher
 
@@ -1244,6 +1245,7 @@ async def dispatch_task_to_worker(
         task_run.dispatch_status = "failed"
         task_run.error_message = result.error or "任务分发失败"
         await task_run.save()
+        await task_stats_service.safe_record([(task_run, "pending")])
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=result.error or "任务分发失败",
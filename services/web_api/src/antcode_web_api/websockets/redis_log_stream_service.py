@@ -2,23 +2,29 @@
 Redis 日志流服务
 
 从 Redis Streams 订阅日志并推送到 WebSocket。
+
+实时跟随由固定数量的读取任务完成：每个读取任务用一次 XREAD 覆盖分配给它的
+所有日志流（各自的 last_id），订阅增减时通过唤醒流打断阻塞中的 XREAD，
+无需重启读取任务。XREAD 的 COUNT 按流生效，单个高产出的流不会饿死其他流。
 """
 
 from __future__ import annotations
 
 import asyncio
 import contextlib
-from dataclasses import dataclass
+import time
+import uuid
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from typing import Any
 
 from loguru import logger
 
 from antcode_core.infrastructure.redis import (
-    decode_stream_payload,
     get_redis_client,
     log_stream_key,
     redis_namespace,
+    unpack_log_entry,
 )
 from antcode_web_api.websockets.websocket_connection_manager import websocket_manager
 
@@ -29,18 +35,41 @@ class StreamFollower:
     last_id: str = "0-0"
     ref_count: int = 0
     running: bool = False
-    task: asyncio.Task | None = None
+    reader_index: int = -1
     history_sent: bool = False
 
 
+@dataclass
+class _StreamReader:
+    """读取任务：一次 XREAD 覆盖多个日志流"""
+
+    index: int
+    wakeup_key: str
+    wakeup_id: str = "0-0"
+    followers: dict[str, StreamFollower] = field(default_factory=dict)  # stream key -> follower
+    has_work: asyncio.Event = field(default_factory=asyncio.Event)
+    task: asyncio.Task | None = None
+    blocking: bool = False
+    messages: int = 0
+    last_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+    last_dispatch_ms: float = 0.0
+
+
 class RedisLogStreamService:
     """Redis Stream 日志订阅服务"""
 
+    # 唤醒流过期时间（秒）
+    WAKEUP_TTL = 3600
+    # 吞吐统计窗口（秒）
+    RATE_WINDOW = 10.0
+
     def __init__(
         self,
         namespace: str | None = None,
         batch_size: int = 200,
         block_ms: int = 5000,
+        reader_count: int = 4,
     ):
         self._namespace = redis_namespace(namespace)
         self._batch_size = batch_size
@@ -48,6 +77,21 @@ class RedisLogStreamService:
         self._followers: dict[str, StreamFollower] = {}
         self._lock = asyncio.Lock()
 
+        instance_id = uuid.uuid4().hex[:12]
+        self._readers = [
+            _StreamReader(
+                index=i,
+                wakeup_key=f"{self._namespace}:log:follow:wakeup:{instance_id}:{i}",
+            )
+            for i in range(max(1, reader_count))
+        ]
+
+        # 吞吐统计
+        self._messages_total = 0
+        self._rate_window_start = time.monotonic()
+        self._rate_window_count = 0
+        self._messages_per_sec = 0.0
+
     async def subscribe(self, run_id: str) -> None:
         """订阅执行日志"""
         async with self._lock:
@@ -93,15 +137,57 @@ class RedisLogStreamService:
                     follower.run_id, sent
                 )
 
-        follower.task = asyncio.create_task(self._follow_stream(follower))
+        await self._attach(follower)
 
     async def _stop_follower(self, follower: StreamFollower) -> None:
         follower.running = False
-        if follower.task:
-            follower.task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await follower.task
-            follower.task = None
+        if follower.reader_index >= 0:
+            # 阻塞中的 XREAD 返回时会忽略已移除的流，无需唤醒
+            reader = self._readers[follower.reader_index]
+            reader.followers.pop(self._stream_key(follower.run_id), None)
+            follower.reader_index = -1
+
+    async def _attach(self, follower: StreamFollower) -> None:
+        """将日志流分配给当前负载最小的读取任务"""
+        if not follower.running:
+            return
+        reader = min(self._readers, key=lambda item: len(item.followers))
+        reader.followers[self._stream_key(follower.run_id)] = follower
+        follower.reader_index = reader.index
+        reader.has_work.set()
+
+        if reader.task is None or reader.task.done():
+            reader.task = asyncio.create_task(self._reader_loop(reader))
+        elif reader.blocking:
+            await self._wakeup(reader)
+
+    async def _wakeup(self, reader: _StreamReader) -> None:
+        """向读取任务的唤醒流写入一条消息，使阻塞中的 XREAD 立即返回"""
+        redis = await get_redis_client()
+        if redis is None:
+            return
+        try:
+            pipe = redis.pipeline(transaction=False)
+            pipe.xadd(reader.wakeup_key, {"w": "1"}, maxlen=1, approximate=False)
+            pipe.expire(reader.wakeup_key, self.WAKEUP_TTL)
+            await pipe.execute()
+        except Exception as e:
+            logger.debug(f"唤醒日志读取任务失败: {e}")
+
+    async def stop(self) -> None:
+        """停止所有读取任务"""
+        async with self._lock:
+            followers = list(self._followers.values())
+            self._followers.clear()
+        for follower in followers:
+            await self._stop_follower(follower)
+
+        for reader in self._readers:
+            if reader.task:
+                reader.task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await reader.task
+                reader.task = None
 
     async def _send_history(self, run_id: str) -> tuple[str, int]:
         """发送历史日志"""
@@ -129,9 +215,9 @@ class RedisLogStreamService:
 
             for msg_id, fields in messages:
                 last_id = self._decode_value(msg_id)
-                log_entry = self._decode_log(fields)
-                await self._emit_log(run_id, log_entry, source="history")
-                sent += 1
+                for log_entry in unpack_log_entry(fields):
+                    await self._emit_log(run_id, log_entry, source="history")
+                    sent += 1
 
         # 如果 Redis 没有数据，尝试从 S3 读取
         if sent == 0:
@@ -205,39 +291,115 @@ class RedisLogStreamService:
 
         return sent
 
-    async def _follow_stream(self, follower: StreamFollower) -> None:
-        """持续跟随日志流"""
+    async def _reader_loop(self, reader: _StreamReader) -> None:
+        """持续跟随分配给该读取任务的所有日志流"""
         redis = await get_redis_client()
-        stream_key = self._stream_key(follower.run_id)
-        last_id = follower.last_id
-
         if redis is None:
-            logger.warning("Redis 不可用，停止日志跟随: {}", follower.run_id)
+            logger.warning("Redis 不可用，停止日志跟随: reader={}", reader.index)
             return
 
-        while follower.running:
+        while True:
+            if not reader.followers:
+                reader.has_work.clear()
+                await reader.has_work.wait()
+                continue
+
+            streams = {key: follower.last_id for key, follower in reader.followers.items()}
+            streams[reader.wakeup_key] = reader.wakeup_id
             try:
+                reader.blocking = True
                 result = await redis.xread(
-                    {stream_key: last_id},
+                    streams,
                     count=self._batch_size,
                     block=self._block_ms,
                 )
-                if not result:
-                    continue
-
-                _, messages = result[0]
-                for msg_id, fields in messages:
-                    last_id = self._decode_value(msg_id)
-                    log_entry = self._decode_log(fields)
-                    await self._emit_log(follower.run_id, log_entry, source="realtime")
-
-                follower.last_id = last_id
-
             except asyncio.CancelledError:
-                break
+                raise
             except Exception as e:
                 logger.error(f"日志流读取失败: {e}")
                 await asyncio.sleep(1.0)
+                continue
+            finally:
+                reader.blocking = False
+
+            if result:
+                await self._dispatch(reader, result)
+
+    async def _dispatch(self, reader: _StreamReader, result: list) -> None:
+        """分发一次 XREAD 的结果"""
+        started = time.perf_counter()
+        now_ms = time.time() * 1000
+        count = 0
+        lag_ms = 0.0
+
+        for stream_name, messages in result:
+            stream_key = self._decode_value(stream_name)
+            if not messages:
+                continue
+            if stream_key == reader.wakeup_key:
+                reader.wakeup_id = self._decode_value(messages[-1][0])
+                continue
+
+            follower = reader.followers.get(stream_key)
+            if follower is None:
+                continue
+
+            for msg_id, fields in messages:
+                if not follower.running:
+                    break
+                for log_entry in unpack_log_entry(fields):
+                    await self._emit_log(follower.run_id, log_entry, source="realtime")
+                follower.last_id = self._decode_value(msg_id)
+                count += 1
+
+            lag_ms = max(lag_ms, now_ms - self._id_ms(follower.last_id))
+
+        reader.messages += count
+        reader.last_lag_ms = round(lag_ms, 1)
+        reader.max_lag_ms = max(reader.max_lag_ms, reader.last_lag_ms)
+        reader.last_dispatch_ms = round((time.perf_counter() - started) * 1000, 2)
+        self._record_messages(count)
+
+    @staticmethod
+    def _id_ms(stream_id: str) -> float:
+        """Stream 消息 ID 中的毫秒时间戳"""
+        try:
+            return float(stream_id.split("-", 1)[0])
+        except ValueError:
+            return 0.0
+
+    def _record_messages(self, count: int) -> None:
+        self._messages_total += count
+        self._rate_window_count += count
+        self._roll_rate_window()
+
+    def _roll_rate_window(self) -> None:
+        elapsed = time.monotonic() - self._rate_window_start
+        if elapsed >= self.RATE_WINDOW:
+            self._messages_per_sec = self._rate_window_count / elapsed
+            self._rate_window_start = time.monotonic()
+            self._rate_window_count = 0
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取跟随统计：跟随的流数、吞吐与各读取任务的延迟"""
+        self._roll_rate_window()
+        return {
+            "streams_followed": sum(len(reader.followers) for reader in self._readers),
+            "messages_total": self._messages_total,
+            "messages_per_sec": round(self._messages_per_sec, 2),
+            "readers": [
+                {
+                    "index": reader.index,
+                    "streams": len(reader.followers),
+                    "running": reader.task is not None and not reader.task.done(),
+                    "messages": reader.messages,
+                    "last_lag_ms": reader.last_lag_ms,
+                    "max_lag_ms": reader.max_lag_ms,
+                    "last_dispatch_ms": reader.last_dispatch_ms,
+                }
+                for reader in self._readers
+            ],
+        }
 
     async def _emit_log(self, run_id: str, log_entry: dict[str, Any], source: str) -> None:
         log_type = log_entry.get("log_type") or "stdout"
@@ -260,15 +422,6 @@ class RedisLogStreamService:
         }
         await websocket_manager.broadcast_to_run(run_id, message)
 
-    def _decode_log(self, fields: dict[str, Any]) -> dict[str, Any]:
-        decoded = decode_stream_payload(fields)
-        return {
-            "log_type": self._decode_value(decoded.get("log_type")),
-            "content": self._decode_value(decoded.get("content")),
-            "timestamp": self._decode_value(decoded.get("timestamp")),
-            "sequence": self._decode_value(decoded.get("sequence")),
-        }
-
     def _decode_value(self, value: Any) -> str:
         if isinstance(value, bytes):
             return value.decode("utf-8")
@@ -1,10 +1,15 @@
 """
 WebSocket连接管理器 - 生产环境优化版本
 负责管理WebSocket连接的生命周期、心跳检测和消息广播
+
+每个连接有独立的有界发送队列和写任务：广播只负责入队，慢连接不会拖慢其他连接。
+客户端可通过 batch=1 订阅合并帧模式（log_batch），compression=gzip 时大帧以二进制 gzip 发送。
 """
 
 import asyncio
 import contextlib
+import gzip
+import json
 import time
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
@@ -17,6 +22,18 @@ from loguru import logger
 from antcode_core.common.serialization import to_json
 
 
+# 合并帧模式下的帧类型
+BATCH_FRAME_TYPE = "log_batch"
+# 支持的帧压缩方式（permessage-deflate 由 ASGI 服务器在握手时协商，不在此处理）
+SUPPORTED_COMPRESSIONS = {"gzip"}
+# 小于该字节数的帧不压缩
+COMPRESS_MIN_BYTES = 1024
+
+# 慢连接处理策略
+SLOW_CONSUMER_DROP = "drop"  # 丢弃最旧的日志行，保留控制消息
+SLOW_CONSUMER_DISCONNECT = "disconnect"  # 断开连接，由客户端重连后重新拉取历史
+
+
 class ConnectionState(Enum):
     """连接状态枚举"""
 
@@ -44,6 +61,15 @@ class ConnectionInfo:
     bytes_sent: int = 0
     bytes_received: int = 0
     missed_pongs: int = 0
+    # 发送队列：[(message, 序列化后的文本), ...]
+    batch_mode: bool = False
+    compression: str | None = None
+    send_queue: deque = field(default_factory=deque)
+    send_event: asyncio.Event = field(default_factory=asyncio.Event)
+    writer_task: asyncio.Task | None = None
+    frames_sent: int = 0
+    dropped_messages: int = 0
+    pending_drop_notice: int = 0
 
 
 class ConnectionPool:
@@ -117,6 +143,7 @@ class ConnectionPool:
             if connection_id in self._connections.get(run_id, {}):
                 conn = self._connections[run_id].pop(connection_id)
                 conn.state = ConnectionState.CLOSED
+                conn.send_event.set()
                 self._total_count -= 1
 
                 # 清理空的 execution
@@ -139,6 +166,7 @@ class ConnectionPool:
             logger.debug(f"关闭连接时忽略异常: {e}")
         finally:
             conn.state = ConnectionState.CLOSED
+            conn.send_event.set()
 
     def get_connection(self, run_id, connection_id):
         """获取单个连接（无锁读取）"""
@@ -262,7 +290,7 @@ class MessageQueue:
     def __init__(
         self,
         max_queue_size: int = 1000,
-        batch_size: int = 20,
+        batch_size: int = 200,  # 广播只入队不等待发送，可一次取更多
         flush_interval: float = 0.05,  # 50ms 刷新间隔
     ):
         self.max_queue_size = max_queue_size
@@ -359,6 +387,8 @@ class WebSocketConnectionManager:
         cleanup_interval: float = 300.0,
         inactive_timeout: float = 1800.0,
     ):
+        from antcode_core.common.config import settings
+
         self.connection_pool = ConnectionPool(max_connections_per_execution)
         self.message_queue = MessageQueue()
         self.heartbeat_manager = HeartbeatManager(ping_interval, pong_timeout, max_missed_pongs)
@@ -366,6 +396,14 @@ class WebSocketConnectionManager:
         self.cleanup_interval = cleanup_interval
         self.inactive_timeout = inactive_timeout
 
+        # 单连接发送配置
+        self.send_queue_size = max(1, getattr(settings, "WEBSOCKET_SEND_QUEUE_SIZE", 2000))
+        self.send_timeout = getattr(settings, "WEBSOCKET_SEND_TIMEOUT", 5.0)
+        self.batch_max_messages = max(1, getattr(settings, "WEBSOCKET_BATCH_MAX_MESSAGES", 500))
+        self.slow_consumer_policy = getattr(
+            settings, "WEBSOCKET_SLOW_CONSUMER_POLICY", SLOW_CONSUMER_DROP
+        )
+
         # 统计信息
         self._stats = {
             "total_connections": 0,
@@ -376,6 +414,9 @@ class WebSocketConnectionManager:
             "bytes_received": 0,
             "errors_count": 0,
             "heartbeat_timeouts": 0,
+            "frames_sent": 0,
+            "slow_consumer_drops": 0,
+            "slow_consumer_disconnects": 0,
             "start_time": datetime.now(UTC),
         }
 
@@ -416,6 +457,7 @@ class WebSocketConnectionManager:
         all_connections = self.connection_pool.get_all_connections()
         for _run_id, connections in all_connections.items():
             for conn in connections:
+                await self._stop_writer(conn)
                 with contextlib.suppress(Exception):
                     await conn.websocket.close(code=1001, reason="服务器关闭")
 
@@ -425,8 +467,13 @@ class WebSocketConnectionManager:
         """生成连接ID"""
         return f"{run_id}_{id(websocket)}_{time.time_ns()}"
 
-    async def connect(self, websocket, run_id, user_id):
-        """建立WebSocket连接"""
+    async def connect(self, websocket, run_id, user_id, batch_mode=False, compression=None):
+        """建立WebSocket连接
+
+        Args:
+            batch_mode: 是否使用合并帧（log_batch）推送
+            compression: 合并帧压缩方式，仅支持 gzip
+        """
         # 确保管理器已启动
         if not self._started:
             await self.start()
@@ -443,10 +490,13 @@ class WebSocketConnectionManager:
                 run_id=run_id,
                 user_id=user_id,
                 websocket=websocket,
+                batch_mode=bool(batch_mode),
+                compression=compression if compression in SUPPORTED_COMPRESSIONS else None,
             )
 
-            # 添加到连接池
+            # 添加到连接池并启动写任务
             await self.connection_pool.add_connection(conn_info)
+            conn_info.writer_task = asyncio.create_task(self._connection_writer(conn_info))
 
             # 更新统计
             self._stats["total_connections"] += 1
@@ -469,6 +519,7 @@ class WebSocketConnectionManager:
         for conn in connections:
             if conn.websocket == websocket:
                 await self.connection_pool.remove_connection(run_id, conn.connection_id)
+                await self._stop_writer(conn)
                 self._stats["total_disconnections"] += 1
                 logger.info(f"WebSocket连接断开: {conn.connection_id}")
                 return
@@ -481,6 +532,7 @@ class WebSocketConnectionManager:
             await conn.websocket.close(code=4008, reason="心跳超时")
 
         await self.connection_pool.remove_connection(conn.run_id, conn.connection_id)
+        await self._stop_writer(conn)
         logger.warning(f"连接因心跳超时断开: {conn.connection_id}")
 
     async def _cleanup_loop(self):
@@ -507,6 +559,7 @@ class WebSocketConnectionManager:
                     with contextlib.suppress(Exception):
                         await conn.websocket.close(code=4009, reason="连接不活跃")
                     await self.connection_pool.remove_connection(run_id, conn.connection_id)
+                    await self._stop_writer(conn)
                     cleaned += 1
 
         if cleaned > 0:
@@ -543,51 +596,137 @@ class WebSocketConnectionManager:
         await self.message_queue.enqueue(run_id, message)
 
     async def _broadcast_batch(self, run_id, messages):
-        """批量广播消息（并发发送）"""
+        """批量广播消息：序列化一次后放入各连接的发送队列，不等待发送完成"""
         connections = self.connection_pool.get_connections(run_id)
         if not connections:
             return
 
         # 预序列化消息（避免重复序列化）
-        serialized_messages = []
-        total_bytes = 0
-        for message in messages:
-            msg_str = to_json(message)
-            serialized_messages.append(msg_str)
-            total_bytes += len(msg_str.encode("utf-8"))
-
-        # 并发发送到所有连接
-        async def send_to_connection(conn):
+        items = [(message, to_json(message)) for message in messages]
+
+        for conn in connections:
             if conn.state != ConnectionState.CONNECTED:
-                return None
-            try:
-                for msg_str in serialized_messages:
-                    await asyncio.wait_for(conn.websocket.send_text(msg_str), timeout=5.0)
-                conn.messages_sent += len(messages)
-                conn.bytes_sent += total_bytes
-                return None
-            except TimeoutError:
-                logger.warning(f"发送消息超时: {conn.connection_id}")
-                return conn
-            except Exception as e:
-                logger.debug(f"广播消息失败: {conn.connection_id}, {e}")
-                return conn
-
-        # 并发执行
-        tasks = [send_to_connection(conn) for conn in connections]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # 统计和清理
-        sent_count = 0
-        for result in results:
-            if result is None:
-                sent_count += 1
-            elif isinstance(result, ConnectionInfo):
-                await self.connection_pool.remove_connection(
-                    result.run_id, result.connection_id
-                )
+                continue
+            if not self._enqueue_for_connection(conn, items):
+                self._stats["slow_consumer_disconnects"] += 1
+                logger.warning(f"连接发送队列溢出，断开慢连接: {conn.connection_id}")
+                await self._close_connection(conn, code=4010, reason="消费过慢")
+
+    def _enqueue_for_connection(self, conn, items) -> bool:
+        """入队到单个连接，返回 False 表示按策略需要断开"""
+        queue = conn.send_queue
+        queue.extend(items)
+        overflow = len(queue) - self.send_queue_size
+        if overflow > 0:
+            if self.slow_consumer_policy == SLOW_CONSUMER_DISCONNECT:
+                return False
+            dropped = self._drop_oldest_logs(conn)
+            conn.dropped_messages += dropped
+            conn.pending_drop_notice += dropped
+            self._stats["slow_consumer_drops"] += dropped
+            if dropped and conn.dropped_messages == dropped:
+                logger.warning(f"连接消费过慢，开始丢弃日志: {conn.connection_id}")
+        conn.send_event.set()
+        return True
+
+    def _drop_oldest_logs(self, conn) -> int:
+        """丢弃最旧的日志行，降到队列上限的 3/4（留出余量避免每次入队都重建队列）"""
+        queue = conn.send_queue
+        target = self.send_queue_size * 3 // 4
+        excess = len(queue) - target
+        kept = deque()
+        dropped = 0
+        for item in queue:
+            if dropped < excess and item[0].get("type") == "log_line":
+                dropped += 1
+                continue
+            kept.append(item)
+        # 控制消息过多时兜底丢弃最旧的消息
+        while len(kept) > self.send_queue_size:
+            kept.popleft()
+            dropped += 1
+        conn.send_queue = kept
+        return dropped
+
+    async def _connection_writer(self, conn):
+        """单连接写任务：从发送队列取消息并发送"""
+        try:
+            while conn.state == ConnectionState.CONNECTED:
+                if not conn.send_queue:
+                    conn.send_event.clear()
+                    await conn.send_event.wait()
+                    continue
 
-        self._stats["messages_sent"] += len(messages) * sent_count
+                items = []
+                while conn.send_queue and len(items) < self.batch_max_messages:
+                    items.append(conn.send_queue.popleft())
+                await self._send_items(conn, items)
+        except asyncio.CancelledError:
+            raise
+        except TimeoutError:
+            logger.warning(f"发送消息超时: {conn.connection_id}")
+            await self._close_connection(conn, code=4008, reason="发送超时")
+        except Exception as e:
+            logger.debug(f"发送消息失败: {conn.connection_id}, {e}")
+            await self._close_connection(conn, code=1011, reason="发送失败")
+
+    async def _send_items(self, conn, items):
+        """发送一批消息：合并帧模式打包为一帧，否则逐条发送"""
+        if conn.pending_drop_notice:
+            notice = {
+                "type": "logs_dropped",
+                "run_id": conn.run_id,
+                "count": conn.pending_drop_notice,
+                "timestamp": datetime.now(UTC).isoformat(),
+            }
+            items.insert(0, (notice, to_json(notice)))
+            conn.pending_drop_notice = 0
+
+        websocket = conn.websocket
+        sent_bytes = 0
+        if conn.batch_mode:
+            # 直接拼接已序列化的消息，避免按连接重复序列化
+            frame = (
+                f'{{"type":"{BATCH_FRAME_TYPE}","run_id":{json.dumps(conn.run_id)},'
+                f'"count":{len(items)},"messages":[{",".join(text for _, text in items)}]}}'
+            )
+            data = frame.encode("utf-8")
+            if conn.compression == "gzip" and len(data) >= COMPRESS_MIN_BYTES:
+                data = gzip.compress(data, compresslevel=5)
+                await asyncio.wait_for(websocket.send_bytes(data), timeout=self.send_timeout)
+            else:
+                await asyncio.wait_for(websocket.send_text(frame), timeout=self.send_timeout)
+            sent_bytes = len(data)
+            frames = 1
+        else:
+            for _, text in items:
+                await asyncio.wait_for(websocket.send_text(text), timeout=self.send_timeout)
+                sent_bytes += len(text.encode("utf-8"))
+            frames = len(items)
+
+        conn.messages_sent += len(items)
+        conn.bytes_sent += sent_bytes
+        conn.frames_sent += frames
+        self._stats["messages_sent"] += len(items)
+        self._stats["bytes_sent"] += sent_bytes
+        self._stats["frames_sent"] += frames
+
+    async def _close_connection(self, conn, code, reason):
+        """关闭并移除连接"""
+        await self.connection_pool.remove_connection(conn.run_id, conn.connection_id)
+        await self._stop_writer(conn)
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(conn.websocket.close(code=code, reason=reason), timeout=5.0)
+
+    async def _stop_writer(self, conn):
+        """停止连接写任务"""
+        task = conn.writer_task
+        conn.writer_task = None
+        if task and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        conn.send_queue.clear()
 
     async def _send_direct(self, websocket, message):
         """直接发送消息"""
@@ -672,6 +811,11 @@ class WebSocketConnectionManager:
             "active_connections": self.connection_pool.get_total_connection_count(),
             "active_runs": len(self.connection_pool.get_all_connections()),
             "queued_messages": self.message_queue.get_total_queue_size(),
+            "connection_queued_messages": sum(
+                len(conn.send_queue)
+                for connections in self.connection_pool.get_all_connections().values()
+                for conn in connections
+            ),
             "dropped_messages": self.message_queue.get_dropped_count(),
             "messages_per_second": round(messages_per_second, 2),
             "bytes_per_second": round(bytes_per_second, 2),
@@ -22,7 +22,7 @@ from antcode_web_api.websockets.websocket_connection_manager import websocket_ma
 class WebSocketLogService:
     """WebSocket日志服务 - 生产环境优化版本"""
 
-    async def connect(self, websocket, run_id, token):
+    async def connect(self, websocket, run_id, token, batch_mode=False, compression=None):
         """处理WebSocket连接"""
         connection_id: str | None = None
 
@@ -49,7 +49,13 @@ class WebSocketLogService:
                 return
 
             # 3. 建立连接
-            connection_id = await websocket_manager.connect(websocket, run_id, user_id)
+            connection_id = await websocket_manager.connect(
+                websocket,
+                run_id,
+                user_id,
+                batch_mode=batch_mode,
+                compression=compression,
+            )
             logger.info(f"WebSocket连接成功: {connection_id}")
 
             # 4. 发送当前执行状态（让前端立即获取最新状态）
@@ -173,6 +173,10 @@ class Lifecycle:
                 await container.engine.stop(grace_period=grace_period)
                 logger.info("引擎已停止")
 
+            # 落盘项目缓存索引
+            if container.project_fetcher:
+                await container.project_fetcher.close()
+
             # 停止心跳
             if container.heartbeat_reporter:
                 await container.heartbeat_reporter.stop()
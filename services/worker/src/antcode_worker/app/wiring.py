@@ -114,7 +114,7 @@ def create_container(config: Any) -> Container:
 
     # 8. 创建心跳上报器
     heartbeat_reporter = _create_heartbeat_reporter(
-        config, transport, metrics_collector
+        config, transport, metrics_collector, runtime_manager
     )
     container.register("heartbeat_reporter", heartbeat_reporter)
 
@@ -138,7 +138,9 @@ def create_container(config: Any) -> Container:
     container.register("engine", engine)
 
     # 11. 创建可观测性服务器
-    observability_server = _create_observability_server(config, transport, engine)
+    observability_server = _create_observability_server(
+        config, transport, engine, project_fetcher
+    )
     container.register("observability_server", observability_server)
 
     container.mark_initialized()
@@ -554,6 +556,8 @@ def _create_runtime_manager(config: Any) -> Any:
         venvs_dir=venvs_dir,
         locks_dir=locks_dir,
         uv_cache_dir=uv_cache_dir,
+        prewarm_concurrency=int(getattr(config, "runtime_prewarm_concurrency", 1) or 0),
+        prewarm_interval=float(getattr(config, "runtime_prewarm_interval", 60) or 0),
     )
     uv_manager.set_venvs_dir(venvs_dir)
     return RuntimeManager(manager_config)
@@ -601,11 +605,12 @@ def _create_log_manager(config: Any, transport: Any) -> Any:
     # WAL 目录用于高可靠归档
     wal_dir = getattr(config, "wal_dir", None) or os.path.join(logs_dir, "wal")
     spool_dir = getattr(config, "spool_dir", None) or os.path.join(logs_dir, "spool")
+    segment_format = getattr(config, "log_segment_format", "json") or "json"
 
     log_config = LogManagerConfig(
         wal_dir=wal_dir,
-        spool_config=SpoolConfig(spool_dir=spool_dir),
-        archive_config=ArchiveConfig(wal_dir=wal_dir),
+        spool_config=SpoolConfig(spool_dir=spool_dir, format=segment_format),
+        archive_config=ArchiveConfig(wal_dir=wal_dir, wal_format=segment_format),
         enable_archive=True,
     )
 
@@ -640,7 +645,9 @@ def _create_metrics_collector(config: Any) -> Any:
     return init_metrics_collector(max_slots=max_concurrent)
 
 
-def _create_heartbeat_reporter(config: Any, transport: Any, metrics_collector: Any) -> Any:
+def _create_heartbeat_reporter(
+    config: Any, transport: Any, metrics_collector: Any, runtime_manager: Any = None
+) -> Any:
     """创建心跳上报器"""
     from antcode_worker.heartbeat.reporter import HeartbeatReporter
 
@@ -673,6 +680,7 @@ def _create_heartbeat_reporter(config: Any, transport: Any, metrics_collector: A
         host=host,
         port=port,
         region=region,
+        runtime_manager=runtime_manager,
     )
 
 
@@ -704,6 +712,7 @@ def _create_engine(
         max_concurrent=max_concurrent,
         memory_limit_mb=getattr(config, "task_memory_limit_mb", 0),
         cpu_limit_seconds=getattr(config, "task_cpu_time_limit_sec", 0),
+        prefetch_window=getattr(config, "task_prefetch_window", 0),
     )
 
     # 绑定指标采集器
@@ -752,7 +761,8 @@ def _create_project_fetcher(config: Any) -> Any:
 
     data_dir = getattr(config, "data_dir", str(DATA_ROOT))
     cache_dir = getattr(config, "projects_dir", None) or os.path.join(data_dir, "projects")
-    cache = ProjectCache(cache_dir=cache_dir)
+    max_mb = int(getattr(config, "project_cache_max_mb", 0) or 0)
+    cache = ProjectCache(cache_dir=cache_dir, max_bytes=max_mb * 1024 * 1024)
     return ArtifactFetcher(cache=cache)
 
 
@@ -768,7 +778,9 @@ def _create_artifact_manager(config: Any) -> Any:
     return ArtifactManager(storage_dir=storage_dir)
 
 
-def _create_observability_server(config: Any, transport: Any, engine: Any) -> Any:
+def _create_observability_server(
+    config: Any, transport: Any, engine: Any, project_fetcher: Any = None
+) -> Any:
     """创建可观测性服务器"""
     from antcode_worker.observability.health import HealthResult, HealthStatus
     from antcode_worker.observability.server import ObservabilityServer
@@ -791,4 +803,7 @@ def _create_observability_server(config: Any, transport: Any, engine: Any) -> An
     server.register_health_check("transport", transport_check)
     server.register_health_check("slots", slots_check)
 
+    if project_fetcher is not None:
+        server.metrics_collector.register_source("project_cache", project_fetcher.get_stats)
+
     return server
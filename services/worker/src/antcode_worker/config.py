@@ -155,6 +155,10 @@ def _load_env_config() -> dict[str, Any]:
     if max_concurrent is not None:
         env_config["max_concurrent_tasks"] = max_concurrent
 
+    prefetch_window = _get_env_int("WORKER_TASK_PREFETCH_WINDOW", "ANTCODE_TASK_PREFETCH_WINDOW")
+    if prefetch_window is not None:
+        env_config["task_prefetch_window"] = prefetch_window
+
     data_dir = _get_env_value("WORKER_DATA_DIR", "ANTCODE_WORKER_DATA_DIR")
     if data_dir:
         env_config["data_dir"] = data_dir
@@ -163,6 +167,18 @@ def _load_env_config() -> dict[str, Any]:
     if credential_store:
         env_config["credential_store"] = credential_store
 
+    project_cache_max_mb = _get_env_int("WORKER_PROJECT_CACHE_MAX_MB")
+    if project_cache_max_mb is not None:
+        env_config["project_cache_max_mb"] = project_cache_max_mb
+
+    prewarm_concurrency = _get_env_int("WORKER_RUNTIME_PREWARM_CONCURRENCY")
+    if prewarm_concurrency is not None:
+        env_config["runtime_prewarm_concurrency"] = prewarm_concurrency
+
+    prewarm_interval = _get_env_int("WORKER_RUNTIME_PREWARM_INTERVAL")
+    if prewarm_interval is not None:
+        env_config["runtime_prewarm_interval"] = prewarm_interval
+
     log_retention_days = _get_env_int("WORKER_LOG_RETENTION_DAYS")
     if log_retention_days is not None:
         env_config["log_retention_days"] = log_retention_days
@@ -175,6 +191,10 @@ def _load_env_config() -> dict[str, Any]:
     if log_cleanup_enabled is not None:
         env_config["log_cleanup_enabled"] = log_cleanup_enabled
 
+    log_segment_format = _get_env_value("WORKER_LOG_SEGMENT_FORMAT")
+    if log_segment_format:
+        env_config["log_segment_format"] = log_segment_format.lower()
+
     # Worker 安装 Key（用于快速注册）
     worker_key = _get_env_value("ANTCODE_WORKER_KEY", "WORKER_KEY")
     if worker_key:
@@ -221,6 +241,7 @@ class WorkerConfig:
     task_timeout: int = 3600  # 任务默认超时时间（秒）
     task_cpu_time_limit_sec: int = 0  # 单任务 CPU 时间上限（秒，0=自动）
     task_memory_limit_mb: int = 0  # 单任务内存上限（MB，0=自动）
+    task_prefetch_window: int = 0  # 本地预取窗口（排队等待的任务上限，0=与并发数一致）
     auto_resource_limit: bool = True  # 是否启用自适应资源限制
 
     # 传输模式配置
@@ -243,10 +264,18 @@ class WorkerConfig:
     # 存储配置
     data_dir: str = field(default_factory=lambda: str(DATA_ROOT))
 
+    # 项目缓存配置
+    project_cache_max_mb: int = 0  # 项目缓存磁盘预算（MB，0=不限制）
+
+    # 运行时预热配置
+    runtime_prewarm_concurrency: int = 1  # 后台预热最大并发构建数（0=禁用预热）
+    runtime_prewarm_interval: int = 60  # 按任务历史统计热点运行时的间隔（秒，0=只接受下发）
+
     # 日志清理配置
     log_retention_days: int = 7  # Worker 端日志保留天数（默认 7 天）
     log_cleanup_interval_hours: int = 24  # 日志清理间隔（小时）
     log_cleanup_enabled: bool = True  # 是否启用日志清理
+    log_segment_format: str = "json"  # WAL/Spool 文件格式: "json" 或 "binary"
 
     # 流控配置
     flow_control_enabled: bool = False  # 是否启用流控
@@ -305,6 +334,7 @@ class WorkerConfig:
             "task_timeout": self.task_timeout,
             "task_cpu_time_limit_sec": self.task_cpu_time_limit_sec,
             "task_memory_limit_mb": self.task_memory_limit_mb,
+            "task_prefetch_window": self.task_prefetch_window,
             "auto_resource_limit": self.auto_resource_limit,
             "transport_mode": self.transport_mode,
             "redis_url": self.redis_url,
@@ -314,9 +344,13 @@ class WorkerConfig:
             "api_base_url": self.api_base_url,
             "credential_store": self.credential_store,
             "data_dir": self.data_dir,
+            "project_cache_max_mb": self.project_cache_max_mb,
+            "runtime_prewarm_concurrency": self.runtime_prewarm_concurrency,
+            "runtime_prewarm_interval": self.runtime_prewarm_interval,
             "log_retention_days": self.log_retention_days,
             "log_cleanup_interval_hours": self.log_cleanup_interval_hours,
             "log_cleanup_enabled": self.log_cleanup_enabled,
+            "log_segment_format": self.log_segment_format,
             "flow_control_enabled": self.flow_control_enabled,
             "flow_control_strategy": self.flow_control_strategy,
             "flow_control_rate": self.flow_control_rate,
@@ -337,6 +371,7 @@ class WorkerConfig:
             "task_timeout": self.task_timeout,
             "task_cpu_time_limit_sec": self.task_cpu_time_limit_sec,
             "task_memory_limit_mb": self.task_memory_limit_mb,
+            "task_prefetch_window": self.task_prefetch_window,
             "transport_mode": self.transport_mode,
             "redis_url": self.redis_url,
             "redis_namespace": self.redis_namespace,
@@ -345,9 +380,13 @@ class WorkerConfig:
             "api_base_url": self.api_base_url,
             "credential_store": self.credential_store,
             "data_dir": self.data_dir,
+            "project_cache_max_mb": self.project_cache_max_mb,
+            "runtime_prewarm_concurrency": self.runtime_prewarm_concurrency,
+            "runtime_prewarm_interval": self.runtime_prewarm_interval,
             "log_retention_days": self.log_retention_days,
             "log_cleanup_interval_hours": self.log_cleanup_interval_hours,
             "log_cleanup_enabled": self.log_cleanup_enabled,
+            "log_segment_format": self.log_segment_format,
             "flow_control_enabled": self.flow_control_enabled,
             "flow_control_strategy": self.flow_control_strategy,
             "flow_control_rate": self.flow_control_rate,
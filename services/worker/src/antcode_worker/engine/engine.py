@@ -43,6 +43,7 @@ class Engine:
         max_concurrent: int = 5,
         memory_limit_mb: int = 0,
         cpu_limit_seconds: int = 0,
+        prefetch_window: int = 0,
     ):
         self._transport = transport
         self._executor = executor
@@ -54,6 +55,8 @@ class Engine:
         self._artifact_manager = artifact_manager
         self._policies = policies or default_policies()
         self._max_concurrent = max_concurrent
+        # 本地预取窗口：队列中等待执行的任务上限（0=与并发数一致）
+        self._prefetch_window = max(0, prefetch_window)
 
         self._scheduler = Scheduler(max_queue_size=max_concurrent * 2)
         self._state_manager = StateManager()
@@ -148,7 +151,7 @@ class Engine:
         logger.info("引擎已停止")
 
     async def _poll_loop(self) -> None:
-        """任务轮询循环"""
+        """任务轮询循环（按空闲容量批量预取）"""
         while self._polling:
             flow_acquired = False
             try:
@@ -157,8 +160,9 @@ class Engine:
                     continue
 
                 # 检查是否有空间
-                if self._scheduler.is_full:
-                    await asyncio.sleep(1)
+                batch_size = self._prefetch_batch_size()
+                if batch_size <= 0:
+                    await asyncio.sleep(0.2)
                     continue
 
                 if self._flow_controller:
@@ -169,48 +173,16 @@ class Engine:
                         await asyncio.sleep(0.1)
                         continue
 
-                # 拉取任务
-                task_msg = await self._transport.poll_task(
-                    timeout=self._policies.timeout.poll_timeout
+                # 拉取任务（一次往返拉取一批）
+                task_msgs = await self._transport.poll_tasks(
+                    max_count=batch_size,
+                    timeout=self._policies.timeout.poll_timeout,
                 )
                 if self._flow_controller:
                     self._flow_controller.on_success()
 
-                if task_msg is None:
-                    continue
-
-                # 创建运行上下文
-                runtime_env_name = None
-                environment = getattr(task_msg, "environment", {}) or {}
-                if isinstance(environment, dict):
-                    runtime_env_name = environment.get("ANTCODE_RUNTIME_ENV")
-                labels = {}
-                if runtime_env_name:
-                    labels["runtime_env_name"] = runtime_env_name
-                run_id = getattr(task_msg, "run_id", None) or self._generate_run_id(task_msg.task_id)
-                context = RunContext(
-                    run_id=run_id,
-                    task_id=task_msg.task_id,
-                    project_id=task_msg.project_id,
-                    timeout_seconds=task_msg.timeout,
-                    memory_limit_mb=self._policies.resource.memory_limit_mb,
-                    cpu_limit_seconds=self._policies.resource.cpu_limit_seconds,
-                    priority=task_msg.priority,
-                    labels=labels,
-                    receipt=getattr(task_msg, "receipt", None),
-                )
-
-                # 添加到状态管理
-                await self._state_manager.add(run_id, task_msg.task_id, receipt=task_msg.receipt)
-
-                # 入队
-                await self._scheduler.enqueue(
-                    run_id=run_id,
-                    data=(context, task_msg),
-                    priority=task_msg.priority,
-                )
-
-                logger.info(f"任务入队: {run_id}")
+                for task_msg in task_msgs:
+                    await self._enqueue_task(task_msg)
 
             except asyncio.CancelledError:
                 break
@@ -223,6 +195,45 @@ class Engine:
                 if self._flow_controller and flow_acquired:
                     await self._flow_controller.release()
 
+    def _prefetch_batch_size(self) -> int:
+        """计算本轮可预取的任务数"""
+        window = self._prefetch_window or self._max_concurrent
+        return min(self._scheduler.free_slots, window - self._scheduler.size)
+
+    async def _enqueue_task(self, task_msg: Any) -> None:
+        """创建运行上下文并入队"""
+        runtime_env_name = None
+        environment = getattr(task_msg, "environment", {}) or {}
+        if isinstance(environment, dict):
+            runtime_env_name = environment.get("ANTCODE_RUNTIME_ENV")
+        labels = {}
+        if runtime_env_name:
+            labels["runtime_env_name"] = runtime_env_name
+        run_id = getattr(task_msg, "run_id", None) or self._generate_run_id(task_msg.task_id)
+        context = RunContext(
+            run_id=run_id,
+            task_id=task_msg.task_id,
+            project_id=task_msg.project_id,
+            timeout_seconds=task_msg.timeout,
+            memory_limit_mb=self._policies.resource.memory_limit_mb,
+            cpu_limit_seconds=self._policies.resource.cpu_limit_seconds,
+            priority=task_msg.priority,
+            labels=labels,
+            receipt=getattr(task_msg, "receipt", None),
+        )
+
+        # 添加到状态管理
+        await self._state_manager.add(run_id, task_msg.task_id, receipt=task_msg.receipt)
+
+        # 入队
+        await self._scheduler.enqueue(
+            run_id=run_id,
+            data=(context, task_msg),
+            priority=task_msg.priority,
+        )
+
+        logger.info(f"任务入队: {run_id}")
+
     async def _control_loop(self) -> None:
         """控制通道轮询（取消/kill）"""
         while self._running:
@@ -381,6 +392,24 @@ class Engine:
                     }
                 elif action == "get_platform_info":
                     result_data = await uv_manager.get_platform_info_async()
+                elif action == "prewarm":
+                    if not self._runtime_manager:
+                        raise RuntimeError("运行时管理器不可用")
+                    from antcode_worker.runtime.spec import RuntimeSpec as RuntimeSpecV2
+
+                    specs = data.get("specs") or []
+                    if not isinstance(specs, list) or not specs:
+                        raise RuntimeError("specs 不能为空")
+                    result_data = self._runtime_manager.prewarm(
+                        [RuntimeSpecV2.from_dict(spec) for spec in specs]
+                    )
+                elif action == "list_warm":
+                    if not self._runtime_manager:
+                        raise RuntimeError("运行时管理器不可用")
+                    result_data = {
+                        "hashes": self._runtime_manager.warm_hashes(),
+                        "prewarm": self._runtime_manager.get_stats().get("prewarm"),
+                    }
                 else:
                     raise RuntimeError(f"未知运行时操作: {action}")
         except Exception as e:
@@ -428,6 +457,7 @@ class Engine:
         started_at = datetime.now()
         log_manager = None
         runtime_handle = None
+        project_path = None
 
         try:
             # 转换状态
@@ -436,15 +466,16 @@ class Engine:
             # 生成任务 payload
             payload = self._build_payload(task_msg)
 
-            # 下载/缓存项目
+            # 下载/缓存项目（任务结束前保持 pin，避免被缓存淘汰删除）
             if self._project_fetcher and payload.download_url:
-                payload.project_path = await self._project_fetcher.fetch(
+                project_path = await self._project_fetcher.fetch(
                     project_id=context.project_id,
                     download_url=payload.download_url,
                     file_hash=payload.file_hash,
                     is_compressed=payload.is_compressed,
                     entry_point=payload.entry_point,
                 )
+                payload.project_path = project_path
 
             # 准备运行时环境
             runtime_handle = await self._prepare_runtime(context)
@@ -531,6 +562,8 @@ class Engine:
                 await log_manager.stop()
             if runtime_handle and self._runtime_manager:
                 await self._runtime_manager.release(runtime_handle)
+            if project_path and self._project_fetcher:
+                await self._project_fetcher.release(project_path)
 
     async def _report_result(self, context: RunContext, result: ExecResult) -> None:
         """上报结果（幂等）"""
@@ -662,6 +695,7 @@ class Engine:
             "polling": self._polling,
             "queue_size": self._scheduler.size,
             "max_concurrent": self._max_concurrent,
+            "prefetch_window": self._prefetch_window or self._max_concurrent,
         }
 
     def _generate_run_id(self, task_id: str) -> str:
@@ -719,6 +753,7 @@ class Engine:
         max_concurrent = config.get("max_concurrent_tasks")
         memory_limit_mb = config.get("task_memory_limit_mb")
         cpu_limit_seconds = config.get("task_cpu_time_limit_sec")
+        prefetch_window = config.get("task_prefetch_window")
 
         if max_concurrent is not None:
             try:
@@ -740,6 +775,12 @@ class Engine:
             except Exception:
                 logger.warning(f"无效的 task_cpu_time_limit_sec: {cpu_limit_seconds}")
 
+        if prefetch_window is not None:
+            try:
+                self._prefetch_window = max(0, int(prefetch_window))
+            except Exception:
+                logger.warning(f"无效的 task_prefetch_window: {prefetch_window}")
+
     async def _resize_workers(self, new_max: int) -> None:
         """动态调整并发 worker 数量"""
         diff = new_max - self._max_concurrent
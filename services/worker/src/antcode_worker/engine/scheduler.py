@@ -215,6 +215,11 @@ class Scheduler:
         """队列大小"""
         return len(self._item_map)
 
+    @property
+    def free_slots(self) -> int:
+        """剩余容量"""
+        return max(0, self._max_size - len(self._item_map))
+
     @property
     def is_full(self) -> bool:
         """队列是否已满"""
@@ -30,12 +30,18 @@ class LogSink(Protocol):
     日志接收器协议
 
     定义日志输出的接口，用于解耦执行器和日志系统。
+    实现 write_batch 的接收器会收到按读取块聚合的批量条目，
+    未实现时执行器退化为逐条 write。
     """
 
     async def write(self, entry: LogEntry) -> None:
         """写入日志条目"""
         ...
 
+    async def write_batch(self, entries: list[LogEntry]) -> None:
+        """批量写入日志条目（可选）"""
+        ...
+
     async def flush(self) -> None:
         """刷新缓冲区"""
         ...
@@ -62,6 +68,10 @@ class ExecutorConfig:
     max_output_lines: int = 100000
     max_output_bytes: int = 100 * 1024 * 1024  # 100MB
 
+    # 输出读取
+    output_read_chunk: int = 64 * 1024  # 单次读取块大小
+    max_line_bytes: int = 1024 * 1024  # 超长行按此长度截断成多条
+
 
 @dataclass
 class ExecutorStats:
@@ -315,6 +325,10 @@ class NoOpLogSink:
         """丢弃日志"""
         pass
 
+    async def write_batch(self, entries: list[LogEntry]) -> None:
+        """丢弃日志"""
+        pass
+
     async def flush(self) -> None:
         """无操作"""
         pass
@@ -349,6 +363,11 @@ class CallbackLogSink:
         except Exception as e:
             logger.debug(f"日志回调失败: {e}")
 
+    async def write_batch(self, entries: list[LogEntry]) -> None:
+        """批量写入日志（逐条回调）"""
+        for entry in entries:
+            await self.write(entry)
+
     async def flush(self) -> None:
         """刷新（无操作）"""
         pass
@@ -399,6 +418,23 @@ class BufferedLogSink:
         if should_flush:
             await self.flush()
 
+    async def write_batch(self, entries: list[LogEntry]) -> None:
+        """批量写入日志"""
+        if not entries:
+            return
+
+        async with self._lock:
+            self._buffer.extend(entries)
+
+            should_flush = (
+                len(self._buffer) >= self._max_buffer_size
+                or (datetime.now() - self._last_flush).total_seconds()
+                >= self._flush_interval
+            )
+
+        if should_flush:
+            await self.flush()
+
     async def flush(self) -> None:
         """刷新缓冲区"""
         async with self._lock:
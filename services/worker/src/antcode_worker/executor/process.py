@@ -12,7 +12,7 @@ import os
 import signal
 import time
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any
 
 from loguru import logger
@@ -292,49 +292,84 @@ class ProcessExecutor(BaseExecutor):
         stdout_count = 0
         stderr_count = 0
 
+        chunk_size = self.config.output_read_chunk
+        max_line_bytes = self.config.max_line_bytes
+        write_batch = getattr(log_sink, "write_batch", None)
+
+        # 墙钟基准 + 单调时钟偏移：每个读取块只取一次时间
+        wall_base = datetime.now()
+        mono_base = time.monotonic()
+
+        async def emit(entries: list[LogEntry]) -> None:
+            if write_batch is not None:
+                await write_batch(entries)
+            else:
+                for entry in entries:
+                    await log_sink.write(entry)
+
         async def read_stream(
             stream: asyncio.StreamReader, stream_type: str
         ) -> int:
-            """读取单个流"""
+            """按块读取单个流，在 memoryview 上切分行后批量写入"""
             nonlocal stdout_count, stderr_count
             count = 0
-
-            while True:
-                try:
-                    line = await stream.readline()
-                    if not line:
-                        break
+            log_stream = LogStream.STDOUT if stream_type == "stdout" else LogStream.STDERR
+            pending = bytearray()
+
+            def split_lines(final: bool) -> list[LogEntry]:
+                """切分 pending 中的完整行，final 时输出剩余的不完整行"""
+                nonlocal count
+                timestamp = wall_base + timedelta(seconds=time.monotonic() - mono_base)
+                entries: list[LogEntry] = []
+                data = pending
+                view = memoryview(data)
+                size = len(data)
+                start = 0
+                while start < size:
+                    end = data.find(b"\n", start)
+                    if end < 0:
+                        if not final and size - start < max_line_bytes:
+                            break
+                        end = min(size, start + max_line_bytes)
+                        next_start = end
+                    else:
+                        next_start = end + 1
 
                     count += 1
-
-                    # 检查行数限制
-                    if count > max_lines:
-                        if count == max_lines + 1:
-                            logger.warning(
-                                f"任务 {run_id} {stream_type} 输出行数超限 ({max_lines})"
+                    if count <= max_lines:
+                        seq_counter[stream_type] += 1
+                        entries.append(
+                            LogEntry(
+                                run_id=run_id,
+                                stream=log_stream,
+                                content=str(view[start:end], "utf-8", "replace").rstrip(),
+                                seq=seq_counter[stream_type],
+                                timestamp=timestamp,
                             )
-                        continue
-
-                    # 解码内容
-                    content = line.decode("utf-8", errors="replace").rstrip()
-
-                    # 更新序列号
-                    seq_counter[stream_type] += 1
-                    seq = seq_counter[stream_type]
-
-                    # 创建日志条目
-                    entry = LogEntry(
-                        run_id=run_id,
-                        stream=LogStream.STDOUT
-                        if stream_type == "stdout"
-                        else LogStream.STDERR,
-                        content=content,
-                        seq=seq,
-                        timestamp=datetime.now(),
-                    )
+                        )
+                    elif count == max_lines + 1:
+                        logger.warning(
+                            f"任务 {run_id} {stream_type} 输出行数超限 ({max_lines})"
+                        )
+                    start = next_start
 
-                    # 写入日志
-                    await log_sink.write(entry)
+                view.release()
+                # 保留未完成的行
+                del pending[:start]
+                return entries
+
+            while True:
+                try:
+                    chunk = await stream.read(chunk_size)
+                    final = not chunk
+                    pending.extend(chunk)
+
+                    # 超过行数限制后继续读取（避免子进程阻塞在管道上），但不再写入
+                    entries = split_lines(final) if pending else []
+                    if entries:
+                        await emit(entries)
+                    if final:
+                        break
 
                 except asyncio.CancelledError:
                     # 任务被取消，正常退出
@@ -292,6 +292,7 @@ class HeartbeatReporter:
         host: str = "",
         port: int = 0,
         region: str = "",
+        runtime_manager: Any = None,
     ):
         self._transport = transport
         self._worker_id = worker_id
@@ -310,6 +311,7 @@ class HeartbeatReporter:
         self._host = host
         self._port = port
         self._region = region
+        self._runtime_manager = runtime_manager
         self._on_disconnect: Callable[[], Any] | None = None
         self._on_reconnect: Callable[[], Any] | None = None
 
@@ -645,12 +647,22 @@ class HeartbeatReporter:
         )
 
     def _get_capabilities(self) -> dict:
-        """获取Worker能力"""
+        """获取Worker能力（含已就绪的运行时哈希，主控据此优先分发）"""
         try:
             detector = get_capability_detector()
-            return detector.detect_all()
+            capabilities = dict(detector.detect_all())
         except Exception:
-            return {}
+            capabilities = {}
+
+        if self._runtime_manager is not None:
+            try:
+                capabilities["runtime_warm"] = {
+                    "enabled": True,
+                    "hashes": self._runtime_manager.warm_hashes(),
+                }
+            except Exception as e:
+                logger.debug(f"获取已就绪运行时失败: {e}")
+        return capabilities
 
 
 # 全局实例
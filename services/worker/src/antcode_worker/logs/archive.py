@@ -49,6 +49,7 @@ class ArchiveConfig:
     # WAL 配置
     wal_dir: str = _DEFAULT_WAL_DIR
     sync_on_write: bool = False
+    wal_format: str = "json"  # json / binary
     
     # 压缩配置
     compression_level: int = 6
@@ -189,6 +190,7 @@ class LogArchiver:
         wal_config = WALConfig(
             wal_dir=self._config.wal_dir,
             sync_on_write=self._config.sync_on_write,
+            format=self._config.wal_format,
         )
         
         # 组件
@@ -244,6 +246,21 @@ class LogArchiver:
             self._entries_written += 1
             self._bytes_written += len(content.encode("utf-8"))
 
+    async def write_many(self, records: list[tuple[str, str, str]]) -> None:
+        """
+        批量写入日志
+
+        Args:
+            records: (log_type, content, level) 列表
+        """
+        if not self._started or not records:
+            return
+
+        seq = await self._wal_writer.write_many(records)
+        if seq > 0:
+            self._entries_written += len(records)
+            self._bytes_written += sum(len(content.encode("utf-8")) for _, content, _ in records)
+
     async def archive(self) -> list[ArchiveResult]:
         """
         执行归档
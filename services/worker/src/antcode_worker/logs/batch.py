@@ -7,6 +7,7 @@ Requirements: 9.5
 """
 
 import asyncio
+import math
 from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass
@@ -198,6 +199,37 @@ class BatchSender:
         
         return True
 
+    async def write_batch(self, entries: list[LogEntry]) -> int:
+        """
+        批量写入日志条目到队列（只检查一次 backpressure、获取一次队列锁）
+
+        与逐条 write 一致：队列达到阻塞（或 drop_on_critical 时的临界）水位后，
+        其余条目丢弃。
+
+        Args:
+            entries: 日志条目列表
+
+        Returns:
+            成功入队的条目数
+        """
+        if not self._running or not entries:
+            return 0
+
+        await self._update_backpressure_state()
+
+        threshold = 1.0
+        if self._config.drop_on_critical:
+            threshold = self._config.critical_threshold
+        capacity = math.ceil(self._config.max_queue_size * threshold)
+
+        async with self._queue_lock:
+            accepted = entries[:max(0, capacity - len(self._queue))]
+            self._queue.extend(accepted)
+            self._total_queued += len(accepted)
+
+        self._total_dropped += len(entries) - len(accepted)
+        return len(accepted)
+
     async def flush(self) -> None:
         """刷新队列"""
         await self._flush_remaining()
@@ -359,6 +391,10 @@ class BatchSink:
         """写入日志条目"""
         return await self._sender.write(entry)
 
+    async def write_batch(self, entries: list[LogEntry]) -> int:
+        """批量写入日志条目"""
+        return await self._sender.write_batch(entries)
+
     async def flush(self) -> None:
         """刷新"""
         await self._sender.flush()
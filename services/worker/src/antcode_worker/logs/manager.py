@@ -292,6 +292,47 @@ class LogManager:
         if self._batch:
             await self._batch.write(entry)
 
+    async def _dispatch_batch(self, entries: list[LogEntry]) -> None:
+        """批量分发日志条目：每个下游整批调用一次，缺少批量接口时逐条写入"""
+        kept = []
+        for entry in entries:
+            if self._should_drop(entry):
+                self._total_dropped += 1
+                if self._on_log_dropped:
+                    self._on_log_dropped(entry, "backpressure")
+            else:
+                kept.append(entry)
+        if not kept:
+            return
+
+        # 写入 WAL（高可靠归档）
+        if self._archiver:
+            records = [
+                (
+                    entry.stream.value,
+                    entry.content,
+                    "ERROR" if entry.stream == LogStream.STDERR else "INFO",
+                )
+                for entry in kept
+            ]
+            write_many = getattr(self._archiver, "write_many", None)
+            if write_many is not None:
+                await write_many(records)
+            else:
+                for log_type, content, level in records:
+                    await self._archiver.write(log_type=log_type, content=content, level=level)
+
+        # 发送到 realtime（Redis Stream）与 batch
+        for sink in (self._realtime, self._batch):
+            if not sink:
+                continue
+            write_batch = getattr(sink, "write_batch", None)
+            if write_batch is not None:
+                await write_batch(kept)
+            else:
+                for entry in kept:
+                    await sink.write(entry)
+
     async def _wait_dispatch_tasks(self) -> None:
         """等待已创建的分发任务完成"""
         if not self._dispatch_tasks:
@@ -369,6 +410,28 @@ class LogManager:
         # 分发
         await self._dispatch_entry(entry)
 
+    async def write_batch(self, entries: list[LogEntry]) -> None:
+        """
+        批量写入日志条目（LogSink 协议）
+
+        Args:
+            entries: 日志条目列表
+        """
+        if not self._running or not entries:
+            return
+
+        if self._spool:
+            await self._spool.write_many(entries)
+
+        self._total_entries += len(entries)
+        for entry in entries:
+            if entry.stream == LogStream.STDOUT:
+                self._stdout_lines += 1
+            elif entry.stream == LogStream.STDERR:
+                self._stderr_lines += 1
+
+        await self._dispatch_batch(entries)
+
     async def write_log(
         self,
         content: str,
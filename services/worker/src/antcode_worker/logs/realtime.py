@@ -24,6 +24,10 @@ class TransportProtocol(Protocol):
         """发送日志"""
         ...
 
+    async def send_log_batch(self, logs: list[Any]) -> bool:
+        """批量发送日志"""
+        ...
+
     @property
     def is_connected(self) -> bool:
         """是否已连接"""
@@ -154,8 +158,49 @@ class RealtimeSender:
         # 发送
         return await self._send_with_retry(entry)
 
+    async def write_batch(self, entries: list[LogEntry]) -> int:
+        """
+        批量发送日志条目
+
+        整批只检查一次连接、预约一次速率额度，并通过一次 send_log_batch 发送；
+        超出速率额度的条目丢弃。
+
+        Args:
+            entries: 日志条目列表
+
+        Returns:
+            发送成功的条目数
+        """
+        if not self._enabled or not self._running or not entries:
+            return 0
+
+        if not self.is_connected:
+            self._total_dropped += len(entries)
+            logger.debug(f"[{self.run_id}] 实时发送跳过: 未连接")
+            return 0
+
+        allowed = await self._reserve_rate(len(entries))
+        if allowed < len(entries):
+            self._total_dropped += len(entries) - allowed
+            logger.debug(f"[{self.run_id}] 实时发送跳过 {len(entries) - allowed} 条: 速率限制")
+            entries = entries[:allowed]
+        if not entries:
+            return 0
+
+        if not hasattr(self._transport, "send_log_batch"):
+            sent = 0
+            for entry in entries:
+                sent += await self._send_with_retry(entry)
+            return sent
+
+        return len(entries) if await self._send_batch_with_retry(entries) else 0
+
     async def _check_rate_limit(self) -> bool:
         """检查速率限制"""
+        return await self._reserve_rate(1) == 1
+
+    async def _reserve_rate(self, count: int) -> int:
+        """预约 count 条的速率额度，返回实际获得的条数"""
         async with self._rate_lock:
             now = datetime.now()
             
@@ -164,11 +209,9 @@ class RealtimeSender:
                 self._send_count = 0
                 self._last_reset = now
             
-            if self._send_count >= self._config.max_entries_per_second:
-                return False
-            
-            self._send_count += 1
-            return True
+            granted = max(0, min(count, self._config.max_entries_per_second - self._send_count))
+            self._send_count += granted
+            return granted
 
     async def _send_with_retry(self, entry: LogEntry) -> bool:
         """带重试的发送"""
@@ -213,6 +256,37 @@ class RealtimeSender:
         
         return False
 
+    async def _send_batch_with_retry(self, entries: list[LogEntry]) -> bool:
+        """带重试的批量发送"""
+        log_messages = [self._build_log_message(entry) for entry in entries]
+        last_error = ""
+
+        for attempt in range(self._config.max_retries):
+            try:
+                if await self._transport.send_log_batch(log_messages):
+                    self._total_sent += len(entries)
+                    return True
+                last_error = "Transport returned False"
+            except Exception as e:
+                last_error = str(e)
+                logger.debug(
+                    f"[{self.run_id}] 批量发送日志失败 (attempt {attempt + 1}): {e}"
+                )
+
+            if attempt < self._config.max_retries - 1:
+                await asyncio.sleep(self._config.retry_delay)
+
+        self._total_failed += len(entries)
+
+        if self._on_send_failure:
+            for entry in entries:
+                try:
+                    self._on_send_failure(entry, last_error)
+                except Exception:
+                    pass
+
+        return False
+
     def _build_log_message(self, entry: LogEntry) -> Any:
         """
         构建日志消息
@@ -272,6 +346,10 @@ class RealtimeSink:
         """写入日志条目"""
         return await self._sender.write(entry)
 
+    async def write_batch(self, entries: list[LogEntry]) -> int:
+        """批量写入日志条目"""
+        return await self._sender.write_batch(entries)
+
     async def flush(self) -> None:
         """刷新"""
         await self._sender.flush()
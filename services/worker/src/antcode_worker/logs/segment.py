@@ -0,0 +1,278 @@
+"""
+二进制日志段（Segment）格式
+
+WAL 与 Spool 共用的紧凑存储格式：
+
+- 文件头：8 字节魔数
+- 记录：``<u32 payload 长度><u32 CRC32><msgpack payload>``，payload 为列表且首元素为 seq
+- 稀疏索引：同名 ``.idx`` 旁路文件，每 index_interval 条记录追加一项
+  ``<u64 此前记录的最大 seq><u64 记录偏移>``，回放时可直接 seek 跳过已确认部分
+
+写入端为组提交：记录先进入内存缓冲，按大小/时间窗口一次 write + fsync。
+崩溃后尾部的半条记录通过长度与 CRC 校验识别并截断。
+"""
+
+import asyncio
+import bisect
+import itertools
+import os
+import struct
+import zlib
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+
+import msgpack
+
+SEGMENT_MAGIC = b"ACSEG01\n"
+
+_RECORD_HEADER = struct.Struct("<II")  # payload 长度, crc32
+_INDEX_ENTRY = struct.Struct("<QQ")  # 此前最大 seq, 偏移
+
+# 单条记录上限，超过视为损坏
+MAX_RECORD_BYTES = 64 * 1024 * 1024
+
+# 顺序读取块大小
+_READ_BLOCK = 256 * 1024
+
+
+def index_path_for(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def is_segment_file(path: Path) -> bool:
+    """是否为二进制段文件（按魔数判断）"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SEGMENT_MAGIC)) == SEGMENT_MAGIC
+    except OSError:
+        return False
+
+
+def encode_record(record: list) -> bytes:
+    """编码单条记录"""
+    payload = msgpack.packb(record, use_bin_type=True)
+    return _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _load_index(path: Path, limit: int | None = None) -> list[tuple[int, int]]:
+    """加载稀疏索引，丢弃越界或残缺的项（索引只是提示，不影响正确性）"""
+    entries: list[tuple[int, int]] = []
+    try:
+        data = index_path_for(path).read_bytes()
+    except OSError:
+        return entries
+
+    usable = len(data) - len(data) % _INDEX_ENTRY.size
+    last_offset = -1
+    for max_seq, offset in _INDEX_ENTRY.iter_unpack(data[:usable]):
+        if offset <= last_offset or (limit is not None and offset >= limit):
+            break
+        entries.append((max_seq, offset))
+        last_offset = offset
+    return entries
+
+
+def _seek_offset(index: list[tuple[int, int]], after_seq: int) -> int:
+    """找到可以直接跳转的偏移：该偏移之前的记录 seq 均不大于 after_seq"""
+    if not index or after_seq <= 0:
+        return len(SEGMENT_MAGIC)
+    keys = [max_seq for max_seq, _ in index]
+    pos = bisect.bisect_right(keys, after_seq) - 1
+    return index[pos][1] if pos >= 0 else len(SEGMENT_MAGIC)
+
+
+def _scan(f, offset: int) -> Iterator[tuple[int, int, list]]:
+    """从 offset 开始顺序解码，遇到截断或 CRC 错误即停止
+
+    Yields:
+        (记录偏移, 记录结束偏移, 记录)
+    """
+    f.seek(offset)
+    buffer = b""
+    pos = 0  # 当前记录在 buffer 中的位置
+    base = offset  # buffer[pos] 对应的文件偏移
+    eof = False
+    while True:
+        available = len(buffer) - pos
+        need = _RECORD_HEADER.size
+        if available >= need:
+            length, crc = _RECORD_HEADER.unpack_from(buffer, pos)
+            if length > MAX_RECORD_BYTES:
+                return
+            need += length
+
+        if available < need:
+            if eof:
+                return
+            chunk = f.read(max(_READ_BLOCK, need - available))
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        payload = buffer[pos + _RECORD_HEADER.size:pos + need]
+        if zlib.crc32(payload) != crc:
+            return
+        try:
+            record = msgpack.unpackb(payload, raw=False)
+        except Exception:
+            return
+        yield base, base + need, record
+        base += need
+        pos += need
+
+
+def read_segment(path: Path, after_seq: int = 0) -> Iterator[list]:
+    """读取段文件中 seq 大于 after_seq 的记录（同步）"""
+    path = Path(path)
+    if not path.exists():
+        return
+    size = path.stat().st_size
+    if size < len(SEGMENT_MAGIC):
+        return
+    offset = _seek_offset(_load_index(path, limit=size), after_seq)
+    with open(path, "rb") as f:
+        if f.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+            raise ValueError(f"不是二进制日志段: {path}")
+        for _, _, record in _scan(f, offset):
+            if record and record[0] > after_seq:
+                yield record
+
+
+async def aiter_segment(
+    path: Path, after_seq: int = 0, batch_size: int = 1024
+) -> AsyncIterator[list]:
+    """异步读取段文件，按批在线程中解码"""
+    iterator = read_segment(path, after_seq)
+    while True:
+        batch = await asyncio.to_thread(lambda: list(itertools.islice(iterator, batch_size)))
+        if not batch:
+            break
+        for record in batch:
+            yield record
+
+
+class SegmentWriter:
+    """
+    段文件写入器（同步实现，由调用方放到线程中执行 commit）
+
+    append 只做内存编码；commit 负责一次 write、fsync 和索引追加。
+    """
+
+    def __init__(self, path: Path, index_interval: int = 256):
+        self.path = Path(path)
+        self._index_path = index_path_for(self.path)
+        self._index_interval = max(1, index_interval)
+
+        self._fd: int | None = None
+        self._size = 0  # 已提交的文件长度
+        self._buffer = bytearray()
+        self._pending_index: list[bytes] = []
+        self._since_index = 0
+        self._max_seq = 0
+
+    @property
+    def size(self) -> int:
+        """已提交 + 待提交的字节数"""
+        return self._size + len(self._buffer)
+
+    @property
+    def pending_bytes(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def max_seq(self) -> int:
+        return self._max_seq
+
+    def open(self) -> list[list]:
+        """
+        打开段文件；已存在时校验并截断损坏的尾部
+
+        Returns:
+            从最后一个索引点开始恢复出的尾部记录（调用方用于重建 seq 等状态）
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self._fd).st_size
+        tail: list[list] = []
+
+        if size < len(SEGMENT_MAGIC):
+            os.ftruncate(self._fd, 0)
+            os.pwrite(self._fd, SEGMENT_MAGIC, 0)
+            self._size = len(SEGMENT_MAGIC)
+            self._index_path.unlink(missing_ok=True)
+            return tail
+
+        if os.pread(self._fd, len(SEGMENT_MAGIC), 0) != SEGMENT_MAGIC:
+            os.close(self._fd)
+            self._fd = None
+            raise ValueError(f"不是二进制日志段: {self.path}")
+
+        index = _load_index(self.path, limit=size)
+        offset = index[-1][1] if index else len(SEGMENT_MAGIC)
+        self._max_seq = index[-1][0] if index else 0
+        valid_end = offset
+        with open(self.path, "rb") as f:
+            for _, end, record in _scan(f, offset):
+                tail.append(record)
+                valid_end = end
+                if record:
+                    self._max_seq = max(self._max_seq, record[0])
+
+        if valid_end < size:
+            os.ftruncate(self._fd, valid_end)
+        self._size = valid_end
+        self._since_index = len(tail)
+
+        # 重写索引，去掉越界项
+        with open(self._index_path, "wb") as f:
+            f.write(b"".join(_INDEX_ENTRY.pack(*entry) for entry in index))
+        return tail
+
+    def append(self, seq: int, record: list) -> int:
+        """追加记录到内存缓冲，返回编码后的字节数"""
+        if self._since_index == 0 or self._since_index >= self._index_interval:
+            self._pending_index.append(_INDEX_ENTRY.pack(self._max_seq, self.size))
+            self._since_index = 0
+        data = encode_record(record)
+        self._buffer += data
+        self._since_index += 1
+        self._max_seq = max(self._max_seq, seq)
+        return len(data)
+
+    def commit(self, fsync: bool = True) -> int:
+        """组提交：写出缓冲并可选 fsync，返回写出的字节数"""
+        if self._fd is None or not self._buffer:
+            return 0
+
+        data = bytes(self._buffer)
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(self._fd, view, self._size)
+            self._size += written
+            view = view[written:]
+        self._buffer.clear()
+
+        if fsync:
+            os.fsync(self._fd)
+
+        # 索引在数据落盘后再写，保证索引不会指向未提交的数据
+        if self._pending_index:
+            with open(self._index_path, "ab") as f:
+                f.write(b"".join(self._pending_index))
+            self._pending_index.clear()
+        return len(data)
+
+    def close(self, fsync: bool = True) -> None:
+        self.commit(fsync=fsync)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def remove(self) -> None:
+        """删除段文件及索引"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self.path.unlink(missing_ok=True)
+        self._index_path.unlink(missing_ok=True)
@@ -3,6 +3,10 @@
 
 负责将日志缓冲到本地磁盘，支持断线恢复。
 
+文件格式（SpoolConfig.format）：
+- json：log_NNNN.jsonl，每行一个 JSON（默认）
+- binary：log_NNNN.seg，见 segment.py；iter_unacked 通过稀疏索引直接定位 acked_seq
+
 Requirements: 9.3
 """
 
@@ -22,6 +26,7 @@ from loguru import logger
 from antcode_worker.domain.enums import LogStream
 from antcode_worker.domain.models import LogEntry
 from antcode_worker.config import DATA_ROOT
+from antcode_worker.logs.segment import SegmentWriter, aiter_segment
 
 
 _DEFAULT_SPOOL_DIR = str(DATA_ROOT / "logs" / "spool")
@@ -46,6 +51,11 @@ class SpoolConfig:
     flush_interval: float = 1.0              # 刷新间隔
     buffer_size: int = 100                   # 内存缓冲条目数
 
+    # 文件格式
+    format: str = "json"                     # json / binary
+    fsync: bool = True                       # binary 格式：每次批量刷新后 fsync（组提交）
+    index_interval: int = 256                # binary 格式：稀疏索引间隔（条）
+
 
 @dataclass
 class SpoolMeta:
@@ -91,6 +101,8 @@ class LogSpool:
         self._meta_file = self._spool_path / "meta.json"
         self._current_file: Path | None = None
         self._current_handle: BinaryIO | None = None
+        self._segment: SegmentWriter | None = None
+        self._binary = self._config.format == "binary"
         
         # 元数据
         self._meta = SpoolMeta(
@@ -201,6 +213,32 @@ class LogSpool:
         
         return True
 
+    async def write_many(self, entries: list[LogEntry]) -> int:
+        """
+        批量写入日志条目（只获取一次缓冲锁）
+
+        Args:
+            entries: 日志条目列表
+
+        Returns:
+            成功写入的条目数
+        """
+        if not self._running or not entries:
+            return 0
+
+        written = 0
+        async with self._buffer_lock:
+            for entry in entries:
+                if self._bytes_written >= self._config.max_disk_bytes:
+                    self._entries_dropped += 1
+                    continue
+                self._buffer.append(entry)
+                written += 1
+                if len(self._buffer) >= self._config.buffer_size:
+                    await self._flush_buffer()
+
+        return written
+
     async def flush(self) -> None:
         """刷新缓冲到磁盘"""
         async with self._buffer_lock:
@@ -213,6 +251,10 @@ class LogSpool:
         
         entries = self._buffer.copy()
         self._buffer.clear()
+
+        if self._binary:
+            await self._write_segment(entries)
+            return
         
         for entry in entries:
             await self._write_entry(entry)
@@ -256,14 +298,66 @@ class LogSpool:
         except Exception as e:
             logger.error(f"[{self.run_id}] 写入 spool 失败: {e}")
 
+    async def _write_segment(self, entries: list[LogEntry]) -> None:
+        """二进制格式：整批编码后一次写入 + fsync（组提交）"""
+        if not self._segment:
+            await self._open_current_file()
+
+        try:
+            for entry in entries:
+                # 按内存中的文件大小轮转，避免每条 stat
+                if self._segment.size >= self._config.max_file_bytes:
+                    await self._commit_segment()
+                    await self._rotate_file()
+
+                record = [
+                    entry.seq,
+                    entry.timestamp.timestamp() if entry.timestamp else None,
+                    entry.stream.value,
+                    entry.content,
+                    entry.level,
+                    entry.source,
+                ]
+                size = self._segment.append(entry.seq, record)
+                self._bytes_written += size
+                self._entries_written += 1
+                self._meta.last_seq = max(self._meta.last_seq, entry.seq)
+
+            self._meta.total_bytes = self._bytes_written
+            await self._commit_segment()
+        except Exception as e:
+            logger.error(f"[{self.run_id}] 写入 spool 失败: {e}")
+
+    async def _commit_segment(self) -> None:
+        if self._segment:
+            await asyncio.to_thread(self._segment.commit, self._config.fsync)
+
+    def _segment_file(self, index: int) -> Path:
+        return self._spool_path / f"log_{index:04d}.seg"
+
+    def _json_file(self, index: int) -> Path:
+        return self._spool_path / f"log_{index:04d}.jsonl"
+
     async def _open_current_file(self) -> None:
         """打开当前写入文件"""
         file_index = self._meta.file_count
-        self._current_file = self._spool_path / f"log_{file_index:04d}.jsonl"
+        if self._binary:
+            self._current_file = self._segment_file(file_index)
+            self._segment = SegmentWriter(self._current_file, self._config.index_interval)
+            await asyncio.to_thread(self._segment.open)
+            return
+        self._current_file = self._json_file(file_index)
         self._current_handle = await aiofiles.open(self._current_file, "ab")
 
     async def _close_current_file(self) -> None:
         """关闭当前文件"""
+        if self._segment:
+            try:
+                await asyncio.to_thread(self._segment.close, self._config.fsync)
+            except Exception:
+                pass
+            self._segment = None
+
         if self._current_handle:
             try:
                 await self._current_handle.close()
@@ -338,8 +432,13 @@ class LogSpool:
         """
         # 遍历所有日志文件
         for i in range(self._meta.file_count + 1):
-            log_file = self._spool_path / f"log_{i:04d}.jsonl"
+            # 切换格式后同一编号可能同时存在两种文件，JSON 在前
+            log_file = self._json_file(i)
+            segment_file = self._segment_file(i)
             if not log_file.exists():
+                if segment_file.exists():
+                    async for entry in self._iter_segment(segment_file):
+                        yield entry
                 continue
             
             try:
@@ -370,6 +469,34 @@ class LogSpool:
             except Exception as e:
                 logger.error(f"[{self.run_id}] 读取日志文件失败: {e}")
 
+            if segment_file.exists():
+                async for entry in self._iter_segment(segment_file):
+                    yield entry
+
+    async def _iter_segment(self, path: Path) -> AsyncIterator[LogEntry]:
+        """读取二进制段中未确认的条目（通过索引跳过已确认部分）"""
+        # 先提交当前缓冲，保证读到最新写入
+        if self._segment and self._segment.path == path:
+            await self._commit_segment()
+
+        try:
+            async for record in aiter_segment(path, self._meta.acked_seq):
+                try:
+                    seq, ts, stream, content, level, source = record[:6]
+                    yield LogEntry(
+                        run_id=self.run_id,
+                        stream=LogStream(stream),
+                        content=content,
+                        seq=seq,
+                        timestamp=datetime.fromtimestamp(ts) if ts is not None else None,
+                        level=level or "INFO",
+                        source=source,
+                    )
+                except Exception as e:
+                    logger.warning(f"[{self.run_id}] 解析日志记录失败: {e}")
+        except Exception as e:
+            logger.error(f"[{self.run_id}] 读取日志文件失败: {e}")
+
     async def mark_completed(self) -> None:
         """标记为已完成"""
         self._meta.completed = True
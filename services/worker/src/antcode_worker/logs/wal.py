@@ -8,6 +8,11 @@ Write-Ahead Log (WAL) 模块
 - 支持崩溃恢复
 - 支持日志轮转
 - 确认删除机制
+
+文件格式（WALConfig.format）：
+- json：每行一个 JSON（默认，兼容旧版本）
+- binary：长度前缀 + CRC 的 msgpack 记录，组提交 fsync，见 segment.py
+读取端按文件魔数自动识别格式。
 """
 
 import asyncio
@@ -25,6 +30,12 @@ import aiofiles.os
 from loguru import logger
 
 from antcode_worker.config import DATA_ROOT
+from antcode_worker.logs.segment import (
+    SegmentWriter,
+    aiter_segment,
+    index_path_for,
+    is_segment_file,
+)
 
 
 _DEFAULT_WAL_DIR = str(DATA_ROOT / "logs" / "wal")
@@ -46,6 +57,9 @@ class WALConfig:
     sync_interval: float = 1.0               # fsync 间隔（秒）
     sync_on_write: bool = False              # 每次写入都 fsync（更可靠但慢）
     retention_hours: int = 72                # WAL 保留时间（小时）
+    format: str = "json"                     # json / binary
+    group_commit_bytes: int = 256 * 1024     # binary 格式：缓冲达到该大小立即提交
+    index_interval: int = 256                # binary 格式：稀疏索引间隔（条）
 
 
 @dataclass
@@ -67,6 +81,22 @@ class WALEntry:
             "level": self.level,
         }
         return json.dumps(data, ensure_ascii=False) + "\n"
+
+    def to_record(self) -> list:
+        """序列化为二进制段记录（首元素为 seq）"""
+        return [self.seq, self.timestamp, self.log_type, self.content, self.level]
+
+    @classmethod
+    def from_record(cls, record: list) -> "WALEntry":
+        """从二进制段记录反序列化"""
+        seq, timestamp, log_type, content, level = record[:5]
+        return cls(
+            seq=seq,
+            timestamp=timestamp,
+            log_type=log_type,
+            content=content,
+            level=level or "INFO",
+        )
     
     @classmethod
     def from_line(cls, line: str) -> "WALEntry":
@@ -140,6 +170,8 @@ class WALWriter:
         
         # 状态
         self._file_handle = None
+        self._segment: SegmentWriter | None = None
+        self._binary = self._config.format == "binary"
         self._metadata: WALMetadata | None = None
         self._seq = 0
         self._byte_count = 0
@@ -168,7 +200,11 @@ class WALWriter:
         
         # 创建目录
         self._wal_dir.mkdir(parents=True, exist_ok=True)
-        
+
+        # 已有 WAL 时沿用其格式
+        if self._wal_file.exists() and self._wal_file.stat().st_size > 0:
+            self._binary = is_segment_file(self._wal_file)
+
         # 检查是否有未完成的 WAL
         if self._meta_file.exists():
             await self._recover()
@@ -176,9 +212,15 @@ class WALWriter:
             # 创建新的 WAL
             self._metadata = WALMetadata(run_id=self.run_id)
             await self._save_metadata()
-        
+
         # 打开文件（追加模式）
-        self._file_handle = await aiofiles.open(self._wal_file, "a")
+        if self._binary:
+            if self._segment is None:
+                self._segment = SegmentWriter(self._wal_file, self._config.index_interval)
+                await asyncio.to_thread(self._segment.open)
+            self._byte_count = self._segment.size
+        else:
+            self._file_handle = await aiofiles.open(self._wal_file, "a")
         
         # 启动定时同步
         if not self._config.sync_on_write:
@@ -208,6 +250,8 @@ class WALWriter:
         if self._file_handle:
             await self._file_handle.close()
             self._file_handle = None
+        if self._segment:
+            await asyncio.to_thread(self._segment.close)
         
         logger.debug(f"[{self.run_id}] WAL 写入器已停止")
 
@@ -223,8 +267,11 @@ class WALWriter:
         Returns:
             序列号
         """
-        if not self._running or not self._file_handle:
+        if not self._running or not (self._file_handle or self._segment):
             return -1
+
+        if self._binary:
+            return await self._write_binary(log_type, content, level)
         
         async with self._lock:
             self._seq += 1
@@ -254,6 +301,86 @@ class WALWriter:
             
             return self._seq
 
+    async def write_many(self, records: list[tuple[str, str, str]]) -> int:
+        """
+        批量写入日志条目（只获取一次锁，整批一次写入/提交）
+
+        Args:
+            records: (log_type, content, level) 列表
+
+        Returns:
+            最后一条的序列号
+        """
+        if not self._running or not (self._file_handle or self._segment):
+            return -1
+        if not records:
+            return self._seq
+
+        async with self._lock:
+            now = time.time()
+            entries = []
+            for log_type, content, level in records:
+                self._seq += 1
+                entries.append(
+                    WALEntry(
+                        seq=self._seq,
+                        timestamp=now,
+                        log_type=log_type,
+                        content=content,
+                        level=level,
+                    )
+                )
+
+            if self._binary:
+                for entry in entries:
+                    self._segment.append(entry.seq, entry.to_record())
+                self._byte_count = self._segment.size
+            else:
+                data = "".join(entry.to_line() for entry in entries)
+                data_bytes = data.encode("utf-8")
+                await self._file_handle.write(data)
+                self._hasher.update(data_bytes)
+                self._byte_count += len(data_bytes)
+            self._dirty = True
+
+            if self._metadata:
+                self._metadata.entry_count = self._seq
+                self._metadata.byte_size = self._byte_count
+
+            if self._config.sync_on_write or (
+                self._binary and self._segment.pending_bytes >= self._config.group_commit_bytes
+            ):
+                await self._sync()
+
+            return self._seq
+
+    async def _write_binary(self, log_type: str, content: str, level: str) -> int:
+        """二进制格式写入：内存编码，按大小/时间窗口组提交"""
+        async with self._lock:
+            self._seq += 1
+            entry = WALEntry(
+                seq=self._seq,
+                timestamp=time.time(),
+                log_type=log_type,
+                content=content,
+                level=level,
+            )
+            self._segment.append(entry.seq, entry.to_record())
+            self._byte_count = self._segment.size
+            self._dirty = True
+
+            if self._metadata:
+                self._metadata.entry_count = self._seq
+                self._metadata.byte_size = self._byte_count
+
+            if (
+                self._config.sync_on_write
+                or self._segment.pending_bytes >= self._config.group_commit_bytes
+            ):
+                await self._sync()
+
+            return self._seq
+
     async def seal(self) -> WALMetadata:
         """
         封存 WAL，准备上传
@@ -269,7 +396,10 @@ class WALWriter:
             if self._metadata:
                 self._metadata.state = WALState.SEALED
                 self._metadata.sealed_at = time.time()
-                self._metadata.checksum = self._hasher.hexdigest()
+                if self._binary:
+                    self._metadata.checksum = await asyncio.to_thread(self._file_checksum)
+                else:
+                    self._metadata.checksum = self._hasher.hexdigest()
                 await self._save_metadata()
             
             logger.info(
@@ -298,8 +428,14 @@ class WALWriter:
     async def delete(self) -> bool:
         """删除 WAL 文件"""
         try:
+            if self._segment:
+                await asyncio.to_thread(self._segment.remove)
+                self._segment = None
             if self._wal_file.exists():
                 await aiofiles.os.remove(self._wal_file)
+            index_file = index_path_for(self._wal_file)
+            if index_file.exists():
+                await aiofiles.os.remove(index_file)
             if self._meta_file.exists():
                 await aiofiles.os.remove(self._meta_file)
             if self._wal_dir.exists():
@@ -317,8 +453,15 @@ class WALWriter:
                 data = json.loads(await f.read())
                 self._metadata = WALMetadata.from_dict(data)
             
+            # 二进制格式：从最后一个索引点恢复 seq 并截断损坏的尾部，无需全量解析
+            if self._binary:
+                self._segment = SegmentWriter(self._wal_file, self._config.index_interval)
+                await asyncio.to_thread(self._segment.open)
+                self._seq = self._segment.max_seq
+                self._byte_count = self._segment.size
+
             # 重新计算状态
-            if self._wal_file.exists():
+            elif self._wal_file.exists():
                 stat = await aiofiles.os.stat(self._wal_file)
                 self._byte_count = stat.st_size
                 
@@ -342,13 +485,30 @@ class WALWriter:
 
     async def _sync(self) -> None:
         """同步到磁盘"""
-        if not self._dirty or not self._file_handle:
+        if not self._dirty:
+            return
+
+        if self._segment:
+            # 组提交：一次 write + fsync
+            await asyncio.to_thread(self._segment.commit, True)
+            self._dirty = False
+            return
+
+        if not self._file_handle:
             return
         
         await self._file_handle.flush()
         os.fsync(self._file_handle.fileno())
         self._dirty = False
 
+    def _file_checksum(self) -> str:
+        """计算 WAL 文件的 SHA256"""
+        hasher = hashlib.sha256()
+        with open(self._wal_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
     async def _sync_loop(self) -> None:
         """定时同步循环"""
         while self._running:
@@ -390,18 +550,34 @@ class WALReader:
             entries.append(entry)
         return entries
 
-    async def iter_entries(self) -> AsyncIterator[WALEntry]:
-        """迭代读取条目"""
+    async def iter_entries(self, after_seq: int = 0) -> AsyncIterator[WALEntry]:
+        """
+        迭代读取条目
+
+        Args:
+            after_seq: 只返回 seq 大于该值的条目（二进制格式通过索引直接定位）
+        """
         if not self._wal_path.exists():
             return
+
+        if is_segment_file(self._wal_path):
+            async for record in aiter_segment(self._wal_path, after_seq):
+                try:
+                    yield WALEntry.from_record(record)
+                except Exception as e:
+                    logger.warning(f"解析 WAL 条目失败: {e}")
+            return
         
         async with aiofiles.open(self._wal_path, "r") as f:
             async for line in f:
                 if line.strip():
                     try:
-                        yield WALEntry.from_line(line)
+                        entry = WALEntry.from_line(line)
                     except Exception as e:
                         logger.warning(f"解析 WAL 条目失败: {e}")
+                        continue
+                    if entry.seq > after_seq:
+                        yield entry
 
     async def get_content_by_type(self, log_type: str) -> str:
         """按类型获取日志内容"""
@@ -5,6 +5,7 @@ Requirements: 12.1
 """
 
 import time
+from collections.abc import Callable
 from typing import Any
 
 try:
@@ -25,6 +26,7 @@ class MetricsCollector:
     def __init__(self):
         self._counters: dict[str, int] = {}
         self._gauges: dict[str, float] = {}
+        self._sources: dict[str, Callable[[], dict[str, Any]]] = {}
         self._start_time = time.time()
 
     def inc(self, name: str, value: int = 1) -> None:
@@ -35,6 +37,22 @@ class MetricsCollector:
         """设置仪表值"""
         self._gauges[name] = value
 
+    def register_source(self, name: str, source: Callable[[], dict[str, Any]]) -> None:
+        """注册组件指标源，导出时以 {name}_{key} 命名"""
+        self._sources[name] = source
+
+    def get_source_metrics(self) -> dict[str, Any]:
+        """采集已注册组件的指标"""
+        metrics: dict[str, Any] = {}
+        for name, source in self._sources.items():
+            try:
+                values = source() or {}
+            except Exception:
+                continue
+            for key, value in values.items():
+                metrics[f"{name}_{key}"] = value
+        return metrics
+
     def get_system_metrics(self) -> dict[str, Any]:
         """获取系统指标"""
         if not psutil:
@@ -52,6 +70,7 @@ class MetricsCollector:
             "uptime_seconds": time.time() - self._start_time,
             **self._counters,
             **self._gauges,
+            **self.get_source_metrics(),
             **self.get_system_metrics(),
         }
         return metrics
@@ -0,0 +1,29 @@
+"""
+爬虫数据管道
+
+- SpiderDataItem: 数据条目
+- SpiderDataReporter: 批量上报器（按条数/时间刷新，失败批次本地落盘重放）
+- RedisDataReporter: 写入 Redis Stream 的上报器
+- Sinks: RedisStreamSink、FileSink（gzip JSONL / Parquet 分片上传 S3）
+"""
+
+from antcode_worker.plugins.spider.data.models import SpiderDataItem, item_to_redis_fields
+from antcode_worker.plugins.spider.data.reporter import (
+    RedisDataReporter,
+    ReporterConfig,
+    SpiderDataReporter,
+)
+from antcode_worker.plugins.spider.data.sinks import FileSink, ItemSink, RedisStreamSink
+from antcode_worker.plugins.spider.data.spool import BatchSpool
+
+__all__ = [
+    "SpiderDataItem",
+    "item_to_redis_fields",
+    "SpiderDataReporter",
+    "RedisDataReporter",
+    "ReporterConfig",
+    "ItemSink",
+    "RedisStreamSink",
+    "FileSink",
+    "BatchSpool",
+]
@@ -0,0 +1,71 @@
+"""
+爬虫数据模型
+"""
+
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+import ujson
+
+
+@dataclass
+class SpiderDataItem:
+    """爬虫数据条目"""
+
+    run_id: str
+    project_id: str
+    spider_name: str
+    data: dict[str, Any]
+    url: str = ""
+    # 条目唯一标识，重放时可能重复投递，消费方按此去重
+    item_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    crawled_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为可 JSON 序列化的字典（管道内部格式）"""
+        return {
+            "item_id": self.item_id,
+            "run_id": self.run_id,
+            "project_id": self.project_id,
+            "spider_name": self.spider_name,
+            "url": self.url,
+            "crawled_at": self.crawled_at,
+            "data": self.data,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SpiderDataItem":
+        return cls(
+            run_id=data.get("run_id", ""),
+            project_id=data.get("project_id", ""),
+            spider_name=data.get("spider_name", ""),
+            data=data.get("data") or {},
+            url=data.get("url", ""),
+            item_id=data.get("item_id") or uuid.uuid4().hex,
+            crawled_at=data.get("crawled_at") or time.time(),
+        )
+
+    def to_redis_dict(self) -> dict[str, str]:
+        """转换为 Redis Stream 字段"""
+        return item_to_redis_fields(self.to_dict())
+
+
+def item_to_redis_fields(item: dict[str, Any]) -> dict[str, str]:
+    """管道内部格式 -> Redis Stream 字段（值均为字符串，data 为 JSON）"""
+    return {
+        "item_id": item.get("item_id", ""),
+        "run_id": item.get("run_id", ""),
+        "project_id": item.get("project_id", ""),
+        "spider_name": item.get("spider_name", ""),
+        "url": item.get("url") or "",
+        "crawled_at": str(item.get("crawled_at", "")),
+        "data": ujson.dumps(item.get("data") or {}, ensure_ascii=False, default=str),
+    }
+
+
+__all__ = [
+    "SpiderDataItem",
+    "item_to_redis_fields",
+]
@@ -0,0 +1,492 @@
+"""
+爬虫数据上报器
+
+爬虫逐条产出的数据项先进入内存缓冲，按条数或时间间隔组成批次写入各个 Sink：
+
+- 批次：满 batch_size 条立即刷新，否则每 flush_interval 秒刷新一次
+- 背压：缓冲超过 max_buffer_items 时 report_item 等待本次刷新完成
+- 落盘：Sink 写入失败的批次写入该 Sink 的本地 Spool，后台按顺序重放；
+  有积压时新批次直接追加到 Spool，保证顺序
+- 指标：吞吐量、积压等定期写入爬虫元数据 Hash（spider:meta:{run_id}）
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import ujson
+from loguru import logger
+
+from antcode_worker.config import DATA_ROOT
+from antcode_worker.plugins.spider.data.models import SpiderDataItem
+from antcode_worker.plugins.spider.data.sinks import ItemSink, RedisStreamSink
+from antcode_worker.plugins.spider.data.spool import BatchSpool
+
+_DEFAULT_SPOOL_DIR = str(DATA_ROOT / "spider" / "spool")
+
+
+@dataclass
+class ReporterConfig:
+    """上报器配置"""
+
+    # 批次控制
+    batch_size: int = 500                    # 每批最大条目数
+    flush_interval: float = 1.0              # 刷新间隔（秒）
+    max_buffer_items: int = 10000            # 内存缓冲上限，超过时上报方等待
+
+    # 本地 Spool
+    spool_dir: str = _DEFAULT_SPOOL_DIR
+    spool_max_disk_bytes: int = 512 * 1024 * 1024
+    spool_max_file_bytes: int = 16 * 1024 * 1024
+    spool_fsync: bool = False
+
+    # 重放
+    retry_delay: float = 1.0
+    retry_backoff: float = 2.0
+    max_retry_delay: float = 30.0
+    drain_timeout: float = 30.0              # 结束时等待积压重放的时间
+
+    # 元数据
+    meta_interval: float = 5.0               # 指标写入间隔（秒）
+    meta_ttl_seconds: int = 86400
+
+
+class _SinkState:
+    """单个 Sink 的投递状态"""
+
+    def __init__(self, sink: ItemSink, spool: BatchSpool):
+        self.sink = sink
+        self.spool = spool
+        self.wakeup = asyncio.Event()
+        self.replay_task: asyncio.Task | None = None
+        self.items_written = 0
+        self.write_errors = 0
+        self.last_error = ""
+
+
+class SpiderDataReporter:
+    """
+    爬虫数据上报器
+
+    用法:
+        reporter = SpiderDataReporter(run_id, project_id, spider_name, sinks=[...])
+        spider.set_data_reporter(reporter)
+        await spider.run()  # 结束时调用 reporter.finalize()
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        project_id: str,
+        spider_name: str,
+        sinks: list[ItemSink],
+        redis_client=None,
+        keys=None,
+        config: ReporterConfig | None = None,
+    ):
+        """
+        Args:
+            run_id: 运行 ID
+            project_id: 项目 ID
+            spider_name: 爬虫名称
+            sinks: 数据 Sink 列表
+            redis_client: Redis 客户端（写入元数据，可选）
+            keys: RedisKeys 实例（写入元数据，可选）
+            config: 上报器配置
+        """
+        self.run_id = run_id
+        self.project_id = project_id
+        self.spider_name = spider_name
+        self._config = config or ReporterConfig()
+        self._redis = redis_client
+        self._keys = keys
+
+        self._spool_root = Path(self._config.spool_dir) / run_id
+        self._sinks = [
+            _SinkState(
+                sink,
+                BatchSpool(
+                    self._spool_root / f"{index}-{sink.name}",
+                    max_disk_bytes=self._config.spool_max_disk_bytes,
+                    max_file_bytes=self._config.spool_max_file_bytes,
+                    fsync=self._config.spool_fsync,
+                ),
+            )
+            for index, sink in enumerate(sinks)
+        ]
+
+        # 内存缓冲
+        self._buffer: list[dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_event = asyncio.Event()
+
+        # 状态
+        self._started = False
+        self._closed = False
+        self._draining = False
+        self._start_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._meta_task: asyncio.Task | None = None
+        self._started_at = 0.0
+
+        # 统计
+        self._items_reported = 0
+        self._items_flushed = 0
+        self._batches_flushed = 0
+
+    @property
+    def buffered_items(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def backlog_items(self) -> int:
+        """未投递的条目数（内存缓冲 + 各 Sink 的 Spool 积压最大值）"""
+        spooled = max((state.spool.backlog_items for state in self._sinks), default=0)
+        return len(self._buffer) + spooled
+
+    async def start(self) -> None:
+        """启动上报器（首次上报时自动调用）"""
+        async with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            self._started_at = time.time()
+
+            for state in self._sinks:
+                await state.spool.open()
+                await state.sink.open()
+                state.replay_task = asyncio.create_task(self._replay_loop(state))
+                if not state.spool.empty:
+                    state.wakeup.set()
+
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            self._meta_task = asyncio.create_task(self._meta_loop())
+            await self._register_run()
+
+        logger.info(
+            f"[{self.run_id}] 数据上报器已启动: sinks={[s.sink.name for s in self._sinks]}"
+        )
+
+    async def report_item(self, item: SpiderDataItem | dict[str, Any]) -> None:
+        """上报单个数据项（只写入内存缓冲）"""
+        if self._closed:
+            raise RuntimeError("数据上报器已关闭")
+        if not self._started:
+            await self.start()
+
+        self._buffer.append(item.to_dict() if isinstance(item, SpiderDataItem) else item)
+        self._items_reported += 1
+
+        buffered = len(self._buffer)
+        if buffered >= self._config.batch_size:
+            self._flush_event.set()
+            if buffered >= self._config.max_buffer_items:
+                # 背压：刷新跟不上产出时由上报方等待
+                await self.flush()
+
+    async def report_items(self, items: list[SpiderDataItem | dict[str, Any]]) -> None:
+        """批量上报数据项"""
+        for item in items:
+            await self.report_item(item)
+
+    async def flush(self) -> None:
+        """把内存缓冲按批次写入各 Sink"""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[: self._config.batch_size]
+                del self._buffer[: len(batch)]
+                try:
+                    await asyncio.gather(*(self._deliver(state, batch) for state in self._sinks))
+                except asyncio.CancelledError:
+                    # 投递被取消：批次放回缓冲，关闭时重新投递（可能重复）
+                    self._buffer[:0] = batch
+                    raise
+                self._items_flushed += len(batch)
+                self._batches_flushed += 1
+
+    async def _deliver(self, state: _SinkState, batch: list[dict[str, Any]]) -> None:
+        """写入 Sink，失败或已有积压时写入 Spool"""
+        if state.spool.empty:
+            try:
+                await state.sink.write(batch)
+                state.items_written += len(batch)
+                return
+            except Exception as e:
+                state.write_errors += 1
+                state.last_error = str(e)
+                logger.warning(f"[{self.run_id}] 数据写入 {state.sink.name} 失败，转存本地: {e}")
+
+        if not await state.spool.append(batch):
+            logger.error(
+                f"[{self.run_id}] {state.sink.name} 本地缓冲已满，丢弃 {len(batch)} 条数据"
+            )
+        state.wakeup.set()
+
+    async def _replay_loop(self, state: _SinkState) -> None:
+        """按顺序重放 Spool 中的批次"""
+        delay = self._config.retry_delay
+        while True:
+            try:
+                if state.spool.empty:
+                    if self._draining:
+                        break
+                    state.wakeup.clear()
+                    await state.wakeup.wait()
+                    continue
+
+                batch = await state.spool.peek()
+                if batch:
+                    await state.sink.write(batch)
+                    state.items_written += len(batch)
+                await state.spool.ack()
+                delay = self._config.retry_delay
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                state.write_errors += 1
+                state.last_error = str(e)
+                logger.debug(f"[{self.run_id}] 重放 {state.sink.name} 失败，{delay:.1f}s 后重试: {e}")
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    break
+                delay = min(delay * self._config.retry_backoff, self._config.max_retry_delay)
+
+    async def _flush_loop(self) -> None:
+        """按时间间隔或批次已满时刷新，关闭后退出"""
+        while not self._closed:
+            try:
+                try:
+                    await asyncio.wait_for(
+                        self._flush_event.wait(), timeout=self._config.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_event.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"[{self.run_id}] 数据刷新异常: {e}")
+
+    async def _meta_loop(self) -> None:
+        """定期写入吞吐量与积压指标"""
+        while True:
+            try:
+                await asyncio.sleep(self._config.meta_interval)
+                await self._write_meta({"status": "running"})
+            except asyncio.CancelledError:
+                break
+
+    async def _register_run(self) -> None:
+        """写入运行索引与初始元数据"""
+        if self._redis is None or self._keys is None:
+            return
+        try:
+            index_key = self._keys.spider_index_key(self.project_id)
+            await self._redis.zadd(index_key, {self.run_id: self._started_at})
+        except Exception as e:
+            logger.debug(f"[{self.run_id}] 写入爬虫运行索引失败: {e}")
+        await self._write_meta(
+            {
+                "status": "running",
+                "project_id": self.project_id,
+                "spider_name": self.spider_name,
+                "started_at": datetime.fromtimestamp(self._started_at).isoformat(),
+            }
+        )
+
+    async def _write_meta(self, fields: dict[str, Any]) -> None:
+        """写入元数据 Hash（失败只记日志，不影响数据投递）"""
+        if self._redis is None or self._keys is None:
+            return
+        mapping = {**self._pipeline_metrics(), **fields}
+        try:
+            meta_key = self._keys.spider_meta_key(self.run_id)
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.hset(
+                meta_key,
+                mapping={k: v if isinstance(v, str) else str(v) for k, v in mapping.items()},
+            )
+            if self._config.meta_ttl_seconds > 0:
+                pipe.expire(meta_key, self._config.meta_ttl_seconds)
+            await pipe.execute()
+        except Exception as e:
+            logger.debug(f"[{self.run_id}] 写入爬虫元数据失败: {e}")
+
+    def _pipeline_metrics(self) -> dict[str, Any]:
+        elapsed = max(time.time() - self._started_at, 1e-6) if self._started_at else 0
+        delivered = min((state.items_written for state in self._sinks), default=self._items_flushed)
+        return {
+            "items_reported": self._items_reported,
+            "items_delivered": delivered,
+            "items_spooled": sum(state.spool.items_spooled for state in self._sinks),
+            "items_dropped": sum(state.spool.items_dropped for state in self._sinks),
+            "backlog_items": self.backlog_items,
+            "items_per_second": round(self._items_reported / elapsed, 2) if elapsed else 0,
+            "updated_at": datetime.now().isoformat(),
+        }
+
+    async def finalize(
+        self,
+        run_id: str | None = None,
+        status: str = "completed",
+        items_count: int = 0,
+        pages_count: int = 0,
+        errors_count: int = 0,
+        duration_ms: float = 0,
+        errors: list[str] | None = None,
+    ) -> None:
+        """
+        完成上报：刷新缓冲、等待积压重放、关闭 Sink 并写入最终状态
+
+        Args:
+            run_id: 运行 ID（与构造时一致，保留参数兼容调用方）
+            status: 最终状态
+            items_count: 数据项数
+            pages_count: 请求数
+            errors_count: 错误数
+            duration_ms: 耗时（毫秒）
+            errors: 错误样本
+        """
+        await self.close()
+        fields: dict[str, Any] = {
+            "status": status,
+            "project_id": self.project_id,
+            "spider_name": self.spider_name,
+            "items_count": items_count,
+            "pages_count": pages_count,
+            "errors_count": errors_count,
+            "duration_ms": round(duration_ms, 2),
+            "finished_at": datetime.now().isoformat(),
+        }
+        if errors:
+            fields["errors"] = ujson.dumps(errors[:20], ensure_ascii=False)
+        await self._write_meta(fields)
+
+    async def close(self) -> None:
+        """停止上报器：刷新剩余数据，在 drain_timeout 内等待积压重放"""
+        if self._closed or not self._started:
+            self._closed = True
+            return
+        self._closed = True
+
+        if self._meta_task and not self._meta_task.done():
+            self._meta_task.cancel()
+            try:
+                await self._meta_task
+            except asyncio.CancelledError:
+                pass
+
+        # 刷新任务可能正在投递，等待其退出而不是取消
+        self._flush_event.set()
+        if self._flush_task:
+            await self._flush_task
+        await self.flush()
+
+        # 重放任务在积压清空后自行退出，超时仍未完成的取消
+        self._draining = True
+        for state in self._sinks:
+            state.wakeup.set()
+        tasks = [state.replay_task for state in self._sinks if state.replay_task]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self._config.drain_timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for state in self._sinks:
+            if state.spool.empty:
+                await state.spool.remove()
+            else:
+                logger.warning(
+                    f"[{self.run_id}] {state.sink.name} 仍有 {state.spool.backlog_items} 条数据"
+                    f"未投递，保留在 {state.spool.path}"
+                )
+            try:
+                await state.sink.close()
+            except Exception as e:
+                logger.error(f"[{self.run_id}] 关闭 {state.sink.name} 失败: {e}")
+
+        try:
+            self._spool_root.rmdir()
+        except OSError:
+            pass
+
+        logger.info(f"[{self.run_id}] 数据上报器已停止: {self._pipeline_metrics()}")
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取统计信息"""
+        return {
+            "run_id": self.run_id,
+            "items_reported": self._items_reported,
+            "items_flushed": self._items_flushed,
+            "batches_flushed": self._batches_flushed,
+            "buffered_items": len(self._buffer),
+            "backlog_items": self.backlog_items,
+            "sinks": {
+                state.sink.name: {
+                    "items_written": state.items_written,
+                    "write_errors": state.write_errors,
+                    "last_error": state.last_error,
+                    **state.spool.get_stats(),
+                    **state.sink.get_stats(),
+                }
+                for state in self._sinks
+            },
+        }
+
+
+class RedisDataReporter(SpiderDataReporter):
+    """写入 Redis Stream 的上报器（可附加其他 Sink）"""
+
+    def __init__(
+        self,
+        redis_client,
+        keys,
+        run_id: str,
+        project_id: str,
+        spider_name: str,
+        sinks: list[ItemSink] | None = None,
+        ttl_seconds: int = 86400,
+        stream_max_len: int = 0,
+        config: ReporterConfig | None = None,
+    ):
+        """
+        Args:
+            redis_client: Redis 客户端
+            keys: RedisKeys 实例
+            run_id: 运行 ID
+            project_id: 项目 ID
+            spider_name: 爬虫名称
+            sinks: 额外的 Sink（如 FileSink）
+            ttl_seconds: Stream 过期时间
+            stream_max_len: Stream 最大长度（0 不裁剪）
+            config: 上报器配置
+        """
+        redis_sink = RedisStreamSink(
+            redis_client,
+            keys,
+            run_id,
+            ttl_seconds=ttl_seconds,
+            stream_max_len=stream_max_len,
+        )
+        super().__init__(
+            run_id=run_id,
+            project_id=project_id,
+            spider_name=spider_name,
+            sinks=[redis_sink, *(sinks or [])],
+            redis_client=redis_client,
+            keys=keys,
+            config=config,
+        )
+
+
+__all__ = [
+    "ReporterConfig",
+    "SpiderDataReporter",
+    "RedisDataReporter",
+]
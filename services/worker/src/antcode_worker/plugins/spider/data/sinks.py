@@ -0,0 +1,277 @@
+"""
+爬虫数据 Sink
+
+上报器按批次调用 write()；写入失败时抛出异常，批次由上报器落盘后重放。
+
+- RedisStreamSink：写入 Redis Stream（spider:data:{run_id}）
+- FileSink：写入本地 gzip JSONL 分片，分片写满或关闭时上传到 S3（可转为 Parquet）
+"""
+
+import asyncio
+import gzip
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+import ujson
+from loguru import logger
+
+from antcode_worker.plugins.spider.data.models import item_to_redis_fields
+
+
+class ItemSink(ABC):
+    """数据 Sink 基类"""
+
+    name: str = "sink"
+
+    async def open(self) -> None:
+        """打开 Sink（上报器启动时调用）"""
+
+    @abstractmethod
+    async def write(self, items: list[dict[str, Any]]) -> None:
+        """
+        写入一个批次
+
+        Args:
+            items: 条目列表（SpiderDataItem.to_dict() 格式）
+
+        Raises:
+            Exception: 写入失败（批次会落盘重放）
+        """
+
+    async def close(self) -> None:
+        """关闭 Sink（上报器结束时调用）"""
+
+    def get_stats(self) -> dict[str, Any]:
+        return {}
+
+
+class RedisStreamSink(ItemSink):
+    """Redis Stream Sink"""
+
+    name = "redis"
+
+    def __init__(
+        self,
+        redis_client,
+        keys,
+        run_id: str,
+        ttl_seconds: int = 86400,
+        stream_max_len: int = 0,
+    ):
+        """
+        Args:
+            redis_client: Redis 客户端
+            keys: RedisKeys 实例
+            run_id: 运行 ID
+            ttl_seconds: Stream 过期时间
+            stream_max_len: Stream 最大长度（0 不裁剪；裁剪会丢弃最早的条目）
+        """
+        self._redis = redis_client
+        self._stream_key = keys.spider_data_stream(run_id)
+        self._ttl_seconds = ttl_seconds
+        self._stream_max_len = stream_max_len
+
+    async def write(self, items: list[dict[str, Any]]) -> None:
+        if self._redis is None:
+            raise ConnectionError("Redis 未连接")
+
+        pipe = self._redis.pipeline(transaction=False)
+        for item in items:
+            if self._stream_max_len > 0:
+                pipe.xadd(
+                    self._stream_key,
+                    item_to_redis_fields(item),
+                    maxlen=self._stream_max_len,
+                    approximate=True,
+                )
+            else:
+                pipe.xadd(self._stream_key, item_to_redis_fields(item))
+        if self._ttl_seconds > 0:
+            pipe.expire(self._stream_key, self._ttl_seconds)
+        await pipe.execute()
+
+
+class FileSink(ItemSink):
+    """
+    文件 Sink
+
+    批次以独立 gzip 成员追加到本地分片（part-NNNNN.jsonl.gz.open），
+    条目数达到 max_items_per_part 时封存并上传到 S3：
+
+        {prefix}/{project_id}/{run_id}/part-NNNNN.jsonl.gz
+        {prefix}/{project_id}/{run_id}/part-NNNNN.parquet   （format="parquet"，需要 pyarrow）
+
+    本地写入成功即视为写入成功；上传失败的分片保留在本地，下次封存或关闭时重试。
+    """
+
+    name = "file"
+
+    def __init__(
+        self,
+        run_id: str,
+        project_id: str,
+        local_dir: str | Path,
+        format: str = "jsonl",
+        max_items_per_part: int = 100_000,
+        bucket: str | None = None,
+        prefix: str = "spider-data",
+        compression_level: int = 6,
+    ):
+        if format not in ("jsonl", "parquet"):
+            raise ValueError(f"不支持的文件格式: {format}")
+
+        self.run_id = run_id
+        self.project_id = project_id
+        self._dir = Path(local_dir)
+        self._format = format
+        self._max_items = max_items_per_part
+        self._bucket = bucket or os.getenv("S3_BUCKET") or os.getenv("MINIO_BUCKET", "antcode")
+        self._prefix = prefix.strip("/")
+        self._level = compression_level
+
+        self._part = 0
+        self._part_items = 0
+        self._uploaded_parts = 0
+        self._uploaded_bytes = 0
+        self._upload_errors = 0
+
+    def _part_path(self, index: int) -> Path:
+        return self._dir / f"part-{index:05d}.jsonl.gz"
+
+    def _open_path(self, index: int) -> Path:
+        return self._dir / f"part-{index:05d}.jsonl.gz.open"
+
+    async def open(self) -> None:
+        if self._format == "parquet":
+            _require_pyarrow()
+        await asyncio.to_thread(self._recover_sync)
+        await self._upload_sealed()
+
+    def _recover_sync(self) -> None:
+        """进程重启后：封存未完成的分片，分片编号接着已有的继续"""
+        self._dir.mkdir(parents=True, exist_ok=True)
+        indexes = []
+        for path in self._dir.glob("part-*.jsonl.gz*"):
+            stem = path.name.split(".", 1)[0]
+            index = stem.split("-", 1)[1]
+            if not index.isdigit():
+                continue
+            indexes.append(int(index))
+            if path.name.endswith(".open"):
+                os.replace(path, self._part_path(int(index)))
+        self._part = max(indexes) + 1 if indexes else 0
+
+    async def write(self, items: list[dict[str, Any]]) -> None:
+        await asyncio.to_thread(self._append_sync, items)
+        self._part_items += len(items)
+        if self._part_items >= self._max_items:
+            await asyncio.to_thread(self._seal_sync)
+            await self._upload_sealed()
+
+    def _append_sync(self, items: list[dict[str, Any]]) -> None:
+        data = "".join(
+            ujson.dumps(item, ensure_ascii=False, default=str) + "\n" for item in items
+        ).encode("utf-8")
+        # 每批一个完整的 gzip 成员，崩溃时已写入的批次仍可读取
+        with open(self._open_path(self._part), "ab") as f:
+            f.write(gzip.compress(data, compresslevel=self._level))
+
+    def _seal_sync(self) -> None:
+        path = self._open_path(self._part)
+        if path.exists():
+            os.replace(path, self._part_path(self._part))
+        self._part += 1
+        self._part_items = 0
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._seal_sync)
+        await self._upload_sealed()
+
+    async def _upload_sealed(self) -> None:
+        """上传已封存的分片，成功后删除本地文件"""
+        for path in sorted(self._dir.glob("part-*.jsonl.gz")):
+            try:
+                await self._upload(path)
+            except Exception as e:
+                self._upload_errors += 1
+                logger.error(f"[{self.run_id}] 上传数据分片失败 {path.name}: {e}")
+                return
+            path.unlink(missing_ok=True)
+
+    async def _upload(self, path: Path) -> None:
+        from antcode_core.infrastructure.storage.s3_client import get_s3_client_manager
+
+        stem = path.name.split(".", 1)[0]
+        if self._format == "parquet":
+            body = await asyncio.to_thread(_jsonl_gz_to_parquet, path)
+            key_name, content_type = f"{stem}.parquet", "application/vnd.apache.parquet"
+        else:
+            body = await asyncio.to_thread(path.read_bytes)
+            key_name, content_type = path.name, "application/gzip"
+
+        key = f"{self._prefix}/{self.project_id}/{self.run_id}/{key_name}"
+        client = await get_s3_client_manager().get_client()
+        await client.put_object(Bucket=self._bucket, Key=key, Body=body, ContentType=content_type)
+        self._uploaded_parts += 1
+        self._uploaded_bytes += len(body)
+        logger.debug(f"[{self.run_id}] 数据分片已上传: s3://{self._bucket}/{key}")
+
+    def get_stats(self) -> dict[str, Any]:
+        pending = len(list(self._dir.glob("part-*.jsonl.gz"))) if self._dir.exists() else 0
+        return {
+            "format": self._format,
+            "part_items": self._part_items,
+            "uploaded_parts": self._uploaded_parts,
+            "uploaded_bytes": self._uploaded_bytes,
+            "pending_parts": pending,
+            "upload_errors": self._upload_errors,
+        }
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet 格式需要安装 pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def _jsonl_gz_to_parquet(path: Path) -> bytes:
+    """gzip JSONL 分片转换为 Parquet（data 列保存为 JSON 字符串）"""
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns: dict[str, list] = {
+        "item_id": [],
+        "run_id": [],
+        "project_id": [],
+        "spider_name": [],
+        "url": [],
+        "crawled_at": [],
+        "data": [],
+    }
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = ujson.loads(line)
+            for name in ("item_id", "run_id", "project_id", "spider_name", "url"):
+                columns[name].append(item.get(name) or "")
+            columns["crawled_at"].append(item.get("crawled_at"))
+            columns["data"].append(
+                ujson.dumps(item.get("data") or {}, ensure_ascii=False, default=str)
+            )
+
+    sink = pa.BufferOutputStream()
+    pq.write_table(pa.table(columns), sink, compression="zstd")
+    return sink.getvalue().to_pybytes()
+
+
+__all__ = [
+    "ItemSink",
+    "RedisStreamSink",
+    "FileSink",
+]
@@ -0,0 +1,271 @@
+"""
+数据批次本地缓冲（Spool）
+
+Sink 写入失败时批次落盘，恢复后按写入顺序重放。
+
+文件格式：
+- batch_NNNN.jsonl：每行一个批次：条目数、制表符、JSON 数组
+- meta.json：读取位置（文件编号 + 偏移），确认后推进
+
+重放按批次确认，确认前崩溃会重复投递（至少一次），条目带 item_id 供消费方去重。
+"""
+
+import asyncio
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+import ujson
+from loguru import logger
+
+
+def _line_count(line: bytes) -> int:
+    """读取批次行前缀中的条目数"""
+    try:
+        return int(line.split(b"\t", 1)[0])
+    except ValueError:
+        return 0
+
+
+class BatchSpool:
+    """
+    数据批次本地缓冲
+
+    - append：批次追加到当前文件，超过 max_file_bytes 轮转
+    - peek / ack：读取最早未确认批次，确认后推进读取位置，读完的文件删除
+    - 磁盘限制：超过 max_disk_bytes 时丢弃新批次并计数
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        max_file_bytes: int = 16 * 1024 * 1024,
+        fsync: bool = False,
+    ):
+        self.path = Path(path)
+        self._meta_file = self.path / "meta.json"
+        self._max_disk_bytes = max_disk_bytes
+        self._max_file_bytes = max_file_bytes
+        self._fsync = fsync
+
+        # 读取位置
+        self._read_file = 0
+        self._read_offset = 0
+        # 写入位置
+        self._write_file = 0
+        self._write_size = 0
+
+        # 积压
+        self._backlog_batches = 0
+        self._backlog_items = 0
+        self._backlog_bytes = 0
+
+        # 最近一次 peek 的批次（ack 时推进）：(文件编号, 下一偏移, 行字节数, 条目数)
+        self._peeked: tuple[int, int, int, int] | None = None
+        self._opened = False
+        self._lock = asyncio.Lock()
+
+        # 统计
+        self.batches_spooled = 0
+        self.items_spooled = 0
+        self.items_dropped = 0
+
+    @property
+    def backlog_items(self) -> int:
+        return self._backlog_items
+
+    @property
+    def backlog_bytes(self) -> int:
+        return self._backlog_bytes
+
+    @property
+    def empty(self) -> bool:
+        return self._backlog_batches == 0
+
+    def _file(self, index: int) -> Path:
+        return self.path / f"batch_{index:04d}.jsonl"
+
+    async def open(self) -> None:
+        """加载已有缓冲（进程重启后继续重放）"""
+        async with self._lock:
+            if not self._opened:
+                await asyncio.to_thread(self._open_sync)
+                self._opened = True
+
+    def _open_sync(self) -> None:
+        if not self.path.exists():
+            return
+
+        try:
+            meta = json.loads(self._meta_file.read_text())
+            self._read_file = int(meta.get("read_file", 0))
+            self._read_offset = int(meta.get("read_offset", 0))
+        except (OSError, ValueError):
+            pass
+
+        indexes = sorted(
+            int(p.stem.split("_", 1)[1])
+            for p in self.path.glob("batch_*.jsonl")
+            if p.stem.split("_", 1)[1].isdigit()
+        )
+        if not indexes:
+            self._read_file = self._write_file = 0
+            self._read_offset = 0
+            return
+
+        if self._read_file not in indexes:
+            self._read_file = indexes[0]
+            self._read_offset = 0
+        self._write_file = indexes[-1]
+        self._write_size = self._file(self._write_file).stat().st_size
+
+        # 统计积压（只在打开时扫描一次）
+        for index in indexes:
+            if index < self._read_file:
+                continue
+            with open(self._file(index), "rb") as f:
+                if index == self._read_file:
+                    f.seek(self._read_offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # 崩溃留下的半行，忽略
+                    self._backlog_batches += 1
+                    self._backlog_items += _line_count(line)
+                    self._backlog_bytes += len(line)
+
+        if self._backlog_batches:
+            logger.info(
+                f"[spool] 发现未重放的数据批次: {self.path} "
+                f"({self._backlog_batches} 批, {self._backlog_items} 条)"
+            )
+
+    async def append(self, items: list[dict[str, Any]]) -> bool:
+        """追加批次，超过磁盘限制时丢弃并返回 False"""
+        if not items:
+            return True
+        payload = ujson.dumps(items, ensure_ascii=False, default=str)
+        line = f"{len(items)}\t{payload}\n".encode()
+
+        async with self._lock:
+            if self._backlog_bytes + len(line) > self._max_disk_bytes:
+                self.items_dropped += len(items)
+                return False
+            await asyncio.to_thread(self._append_sync, line)
+            self._backlog_batches += 1
+            self._backlog_items += len(items)
+            self._backlog_bytes += len(line)
+            self.batches_spooled += 1
+            self.items_spooled += len(items)
+        return True
+
+    def _append_sync(self, line: bytes) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        if self._write_size >= self._max_file_bytes:
+            self._write_file += 1
+            self._write_size = 0
+        with open(self._file(self._write_file), "ab") as f:
+            f.write(line)
+            if self._fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        self._write_size += len(line)
+
+    async def peek(self) -> list[dict[str, Any]] | None:
+        """读取最早未确认的批次，无积压返回 None"""
+        async with self._lock:
+            if self._backlog_batches == 0:
+                return None
+            batch, position = await asyncio.to_thread(self._read_sync)
+            self._peeked = position
+            return batch
+
+    def _read_sync(self) -> tuple[list[dict[str, Any]], tuple[int, int, int, int]]:
+        index, offset = self._read_file, self._read_offset
+        while index <= self._write_file:
+            path = self._file(index)
+            if path.exists():
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    line = f.readline()
+                    if line.endswith(b"\n"):
+                        count = _line_count(line)
+                        try:
+                            batch = ujson.loads(line.split(b"\t", 1)[1])
+                        except (IndexError, ValueError):
+                            logger.warning(f"[spool] 跳过损坏的批次: {path}@{offset}")
+                            batch = []
+                        return batch, (index, offset + len(line), len(line), count)
+            index += 1
+            offset = 0
+        # 记账与文件不一致（文件被外部删除），清空积压
+        return [], (self._write_file, self._write_size, 0, 0)
+
+    async def ack(self) -> None:
+        """确认最近一次 peek 的批次"""
+        async with self._lock:
+            if self._peeked is None:
+                return
+            index, offset, size, count = self._peeked
+            self._peeked = None
+
+            finished = list(range(self._read_file, index))
+            self._read_file, self._read_offset = index, offset
+            if size:
+                self._backlog_batches = max(0, self._backlog_batches - 1)
+                self._backlog_items = max(0, self._backlog_items - count)
+                self._backlog_bytes = max(0, self._backlog_bytes - size)
+            else:
+                self._backlog_batches = 0
+            if self._backlog_batches == 0:
+                self._backlog_items = 0
+                self._backlog_bytes = 0
+            await asyncio.to_thread(self._commit_sync, finished)
+
+    def _commit_sync(self, finished: list[int]) -> None:
+        for index in finished:
+            try:
+                self._file(index).unlink()
+            except OSError:
+                pass
+
+        if self._backlog_batches == 0:
+            # 全部确认后清空文件，从头开始
+            for path in self.path.glob("batch_*.jsonl"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._read_file = self._write_file = 0
+            self._read_offset = self._write_size = 0
+
+        tmp = self._meta_file.with_suffix(".tmp")
+        try:
+            tmp.write_text(
+                json.dumps({"read_file": self._read_file, "read_offset": self._read_offset})
+            )
+            os.replace(tmp, self._meta_file)
+        except OSError as e:
+            logger.error(f"[spool] 保存读取位置失败: {e}")
+
+    async def remove(self) -> None:
+        """删除已清空的缓冲目录"""
+        async with self._lock:
+            if self._backlog_batches == 0:
+                await asyncio.to_thread(shutil.rmtree, self.path, True)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "backlog_batches": self._backlog_batches,
+            "backlog_items": self._backlog_items,
+            "backlog_bytes": self._backlog_bytes,
+            "batches_spooled": self.batches_spooled,
+            "items_spooled": self.items_spooled,
+            "items_dropped": self.items_dropped,
+        }
+
+
+__all__ = ["BatchSpool"]
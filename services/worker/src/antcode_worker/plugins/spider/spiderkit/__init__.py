@@ -5,6 +5,7 @@ SpiderKit - 爬虫核心框架
 - Request/Response: 请求响应对象
 - Selector: XPath/CSS/正则解析器（基于 lxml）
 - Spider: 爬虫基类
+- CrawlFrontier: 请求调度（优先级、按域名并发与间隔、指纹去重、溢出到磁盘）
 - HttpClient: 异步 HTTP 客户端（httpx + curl_cffi）
 - Middlewares: 爬虫中间件（UA轮换、代理、限速、指纹伪装）
 - RenderClient: DrissionPage 浏览器渲染客户端
@@ -38,6 +39,7 @@ SpiderKit - 爬虫核心框架
 
 from .base import CrawlResult, Spider
 from .client import ClientConfig, HttpClient
+from .frontier import CrawlFrontier, FingerprintSet, request_fingerprint
 from .middlewares import (
     CookieMiddleware,
     ImpersonateMiddleware,
@@ -64,6 +66,9 @@ __all__ = [
     # 爬虫
     "Spider",
     "CrawlResult",
+    "CrawlFrontier",
+    "FingerprintSet",
+    "request_fingerprint",
     # HTTP 客户端
     "HttpClient",
     "ClientConfig",
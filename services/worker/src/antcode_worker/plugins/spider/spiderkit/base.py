@@ -22,6 +22,9 @@ Spider 基类 - 爬虫定义
     spider = MySpider()
     spider.set_data_reporter(reporter)  # 注入数据上报器
     result = await spider.run()
+
+请求经 CrawlFrontier 调度（优先级、按域名并发与间隔、指纹去重、超预算溢出到磁盘）；
+数据项逐条交给 process_item 流式处理，CrawlResult.items 只保留前 max_result_items 条样本。
 """
 
 from __future__ import annotations
@@ -36,6 +39,7 @@ from typing import TYPE_CHECKING, Any
 from loguru import logger
 
 from .client import ClientConfig, HttpClient
+from .frontier import CrawlFrontier
 from .request import Request, Response
 
 if TYPE_CHECKING:
@@ -51,6 +55,8 @@ class CrawlResult:
     requests_count: int = 0
     items_count: int = 0
     errors: list[str] = field(default_factory=list)
+    errors_count: int = 0
+    frontier: dict[str, Any] = field(default_factory=dict)
     started_at: str | None = None
     finished_at: str | None = None
     duration_ms: float = 0
@@ -64,6 +70,8 @@ class CrawlResult:
             "requests_count": self.requests_count,
             "items_count": self.items_count,
             "errors": self.errors,
+            "errors_count": self.errors_count,
+            "frontier": self.frontier,
             "started_at": self.started_at,
             "finished_at": self.finished_at,
             "duration_ms": self.duration_ms,
@@ -96,17 +104,30 @@ class Spider(ABC):
     default_headers: dict[str, str] = {}
     default_cookies: dict[str, str] = {}
 
-    # 并发控制
+    # 并发控制（download_delay 为同一域名相邻请求的最小间隔）
     concurrent_requests: int = 16
+    concurrent_requests_per_domain: int = 8
     download_delay: float = 0
 
+    # 内存控制
+    frontier_memory_budget: int = 100_000  # 内存中待爬请求数上限，超出部分溢出到磁盘
+    max_result_items: int = 1000  # CrawlResult.items 保留的样本数
+    max_result_errors: int = 1000  # CrawlResult.errors 保留的错误数
+
     def __init__(self, **kwargs):
         """初始化爬虫"""
         self.settings = {**self.custom_settings, **kwargs}
         self._client: HttpClient | None = None
         self._running = False
-        self._request_queue: asyncio.Queue = asyncio.Queue()
-        self._seen_urls: set = set()
+        self._frontier = CrawlFrontier(
+            concurrency_per_domain=self.settings.get(
+                "concurrent_requests_per_domain", self.concurrent_requests_per_domain
+            ),
+            download_delay=self.settings.get("download_delay", self.download_delay),
+            memory_budget=self.settings.get("frontier_memory_budget", self.frontier_memory_budget),
+            spill_dir=self.settings.get("frontier_spill_dir"),
+            owner=self,
+        )
 
         # 结果
         self._result = CrawlResult(spider_name=self.name)
@@ -179,7 +200,23 @@ class Spider(ABC):
             error: 异常
         """
         logger.error(f"请求失败 [{request.url}]: {error}")
-        self._result.errors.append(f"{request.url}: {error}")
+        self._record_error(f"{request.url}: {error}")
+
+    async def process_item(self, item: dict[str, Any], response: Response) -> None:
+        """
+        数据项处理（流式）
+
+        每个数据项产出时调用一次，可重写以写入存储；默认不做处理
+
+        Args:
+            item: 数据项
+            response: 产出该数据项的响应
+        """
+
+    def _record_error(self, message: str) -> None:
+        self._result.errors_count += 1
+        if len(self._result.errors) < self.max_result_errors:
+            self._result.errors.append(message)
 
     async def run(self, client: HttpClient | None = None) -> CrawlResult:
         """
@@ -211,37 +248,35 @@ class Spider(ABC):
         self._running = True
         status = "completed"
 
+        workers: list[asyncio.Task] = []
         try:
             # 添加起始请求
             async for request in self.start_requests():
-                await self._request_queue.put(request)
+                self._frontier.push(request)
 
-            # 并发处理
+            # 并发处理，无待爬且无进行中请求时 worker 自行退出
             workers = [
                 asyncio.create_task(self._worker())
                 for _ in range(self.concurrent_requests)
             ]
-
-            # 等待队列清空
-            await self._request_queue.join()
-
-            # 停止 workers
-            self._running = False
-            for worker in workers:
-                worker.cancel()
+            await asyncio.gather(*workers)
 
         except Exception as e:
             logger.error(f"爬虫异常: {e}")
-            self._result.errors.append(str(e))
+            self._record_error(str(e))
             status = "failed"
 
         finally:
+            self._running = False
+            for worker in workers:
+                worker.cancel()
+            self._result.frontier = self._frontier.get_stats()
+            self._frontier.close()
             if own_client and self._client:
                 await self._client.close()
 
         self._result.finished_at = datetime.now().isoformat()
         self._result.duration_ms = (time.time() - start_time) * 1000
-        self._result.items_count = len(self._result.items)
 
         # 完成爬取，写入最终状态到 Redis
         if self._data_reporter:
@@ -260,7 +295,7 @@ class Spider(ABC):
                 status=status,
                 items_count=self._result.items_count,
                 pages_count=self._result.requests_count,
-                errors_count=len(self._result.errors),
+                errors_count=self._result.errors_count,
                 duration_ms=self._result.duration_ms,
                 errors=self._result.errors if self._result.errors else None,
             )
@@ -270,13 +305,8 @@ class Spider(ABC):
     async def _worker(self) -> None:
         """工作协程"""
         while self._running:
-            try:
-                request = await asyncio.wait_for(
-                    self._request_queue.get(), timeout=1.0
-                )
-            except TimeoutError:
-                continue
-            except asyncio.CancelledError:
+            request = await self._frontier.get()
+            if request is None:
                 break
 
             try:
@@ -284,19 +314,10 @@ class Spider(ABC):
             except Exception as e:
                 await self.errback(request, e)
             finally:
-                self._request_queue.task_done()
-
-            # 下载延迟
-            if self.download_delay > 0:
-                await asyncio.sleep(self.download_delay)
+                self._frontier.done(request)
 
     async def _process_request(self, request: Request) -> None:
-        """处理请求"""
-        # URL 去重
-        if not request.dont_filter and request.url in self._seen_urls:
-            return
-        self._seen_urls.add(request.url)
-
+        """处理请求（去重已在入队时完成）"""
         self._result.requests_count += 1
 
         # 发送请求
@@ -315,10 +336,13 @@ class Spider(ABC):
         async for result in callback(response, **request.cb_kwargs):
             if isinstance(result, Request):
                 # 新请求
-                await self._request_queue.put(result)
+                self._frontier.push(result)
             elif isinstance(result, dict):
-                # 数据项
-                self._result.items.append(result)
+                # 数据项：计数并流式处理，结果中只保留样本
+                self._result.items_count += 1
+                if len(self._result.items) < self.max_result_items:
+                    self._result.items.append(result)
+                await self.process_item(result, response)
 
                 # 实时上报到 Redis（如果配置了上报器）
                 if self._data_reporter:
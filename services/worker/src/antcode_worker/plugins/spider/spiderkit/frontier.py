@@ -0,0 +1,452 @@
+"""
+爬取边界（Frontier）- 请求调度
+
+- 优先级：Request.priority 越大越先出队，同优先级先进先出
+- 按域名调度：每个域名独立队列，限制域名并发槽位；同一域名相邻请求的发起间隔
+  不小于 download_delay（礼貌队列），等待中的域名不占用 worker
+- 去重：请求指纹为 64 位哈希，保存在 array 开放寻址表中（约 16 字节/条）
+- 内存预算：内存中待爬请求数超过预算时，新请求溢出到磁盘，回落到预算一半以下时分批读回
+  （读回的请求按溢出顺序参与调度）
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import heapq
+import itertools
+import os
+import pickle
+import struct
+import tempfile
+import time
+from array import array
+from typing import Any
+from urllib.parse import urlencode, urlsplit
+
+from loguru import logger
+
+from .request import Request
+
+_RECORD_HEADER = struct.Struct("<I")
+
+
+def request_fingerprint(request: Request) -> int:
+    """计算请求指纹（方法 + URL + 查询参数 + 请求体，64 位）"""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(request.method.value.encode())
+    h.update(b" ")
+    h.update(request.url.encode("utf-8", "surrogatepass"))
+    if request.params:
+        h.update(b"?")
+        h.update(urlencode(sorted(request.params.items())).encode())
+    if request.data is not None:
+        h.update(b"\x00")
+        h.update(request.data if isinstance(request.data, bytes) else repr(request.data).encode())
+    if request.json is not None:
+        h.update(b"\x01")
+        h.update(repr(request.json).encode())
+    return int.from_bytes(h.digest(), "big")
+
+
+class FingerprintSet:
+    """64 位指纹集合（线性探测开放寻址，负载因子不超过 0.6）"""
+
+    def __init__(self, capacity: int = 1 << 16):
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self._table = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, fingerprint: int) -> bool:
+        fingerprint = fingerprint or 1
+        table, mask = self._table, self._mask
+        i = fingerprint & mask
+        while True:
+            value = table[i]
+            if value == fingerprint:
+                return True
+            if value == 0:
+                return False
+            i = (i + 1) & mask
+
+    def add(self, fingerprint: int) -> bool:
+        """加入指纹，已存在时返回 False"""
+        fingerprint = fingerprint or 1  # 0 表示空槽
+        if (self._size + 1) * 5 > (self._mask + 1) * 3:
+            self._grow()
+        table, mask = self._table, self._mask
+        i = fingerprint & mask
+        while True:
+            value = table[i]
+            if value == fingerprint:
+                return False
+            if value == 0:
+                table[i] = fingerprint
+                self._size += 1
+                return True
+            i = (i + 1) & mask
+
+    @property
+    def nbytes(self) -> int:
+        return self._table.itemsize * len(self._table)
+
+    def _grow(self) -> None:
+        old = self._table
+        size = len(old) * 2
+        table = array("Q", bytes(8 * size))
+        mask = size - 1
+        for value in old:
+            if value:
+                i = value & mask
+                while table[i]:
+                    i = (i + 1) & mask
+                table[i] = value
+        self._table = table
+        self._mask = mask
+
+
+class _Unspillable(Exception):
+    """请求无法序列化（如回调为闭包），只能保留在内存中"""
+
+
+class _SpillFile:
+    """溢出文件：长度前缀的 pickle 记录，顺序追加、顺序读回"""
+
+    WRITE_BATCH = 512
+
+    def __init__(self, directory: str | None = None):
+        fd, self.path = tempfile.mkstemp(prefix="spiderkit-frontier-", suffix=".spill", dir=directory)
+        self._file = os.fdopen(fd, "w+b")
+        self._buffer: list[bytes] = []
+        self._read_offset = 0
+        self._write_offset = 0
+        self.count = 0
+
+    def append(self, payload: bytes) -> None:
+        self._buffer.append(_RECORD_HEADER.pack(len(payload)) + payload)
+        self.count += 1
+        if len(self._buffer) >= self.WRITE_BATCH:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        self._buffer.clear()
+        self._file.seek(self._write_offset)
+        self._file.write(data)
+        self._write_offset += len(data)
+
+    def read(self, limit: int) -> list[bytes]:
+        """按追加顺序读回最多 limit 条记录"""
+        self._flush()
+        self._file.flush()
+        self._file.seek(self._read_offset)
+        records = []
+        while len(records) < limit and self._read_offset < self._write_offset:
+            (length,) = _RECORD_HEADER.unpack(self._file.read(_RECORD_HEADER.size))
+            records.append(self._file.read(length))
+            self._read_offset += _RECORD_HEADER.size + length
+        self.count -= len(records)
+
+        if self.count == 0:
+            # 全部读回后截断文件，复用空间
+            self._file.seek(0)
+            self._file.truncate()
+            self._read_offset = self._write_offset = 0
+        return records
+
+    def close(self) -> None:
+        with contextlib.suppress(OSError):
+            self._file.close()
+        with contextlib.suppress(OSError):
+            os.unlink(self.path)
+
+
+class _DomainQueue:
+    __slots__ = ("name", "heap", "active", "next_at", "ticket", "ready_priority")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.heap: list[tuple[int, int, Request]] = []
+        self.active = 0
+        self.next_at = 0.0
+        self.ticket: int | None = None  # 当前有效的调度项序号，None 表示未调度
+        self.ready_priority: int | None = None  # 位于就绪堆时的优先级键
+
+
+class CrawlFrontier:
+    """
+    爬取边界
+
+    用法:
+        frontier.push(request)          # 去重后入队
+        request = await frontier.get()  # 无待爬且无进行中请求时返回 None
+        ...
+        frontier.done(request)          # 释放域名槽位
+    """
+
+    # 域名数超过该值时清理空闲域名（仅保留间隔未到期的）
+    PRUNE_THRESHOLD = 1024
+
+    def __init__(
+        self,
+        concurrency_per_domain: int = 8,
+        download_delay: float = 0.0,
+        memory_budget: int = 100_000,
+        spill_dir: str | None = None,
+        owner: Any = None,
+    ):
+        """
+        初始化爬取边界
+
+        Args:
+            concurrency_per_domain: 单域名最大并发请求数
+            download_delay: 同一域名相邻请求的最小发起间隔（秒）
+            memory_budget: 内存中待爬请求数上限，超过后溢出到磁盘（0 表示不限制）
+            spill_dir: 溢出文件目录（默认系统临时目录）
+            owner: 回调所属对象（通常为 Spider），溢出时回调按方法名序列化
+        """
+        self.concurrency_per_domain = max(1, concurrency_per_domain)
+        self.download_delay = max(0.0, download_delay)
+        self.memory_budget = max(0, memory_budget)
+        self._spill_dir = spill_dir
+        self._owner = owner
+
+        self._seen = FingerprintSet()
+        self._domains: dict[str, _DomainQueue] = {}
+        self._ready: list[tuple[int, int, str]] = []
+        self._delayed: list[tuple[float, int, str]] = []
+        self._inflight: dict[int, str] = {}  # id(request) -> 域名
+        self._seq = itertools.count()
+        self._in_memory = 0
+        self._spill: _SpillFile | None = None
+        self._changed = asyncio.Event()
+        self._closed = False
+        self._prune_at = self.PRUNE_THRESHOLD
+
+        self._stats = {
+            "enqueued": 0,
+            "duplicates": 0,
+            "dispatched": 0,
+            "spilled": 0,
+            "unspillable": 0,
+            "restored": 0,
+            "peak_in_memory": 0,
+        }
+
+    def __len__(self) -> int:
+        """待爬请求数（含已溢出到磁盘的）"""
+        return self._in_memory + (self._spill.count if self._spill else 0)
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def push(self, request: Request) -> bool:
+        """
+        加入请求
+
+        Returns:
+            是否入队（重复请求返回 False）
+        """
+        if self._closed:
+            return False
+        if not request.dont_filter and not self._seen.add(request_fingerprint(request)):
+            self._stats["duplicates"] += 1
+            return False
+
+        self._stats["enqueued"] += 1
+        if self.memory_budget and self._in_memory >= self.memory_budget:
+            try:
+                self._spill_request(request)
+                return True
+            except _Unspillable:
+                self._stats["unspillable"] += 1
+
+        self._enqueue(request)
+        self._changed.set()
+        return True
+
+    async def get(self) -> Request | None:
+        """取出下一个可发起的请求；爬取结束或已关闭时返回 None"""
+        while True:
+            if self._closed:
+                return None
+
+            self._maybe_restore()
+            now = time.monotonic()
+            request = self._pop_ready(now)
+            if request is not None:
+                return request
+
+            if not self._inflight and not len(self):
+                # 爬取结束：唤醒其他等待中的 worker
+                self._changed.set()
+                return None
+
+            timeout = None
+            if self._delayed:
+                timeout = max(0.0, self._delayed[0][0] - now)
+
+            self._changed.clear()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._changed.wait(), timeout)
+
+    def done(self, request: Request) -> None:
+        """请求处理完成（无论成功与否），释放域名槽位"""
+        name = self._inflight.pop(id(request), None)
+        if name is None:
+            return
+        domain = self._domains.get(name)
+        if domain is None:
+            return
+        now = time.monotonic()
+        domain.active -= 1
+        if domain.ticket is None:
+            self._schedule(domain, now)
+        if not domain.heap and not domain.active and domain.next_at <= now:
+            del self._domains[name]
+        elif len(self._domains) > self._prune_at:
+            self._prune_domains(now)
+        self._changed.set()
+
+    def close(self) -> None:
+        """关闭并清理溢出文件，唤醒等待中的 worker"""
+        self._closed = True
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+        self._changed.set()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "pending": len(self),
+            "in_memory": self._in_memory,
+            "on_disk": self._spill.count if self._spill else 0,
+            "inflight": len(self._inflight),
+            "domains": len(self._domains),
+            "seen": len(self._seen),
+            "seen_bytes": self._seen.nbytes,
+        }
+
+    # ---- 内部实现 ----
+
+    def _enqueue(self, request: Request) -> None:
+        name = urlsplit(request.url).netloc
+        domain = self._domains.get(name)
+        if domain is None:
+            domain = self._domains[name] = _DomainQueue(name)
+
+        key = -request.priority
+        heapq.heappush(domain.heap, (key, next(self._seq), request))
+        self._in_memory += 1
+        if self._in_memory > self._stats["peak_in_memory"]:
+            self._stats["peak_in_memory"] = self._in_memory
+
+        # 未调度，或就绪堆中的优先级已过期（新请求优先级更高）时重新调度
+        if domain.ticket is None or (
+            domain.ready_priority is not None and key < domain.ready_priority
+        ):
+            self._schedule(domain, time.monotonic())
+
+    def _schedule(self, domain: _DomainQueue, now: float) -> None:
+        """按域名状态放入就绪堆或延迟堆"""
+        domain.ticket = None
+        domain.ready_priority = None
+        if not domain.heap or domain.active >= self.concurrency_per_domain:
+            return
+
+        ticket = next(self._seq)
+        domain.ticket = ticket
+        if domain.next_at <= now:
+            domain.ready_priority = domain.heap[0][0]
+            heapq.heappush(self._ready, (domain.ready_priority, ticket, domain.name))
+        else:
+            heapq.heappush(self._delayed, (domain.next_at, ticket, domain.name))
+
+    def _pop_ready(self, now: float) -> Request | None:
+        delayed = self._delayed
+        while delayed and delayed[0][0] <= now:
+            _, ticket, name = heapq.heappop(delayed)
+            domain = self._domains.get(name)
+            if domain is not None and domain.ticket == ticket and domain.heap:
+                domain.ready_priority = domain.heap[0][0]
+                heapq.heappush(self._ready, (domain.ready_priority, ticket, name))
+
+        ready = self._ready
+        while ready:
+            _, ticket, name = heapq.heappop(ready)
+            domain = self._domains.get(name)
+            if domain is None or domain.ticket != ticket or not domain.heap:
+                continue
+
+            _, _, request = heapq.heappop(domain.heap)
+            self._in_memory -= 1
+            domain.active += 1
+            if self.download_delay:
+                domain.next_at = now + self.download_delay
+            self._inflight[id(request)] = name
+            self._stats["dispatched"] += 1
+            self._schedule(domain, now)
+            return request
+        return None
+
+    def _prune_domains(self, now: float) -> None:
+        idle = [
+            name
+            for name, domain in self._domains.items()
+            if not domain.heap and not domain.active and domain.next_at <= now
+        ]
+        for name in idle:
+            del self._domains[name]
+        self._prune_at = max(self.PRUNE_THRESHOLD, len(self._domains) * 2)
+
+    def _callback_name(self, func: Any) -> str | None:
+        if func is None:
+            return None
+        name = getattr(func, "__name__", None)
+        if name and self._owner is not None and getattr(self._owner, name, None) == func:
+            return name
+        raise _Unspillable()
+
+    def _spill_request(self, request: Request) -> None:
+        state = dict(request.__dict__)
+        state["callback"] = self._callback_name(request.callback)
+        state["errback"] = self._callback_name(request.errback)
+        try:
+            payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            raise _Unspillable() from e
+
+        if self._spill is None:
+            self._spill = _SpillFile(self._spill_dir)
+            logger.info(f"待爬请求超过内存预算 {self.memory_budget}，溢出到磁盘: {self._spill.path}")
+        self._spill.append(payload)
+        self._stats["spilled"] += 1
+
+    def _maybe_restore(self) -> None:
+        """内存中的请求回落到预算一半以下时，从溢出文件读回一批"""
+        if not self._spill or not self._spill.count:
+            return
+        threshold = self.memory_budget // 2
+        if self._in_memory > threshold:
+            return
+
+        for payload in self._spill.read(max(1, self.memory_budget - self._in_memory - threshold)):
+            state = pickle.loads(payload)
+            for key in ("callback", "errback"):
+                if state[key] is not None:
+                    state[key] = getattr(self._owner, state[key])
+            request = Request.__new__(Request)
+            request.__dict__.update(state)
+            self._enqueue(request)
+            self._stats["restored"] += 1
@@ -5,7 +5,7 @@
 - UserAgentMiddleware: UA 轮换
 - ProxyMiddleware: 代理管理
 - RetryMiddleware: 重试
-- RateLimitMiddleware: 限速
+- RateLimitMiddleware: 按域名令牌桶限速（自适应减速、可选 Redis 集群协调）
 - CookieMiddleware: Cookie 管理
 - ImpersonateMiddleware: curl_cffi 指纹轮换
 """
@@ -203,25 +203,87 @@ class RetryMiddleware(SpiderMiddleware):
 # ============ 限速中间件 ============
 
 
+class _DomainBucket:
+    """单个域名的限速状态（GCRA：按理论到达时间预约发送时刻）"""
+
+    __slots__ = ("rate", "burst", "tat", "factor", "blocked_until")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tat = 0.0  # 理论到达时间（monotonic）
+        self.factor = 1.0  # 自适应减速倍数，1 表示不减速
+        self.blocked_until = 0.0  # Retry-After 截止时间（monotonic）
+
+    @property
+    def effective_rate(self) -> float:
+        return self.rate / self.factor
+
+
 class RateLimitMiddleware(SpiderMiddleware):
-    """限速中间件"""
+    """
+    限速中间件
+
+    - 令牌桶按域名独立计算：请求到达时同步预约发送时刻，再在锁外等待，
+      一个域名被限速不会阻塞其他域名；同一实例的并发 worker 共享预算
+    - domain_rates 覆盖指定域名的速率（"example.com" 同时匹配其子域名）
+    - 收到 429/503 时该域名速率减半（遵循 Retry-After），之后每次成功响应逐步恢复
+    - distributed=True 时额外通过 Redis 滑动窗口限流协调多个 Worker，
+      同一站点在整个集群内共享一个速率预算（Redis 不可用时放行）
+    """
 
     name = "RateLimit"
     priority = 50
 
+    # 分布式限流被拒绝后的最长重试间隔（秒）
+    MAX_DISTRIBUTED_BACKOFF = 1.0
+
     def __init__(
         self,
         requests_per_second: float = 10.0,
         burst: int = 20,
         per_domain: bool = True,
+        domain_rates: dict[str, float] | None = None,
+        slowdown_codes: list[int] | None = None,
+        max_slowdown: float = 32.0,
+        recovery: float = 0.1,
+        distributed: bool = False,
+        distributed_window: int = 1,
+        redis_limiter=None,
     ):
+        """
+        Args:
+            requests_per_second: 默认每域名速率
+            burst: 突发容量
+            per_domain: 是否按域名独立限速（False 时所有请求共享一个桶）
+            domain_rates: 域名 -> 速率 覆盖
+            slowdown_codes: 触发减速的状态码（默认 429、503）
+            max_slowdown: 最大减速倍数
+            recovery: 每次成功响应减少的减速倍数
+            distributed: 是否通过 Redis 在 Worker 之间协调限速
+            distributed_window: 分布式滑动窗口大小（秒）
+            redis_limiter: 自定义 RedisRateLimiter 实例
+        """
         self.rate = requests_per_second
         self.burst = burst
         self.per_domain = per_domain
-
-        self._tokens: dict[str, float] = {}
-        self._last_update: dict[str, float] = {}
-        self._lock = asyncio.Lock()
+        self.domain_rates = {k.lower(): v for k, v in (domain_rates or {}).items()}
+        self.slowdown_codes = set(slowdown_codes or [429, 503])
+        self.max_slowdown = max(1.0, max_slowdown)
+        self.recovery = recovery
+        self.distributed = distributed or redis_limiter is not None
+        self.distributed_window = max(1, int(distributed_window))
+
+        self._buckets: dict[str, _DomainBucket] = {}
+        self._redis_limiter = redis_limiter
+
+        self._stats = {
+            "requests": 0,
+            "throttled": 0,
+            "wait_seconds": 0.0,
+            "slowdowns": 0,
+            "distributed_denied": 0,
+        }
 
     def _get_domain(self, url: str) -> str:
         """提取域名"""
@@ -229,33 +291,131 @@ class RateLimitMiddleware(SpiderMiddleware):
 
         return urlparse(url).netloc if self.per_domain else "__global__"
 
+    def _rate_for(self, domain: str) -> float:
+        """按域名覆盖查找速率：完整 netloc、主机名、逐级父域名"""
+        if not self.domain_rates:
+            return self.rate
+        host = domain.lower()
+        if host in self.domain_rates:
+            return self.domain_rates[host]
+        host = host.rsplit(":", 1)[0] if ":" in host and not host.endswith("]") else host
+        while host:
+            if host in self.domain_rates:
+                return self.domain_rates[host]
+            _, _, host = host.partition(".")
+        return self.rate
+
+    def _bucket(self, domain: str) -> _DomainBucket:
+        bucket = self._buckets.get(domain)
+        if bucket is None:
+            bucket = self._buckets[domain] = _DomainBucket(self._rate_for(domain), self.burst)
+        return bucket
+
+    def reserve(self, domain: str) -> float:
+        """
+        为一次请求预约发送时刻
+
+        Returns:
+            需要等待的秒数（0 表示立即发送）
+        """
+        bucket = self._bucket(domain)
+        rate = bucket.effective_rate
+        if rate <= 0:
+            return 0.0
+
+        now = time.monotonic()
+        interval = 1.0 / rate
+        if bucket.blocked_until > now:
+            # Retry-After 期间不放行，之后从空桶开始按速率发送，不一次释放突发额度
+            bucket.tat = max(bucket.tat, bucket.blocked_until + (bucket.burst - 1) * interval)
+        tat = max(bucket.tat, now) + interval
+        bucket.tat = tat
+        return max(0.0, tat - bucket.burst * interval - now)
+
     async def process_request(self, request: Request) -> Request:
         domain = self._get_domain(request.url)
+        self._stats["requests"] += 1
 
-        async with self._lock:
-            now = time.time()
+        # 预约是同步的，等待期间不持有任何共享锁
+        wait_time = self.reserve(domain)
+        if wait_time > 0:
+            self._stats["throttled"] += 1
+            self._stats["wait_seconds"] += wait_time
+            await asyncio.sleep(wait_time)
 
-            # 初始化
-            if domain not in self._tokens:
-                self._tokens[domain] = self.burst
-                self._last_update[domain] = now
+        if self.distributed:
+            await self._acquire_distributed(domain)
 
-            # 补充令牌
-            elapsed = now - self._last_update[domain]
-            self._tokens[domain] = min(
-                self.burst, self._tokens[domain] + elapsed * self.rate
-            )
-            self._last_update[domain] = now
+        return request
 
-            # 等待令牌
-            if self._tokens[domain] < 1:
-                wait_time = (1 - self._tokens[domain]) / self.rate
-                await asyncio.sleep(wait_time)
-                self._tokens[domain] = 0
-            else:
-                self._tokens[domain] -= 1
+    async def process_response(
+        self, request: Request, response: Response
+    ) -> Response | None:
+        bucket = self._buckets.get(self._get_domain(request.url))
+        if bucket is None:
+            return response
+
+        if response.status in self.slowdown_codes:
+            self._slow_down(bucket, response)
+        elif bucket.factor > 1.0 and 200 <= response.status < 400:
+            bucket.factor = max(1.0, bucket.factor - self.recovery)
+        return response
 
-        return request
+    async def process_exception(
+        self, request: Request, exception: Exception
+    ) -> Request | None:
+        return None
+
+    def _slow_down(self, bucket: _DomainBucket, response: Response) -> None:
+        bucket.factor = min(self.max_slowdown, bucket.factor * 2)
+        self._stats["slowdowns"] += 1
+
+        # Retry-After（秒）：推迟该域名后续所有预约
+        retry_after = response.headers.get("Retry-After") or response.headers.get("retry-after")
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = 0.0
+            if delay > 0:
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+
+        logger.debug(
+            f"限速减速: HTTP {response.status}, 速率 {bucket.effective_rate:.2f}/s "
+            f"(x{bucket.factor:g})"
+        )
+
+    async def _acquire_distributed(self, domain: str) -> None:
+        """通过 Redis 滑动窗口限流等待集群预算"""
+        limiter = self._get_redis_limiter()
+        if limiter is None:
+            return
+
+        bucket = self._bucket(domain)
+        limit = max(1, int(bucket.effective_rate * self.distributed_window))
+        backoff = min(self.MAX_DISTRIBUTED_BACKOFF, self.distributed_window / limit)
+        while not await limiter.is_allowed(domain, limit, self.distributed_window):
+            self._stats["distributed_denied"] += 1
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.5))
+
+    def _get_redis_limiter(self):
+        if self._redis_limiter is None:
+            try:
+                from antcode_core.infrastructure.redis import RedisRateLimiter
+            except ImportError:
+                logger.warning("antcode_core.infrastructure.redis 不可用，分布式限速已关闭")
+                self.distributed = False
+                return None
+            self._redis_limiter = RedisRateLimiter(key_prefix="ratelimit:spider:")
+        return self._redis_limiter
+
+    def get_stats(self) -> dict:
+        return {
+            **self._stats,
+            "wait_seconds": round(self._stats["wait_seconds"], 3),
+            "domains": len(self._buckets),
+            "slowed_domains": sum(1 for b in self._buckets.values() if b.factor > 1.0),
+        }
 
 
 # ============ Cookie 中间件 ============
@@ -1,5 +1,6 @@
 """项目获取与缓存模块"""
 
-from antcode_worker.projects.fetcher import ArtifactFetcher, ProjectCache
+from antcode_worker.projects.fetcher import ArtifactFetcher, FetcherStats, ProjectCache
+from antcode_worker.projects.store import ArtifactStore, SingleFlight
 
-__all__ = ["ArtifactFetcher", "ProjectCache"]
+__all__ = ["ArtifactFetcher", "ArtifactStore", "FetcherStats", "ProjectCache", "SingleFlight"]
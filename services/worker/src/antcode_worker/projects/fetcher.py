@@ -2,25 +2,34 @@
 项目拉取与缓存
 
 提供基于 file_hash 的缓存与安全解压。
+并发拉取同一产物时只下载一次（single-flight），
+相同内容的产物跨项目只存储、解压一次（内容寻址存储）。
 """
 
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import hashlib
 import json
 import os
 import re
+import shutil
 import tarfile
+import threading
 import time
+import uuid
 import zipfile
-from dataclasses import asdict, dataclass, field
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, fields
 from pathlib import Path
 from typing import Any
 from urllib.parse import parse_qs, urlparse
 
 from loguru import logger
 
+from antcode_worker.projects.store import ArtifactStore, SingleFlight
+
 
 @dataclass
 class ProjectCacheEntry:
@@ -33,91 +42,403 @@ class ProjectCacheEntry:
     created_at: float = field(default_factory=time.time)
     last_access: float = field(default_factory=time.time)
     size_bytes: int = 0
+    storage_path: str = ""  # 淘汰时删除的目录（多个条目可共享）
+    disk_bytes: int = 0  # storage_path 占用的磁盘空间
 
     def to_dict(self) -> dict[str, Any]:
         return asdict(self)
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> ProjectCacheEntry:
-        return cls(**data)
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+    @property
+    def owned_path(self) -> str:
+        return self.storage_path or self.local_path
 
 
 class ProjectCache:
-    """项目缓存索引"""
+    """
+    项目缓存索引
+
+    - 索引 = 快照（index.json）+ 追加日志（index.journal），写入只追加，
+      日志超过阈值后合并为新快照
+    - 访问时间更新在内存中合并，按 flush_interval 批量在线程池中落盘
+    - 按 LRU 淘汰（OrderedDict，O(1)），同时受条目数与字节预算约束，
+      淘汰时删除不再被引用的磁盘目录
+    - 进行中的拉取与运行中的任务通过 pin 引用目录；被 pin 的目录淘汰/过期时
+      只移出索引，待最后一个 unpin 后再删除
+    """
 
     INDEX_FILE = "index.json"
+    JOURNAL_FILE = "index.journal"
+    TRASH_DIR = ".trash"
 
     def __init__(
         self,
         cache_dir: str,
         max_entries: int = 200,
         ttl_hours: int = 24 * 7,
+        max_bytes: int = 0,
+        flush_interval: float = 1.0,
+        compact_threshold: int = 1000,
     ):
         self._cache_dir = Path(cache_dir)
         self._cache_dir.mkdir(parents=True, exist_ok=True)
         self._index_path = self._cache_dir / self.INDEX_FILE
+        self._journal_path = self._cache_dir / self.JOURNAL_FILE
         self._max_entries = max_entries
+        self._max_bytes = max_bytes
         self._ttl_seconds = ttl_hours * 3600
-        self._entries: dict[str, ProjectCacheEntry] = {}
+        self._flush_interval = flush_interval
+        self._compact_threshold = compact_threshold
+
+        # LRU 顺序：最久未访问在前
+        self._entries: OrderedDict[str, ProjectCacheEntry] = OrderedDict()
+        self._path_refs: dict[str, int] = {}
+        self._total_bytes = 0
+        # 使用中的目录引用计数（项目路径 -> 所在目录），以及已移出索引、等待释放后删除的目录
+        self._pins: dict[str, int] = {}
+        self._leases: dict[str, str] = {}
+        self._deferred: set[str] = set()
+        self._trash_dir = self._cache_dir / self.TRASH_DIR
+        shutil.rmtree(self._trash_dir, ignore_errors=True)
         self._lock = asyncio.Lock()
+
+        # 待落盘的日志记录与合并后的访问时间
+        self._pending: list[dict[str, Any]] = []
+        self._touches: dict[str, float] = {}
+        self._journal_records = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task | None = None
+        self._io_lock = threading.Lock()
+
         self._load_index()
 
-    def _load_index(self) -> None:
-        if not self._index_path.exists():
-            return
-        try:
-            data = json.loads(self._index_path.read_text(encoding="utf-8"))
-            for key, entry in data.items():
-                self._entries[key] = ProjectCacheEntry.from_dict(entry)
-        except Exception as exc:
-            logger.warning(f"读取项目缓存索引失败: {exc}")
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
-    def _save_index(self) -> None:
-        data = {k: v.to_dict() for k, v in self._entries.items()}
-        self._index_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    # ==================== 加载 ====================
 
-    async def get(self, cache_key: str) -> str | None:
+    def _load_index(self) -> None:
+        entries: dict[str, ProjectCacheEntry] = {}
+        if self._index_path.exists():
+            try:
+                data = json.loads(self._index_path.read_text(encoding="utf-8"))
+                for key, entry in data.items():
+                    entries[key] = ProjectCacheEntry.from_dict(entry)
+            except Exception as exc:
+                logger.warning(f"读取项目缓存索引失败: {exc}")
+
+        if self._journal_path.exists():
+            try:
+                with open(self._journal_path, encoding="utf-8") as f:
+                    for line in f:
+                        self._journal_records += 1
+                        self._replay_record(entries, line)
+            except Exception as exc:
+                logger.warning(f"读取项目缓存日志失败: {exc}")
+
+        for entry in sorted(entries.values(), key=lambda e: e.last_access):
+            self._add_locked(entry)
+
+    def _replay_record(self, entries: dict[str, ProjectCacheEntry], line: str) -> None:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # 崩溃时可能残留半行，忽略
+            return
+        op = record.get("op")
+        if op == "put":
+            entry = ProjectCacheEntry.from_dict(record["entry"])
+            entries[entry.cache_key] = entry
+        elif op == "del":
+            entries.pop(record.get("key", ""), None)
+        elif op == "touch":
+            entry = entries.get(record.get("key", ""))
+            if entry:
+                entry.last_access = float(record.get("ts", entry.last_access))
+
+    # ==================== 读写 ====================
+
+    async def get(self, cache_key: str, pin: bool = False) -> str | None:
+        """查找缓存；pin=True 时命中即 pin 条目目录，调用方用完后需 release(返回的路径)"""
+        removed: list[str] = []
         async with self._lock:
             entry = self._entries.get(cache_key)
             if not entry:
                 return None
 
             now = time.time()
-            if now - entry.created_at > self._ttl_seconds:
-                self._entries.pop(cache_key, None)
-                self._save_index()
-                return None
-
-            if not os.path.exists(entry.local_path):
-                self._entries.pop(cache_key, None)
-                self._save_index()
-                return None
-
-            entry.last_access = now
-            self._save_index()
-            return entry.local_path
+            if now - entry.created_at > self._ttl_seconds or not os.path.exists(entry.local_path):
+                removed = self._take_deletable(self._remove_locked(cache_key))
+                self._record({"op": "del", "key": cache_key})
+            else:
+                entry.last_access = now
+                self._entries.move_to_end(cache_key)
+                self._touches[cache_key] = now
+                self._schedule_flush()
+                if pin:
+                    self._acquire(entry.local_path, entry.owned_path)
+                return entry.local_path
+
+            if removed:
+                await asyncio.to_thread(self._delete_paths, removed)
+            return None
 
     async def put(self, entry: ProjectCacheEntry) -> None:
         async with self._lock:
-            if len(self._entries) >= self._max_entries:
-                self._evict_locked()
-            self._entries[entry.cache_key] = entry
-            self._save_index()
+            removed = self._remove_locked(entry.cache_key, keep_path=entry.owned_path)
+            self._add_locked(entry)
+            self._deferred.discard(entry.owned_path)
+            self._record({"op": "put", "entry": entry.to_dict()})
+            removed.extend(self._evict_locked())
+            removed = self._take_deletable(removed)
+            if removed:
+                await asyncio.to_thread(self._delete_paths, removed)
+
+    def pin(self, local_path: str, owned_path: str) -> bool:
+        """
+        pin 项目路径所在的目录（目录不存在时返回 False），用完后需 release(local_path)
+
+        检查与计数之间没有让出事件循环，而淘汰在同一事件循环中先把目录移入
+        回收目录，因此 pin 成功后目录在释放前不会被删除。
+        """
+        if not os.path.isdir(owned_path):
+            return False
+        self._acquire(local_path, owned_path)
+        return True
 
-    def _evict_locked(self) -> None:
-        if not self._entries:
+    async def release(self, local_path: str) -> None:
+        """释放 pin；目录已被淘汰且不再使用时在此删除"""
+        path = self._leases.get(local_path)
+        if path is None:
+            return
+        refs = self._pins.get(path, 0) - 1
+        if refs > 0:
+            self._pins[path] = refs
+            return
+        self._pins.pop(path, None)
+        self._leases.pop(local_path, None)
+        if path not in self._deferred:
             return
-        oldest = sorted(self._entries.values(), key=lambda e: e.last_access)
-        evict_count = max(1, len(self._entries) - self._max_entries + 1)
-        for entry in oldest[:evict_count]:
-            self._entries.pop(entry.cache_key, None)
+        async with self._lock:
+            if path in self._pins or path in self._path_refs or path not in self._deferred:
+                return
+            self._deferred.discard(path)
+            removed = self._take_deletable([path])
+            await asyncio.to_thread(self._delete_paths, removed)
+
+    async def flush(self) -> None:
+        """立即落盘所有待写记录"""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        records, snapshot = self._drain_pending()
+        if records or snapshot is not None:
+            await asyncio.to_thread(self._write_records, records, snapshot)
+
+    async def close(self) -> None:
+        """关闭前落盘"""
+        if self._flush_task:
+            with contextlib.suppress(Exception):
+                await self._flush_task
+        await self.flush()
+
+    # ==================== 内部：内存索引 ====================
+
+    def _add_locked(self, entry: ProjectCacheEntry) -> None:
+        self._entries[entry.cache_key] = entry
+        self._entries.move_to_end(entry.cache_key)
+        path = entry.owned_path
+        refs = self._path_refs.get(path, 0)
+        if refs == 0:
+            self._total_bytes += entry.disk_bytes
+        self._path_refs[path] = refs + 1
+
+    def _remove_locked(self, cache_key: str, keep_path: str | None = None) -> list[str]:
+        """移除条目，返回引用计数归零、需要删除的目录"""
+        entry = self._entries.pop(cache_key, None)
+        if not entry:
+            return []
+        path = entry.owned_path
+        refs = self._path_refs.get(path, 0) - 1
+        if refs > 0:
+            self._path_refs[path] = refs
+            return []
+        self._path_refs.pop(path, None)
+        self._total_bytes -= entry.disk_bytes
+        if path == keep_path:
+            return []
+        return [path]
+
+    def _evict_locked(self) -> list[str]:
+        removed: list[str] = []
+        while len(self._entries) > 1 and (
+            len(self._entries) > self._max_entries
+            or (self._max_bytes and self._total_bytes > self._max_bytes)
+        ):
+            cache_key = next(iter(self._entries))
+            removed.extend(self._remove_locked(cache_key))
+            self._record({"op": "del", "key": cache_key})
+        return removed
+
+    def _acquire(self, local_path: str, owned_path: str) -> None:
+        self._pins[owned_path] = self._pins.get(owned_path, 0) + 1
+        self._leases[local_path] = owned_path
+
+    def _take_deletable(self, paths: list[str]) -> list[str]:
+        """
+        过滤待删目录：被 pin 的推迟到 unpin，其余立即移入回收目录
+
+        rename 在事件循环中同步完成，之后的 lookup/pin 不会再看到该目录；
+        实际的 rmtree 由调用方放到线程池执行。
+        """
+        deletable: list[str] = []
+        for path in paths:
+            if path in self._pins:
+                self._deferred.add(path)
+                continue
+            deletable.append(self._move_to_trash(path))
+        return deletable
+
+    def _move_to_trash(self, path: str) -> str:
+        try:
+            Path(path).resolve().relative_to(self._cache_dir.resolve())
+            self._trash_dir.mkdir(exist_ok=True)
+            target = self._trash_dir / uuid.uuid4().hex
+            os.rename(path, target)
+        except (ValueError, OSError):
+            return path
+        return str(target)
+
+    def _delete_paths(self, paths: list[str]) -> None:
+        for path in paths:
+            target = Path(path)
+            # 只删除缓存目录内的路径
+            try:
+                target.resolve().relative_to(self._cache_dir.resolve())
+            except ValueError:
+                continue
+            shutil.rmtree(target, ignore_errors=True)
+
+    # ==================== 内部：日志落盘 ====================
+
+    def _record(self, record: dict[str, Any]) -> None:
+        key = record.get("key") or record.get("entry", {}).get("cache_key")
+        # put/del 之后的访问时间已包含在记录中
+        self._touches.pop(key, None)
+        self._pending.append(record)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle or self._flush_task:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_handle = loop.call_later(self._flush_interval, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._flush_handle = None
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        try:
+            await self.flush()
+        except Exception as exc:
+            logger.warning(f"写入项目缓存索引失败: {exc}")
+        finally:
+            self._flush_task = None
+            if self._pending or self._touches:
+                self._schedule_flush()
+
+    def _drain_pending(self) -> tuple[list[dict[str, Any]], dict[str, Any] | None]:
+        records = self._pending
+        records.extend(
+            {"op": "touch", "key": key, "ts": ts} for key, ts in self._touches.items()
+        )
+        self._pending = []
+        self._touches = {}
+
+        if self._journal_records + len(records) > self._compact_threshold:
+            snapshot = {k: v.to_dict() for k, v in self._entries.items()}
+            self._journal_records = 0
+            return [], snapshot
+
+        self._journal_records += len(records)
+        return records, None
+
+    def _write_records(
+        self, records: list[dict[str, Any]], snapshot: dict[str, Any] | None
+    ) -> None:
+        with self._io_lock:
+            if snapshot is not None:
+                tmp_path = self._index_path.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp_path, self._index_path)
+                # 快照已包含全部状态，清空日志
+                with open(self._journal_path, "w", encoding="utf-8"):
+                    pass
+                return
+            with open(self._journal_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+
+
+@dataclass
+class FetcherStats:
+    """项目拉取统计"""
+
+    hits: int = 0  # 索引命中
+    store_hits: int = 0  # 内容寻址存储命中（跨项目复用）
+    misses: int = 0  # 需要下载
+    inflight_joins: int = 0  # 加入进行中的下载
+    downloads: int = 0
+    bytes_downloaded: int = 0
+    bytes_saved: int = 0  # 因复用而免于下载的字节数
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
 
 
 class ArtifactFetcher:
-    """项目文件获取器"""
+    """
+    项目文件获取器
+
+    fetch 返回的项目路径在 release 之前保持 pin，缓存淘汰不会删除正在使用的目录。
+    """
+
+    STORE_DIR = "_store"
+    PIN_ATTEMPTS = 3
 
     def __init__(self, cache: ProjectCache):
         self._cache = cache
+        self._store = ArtifactStore(cache._cache_dir / self.STORE_DIR)
+        self._store.purge_staging()
+        self._flights = SingleFlight()
+        self._stats = FetcherStats()
+
+    def get_stats(self) -> dict[str, int]:
+        """获取拉取统计（供可观测性指标使用）"""
+        stats = self._stats.to_dict()
+        stats["inflight"] = self._flights.inflight_count
+        stats["entries"] = len(self._cache)
+        stats["disk_bytes"] = self._cache.total_bytes
+        return stats
+
+    async def close(self) -> None:
+        """落盘缓存索引"""
+        await self._cache.close()
+
+    async def release(self, project_path: str) -> None:
+        """任务结束后释放 fetch 返回的项目路径"""
+        await self._cache.release(project_path)
 
     async def fetch(
         self,
@@ -147,57 +468,171 @@ class ArtifactFetcher:
         entry_point: str | None = None,
     ) -> str:
         cache_key = self._build_cache_key(project_id, file_hash, download_url)
-        cached = await self._cache.get(cache_key)
+        cached = await self._cache.get(cache_key, pin=True)
         if cached:
+            self._stats.hits += 1
             return cached
 
-        project_dir = self._build_project_dir(project_id, cache_key)
-        project_dir.mkdir(parents=True, exist_ok=True)
-
         filename = self._guess_filename(download_url)
-        file_path = project_dir / filename
-
-        await self._download_file(download_url, file_path)
-
-        if file_hash:
-            algo = self._detect_hash_algo(file_hash)
-            actual = await asyncio.to_thread(self._hash_file, file_path, algo)
-            if actual.lower() != file_hash.lower():
-                raise RuntimeError(f"项目文件哈希不一致: expected={file_hash}, actual={actual}")
-
-        # 判断是否需要解压
-        # 1. 如果明确指定 is_compressed=False，则不解压
-        # 2. 如果是压缩包扩展名，则解压
-        should_extract = True
-        if is_compressed is False:
-            should_extract = False
+        extract = is_compressed is not False and self._is_archive(filename)
+        # 不解压时目标文件名参与对象 key（同内容不同入口文件需各自存放）
+        if extract:
+            variant = ""
+        elif is_compressed is False:
+            variant = entry_point or filename
+        else:
+            variant = filename
 
-        if should_extract:
-            extracted_path = await self._extract_if_needed(file_path, project_dir)
+        # 有哈希时按内容去重，否则退化为按下载地址去重
+        flight_key = (
+            ArtifactStore.object_key(file_hash, variant) if file_hash else f"url:{cache_key}"
+        )
+        for _ in range(self.PIN_ATTEMPTS):
+            (final_path, size_bytes, object_dir, disk_bytes), shared = await self._flights.do(
+                flight_key,
+                lambda: self._materialize_artifact(
+                    download_url=download_url,
+                    file_hash=file_hash,
+                    filename=filename,
+                    extract=extract,
+                    variant=variant,
+                    single_file=is_compressed is False,
+                ),
+            )
+            if shared:
+                self._stats.inflight_joins += 1
+                self._stats.bytes_saved += size_bytes
+            # 对象可能在返回前被并发淘汰，pin 失败时重新拉取
+            if self._cache.pin(final_path, object_dir):
+                break
         else:
-            extracted_path = None
-            # 对于单个文件，将其移动到 extracted 目录以保持一致的目录结构
-            extract_dir = project_dir / "extracted"
-            extract_dir.mkdir(parents=True, exist_ok=True)
-            # 使用 entry_point 作为文件名（如果提供），否则使用原始文件名
-            target_name = entry_point if entry_point else filename
-            target_path = extract_dir / target_name
-            await asyncio.to_thread(self._copy_file, file_path, target_path)
-            extracted_path = str(extract_dir)
-
-        final_path = extracted_path or str(project_dir)
-
-        size_bytes = file_path.stat().st_size if file_path.exists() else 0
+            raise RuntimeError(f"项目目录在使用前被淘汰: {project_id}")
+
         entry = ProjectCacheEntry(
             cache_key=cache_key,
             project_id=project_id,
             file_hash=file_hash or "",
             local_path=final_path,
             size_bytes=size_bytes,
+            storage_path=object_dir,
+            disk_bytes=disk_bytes,
         )
-        await self._cache.put(entry)
+        await self._put_pinned(entry)
         return final_path
 
+    async def _put_pinned(self, entry: ProjectCacheEntry) -> None:
+        """写入索引；失败时释放调用方持有的 pin"""
+        try:
+            await self._cache.put(entry)
+        except BaseException:
+            await self._cache.release(entry.local_path)
+            raise
+
+    async def _materialize_artifact(
+        self,
+        download_url: str,
+        file_hash: str | None,
+        filename: str,
+        extract: bool,
+        variant: str,
+        single_file: bool,
+    ) -> tuple[str, int, str, int]:
+        """
+        下载并解压到内容寻址存储
+
+        Returns:
+            (项目路径, 产物字节数, 对象目录, 对象目录磁盘占用)
+        """
+        if file_hash:
+            existing = self._store.lookup(ArtifactStore.object_key(file_hash, variant))
+            if existing:
+                return await self._reuse_object(existing, extract, single_file)
+
+        self._stats.misses += 1
+        staging = await asyncio.to_thread(self._store.new_staging_dir)
+        try:
+            file_path = staging / filename
+            await self._download_file(download_url, file_path)
+            size_bytes = file_path.stat().st_size if file_path.exists() else 0
+            self._stats.downloads += 1
+            self._stats.bytes_downloaded += size_bytes
+
+            algo = self._detect_hash_algo(file_hash) if file_hash else "sha256"
+            actual = await asyncio.to_thread(self._hash_file, file_path, algo)
+            if file_hash and actual.lower() != file_hash.lower():
+                raise RuntimeError(f"项目文件哈希不一致: expected={file_hash}, actual={actual}")
+
+            key = ArtifactStore.object_key(actual, variant)
+            if not file_hash:
+                # 未提供哈希时下载后才能得知内容，仍可避免重复解压与存储
+                existing = self._store.lookup(key)
+                if existing:
+                    await asyncio.to_thread(self._store.discard, staging)
+                    disk_bytes = await asyncio.to_thread(self._dir_size, existing)
+                    return (
+                        self._object_project_path(existing, extract, single_file),
+                        size_bytes,
+                        str(existing),
+                        disk_bytes,
+                    )
+
+            if extract:
+                await self._extract_if_needed(file_path, staging)
+            elif single_file:
+                # 对于单个文件，将其移动到 extracted 目录以保持一致的目录结构
+                target_path = staging / "extracted" / variant
+                await asyncio.to_thread(self._copy_file, file_path, target_path)
+
+            disk_bytes = await asyncio.to_thread(self._dir_size, staging)
+            object_dir = await asyncio.to_thread(self._store.commit, key, staging)
+            return (
+                self._object_project_path(object_dir, extract, single_file),
+                size_bytes,
+                str(object_dir),
+                disk_bytes,
+            )
+        except BaseException:
+            self._store.discard(staging)
+            raise
+
+    async def _reuse_object(
+        self, object_dir: Path, extract: bool, single_file: bool
+    ) -> tuple[str, int, str, int]:
+        size_bytes = self._object_size(object_dir)
+        disk_bytes = await asyncio.to_thread(self._dir_size, object_dir)
+        self._stats.store_hits += 1
+        self._stats.bytes_saved += size_bytes
+        return (
+            self._object_project_path(object_dir, extract, single_file),
+            size_bytes,
+            str(object_dir),
+            disk_bytes,
+        )
+
+    def _object_project_path(self, object_dir: Path, extract: bool, single_file: bool) -> str:
+        if extract or single_file:
+            return str(object_dir / "extracted")
+        return str(object_dir)
+
+    def _object_size(self, object_dir: Path) -> int:
+        """对象中原始产物文件大小"""
+        for child in object_dir.iterdir():
+            if child.is_file():
+                return child.stat().st_size
+        return 0
+
+    def _dir_size(self, path: Path) -> int:
+        total = 0
+        for root, _dirs, files in os.walk(path):
+            for name in files:
+                with contextlib.suppress(OSError):
+                    total += os.lstat(os.path.join(root, name)).st_size
+        return total
+
+    def _is_archive(self, filename: str) -> bool:
+        name = filename.lower()
+        return name.endswith((".zip", ".tar.gz", ".tgz"))
+
     async def _fetch_git_project(
         self,
         project_id: str,
@@ -208,16 +643,22 @@ class ArtifactFetcher:
         cache_key = self._build_cache_key(project_id, file_hash, download_url)
 
         if file_hash:
-            cached = await self._cache.get(cache_key)
+            cached = await self._cache.get(cache_key, pin=True)
             if cached:
+                self._stats.hits += 1
                 return cached
 
-        project_dir = self._build_project_dir(project_id, cache_key)
-        await asyncio.to_thread(self._prepare_project_dir, project_dir)
-
-        repo_dir = project_dir / "repo"
-        await self._clone_git_repo(source_config, repo_dir)
-        final_path = self._resolve_git_project_path(repo_dir, source_config.get("subdir"))
+        for _ in range(self.PIN_ATTEMPTS):
+            (final_path, project_dir, disk_bytes), shared = await self._flights.do(
+                f"git:{cache_key}",
+                lambda: self._clone_git_project(project_id, cache_key, source_config),
+            )
+            if shared:
+                self._stats.inflight_joins += 1
+            if self._cache.pin(final_path, project_dir):
+                break
+        else:
+            raise RuntimeError(f"项目目录在使用前被淘汰: {project_id}")
 
         if file_hash:
             entry = ProjectCacheEntry(
@@ -226,11 +667,29 @@ class ArtifactFetcher:
                 file_hash=file_hash,
                 local_path=final_path,
                 size_bytes=0,
+                storage_path=project_dir,
+                disk_bytes=disk_bytes,
             )
-            await self._cache.put(entry)
+            await self._put_pinned(entry)
 
         return final_path
 
+    async def _clone_git_project(
+        self,
+        project_id: str,
+        cache_key: str,
+        source_config: dict[str, str],
+    ) -> tuple[str, str, int]:
+        self._stats.misses += 1
+        project_dir = self._build_project_dir(project_id, cache_key)
+        await asyncio.to_thread(self._prepare_project_dir, project_dir)
+
+        repo_dir = project_dir / "repo"
+        await self._clone_git_repo(source_config, repo_dir)
+        final_path = self._resolve_git_project_path(repo_dir, source_config.get("subdir"))
+        disk_bytes = await asyncio.to_thread(self._dir_size, project_dir)
+        return final_path, str(project_dir), disk_bytes
+
     def _build_cache_key(self, project_id: str, file_hash: str | None, url: str) -> str:
         safe_project = self._safe_slug(project_id)
         if file_hash:
@@ -379,7 +838,7 @@ class ArtifactFetcher:
 
     async def _extract_if_needed(self, file_path: Path, project_dir: Path) -> str | None:
         name = file_path.name.lower()
-        if not (name.endswith(".zip") or name.endswith(".tar.gz") or name.endswith(".tgz")):
+        if not self._is_archive(name):
             return None
 
         extract_dir = project_dir / "extracted"
@@ -0,0 +1,141 @@
+"""
+内容寻址的项目产物存储
+
+- ArtifactStore：按内容哈希存放下载文件与解压结果，跨项目共享
+- SingleFlight：同一 key 的并发请求只执行一次，其余等待结果
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import shutil
+import uuid
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+
+class _LeaderCancelled(Exception):
+    """执行方被取消，等待方应重新加入或接替执行"""
+
+
+class SingleFlight:
+    """同 key 并发去重：首个调用方执行，其余调用方共享结果或异常
+
+    执行方被取消时不把取消传给等待方：等待方重新发起，其中一个接替执行。
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @property
+    def inflight_count(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        执行或加入同 key 的进行中请求
+
+        Returns:
+            (结果, 是否共享了其他调用方的结果)
+        """
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                # shield：等待方被取消时不影响执行方
+                return await asyncio.shield(future), True
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await factory()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.set_exception(_LeaderCancelled())
+            else:
+                future.set_exception(e)
+            # 无等待方时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._inflight.pop(key, None)
+
+
+class ArtifactStore:
+    """
+    内容寻址存储
+
+    目录结构::
+
+        objects/<hash[:2]>/<object_key>/   已提交对象（只读）
+        staging/<uuid>/                    构建中的临时目录
+
+    对象在 staging 中构建完成后通过 rename 原子切换到 objects，
+    读者永远不会看到半解压的目录。
+    """
+
+    OBJECTS_DIR = "objects"
+    STAGING_DIR = "staging"
+
+    def __init__(self, root_dir: str | Path):
+        self._root = Path(root_dir)
+        self._objects_dir = self._root / self.OBJECTS_DIR
+        self._staging_dir = self._root / self.STAGING_DIR
+        self._objects_dir.mkdir(parents=True, exist_ok=True)
+        self._staging_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def objects_dir(self) -> Path:
+        return self._objects_dir
+
+    @staticmethod
+    def object_key(content_hash: str, variant: str = "") -> str:
+        """对象 key：内容哈希 + 可选变体（如单文件的目标文件名）"""
+        key = content_hash.lower()
+        if variant:
+            key = f"{key}-{re.sub(r'[^a-zA-Z0-9._-]', '_', variant)}"
+        return key
+
+    def object_path(self, key: str) -> Path:
+        return self._objects_dir / key[:2] / key
+
+    def lookup(self, key: str) -> Path | None:
+        """查找已提交对象"""
+        path = self.object_path(key)
+        return path if path.is_dir() else None
+
+    def new_staging_dir(self) -> Path:
+        """创建临时构建目录"""
+        path = self._staging_dir / uuid.uuid4().hex
+        path.mkdir(parents=True, exist_ok=False)
+        return path
+
+    def commit(self, key: str, staging_path: Path) -> Path:
+        """
+        原子提交对象
+
+        目标已存在（其他进程抢先提交）时丢弃临时目录并复用已有对象。
+        """
+        target = self.object_path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.rename(staging_path, target)
+        except OSError:
+            if not target.is_dir():
+                raise
+            shutil.rmtree(staging_path, ignore_errors=True)
+        return target
+
+    def discard(self, staging_path: Path) -> None:
+        shutil.rmtree(staging_path, ignore_errors=True)
+
+    def purge_staging(self) -> None:
+        """清理上次进程残留的临时目录"""
+        for child in self._staging_dir.iterdir():
+            shutil.rmtree(child, ignore_errors=True)
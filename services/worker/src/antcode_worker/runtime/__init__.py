@@ -51,6 +51,15 @@ from antcode_worker.runtime.manager import (
     get_runtime_manager,
     set_runtime_manager,
 )
+
+# 预热
+from antcode_worker.runtime.prewarm import RuntimePrewarmer
+
+# 注册表
+from antcode_worker.runtime.registry import (
+    RuntimeEntry,
+    RuntimeRegistry,
+)
 from antcode_worker.runtime.spec import (
     LockSource,
     PythonSpec,
@@ -86,6 +95,11 @@ __all__ = [
     "GCStats",
     "RuntimeInfo",
     "get_runtime_gc",
+    # 预热
+    "RuntimePrewarmer",
+    # 注册表
+    "RuntimeRegistry",
+    "RuntimeEntry",
     # 管理器
     "RuntimeManager",
     "RuntimeManagerConfig",
@@ -18,7 +18,9 @@ from typing import Any
 import ujson
 from loguru import logger
 
+from antcode_worker.runtime.gc import compute_dir_size
 from antcode_worker.runtime.hash import compute_runtime_hash
+from antcode_worker.runtime.registry import RuntimeEntry, RuntimeRegistry
 from antcode_worker.runtime.spec import RuntimeSpec
 from antcode_worker.runtime.uv_manager import CommandResult, run_command
 
@@ -35,6 +37,7 @@ class BuildResult:
     error_message: str | None = None
     build_time_ms: float = 0
     cached: bool = False
+    size_bytes: int = 0
 
     def to_dict(self) -> dict[str, Any]:
         """转换为字典"""
@@ -47,6 +50,7 @@ class BuildResult:
             "error_message": self.error_message,
             "build_time_ms": self.build_time_ms,
             "cached": self.cached,
+            "size_bytes": self.size_bytes,
         }
 
 
@@ -64,6 +68,7 @@ class RuntimeBuilder:
         venvs_dir: str,
         timeout: int = 600,
         uv_cache_dir: str | None = None,
+        registry: RuntimeRegistry | None = None,
     ):
         """
         初始化构建器
@@ -72,10 +77,12 @@ class RuntimeBuilder:
             venvs_dir: 虚拟环境存储目录
             timeout: 构建超时时间（秒）
             uv_cache_dir: uv 缓存目录
+            registry: 运行时注册表，为空时每次复用都读取清单并查询版本
         """
         self.venvs_dir = venvs_dir
         self.timeout = timeout
         self.uv_cache_dir = uv_cache_dir
+        self.registry = registry
 
         # 确保目录存在
         os.makedirs(venvs_dir, exist_ok=True)
@@ -308,7 +315,8 @@ class RuntimeBuilder:
         spec: RuntimeSpec,
         runtime_hash: str,
         python_version: str | None,
-    ) -> None:
+        size_bytes: int | None = None,
+    ) -> dict[str, Any]:
         """保存清单文件"""
         manifest = {
             "runtime_hash": runtime_hash,
@@ -317,10 +325,13 @@ class RuntimeBuilder:
             "created_at": datetime.now().isoformat(),
             "last_used": datetime.now().isoformat(),
         }
+        if size_bytes is not None:
+            manifest["size_bytes"] = size_bytes
 
         manifest_path = self._get_manifest_path(venv_path)
         with open(manifest_path, "w", encoding="utf-8") as f:
             ujson.dump(manifest, f, ensure_ascii=False, indent=2)
+        return manifest
 
     def _load_manifest(self, venv_path: str) -> dict[str, Any] | None:
         """加载清单文件"""
@@ -335,7 +346,13 @@ class RuntimeBuilder:
             return None
 
     def _update_last_used(self, venv_path: str) -> None:
-        """更新最后使用时间"""
+        """更新最后使用时间（有注册表时只更新内存，由注册表批量写回）"""
+        if self.registry is not None:
+            runtime_hash = os.path.basename(os.path.normpath(venv_path))
+            if runtime_hash in self.registry:
+                self.registry.touch(runtime_hash)
+                return
+
         manifest = self._load_manifest(venv_path)
         if manifest:
             manifest["last_used"] = datetime.now().isoformat()
@@ -370,6 +387,73 @@ class RuntimeBuilder:
 
         return tmp_path
 
+    def load_registry(self) -> int:
+        """从已有运行时的清单加载注册表（同步，启动时调用一次）"""
+        if self.registry is None or not os.path.exists(self.venvs_dir):
+            return 0
+
+        loaded = 0
+        for name in os.listdir(self.venvs_dir):
+            venv_path = os.path.join(self.venvs_dir, name)
+            python_exe = self._get_python_executable(venv_path)
+            if not os.path.exists(python_exe):
+                continue
+
+            manifest = self._load_manifest(venv_path)
+            if not manifest or not manifest.get("python_version"):
+                # 缺少清单或版本，首次复用时再补齐
+                continue
+
+            self.registry.put(
+                RuntimeEntry(
+                    runtime_hash=name,
+                    venv_path=venv_path,
+                    python_executable=python_exe,
+                    python_version=manifest["python_version"],
+                    manifest=manifest,
+                )
+            )
+            loaded += 1
+        return loaded
+
+    async def _lookup_cached(self, runtime_hash: str) -> RuntimeEntry | None:
+        """查找可复用的运行时"""
+        venv_path = self._get_venv_path(runtime_hash)
+        python_exe = self._get_python_executable(venv_path)
+
+        if self.registry is not None:
+            entry = self.registry.get(runtime_hash)
+            if entry is not None:
+                if os.path.exists(entry.python_executable):
+                    self.registry.touch(runtime_hash)
+                    return entry
+                # 运行时已被外部删除
+                self.registry.invalidate(runtime_hash)
+
+        if not os.path.exists(python_exe):
+            return None
+
+        # 注册表未命中（由其他进程构建或清单不完整）：读取清单，缺少版本时才启动子进程
+        manifest = self._load_manifest(venv_path) or {}
+        python_version = manifest.get("python_version") or await self._get_python_version(
+            python_exe
+        )
+        entry = RuntimeEntry(
+            runtime_hash=runtime_hash,
+            venv_path=venv_path,
+            python_executable=python_exe,
+            python_version=python_version,
+            manifest=manifest,
+        )
+
+        if self.registry is not None and manifest:
+            manifest["python_version"] = python_version
+            self.registry.put(entry)
+            self.registry.touch(runtime_hash)
+        else:
+            self._update_last_used(venv_path)
+        return entry
+
     def exists(self, runtime_hash: str) -> bool:
         """检查运行时是否已存在"""
         venv_path = self._get_venv_path(runtime_hash)
@@ -401,23 +485,23 @@ class RuntimeBuilder:
         python_exe = self._get_python_executable(venv_path)
 
         # 检查是否已存在
-        if not force_rebuild and os.path.exists(python_exe):
+        cached = None if force_rebuild else await self._lookup_cached(runtime_hash)
+        if cached is not None:
             logger.info(f"运行时已存在，复用缓存: {runtime_hash}")
-            self._update_last_used(venv_path)
-
-            python_version = await self._get_python_version(python_exe)
-
             return BuildResult(
                 success=True,
-                venv_path=venv_path,
+                venv_path=cached.venv_path,
                 runtime_hash=runtime_hash,
-                python_executable=python_exe,
-                python_version=python_version,
+                python_executable=cached.python_executable,
+                python_version=cached.python_version,
                 cached=True,
+                size_bytes=cached.manifest.get("size_bytes") or 0,
                 build_time_ms=(asyncio.get_event_loop().time() - start_time) * 1000,
             )
 
         logger.info(f"开始构建运行时: {runtime_hash}")
+        if self.registry is not None:
+            self.registry.invalidate(runtime_hash)
 
         # 清理旧目录（如果存在）
         if os.path.exists(venv_path):
@@ -456,8 +540,23 @@ class RuntimeBuilder:
             # 获取 Python 版本
             python_version = await self._get_python_version(python_exe)
 
+            # 统计占用大小（构建后只统计一次，供 GC 大小索引使用）
+            size_bytes = await asyncio.to_thread(compute_dir_size, venv_path)
+
             # 保存清单
-            self._save_manifest(venv_path, spec, runtime_hash, python_version)
+            manifest = self._save_manifest(
+                venv_path, spec, runtime_hash, python_version, size_bytes
+            )
+            if self.registry is not None:
+                self.registry.put(
+                    RuntimeEntry(
+                        runtime_hash=runtime_hash,
+                        venv_path=venv_path,
+                        python_executable=python_exe,
+                        python_version=python_version,
+                        manifest=manifest,
+                    )
+                )
 
             build_time = (asyncio.get_event_loop().time() - start_time) * 1000
             logger.info(f"运行时构建完成: {runtime_hash}, 耗时: {build_time:.0f}ms")
@@ -469,6 +568,7 @@ class RuntimeBuilder:
                 python_executable=python_exe,
                 python_version=python_version,
                 build_time_ms=build_time,
+                size_bytes=size_bytes,
             )
 
         except Exception as e:
@@ -493,6 +593,8 @@ class RuntimeBuilder:
             是否成功删除
         """
         venv_path = self._get_venv_path(runtime_hash)
+        if self.registry is not None:
+            self.registry.invalidate(runtime_hash)
 
         if not os.path.exists(venv_path):
             return False
@@ -3,6 +3,11 @@
 
 实现 TTL/LRU/disk watermark 清理策略。
 
+磁盘占用通过大小索引统计，不在每次 GC 时遍历目录：
+- 运行时构建完成（或命名环境增删包）时统计一次，写入清单 size_bytes
+- GC 在线程中刷新索引，只重新读取 mtime 变化的清单；缺少 size_bytes 的旧运行时补算一次
+- 清理决策只在内存索引上进行；完整重新统计仅在 rescan() 时执行
+
 Requirements: 6.6
 """
 
@@ -10,7 +15,8 @@ import asyncio
 import contextlib
 import os
 import shutil
-from collections.abc import Callable
+import time
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
@@ -18,6 +24,29 @@ from typing import Any
 import ujson
 from loguru import logger
 
+MANIFEST_FILE = "manifest.json"
+
+
+def compute_dir_size(path: str) -> int:
+    """统计目录占用字节数（同步，不跟随符号链接；调用方应放到线程中执行）"""
+    total = 0
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
 
 @dataclass
 class GCPolicy:
@@ -60,6 +89,9 @@ class GCStats:
     total_bytes_freed: int = 0
     last_cleaned: int = 0
     last_bytes_freed: int = 0
+    last_gc_duration_ms: float = 0.0
+    max_gc_duration_ms: float = 0.0
+    size_scans: int = 0  # 目录遍历次数（构建外的补算与 rescan）
     errors: list[str] = field(default_factory=list)
 
 
@@ -101,6 +133,16 @@ class RuntimeGC:
         self._running = False
         self._task: asyncio.Task | None = None
         self._on_gc_complete: Callable[[GCStats], None] | None = None
+        self._before_gc: Callable[[], Awaitable[Any]] | None = None
+        self._on_runtime_removed: Callable[[str], None] | None = None
+        self._on_size_computed: Callable[[str, int], None] | None = None
+
+        # 大小索引：runtime_hash -> RuntimeInfo，以及对应清单的 mtime
+        self._index: dict[str, RuntimeInfo] = {}
+        self._manifest_mtimes: dict[str, int | None] = {}
+        self._tracked: dict[str, RuntimeInfo] = {}  # 刷新期间新记录的运行时
+        self._index_loaded = False
+        self._index_lock = asyncio.Lock()
 
     @property
     def stats(self) -> GCStats:
@@ -111,6 +153,18 @@ class RuntimeGC:
         """设置 GC 完成回调"""
         self._on_gc_complete = callback
 
+    def set_before_gc_callback(self, callback: Callable[[], Awaitable[Any]]) -> None:
+        """设置 GC 开始前回调（如写回内存中的 last_used）"""
+        self._before_gc = callback
+
+    def set_remove_callback(self, callback: Callable[[str], None]) -> None:
+        """设置运行时被清理后的回调，参数为 runtime_hash"""
+        self._on_runtime_removed = callback
+
+    def set_size_callback(self, callback: Callable[[str, int], None]) -> None:
+        """设置补算出运行时大小后的回调，参数为 (runtime_hash, size_bytes)"""
+        self._on_size_computed = callback
+
     async def start(self) -> None:
         """启动自动 GC"""
         if self._running:
@@ -161,17 +215,9 @@ class RuntimeGC:
                 await asyncio.sleep(60)
 
     def _get_dir_size(self, path: str) -> int:
-        """获取目录大小"""
-        total = 0
-        try:
-            for dirpath, _dirnames, filenames in os.walk(path):
-                for f in filenames:
-                    fp = os.path.join(dirpath, f)
-                    with contextlib.suppress(OSError, FileNotFoundError):
-                        total += os.path.getsize(fp)
-        except Exception:
-            pass
-        return total
+        """获取目录大小（同步遍历）"""
+        self._stats.size_scans += 1
+        return compute_dir_size(path)
 
     def _get_disk_usage(self) -> float:
         """获取磁盘使用率"""
@@ -196,12 +242,91 @@ class RuntimeGC:
         except Exception:
             return None
 
-    async def _collect_runtimes(self) -> list[RuntimeInfo]:
-        """收集所有运行时信息"""
-        runtimes = []
+    def _python_executable(self, venv_path: str) -> str:
+        if os.name == "nt":
+            return os.path.join(venv_path, "Scripts", "python.exe")
+        return os.path.join(venv_path, "bin", "python")
+
+    def _manifest_mtime(self, venv_path: str) -> int | None:
+        try:
+            return os.stat(os.path.join(venv_path, MANIFEST_FILE)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _write_size(self, venv_path: str, manifest: dict[str, Any], size_bytes: int) -> None:
+        """把补算的大小写回清单（原子替换）"""
+        manifest_path = os.path.join(venv_path, MANIFEST_FILE)
+        tmp_path = f"{manifest_path}.tmp"
+        try:
+            manifest["size_bytes"] = size_bytes
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                ujson.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, manifest_path)
+        except OSError as e:
+            logger.debug(f"写回运行时大小失败 {venv_path}: {e}")
+
+    def _build_info(
+        self,
+        name: str,
+        venv_path: str,
+        manifest: dict[str, Any] | None,
+        rescan: bool,
+    ) -> tuple[RuntimeInfo, int | None]:
+        """由清单构建索引项，返回 (索引项, 新补算的大小)"""
+        created_at = None
+        last_used_at = None
+        size_bytes = None
+
+        if manifest:
+            if manifest.get("created_at"):
+                with contextlib.suppress(Exception):
+                    created_at = datetime.fromisoformat(manifest["created_at"])
+            if manifest.get("last_used"):
+                with contextlib.suppress(Exception):
+                    last_used_at = datetime.fromisoformat(manifest["last_used"])
+            if isinstance(manifest.get("size_bytes"), int):
+                size_bytes = manifest["size_bytes"]
+
+        # 如果没有时间信息，使用文件修改时间
+        if not created_at:
+            with contextlib.suppress(Exception):
+                created_at = datetime.fromtimestamp(os.path.getctime(venv_path))
+
+        if not last_used_at:
+            with contextlib.suppress(Exception):
+                last_used_at = datetime.fromtimestamp(os.path.getmtime(venv_path))
+
+        computed = None
+        if rescan or size_bytes is None:
+            previous = self._index.get(name)
+            if not rescan and previous is not None:
+                size_bytes = previous.size_bytes
+            else:
+                size_bytes = computed = self._get_dir_size(venv_path)
+                if manifest is not None:
+                    self._write_size(venv_path, manifest, computed)
+
+        info = RuntimeInfo(
+            runtime_hash=name,
+            path=venv_path,
+            size_bytes=size_bytes,
+            created_at=created_at,
+            last_used_at=last_used_at,
+        )
+        return info, computed
+
+    def _scan_index(self, rescan: bool = False) -> tuple[dict, dict, list[tuple[str, int]]]:
+        """
+        扫描运行时目录，生成新索引（同步，在线程中执行）
+
+        清单 mtime 未变化的运行时直接沿用现有索引项。
+        """
+        index: dict[str, RuntimeInfo] = {}
+        mtimes: dict[str, int | None] = {}
+        computed: list[tuple[str, int]] = []
 
         if not os.path.exists(self.venvs_dir):
-            return runtimes
+            return index, mtimes, computed
 
         for name in os.listdir(self.venvs_dir):
             venv_path = os.path.join(self.venvs_dir, name)
@@ -209,46 +334,88 @@ class RuntimeGC:
                 continue
 
             # 检查是否是有效的虚拟环境
-            python_exe = os.path.join(venv_path, "bin", "python")
-            if os.name == "nt":
-                python_exe = os.path.join(venv_path, "Scripts", "python.exe")
+            if not os.path.exists(self._python_executable(venv_path)):
+                continue
 
-            if not os.path.exists(python_exe):
+            mtime = self._manifest_mtime(venv_path)
+            previous = self._index.get(name)
+            if (
+                not rescan
+                and previous is not None
+                and mtime is not None
+                and self._manifest_mtimes.get(name) == mtime
+            ):
+                index[name] = previous
+                mtimes[name] = mtime
                 continue
 
-            # 加载清单
             manifest = self._load_manifest(venv_path)
+            info, size = self._build_info(name, venv_path, manifest, rescan)
+            index[name] = info
+            mtimes[name] = self._manifest_mtime(venv_path) if size is not None else mtime
+            if size is not None:
+                computed.append((name, size))
 
-            # 解析时间
-            created_at = None
-            last_used_at = None
-
-            if manifest:
-                if manifest.get("created_at"):
-                    with contextlib.suppress(Exception):
-                        created_at = datetime.fromisoformat(manifest["created_at"])
-                if manifest.get("last_used"):
-                    with contextlib.suppress(Exception):
-                        last_used_at = datetime.fromisoformat(manifest["last_used"])
+        return index, mtimes, computed
 
-            # 如果没有时间信息，使用文件修改时间
-            if not created_at:
-                with contextlib.suppress(Exception):
-                    created_at = datetime.fromtimestamp(os.path.getctime(venv_path))
+    async def refresh_index(self, rescan: bool = False) -> int:
+        """
+        在线程中刷新大小索引
 
-            if not last_used_at:
-                with contextlib.suppress(Exception):
-                    last_used_at = datetime.fromtimestamp(os.path.getmtime(venv_path))
+        Args:
+            rescan: 是否忽略已记录的大小，重新遍历所有运行时目录
 
-            runtimes.append(RuntimeInfo(
-                runtime_hash=name,
-                path=venv_path,
-                size_bytes=self._get_dir_size(venv_path),
-                created_at=created_at,
-                last_used_at=last_used_at,
-            ))
+        Returns:
+            索引中的运行时数量
+        """
+        async with self._index_lock:
+            self._tracked.clear()
+            index, mtimes, computed = await asyncio.to_thread(self._scan_index, rescan)
+            # 扫描期间构建完成的运行时可能未被扫描到，保留其索引项
+            for runtime_hash, info in self._tracked.items():
+                index.setdefault(runtime_hash, info)
+            self._tracked.clear()
+            self._index = index
+            self._manifest_mtimes = mtimes
+            self._index_loaded = True
+
+        if self._on_size_computed:
+            for runtime_hash, size in computed:
+                try:
+                    self._on_size_computed(runtime_hash, size)
+                except Exception as e:
+                    logger.debug(f"运行时大小回调异常: {e}")
+        return len(index)
+
+    async def rescan(self) -> int:
+        """按需完整重新统计所有运行时大小（线程中执行）"""
+        return await self.refresh_index(rescan=True)
+
+    def track(self, runtime_hash: str, path: str, size_bytes: int) -> None:
+        """记录新构建的运行时（大小已在构建时统计）"""
+        now = datetime.now()
+        info = RuntimeInfo(
+            runtime_hash=runtime_hash,
+            path=path,
+            size_bytes=size_bytes,
+            created_at=now,
+            last_used_at=now,
+        )
+        self._index[runtime_hash] = info
+        self._tracked[runtime_hash] = info
+        # 清单 mtime 未记录，下次刷新时重新读取清单
+        self._manifest_mtimes.pop(runtime_hash, None)
+
+    def forget(self, runtime_hash: str) -> None:
+        """从索引中移除运行时"""
+        self._index.pop(runtime_hash, None)
+        self._tracked.pop(runtime_hash, None)
+        self._manifest_mtimes.pop(runtime_hash, None)
 
-        return runtimes
+    async def _collect_runtimes(self) -> list[RuntimeInfo]:
+        """收集所有运行时信息（刷新索引后返回快照）"""
+        await self.refresh_index()
+        return list(self._index.values())
 
     async def _apply_ttl_policy(
         self,
@@ -337,6 +504,7 @@ class RuntimeGC:
 
         to_clean = []
         current_usage = disk_usage
+        total_size = self._get_total_disk_size()
 
         for rt in remaining:
             if current_usage <= self.policy.disk_low_watermark:
@@ -349,7 +517,6 @@ class RuntimeGC:
             to_clean.append(rt)
             # 估算清理后的使用率
             # 这是一个近似值，实际效果取决于文件系统
-            total_size = self._get_total_disk_size()
             if total_size > 0:
                 current_usage -= rt.size_bytes / total_size
 
@@ -376,8 +543,11 @@ class RuntimeGC:
             是否成功清理
         """
         try:
-            shutil.rmtree(runtime.path)
+            await asyncio.to_thread(shutil.rmtree, runtime.path)
+            self.forget(runtime.runtime_hash)
             logger.info(f"已清理运行时: {runtime.runtime_hash}")
+            if self._on_runtime_removed:
+                self._on_runtime_removed(runtime.runtime_hash)
             return True
         except Exception as e:
             logger.error(f"清理运行时失败 {runtime.runtime_hash}: {e}")
@@ -396,11 +566,19 @@ class RuntimeGC:
             "bytes_freed": 0,
             "errors": [],
         }
+        started = time.perf_counter()
+
+        if self._before_gc:
+            try:
+                await self._before_gc()
+            except Exception as e:
+                logger.warning(f"GC 前置回调失败: {e}")
 
         # 收集运行时信息
         runtimes = await self._collect_runtimes()
 
         if not runtimes:
+            self._record_duration(started)
             return result
 
         # 标记需要清理的运行时
@@ -441,9 +619,16 @@ class RuntimeGC:
         self._stats.total_bytes_freed += result["bytes_freed"]
         self._stats.last_cleaned = result["cleaned"]
         self._stats.last_bytes_freed = result["bytes_freed"]
+        result["duration_ms"] = self._record_duration(started)
 
         return result
 
+    def _record_duration(self, started: float) -> float:
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        self._stats.last_gc_duration_ms = duration_ms
+        self._stats.max_gc_duration_ms = max(self._stats.max_gc_duration_ms, duration_ms)
+        return duration_ms
+
     async def clean_by_hash(self, runtime_hash: str) -> bool:
         """
         按哈希清理指定运行时
@@ -460,13 +645,20 @@ class RuntimeGC:
             return False
 
         try:
-            size = self._get_dir_size(venv_path)
-            shutil.rmtree(venv_path)
+            info = self._index.get(runtime_hash)
+            if info is not None:
+                size = info.size_bytes
+            else:
+                size = await asyncio.to_thread(self._get_dir_size, venv_path)
+            await asyncio.to_thread(shutil.rmtree, venv_path)
+            self.forget(runtime_hash)
 
             self._stats.total_cleaned += 1
             self._stats.total_bytes_freed += size
 
             logger.info(f"已清理运行时: {runtime_hash}")
+            if self._on_runtime_removed:
+                self._on_runtime_removed(runtime_hash)
             return True
         except Exception as e:
             logger.error(f"清理运行时失败 {runtime_hash}: {e}")
@@ -474,27 +666,23 @@ class RuntimeGC:
 
     def get_runtime_count(self) -> int:
         """获取运行时数量"""
+        if self._index_loaded:
+            return len(self._index)
+
         if not os.path.exists(self.venvs_dir):
             return 0
 
         count = 0
         for name in os.listdir(self.venvs_dir):
             venv_path = os.path.join(self.venvs_dir, name)
-            if os.path.isdir(venv_path):
-                python_exe = os.path.join(venv_path, "bin", "python")
-                if os.name == "nt":
-                    python_exe = os.path.join(venv_path, "Scripts", "python.exe")
-                if os.path.exists(python_exe):
-                    count += 1
+            if os.path.isdir(venv_path) and os.path.exists(self._python_executable(venv_path)):
+                count += 1
 
         return count
 
     def get_total_size(self) -> int:
-        """获取所有运行时的总大小"""
-        if not os.path.exists(self.venvs_dir):
-            return 0
-
-        return self._get_dir_size(self.venvs_dir)
+        """获取所有运行时的总大小（来自大小索引，索引未加载时返回 0）"""
+        return sum(info.size_bytes for info in self._index.values())
 
 
 # 全局 GC 实例
@@ -7,6 +7,7 @@
 Requirements: 6.1
 """
 
+import asyncio
 import os
 from dataclasses import dataclass
 from datetime import datetime
@@ -19,7 +20,10 @@ from antcode_worker.runtime.builder import RuntimeBuilder
 from antcode_worker.runtime.gc import GCPolicy, RuntimeGC
 from antcode_worker.runtime.hash import compute_runtime_hash
 from antcode_worker.runtime.locks import RuntimeLock
+from antcode_worker.runtime.prewarm import RuntimePrewarmer
+from antcode_worker.runtime.registry import RuntimeRegistry
 from antcode_worker.runtime.spec import RuntimeSpec
+from antcode_worker.runtime.uv_manager import command_niceness
 
 
 @dataclass
@@ -47,6 +51,26 @@ class RuntimeManagerConfig:
     # 是否启用自动 GC
     auto_gc: bool = True
 
+    # 运行时 last_used 批量写回间隔（秒）
+    last_used_flush_interval: float = 30.0
+
+    # 预热：最大并发构建数（0 表示禁用预热）
+    prewarm_concurrency: int = 1
+
+    # 预热：按任务历史统计热点的间隔（秒，0 表示只接受显式下发）
+    prewarm_interval: float = 60.0
+
+    # 预热：任务历史窗口、每轮热点数量与最小出现次数
+    prewarm_history_size: int = 200
+    prewarm_top_n: int = 3
+    prewarm_min_hits: int = 2
+
+    # 预热构建子进程的 nice 增量
+    prewarm_niceness: int = 10
+
+    # 心跳上报的已就绪运行时哈希数量上限
+    warm_report_limit: int = 50
+
 
 class RuntimeManager:
     """
@@ -61,6 +85,7 @@ class RuntimeManager:
     - release(): 释放运行时（更新最后使用时间）
     - remove(): 删除运行时
     - list(): 列出所有运行时
+    - warm(): 后台预热运行时（由 RuntimePrewarmer 调度）
     """
 
     def __init__(self, config: RuntimeManagerConfig):
@@ -78,10 +103,13 @@ class RuntimeManager:
             os.makedirs(config.locks_dir, exist_ok=True)
 
         # 初始化组件
+        self._registry = RuntimeRegistry(flush_interval=config.last_used_flush_interval)
+
         self._builder = RuntimeBuilder(
             venvs_dir=config.venvs_dir,
             timeout=config.build_timeout,
             uv_cache_dir=config.uv_cache_dir,
+            registry=self._registry,
         )
 
         self._lock = RuntimeLock(default_timeout=config.lock_timeout)
@@ -90,10 +118,28 @@ class RuntimeManager:
             venvs_dir=config.venvs_dir,
             policy=config.gc_policy or GCPolicy(auto_gc=config.auto_gc),
         )
+        self._gc.set_before_gc_callback(self._registry.flush)
+        self._gc.set_remove_callback(self._registry.invalidate)
+        self._gc.set_size_callback(self._registry.set_size)
+
+        # 预热器
+        self._prewarmer: RuntimePrewarmer | None = None
+        if config.prewarm_concurrency > 0:
+            self._prewarmer = RuntimePrewarmer(
+                manager=self,
+                max_concurrent_builds=config.prewarm_concurrency,
+                history_size=config.prewarm_history_size,
+                hot_top_n=config.prewarm_top_n,
+                hot_min_hits=config.prewarm_min_hits,
+                interval=config.prewarm_interval,
+            )
 
         # 运行时使用计数
         self._usage_count: dict[str, int] = {}
 
+        # 进行中的前台（任务）构建数，预热在其期间让步
+        self._foreground_builds = 0
+
         # 运行状态
         self._running = False
 
@@ -104,21 +150,41 @@ class RuntimeManager:
 
         self._running = True
 
+        # 加载运行时注册表
+        loaded = await asyncio.to_thread(self._builder.load_registry)
+        await self._registry.start()
+        logger.debug(f"运行时注册表已加载: {loaded} 个")
+
+        # 加载运行时大小索引（线程中执行，仅为缺少大小的旧运行时遍历目录）
+        indexed = await self._gc.refresh_index()
+        logger.debug(f"运行时大小索引已加载: {indexed} 个")
+
         # 启动锁管理器
         await self._lock.start()
 
         # 启动 GC
         await self._gc.start()
 
+        # 启动预热
+        if self._prewarmer:
+            await self._prewarmer.start()
+
         logger.info("运行时管理器已启动")
 
     async def stop(self) -> None:
         """停止运行时管理器"""
         self._running = False
 
+        # 停止预热
+        if self._prewarmer:
+            await self._prewarmer.stop()
+
         # 停止 GC
         await self._gc.stop()
 
+        # 写回 last_used
+        await self._registry.stop()
+
         # 停止锁管理器
         await self._lock.stop()
 
@@ -154,6 +220,9 @@ class RuntimeManager:
 
         logger.debug(f"准备运行时: {runtime_hash}")
 
+        if self._prewarmer:
+            self._prewarmer.record(runtime_hash, spec)
+
         # 获取锁
         async with self._lock.lock(
             runtime_hash,
@@ -163,11 +232,18 @@ class RuntimeManager:
                 raise RuntimeError(f"无法获取运行时锁: {runtime_hash}")
 
             # 构建运行时
-            result = await self._builder.build(spec, force_rebuild=force_rebuild)
+            self._foreground_builds += 1
+            try:
+                result = await self._builder.build(spec, force_rebuild=force_rebuild)
+            finally:
+                self._foreground_builds -= 1
 
             if not result.success:
                 raise RuntimeError(f"构建运行时失败: {result.error_message}")
 
+            if not result.cached:
+                self._gc.track(runtime_hash, result.venv_path, result.size_bytes)
+
             # 更新使用计数
             self._usage_count[runtime_hash] = self._usage_count.get(runtime_hash, 0) + 1
 
@@ -189,6 +265,66 @@ class RuntimeManager:
 
             return handle
 
+    @property
+    def prewarmer(self) -> RuntimePrewarmer | None:
+        return self._prewarmer
+
+    @property
+    def foreground_builds(self) -> int:
+        return self._foreground_builds
+
+    def is_warm(self, runtime_hash: str) -> bool:
+        """运行时是否已构建就绪"""
+        return runtime_hash in self._registry
+
+    def warm_hashes(self) -> list[str]:
+        """已就绪的运行时哈希（最近使用优先，数量受 warm_report_limit 限制）"""
+        return self._registry.recent_hashes(self.config.warm_report_limit)
+
+    def prewarm(self, specs: list[RuntimeSpec]) -> dict[str, list[str]]:
+        """
+        提交预热请求（立即返回，后台构建）
+
+        Returns:
+            {"queued": [...], "warm": [...], "skipped": [...]}
+        """
+        if not self._prewarmer:
+            raise RuntimeError("运行时预热未启用")
+        return self._prewarmer.submit(specs)
+
+    async def warm(self, spec: RuntimeSpec) -> str:
+        """
+        预热构建运行时
+
+        不计入使用计数、不更新 last_used；锁被占用说明前台任务正在构建同一运行时，直接跳过。
+
+        Returns:
+            built / already_warm / skipped_locked
+
+        Raises:
+            RuntimeError: 构建失败
+        """
+        runtime_hash = compute_runtime_hash(spec)
+        if self.is_warm(runtime_hash):
+            return "already_warm"
+
+        if not await self._lock.acquire(runtime_hash, holder_id="prewarm", wait=False):
+            return "skipped_locked"
+
+        token = command_niceness.set(self.config.prewarm_niceness)
+        try:
+            result = await self._builder.build(spec)
+        finally:
+            command_niceness.reset(token)
+            await self._lock.release(runtime_hash)
+
+        if not result.success:
+            raise RuntimeError(f"构建运行时失败: {result.error_message}")
+        if result.cached:
+            return "already_warm"
+        self._gc.track(runtime_hash, result.venv_path, result.size_bytes)
+        return "built"
+
     async def release(self, handle: RuntimeHandle) -> None:
         """
         释放运行时
@@ -233,6 +369,7 @@ class RuntimeManager:
 
             # 删除运行时
             success = await self._builder.remove(runtime_hash)
+            self._gc.forget(runtime_hash)
 
             if success:
                 # 清理使用计数
@@ -307,6 +444,15 @@ class RuntimeManager:
         """
         return await self._gc.run_gc()
 
+    async def rescan_sizes(self) -> int:
+        """
+        按需完整重新统计运行时占用大小（线程中执行）
+
+        Returns:
+            统计的运行时数量
+        """
+        return await self._gc.rescan()
+
     def get_stats(self) -> dict[str, Any]:
         """
         获取统计信息
@@ -321,11 +467,16 @@ class RuntimeManager:
             "runtime_count": self._gc.get_runtime_count(),
             "total_size_bytes": self._gc.get_total_size(),
             "active_count": sum(1 for c in self._usage_count.values() if c > 0),
+            "registry": self._registry.get_stats(),
+            "prewarm": self._prewarmer.get_stats() if self._prewarmer else None,
             "gc": {
                 "last_gc_time": gc_stats.last_gc_time.isoformat() if gc_stats.last_gc_time else None,
                 "total_gc_runs": gc_stats.total_gc_runs,
                 "total_cleaned": gc_stats.total_cleaned,
                 "total_bytes_freed": gc_stats.total_bytes_freed,
+                "last_gc_duration_ms": gc_stats.last_gc_duration_ms,
+                "max_gc_duration_ms": gc_stats.max_gc_duration_ms,
+                "size_scans": gc_stats.size_scans,
             },
             "locks": {
                 "total_acquired": lock_stats.total_acquired,
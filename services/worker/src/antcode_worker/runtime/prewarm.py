@@ -0,0 +1,196 @@
+"""
+运行时预热
+
+在后台提前构建热点运行时，使冷启动的 Worker 不必在任务超时时间内等待
+uv venv + 依赖安装：
+
+- 热点规格来源：runtime_manage 控制通道下发（action=prewarm），或按最近任务历史统计
+- 低优先级：前台任务构建运行时期间暂停，构建子进程以 nice 降低调度优先级
+- 并发受限：固定数量的预热协程；同一 runtime_hash 通过 RuntimeLock 与前台构建互斥
+"""
+
+import asyncio
+import contextlib
+from collections import Counter, deque
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from antcode_worker.runtime.hash import compute_runtime_hash
+from antcode_worker.runtime.spec import RuntimeSpec
+
+if TYPE_CHECKING:
+    from antcode_worker.runtime.manager import RuntimeManager
+
+
+class RuntimePrewarmer:
+    """运行时预热器"""
+
+    # 前台构建进行中时的让步间隔（秒）
+    IDLE_POLL_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        manager: "RuntimeManager",
+        max_concurrent_builds: int = 1,
+        history_size: int = 200,
+        hot_top_n: int = 3,
+        hot_min_hits: int = 2,
+        interval: float = 60.0,
+        queue_size: int = 64,
+    ):
+        """
+        初始化预热器
+
+        Args:
+            manager: 运行时管理器
+            max_concurrent_builds: 最大并发预热构建数
+            history_size: 任务历史窗口（最近 N 次 prepare）
+            hot_top_n: 每轮按历史预热的规格数量上限
+            hot_min_hits: 历史中出现次数达到该值才视为热点
+            interval: 历史统计间隔（秒），0 表示只接受显式下发
+            queue_size: 待预热队列上限
+        """
+        self._manager = manager
+        self._max_concurrent_builds = max(1, max_concurrent_builds)
+        self._hot_top_n = hot_top_n
+        self._hot_min_hits = max(1, hot_min_hits)
+        self._interval = interval
+
+        self._queue: asyncio.Queue[tuple[str, RuntimeSpec]] = asyncio.Queue(maxsize=queue_size)
+        self._pending: set[str] = set()
+        self._history: deque[str] = deque(maxlen=max(1, history_size))
+        self._history_specs: dict[str, RuntimeSpec] = {}
+
+        self._tasks: list[asyncio.Task] = []
+        self._running = False
+
+        self._stats = {
+            "submitted": 0,
+            "built": 0,
+            "already_warm": 0,
+            "skipped_locked": 0,
+            "failed": 0,
+            "dropped": 0,
+            "history_rounds": 0,
+        }
+
+    async def start(self) -> None:
+        """启动预热协程"""
+        if self._running:
+            return
+        self._running = True
+        for _ in range(self._max_concurrent_builds):
+            self._tasks.append(asyncio.create_task(self._build_loop()))
+        if self._interval > 0:
+            self._tasks.append(asyncio.create_task(self._history_loop()))
+        logger.debug(f"运行时预热已启动 (concurrency={self._max_concurrent_builds})")
+
+    async def stop(self) -> None:
+        """停止预热，丢弃未开始的预热请求"""
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._pending.clear()
+
+    def submit(self, specs: list[RuntimeSpec]) -> dict[str, list[str]]:
+        """
+        提交待预热的规格
+
+        Returns:
+            {"queued": [...], "warm": [...], "skipped": [...]}，元素为 runtime_hash
+        """
+        result: dict[str, list[str]] = {"queued": [], "warm": [], "skipped": []}
+        for spec in specs:
+            runtime_hash = compute_runtime_hash(spec)
+            if self._manager.is_warm(runtime_hash):
+                result["warm"].append(runtime_hash)
+                continue
+            if runtime_hash in self._pending:
+                result["skipped"].append(runtime_hash)
+                continue
+            try:
+                self._queue.put_nowait((runtime_hash, spec))
+            except asyncio.QueueFull:
+                self._stats["dropped"] += 1
+                result["skipped"].append(runtime_hash)
+                continue
+            self._pending.add(runtime_hash)
+            self._stats["submitted"] += 1
+            result["queued"].append(runtime_hash)
+        return result
+
+    def record(self, runtime_hash: str, spec: RuntimeSpec) -> None:
+        """记录一次任务使用的运行时（由前台 prepare 调用）"""
+        evicted = self._history[0] if len(self._history) == self._history.maxlen else None
+        self._history.append(runtime_hash)
+        self._history_specs[runtime_hash] = spec
+        if evicted is not None and evicted not in self._history:
+            self._history_specs.pop(evicted, None)
+
+    def hot_specs(self) -> list[RuntimeSpec]:
+        """按历史出现次数返回尚未就绪的热点规格"""
+        hot = []
+        for runtime_hash, hits in Counter(self._history).most_common():
+            if len(hot) >= self._hot_top_n or hits < self._hot_min_hits:
+                break
+            if self._manager.is_warm(runtime_hash) or runtime_hash in self._pending:
+                continue
+            spec = self._history_specs.get(runtime_hash)
+            if spec is not None:
+                hot.append(spec)
+        return hot
+
+    async def _history_loop(self) -> None:
+        while self._running:
+            try:
+                await asyncio.sleep(self._interval)
+                specs = self.hot_specs()
+                self._stats["history_rounds"] += 1
+                if specs:
+                    queued = self.submit(specs)["queued"]
+                    if queued:
+                        logger.info(f"按任务历史预热运行时: {queued}")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"运行时预热统计异常: {e}")
+
+    async def _build_loop(self) -> None:
+        while self._running:
+            try:
+                runtime_hash, spec = await self._queue.get()
+            except asyncio.CancelledError:
+                break
+
+            try:
+                # 前台构建优先：有任务正在准备运行时则让步
+                while self._manager.foreground_builds > 0:
+                    await asyncio.sleep(self.IDLE_POLL_INTERVAL)
+
+                status = await self._manager.warm(spec)
+                self._stats[status] += 1
+                if status == "built":
+                    logger.info(f"运行时预热完成: {runtime_hash}")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.warning(f"运行时预热失败 {runtime_hash}: {e}")
+            finally:
+                self._pending.discard(runtime_hash)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "pending": len(self._pending),
+            "history": len(self._history),
+            "concurrency": self._max_concurrent_builds,
+        }
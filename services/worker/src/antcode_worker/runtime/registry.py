@@ -0,0 +1,176 @@
+"""
+运行时注册表
+
+按 runtime_hash 缓存已构建运行时的解释器路径、Python 版本和清单，
+复用运行时时不再启动子进程查询版本、也不再每次重写清单：
+
+- 启动时从各运行时的 manifest.json 加载一次
+- 构建、删除、GC 清理时更新或失效
+- last_used 只更新内存，按间隔批量写回清单（GC 执行前也会写回）
+"""
+
+import asyncio
+import contextlib
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+import ujson
+from loguru import logger
+
+MANIFEST_FILE = "manifest.json"
+
+
+@dataclass
+class RuntimeEntry:
+    """注册表条目"""
+
+    runtime_hash: str
+    venv_path: str
+    python_executable: str
+    python_version: str | None
+    manifest: dict[str, Any] = field(default_factory=dict)
+    dirty: bool = False
+
+
+class RuntimeRegistry:
+    """运行时注册表"""
+
+    def __init__(self, flush_interval: float = 30.0):
+        """
+        初始化注册表
+
+        Args:
+            flush_interval: last_used 批量写回间隔（秒）
+        """
+        self.flush_interval = flush_interval
+        self._entries: dict[str, RuntimeEntry] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._running = False
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "flushes": 0,
+            "manifests_written": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, runtime_hash: str) -> bool:
+        return runtime_hash in self._entries
+
+    def get(self, runtime_hash: str) -> RuntimeEntry | None:
+        """查找条目"""
+        entry = self._entries.get(runtime_hash)
+        if entry is None:
+            self._stats["misses"] += 1
+        else:
+            self._stats["hits"] += 1
+        return entry
+
+    def put(self, entry: RuntimeEntry) -> None:
+        """写入或替换条目"""
+        self._entries[entry.runtime_hash] = entry
+
+    def invalidate(self, runtime_hash: str) -> None:
+        """移除条目（运行时被删除或重建）"""
+        if self._entries.pop(runtime_hash, None) is not None:
+            self._stats["invalidations"] += 1
+
+    def touch(self, runtime_hash: str) -> None:
+        """更新最后使用时间（仅内存，等待批量写回）"""
+        entry = self._entries.get(runtime_hash)
+        if entry is None:
+            return
+        entry.manifest["last_used"] = datetime.now().isoformat()
+        entry.dirty = True
+
+    def set_size(self, runtime_hash: str, size_bytes: int) -> None:
+        """记录 GC 补算的运行时大小（清单已由 GC 写回，这里只同步内存副本）"""
+        entry = self._entries.get(runtime_hash)
+        if entry is not None:
+            entry.manifest["size_bytes"] = size_bytes
+
+    def recent_hashes(self, limit: int | None = None) -> list[str]:
+        """按最后使用时间倒序返回运行时哈希"""
+        entries = sorted(
+            self._entries.values(),
+            key=lambda entry: str(entry.manifest.get("last_used") or ""),
+            reverse=True,
+        )
+        hashes = [entry.runtime_hash for entry in entries]
+        return hashes[:limit] if limit is not None else hashes
+
+    async def start(self) -> None:
+        """启动批量写回任务"""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """停止写回任务并写回剩余数据"""
+        self._running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        self._task = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while self._running:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"运行时清单写回异常: {e}")
+
+    async def flush(self) -> int:
+        """批量写回 last_used 已变化的清单，返回写回数量"""
+        async with self._flush_lock:
+            pending = []
+            for entry in self._entries.values():
+                if entry.dirty:
+                    entry.dirty = False
+                    pending.append((entry, dict(entry.manifest)))
+
+            if not pending:
+                return 0
+
+            written = await asyncio.to_thread(self._write_manifests, pending)
+            self._stats["flushes"] += 1
+            self._stats["manifests_written"] += written
+            return written
+
+    def _write_manifests(self, pending: list[tuple[RuntimeEntry, dict[str, Any]]]) -> int:
+        written = 0
+        for entry, manifest in pending:
+            if not os.path.isdir(entry.venv_path):
+                continue
+
+            manifest_path = os.path.join(entry.venv_path, MANIFEST_FILE)
+            tmp_path = f"{manifest_path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    ujson.dump(manifest, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, manifest_path)
+                written += 1
+            except OSError as e:
+                entry.dirty = True
+                logger.warning(f"写回运行时清单失败 {entry.runtime_hash}: {e}")
+        return written
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "dirty": sum(1 for entry in self._entries.values() if entry.dirty),
+        }
@@ -16,8 +16,10 @@ import platform
 import re
 import shutil
 import sys
+from contextvars import ContextVar
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 
 import ujson
 from loguru import logger
@@ -32,6 +34,9 @@ MISE_AVAILABLE = not IS_WINDOWS
 
 PACKAGE_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._@/+=:~\\-\\[\\]\\(\\),<>!#]*$")
 
+# 当前上下文启动子进程时的 nice 增量（运行时预热等后台构建使用，仅 POSIX 生效）
+command_niceness: ContextVar[int] = ContextVar("command_niceness", default=0)
+
 
 @dataclass
 class CommandResult:
@@ -56,6 +61,9 @@ async def run_command(
     cmd_str = " ".join(args)
     logger.debug(f"执行命令: {cmd_str}")
 
+    niceness = command_niceness.get()
+    preexec_fn = partial(os.nice, niceness) if niceness > 0 and not IS_WINDOWS else None
+
     try:
         process = await asyncio.create_subprocess_exec(
             *args,
@@ -63,6 +71,7 @@ async def run_command(
             env=final_env,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
+            preexec_fn=preexec_fn,
         )
 
         stdout_b, stderr_b = await asyncio.wait_for(
@@ -545,6 +554,10 @@ class UVManager:
                     manifest = ujson.load(f)
 
             manifest["packages_count"] = len(packages)
+            # 包变化后重新统计占用大小，供运行时 GC 大小索引使用
+            from antcode_worker.runtime.gc import compute_dir_size
+
+            manifest["size_bytes"] = await asyncio.to_thread(compute_dir_size, venv_path)
 
             with open(manifest_path, "w", encoding="utf-8") as f:
                 ujson.dump(manifest, f, ensure_ascii=False, indent=2)
@@ -54,6 +54,11 @@ class ServerConfig:
     worker_queue_prefix: str = "worker:queue:"
     task_stream_prefix: str = "task:stream:"
     log_stream_prefix: str = "log:stream:"
+    log_pack_enabled: bool = True  # 批量日志按 run 打包为单条 Stream 消息
+    log_pack_max_lines: int = 200  # 单条打包消息最多行数
+    log_pack_max_bytes: int = 64 * 1024  # 单条打包消息最大内容长度（按字符数近似）
+    log_pipeline_max_entries: int = 200  # 单次 pipeline 最多 XADD 数
+    log_send_retries: int = 2  # 失败子批次的重试次数
 
     # Gateway 模式配置
     gateway_host: str = "localhost"
@@ -211,6 +216,22 @@ class TransportBase(ABC):
         """
         pass
 
+    async def poll_tasks(self, max_count: int = 1, timeout: float = 5.0) -> list[TaskMessage]:
+        """
+        批量拉取任务
+
+        默认实现退化为单次 poll_task，子类应覆盖为单次往返的批量实现。
+
+        Args:
+            max_count: 最多拉取的任务数
+            timeout: 超时时间（秒）
+
+        Returns:
+            任务消息列表，无任务返回空列表
+        """
+        task = await self.poll_task(timeout=timeout)
+        return [task] if task is not None else []
+
     @abstractmethod
     async def ack_task(self, task_id: str, accepted: bool, reason: str = "") -> bool:
         """
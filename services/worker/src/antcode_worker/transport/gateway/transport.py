@@ -220,15 +220,24 @@ class GatewayTransport(TransportBase):
 
         通过 gRPC 调用 PollTask 方法。
         """
+        tasks = await self.poll_tasks(max_count=1, timeout=timeout)
+        return tasks[0] if tasks else None
+
+    async def poll_tasks(self, max_count: int = 1, timeout: float = 5.0) -> list[TaskMessage]:
+        """
+        从 Gateway 批量拉取任务
+
+        PollTask 携带 max_tasks，网关单次 XREADGROUP 返回多条任务。
+        """
         if not self._stub or not self._running:
-            return None
+            return []
 
         try:
             # 导入 protobuf 消息
             from antcode_worker.transport.gateway.codecs import TaskDecoder
 
             # 构建请求
-            request = self._build_poll_task_request(timeout)
+            request = self._build_poll_task_request(timeout, max_count=max_count)
 
             # 发送请求
             response = await asyncio.wait_for(
@@ -241,23 +250,31 @@ class GatewayTransport(TransportBase):
 
             # 解码响应
             if not response.has_task:
-                return None
-
-            task = TaskDecoder.decode(response.task)
-            receipt_id = getattr(response, "receipt_id", "") or getattr(response, "message_id", "")
-            if receipt_id:
-                task.receipt = receipt_id
-                self._receipt_cache[receipt_id] = (datetime.now().timestamp(), task.task_id)
+                return []
+
+            # 旧版网关只返回单任务字段
+            polled = list(getattr(response, "tasks", None) or [])
+            if not polled:
+                polled = [response]
+
+            tasks: list[TaskMessage] = []
+            for item in polled:
+                task = TaskDecoder.decode(item.task)
+                receipt_id = getattr(item, "receipt_id", "") or getattr(item, "message_id", "")
+                if receipt_id:
+                    task.receipt = receipt_id
+                    self._receipt_cache[receipt_id] = (datetime.now().timestamp(), task.task_id)
+                tasks.append(task)
             self._consecutive_failures = 0
-            return task
+            return tasks
 
         except TimeoutError:
-            return None
+            return []
         except Exception as e:
             self._consecutive_failures += 1
             logger.error(f"拉取任务失败: {e}")
             await self._handle_connection_error(e)
-            return None
+            return []
 
     async def ack_task(self, task_id: str, accepted: bool, reason: str = "") -> bool:
         """
@@ -782,12 +799,13 @@ class GatewayTransport(TransportBase):
             return self._authenticator.get_metadata()
         return []
 
-    def _build_poll_task_request(self, timeout: float) -> Any:
+    def _build_poll_task_request(self, timeout: float, max_count: int = 1) -> Any:
         """构建 PollTask 请求"""
         from antcode_contracts import gateway_pb2
         return gateway_pb2.PollTaskRequest(
             worker_id=self._gateway_config.worker_id or "",
             timeout_ms=int(timeout * 1000),
+            max_tasks=max(1, max_count),
         )
 
     def _build_poll_control_request(self, timeout: float) -> Any:
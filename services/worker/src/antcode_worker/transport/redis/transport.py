@@ -17,6 +17,8 @@ from typing import Any
 from loguru import logger
 from redis.exceptions import ConnectionError, TimeoutError
 
+from antcode_core.infrastructure.redis import pack_log_lines
+
 from antcode_worker.transport.base import (
     ControlMessage,
     HeartbeatMessage,
@@ -194,8 +196,17 @@ class RedisTransport(TransportBase):
 
         使用 XREADGROUP 从 ready queue 读取任务。
         """
+        tasks = await self.poll_tasks(max_count=1, timeout=timeout)
+        return tasks[0] if tasks else None
+
+    async def poll_tasks(self, max_count: int = 1, timeout: float = 5.0) -> list[TaskMessage]:
+        """
+        从 Redis Streams 批量拉取任务
+
+        单次 XREADGROUP (count=max_count) 读取多条任务，减少往返。
+        """
         if not self._redis or not self._running:
-            return None
+            return []
 
         try:
             now = time.monotonic()
@@ -207,43 +218,22 @@ class RedisTransport(TransportBase):
                 groupname=self._consumer_group,
                 consumername=self._consumer_name,
                 streams={stream_key: ">"},
-                count=1,
-                block=int(timeout * 1000),
+                count=max(1, max_count),
+                block=max(1, int(timeout * 1000)),
             )
 
             self._poll_error_count = 0
             self._poll_backoff_until = 0.0
 
             if not result:
-                return None
+                return []
 
             # 解析消息
-            stream_name, messages = result[0]
-            if not messages:
-                return None
-
-            msg_id, data = messages[0]
-            decoded = self._decode_data(data)
-            receipt = self._encode_receipt(stream_name, msg_id)
-
-            task_msg = TaskMessage(
-                task_id=decoded.get("task_id", ""),
-                project_id=decoded.get("project_id", ""),
-                project_type=decoded.get("project_type", "code"),
-                priority=int(decoded.get("priority", 0) or 0),
-                params=decoded.get("params", {}) or {},
-                environment=decoded.get("environment", {}) or {},
-                timeout=int(decoded.get("timeout", 3600) or 3600),
-                download_url=decoded.get("download_url", "") or "",
-                file_hash=decoded.get("file_hash", "") or "",
-                entry_point=decoded.get("entry_point", "") or "",
-                is_compressed=decoded.get("is_compressed"),
-                run_id=decoded.get("run_id", "") or "",
-                receipt=receipt,
-            )
-
-            self._receipt_cache[receipt] = (stream_name, msg_id, decoded)
-            return task_msg
+            tasks: list[TaskMessage] = []
+            for stream_name, messages in result:
+                for msg_id, data in messages or []:
+                    tasks.append(self._build_task_message(stream_name, msg_id, data))
+            return tasks
 
         except Exception as e:
             self._poll_error_count += 1
@@ -253,7 +243,31 @@ class RedisTransport(TransportBase):
             logger.warning(f"拉取任务退避 {delay:.1f}s (连续失败 {self._poll_error_count} 次)")
             if self._poll_error_count % 3 == 0:
                 await self.reconnect()
-            return None
+            return []
+
+    def _build_task_message(self, stream_name: str, msg_id: str, data: dict[str, Any]) -> TaskMessage:
+        """解析 Stream 消息为任务消息并缓存回执"""
+        decoded = self._decode_data(data)
+        receipt = self._encode_receipt(stream_name, msg_id)
+
+        task_msg = TaskMessage(
+            task_id=decoded.get("task_id", ""),
+            project_id=decoded.get("project_id", ""),
+            project_type=decoded.get("project_type", "code"),
+            priority=int(decoded.get("priority", 0) or 0),
+            params=decoded.get("params", {}) or {},
+            environment=decoded.get("environment", {}) or {},
+            timeout=int(decoded.get("timeout", 3600) or 3600),
+            download_url=decoded.get("download_url", "") or "",
+            file_hash=decoded.get("file_hash", "") or "",
+            entry_point=decoded.get("entry_point", "") or "",
+            is_compressed=decoded.get("is_compressed"),
+            run_id=decoded.get("run_id", "") or "",
+            receipt=receipt,
+        )
+
+        self._receipt_cache[receipt] = (stream_name, msg_id, decoded)
+        return task_msg
 
     async def ack_task(self, task_id: str, accepted: bool, reason: str = "") -> bool:
         """确认任务"""
@@ -381,7 +395,12 @@ class RedisTransport(TransportBase):
             return False
 
     async def send_log_batch(self, logs: list[LogMessage]) -> bool:
-        """发送批量日志"""
+        """
+        发送批量日志
+
+        同一 run 中连续的同类型日志打包为一条 Stream 消息（格式见 log_codec），
+        按 log_pipeline_max_entries 切分后通过非事务 pipeline 发送，只重试失败的消息。
+        """
         if not self._redis or not self._running:
             return False
 
@@ -389,50 +408,122 @@ class RedisTransport(TransportBase):
             return True
 
         try:
-            maxlen = self._keys.config.stream_max_len
-            ttl_seconds = self._keys.config.log_ttl
-
-            async def _write_batch_logs():
-                pipe = self._redis.pipeline()
-                seen = set()
-                for log in logs:
-                    log_key = self._keys.log_stream(log.run_id)
-                    timestamp = log.timestamp or datetime.now()
-                    fields = {
-                        "log_type": log.log_type,
-                        "content": log.content,
-                        "timestamp": timestamp.isoformat(),
-                        "sequence": str(log.sequence),
-                    }
-                    entry_id = self._build_log_entry_id(log, timestamp) or "*"
-                    if maxlen > 0:
-                        pipe.xadd(
-                            log_key,
-                            fields,
-                            id=entry_id,
-                            maxlen=maxlen,
-                            approximate=self._keys.config.stream_approx_max_len,
-                        )
-                    else:
-                        pipe.xadd(log_key, fields, id=entry_id)
-                    if ttl_seconds > 0 and log_key not in seen:
-                        pipe.expire(log_key, ttl_seconds)
-                        seen.add(log_key)
-
-                return await pipe.execute(raise_on_error=False)
-
-            results = await self._run_with_reconnect("发送批量日志", _write_batch_logs)
-            for result in results:
-                if isinstance(result, Exception):
-                    if self._is_duplicate_log_error(result):
-                        continue
-                    logger.error(f"发送批量日志失败: {result}")
-                    return False
+            entries = self._build_log_entries(logs)
+            max_entries = max(1, self._config.log_pipeline_max_entries)
+            failed: list[tuple[str, dict[str, str], str]] = []
+            for start in range(0, len(entries), max_entries):
+                failed.extend(await self._xadd_log_entries(entries[start : start + max_entries]))
+
+            for attempt in range(self._config.log_send_retries):
+                if not failed:
+                    break
+                await asyncio.sleep(0.1 * (attempt + 1))
+                # 单条命令被拒绝属于确定失败；后续消息可能已写入，重试改用自动 ID 避免 ID 回退
+                failed = await self._xadd_log_entries(
+                    [(log_key, fields, "*") for log_key, fields, _ in failed]
+                )
+
+            if failed:
+                logger.error(f"发送批量日志失败: {len(failed)} 条消息重试后仍失败")
+                return False
             return True
         except Exception as e:
             logger.error(f"发送批量日志失败: {e}")
             return False
 
+    def _build_log_entries(
+        self, logs: list[LogMessage]
+    ) -> list[tuple[str, dict[str, str], str]]:
+        """构建 XADD 参数列表：[(stream key, 字段, 消息 ID), ...]"""
+        if not self._config.log_pack_enabled:
+            entries = []
+            for log in logs:
+                timestamp = log.timestamp or datetime.now()
+                fields = {
+                    "log_type": log.log_type,
+                    "content": log.content,
+                    "timestamp": timestamp.isoformat(),
+                    "sequence": str(log.sequence),
+                }
+                entry_id = self._build_log_entry_id(log, timestamp) or "*"
+                entries.append((self._keys.log_stream(log.run_id), fields, entry_id))
+            return entries
+
+        max_lines = max(1, self._config.log_pack_max_lines)
+        max_bytes = max(1, self._config.log_pack_max_bytes)
+        now_ms = int(time.time() * 1000)
+
+        by_run: dict[str, list[LogMessage]] = {}
+        for log in logs:
+            by_run.setdefault(log.run_id, []).append(log)
+
+        entries = []
+        for run_id, run_logs in by_run.items():
+            log_key = self._keys.log_stream(run_id)
+            lines: list[tuple[int, int, str]] = []
+            log_type = ""
+            size = 0
+            for log in run_logs:
+                if lines and (
+                    log.log_type != log_type
+                    or len(lines) >= max_lines
+                    or size + len(log.content) > max_bytes
+                ):
+                    entries.append(self._build_packed_entry(log_key, log_type, lines))
+                    lines = []
+                    size = 0
+                ts_ms = int(log.timestamp.timestamp() * 1000) if log.timestamp else now_ms
+                lines.append((int(log.sequence or 0), ts_ms, log.content))
+                log_type = log.log_type
+                size += len(log.content)
+            if lines:
+                entries.append(self._build_packed_entry(log_key, log_type, lines))
+        return entries
+
+    @staticmethod
+    def _build_packed_entry(
+        log_key: str, log_type: str, lines: list[tuple[int, int, str]]
+    ) -> tuple[str, dict[str, str], str]:
+        # 消息 ID 取首行的 时间戳-序号，重发时由 Redis 拒绝重复写入
+        seq, ts_ms, _ = lines[0]
+        return log_key, pack_log_lines(log_type, lines), f"{ts_ms}-{seq}"
+
+    async def _xadd_log_entries(
+        self, entries: list[tuple[str, dict[str, str], str]]
+    ) -> list[tuple[str, dict[str, str], str]]:
+        """单次非事务 pipeline 写入，返回失败的消息"""
+        if not entries:
+            return []
+
+        maxlen = self._keys.config.stream_max_len
+        ttl_seconds = self._keys.config.log_ttl
+
+        async def _write_batch_logs():
+            pipe = self._redis.pipeline(transaction=False)
+            for log_key, fields, entry_id in entries:
+                if maxlen > 0:
+                    pipe.xadd(
+                        log_key,
+                        fields,
+                        id=entry_id,
+                        maxlen=maxlen,
+                        approximate=self._keys.config.stream_approx_max_len,
+                    )
+                else:
+                    pipe.xadd(log_key, fields, id=entry_id)
+            if ttl_seconds > 0:
+                for log_key in dict.fromkeys(log_key for log_key, _, _ in entries):
+                    pipe.expire(log_key, ttl_seconds)
+            return await pipe.execute(raise_on_error=False)
+
+        results = await self._run_with_reconnect("发送批量日志", _write_batch_logs)
+        failed = []
+        for entry, result in zip(entries, results):
+            if isinstance(result, Exception) and not self._is_duplicate_log_error(result):
+                logger.warning(f"日志消息写入失败，稍后重试: {entry[0]} {result}")
+                failed.append(entry)
+        return failed
+
     @staticmethod
     def _build_log_entry_id(log: LogMessage, timestamp: datetime) -> str | None:
         if log.sequence is None:
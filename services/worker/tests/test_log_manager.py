@@ -0,0 +1,62 @@
+"""日志管理器测试"""
+
+import pytest
+
+from antcode_worker.domain.enums import LogStream
+from antcode_worker.domain.models import LogEntry
+from antcode_worker.logs.manager import LogManager, LogManagerConfig
+
+
+class _RecordingTransport:
+    def __init__(self):
+        self.single_calls = 0
+        self.batch_calls: list[int] = []
+
+    @property
+    def is_connected(self) -> bool:
+        return True
+
+    async def send_log(self, log) -> bool:
+        self.single_calls += 1
+        return True
+
+    async def send_log_batch(self, logs) -> bool:
+        self.batch_calls.append(len(logs))
+        return True
+
+
+@pytest.mark.asyncio
+async def test_write_batch_calls_each_sink_once(tmp_path):
+    transport = _RecordingTransport()
+    manager = LogManager(
+        run_id="run-batch",
+        transport=transport,
+        config=LogManagerConfig(enable_spool=False, wal_dir=str(tmp_path)),
+    )
+    await manager.start()
+
+    entries = [
+        LogEntry(run_id="run-batch", stream=LogStream.STDOUT, content=f"line {i}", seq=i)
+        for i in range(50)
+    ]
+    calls = []
+    for name in ("_archiver", "_realtime", "_batch"):
+        sink = getattr(manager, name)
+        method = "write_many" if name == "_archiver" else "write_batch"
+        original = getattr(sink, method)
+
+        async def recorded(items, _original=original, _name=name):
+            calls.append((_name, len(items)))
+            return await _original(items)
+
+        setattr(sink, method, recorded)
+
+    await manager.write_batch(entries)
+
+    assert calls == [("_archiver", 50), ("_realtime", 50), ("_batch", 50)]
+    assert transport.single_calls == 0
+    assert transport.batch_calls == [50]
+    assert manager._archiver.get_stats()["entries_written"] == 50
+
+    await manager.stop()
+    assert sum(transport.batch_calls) == 100
@@ -0,0 +1,25 @@
+"""限速中间件测试"""
+
+import pytest
+
+from antcode_worker.plugins.spider.spiderkit.middlewares import RateLimitMiddleware
+from antcode_worker.plugins.spider.spiderkit.request import Request, Response
+
+URL = "https://example.com/page"
+
+
+@pytest.mark.asyncio
+async def test_retry_after_delays_next_reservations():
+    middleware = RateLimitMiddleware(requests_per_second=10, burst=20)
+    request = Request(url=URL)
+    await middleware.process_request(request)
+
+    delay = 2.0
+    await middleware.process_response(
+        request, Response(url=URL, status=429, headers={"Retry-After": str(delay)})
+    )
+
+    domain = middleware._get_domain(URL)
+    waits = [middleware.reserve(domain) for _ in range(5)]
+    assert all(wait >= delay - 0.05 for wait in waits)
+    assert waits == sorted(waits)
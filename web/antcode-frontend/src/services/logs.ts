@@ -199,7 +199,7 @@ class LogService extends BaseService {
 
     const wsHost = import.meta.env.VITE_WS_HOST || window.location.host
     const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
-    const wsUrl = `${wsProtocol}//${wsHost}/api/v1/ws/runs/${runId}/logs?token=${encodeURIComponent(token)}`
+    const wsUrl = `${wsProtocol}//${wsHost}/api/v1/ws/runs/${runId}/logs?token=${encodeURIComponent(token)}&batch=1`
 
     let ws: WebSocket | null = null
     let reconnectAttempts = 0
@@ -215,60 +215,74 @@ class LogService extends BaseService {
           onStateChange?.('connected')
         }
 
-        ws.onmessage = (event) => {
-          try {
-            const message = JSON.parse(event.data)
-
-            if (message.type === 'log_line' && message.data) {
-              const logEntry: LogEntry = {
-                id: `${Date.now()}_${Math.random().toString(36).slice(2, 10)}`,
-                timestamp: message.data.timestamp || message.timestamp,
-                level: (message.data.level || 'INFO') as LogLevel,
-                log_type: (message.data.log_type || 'stdout') as LogType,
-                run_id: message.data.run_id || runId,
-                message: message.data.content || message.data.message || '',
-                source: message.data.source,
-              }
-              onMessage?.(logEntry)
-              return
+        // 单条消息处理（合并帧 log_batch 中的每条消息同样走这里）
+        // eslint-disable-next-line @typescript-eslint/no-explicit-any
+        const handleMessage = (message: any) => {
+          if (message.type === 'log_line' && message.data) {
+            const logEntry: LogEntry = {
+              id: `${Date.now()}_${Math.random().toString(36).slice(2, 10)}`,
+              timestamp: message.data.timestamp || message.timestamp,
+              level: (message.data.level || 'INFO') as LogLevel,
+              log_type: (message.data.log_type || 'stdout') as LogType,
+              run_id: message.data.run_id || runId,
+              message: message.data.content || message.data.message || '',
+              source: message.data.source,
             }
+            onMessage?.(logEntry)
+            return
+          }
 
-            if (message.type === 'ping') {
-              ws?.send(JSON.stringify({ type: 'pong', timestamp: new Date().toISOString() }))
-              return
-            }
+          if (message.type === 'ping') {
+            ws?.send(JSON.stringify({ type: 'pong', timestamp: new Date().toISOString() }))
+            return
+          }
 
-            if (message.type === 'run_status' && message.data) {
-              onStatusUpdate?.({
-                status: message.data.status,
-                message: message.data.message,
-                progress: message.data.progress,
-              })
-              return
-            }
+          if (message.type === 'run_status' && message.data) {
+            onStatusUpdate?.({
+              status: message.data.status,
+              message: message.data.message,
+              progress: message.data.progress,
+            })
+            return
+          }
 
-            if (message.type === 'historical_logs_start') {
-              onHistoricalLogsUpdate?.({ phase: 'loading' })
-              return
-            }
+          if (message.type === 'historical_logs_start') {
+            onHistoricalLogsUpdate?.({ phase: 'loading' })
+            return
+          }
 
-            if (message.type === 'historical_logs_end') {
-              const sentLines = Number(message.sent_lines)
-              onHistoricalLogsUpdate?.({
-                phase: 'loaded',
-                sentLines: Number.isFinite(sentLines) ? sentLines : 0,
-              })
-              return
-            }
+          if (message.type === 'historical_logs_end') {
+            const sentLines = Number(message.sent_lines)
+            onHistoricalLogsUpdate?.({
+              phase: 'loaded',
+              sentLines: Number.isFinite(sentLines) ? sentLines : 0,
+            })
+            return
+          }
 
-            if (message.type === 'no_historical_logs') {
-              onHistoricalLogsUpdate?.({ phase: 'empty', sentLines: 0 })
-              return
-            }
+          if (message.type === 'no_historical_logs') {
+            onHistoricalLogsUpdate?.({ phase: 'empty', sentLines: 0 })
+            return
+          }
+
+          if (message.type === 'logs_dropped') {
+            Logger.warn(`连接消费过慢，服务端丢弃了 ${message.count} 条日志`)
+            return
+          }
+
+          if (message.type === 'error') {
+            onError?.(message.message || 'WebSocket server error')
+          }
+        }
 
-            if (message.type === 'error') {
-              onError?.(message.message || 'WebSocket server error')
+        ws.onmessage = (event) => {
+          try {
+            const message = JSON.parse(event.data)
+            if (message.type === 'log_batch' && Array.isArray(message.messages)) {
+              message.messages.forEach(handleMessage)
+              return
             }
+            handleMessage(message)
           } catch (e) {
             Logger.error('解析日志 WebSocket 消息失败:', e)
           }